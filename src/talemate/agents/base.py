@@ -842,6 +842,16 @@ class Agent(ABC):
         """
         return False
 
+    # agent functions whose prompts are deterministic given their input, their
+    # responses may be served from the client response cache
+    response_cache_functions: tuple[str, ...] = ()
+
+    def allow_response_cache(self, kind: str, agent_function_name: str) -> bool:
+        """
+        Returns True if the response to the prompt may be cached.
+        """
+        return agent_function_name in self.response_cache_functions
+
     @set_processing
     async def delegate(self, fn: Callable, *args, **kwargs):
         """
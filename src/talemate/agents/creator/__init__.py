@@ -30,6 +30,11 @@ class CreatorAgent(
 
     agent_type = "creator"
     verbose_name = "Creator"
+    # character card analysis on import
+    response_cache_functions = (
+        "determine_content_context_for_character",
+        "determine_character_description",
+    )
 
     @classmethod
     def init_actions(cls) -> dict[str, AgentAction]:
@@ -48,6 +48,7 @@ class DirectorAgent(
 ):
     agent_type = "director"
     verbose_name = "Director"
+    response_cache_functions = ("detect_characters_from_texts",)
     websocket_handler = DirectorWebsocketHandler
 
     @classmethod
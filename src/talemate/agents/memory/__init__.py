@@ -3,8 +3,11 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 import asyncio
+import contextlib
 import functools
 import hashlib
+import json
+import os
 import traceback
 import numpy as np
 from typing import Callable
@@ -27,12 +30,20 @@ from talemate.config.schema import EmbeddingFunctionPreset
 from talemate.context import scene_is_loading, active_scene
 from talemate.emit import emit
 import talemate.emit.async_signals as async_signals
-from talemate.agents.memory.context import memory_request, MemoryRequest
+from talemate.agents.memory.context import (
+    memory_request,
+    MemoryRequest,
+    MemoryRequestState,
+)
 from talemate.agents.memory.exceptions import (
     EmbeddingsModelLoadError,
     SetDBError,
 )
 from talemate.agents.memory.schema import MemoryDocument
+from talemate.agents.memory.embedding_cache import (
+    EMBEDDING_CACHE,
+    CachedEmbeddingFunction,
+)
 
 import talemate.agents.memory.nodes  # noqa: F401
 
@@ -54,6 +65,28 @@ log = structlog.get_logger("talemate.agents.memory")
 if not chromadb:
     log.info("ChromaDB not found, disabling Chroma agent")
 
+# metadata keys that do not describe the document content and are left out
+# of the content hash
+CONTENT_HASH_IGNORE_META = ("session", "content_hash")
+
+
+def content_hash(text: str, meta: dict) -> str:
+    """
+    Returns a stable hash of a memory document's text and metadata.
+
+    Used to tell whether a document already stored in the memory database
+    needs to be re-embedded.
+    """
+    payload = "\x1f".join(
+        [text]
+        + [
+            f"{key}={meta[key]!r}"
+            for key in sorted(meta)
+            if key not in CONTENT_HASH_IGNORE_META
+        ]
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
 
 class MemoryAgent(Agent):
     """
@@ -93,6 +126,12 @@ class MemoryAgent(Agent):
                             {"value": "cuda", "label": "CUDA"},
                         ],
                     ),
+                    "persist_embedding_cache": AgentActionConfig(
+                        type="bool",
+                        value=False,
+                        label="Persist embedding cache",
+                        description="Keep cached embeddings on disk so they are reused after a restart",
+                    ),
                 },
             ),
         }
@@ -203,6 +242,10 @@ class MemoryAgent(Agent):
     def device(self) -> str:
         return self.actions["_config"].config["device"].value
 
+    @property
+    def persist_embedding_cache(self) -> bool:
+        return self.actions["_config"].config["persist_embedding_cache"].value
+
     @property
     def trust_remote_code(self) -> bool:
         try:
@@ -429,6 +472,42 @@ class MemoryAgent(Agent):
         """
         raise NotImplementedError()
 
+    @set_processing
+    async def sync_many(self, objects: list[dict]) -> dict | None:
+        """
+        Makes the memory contain exactly the given objects.
+
+        Only new and changed objects are (re-)embedded, objects that are no
+        longer in the list are removed.
+        """
+        if self.readonly:
+            log.debug("memory agent", status="readonly")
+            return None
+
+        while not self._ready_to_add:
+            await asyncio.sleep(0.1)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._sync_many, objects)
+
+    def _sync_many(self, objects: list[dict]) -> dict:
+        raise NotImplementedError()
+
+    @set_processing
+    async def copy_db(self, memory_id: str):
+        """
+        Copies the current memory database, including its embeddings, to the
+        database for `memory_id`
+        """
+        if not self.db:
+            return
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._copy_db, memory_id)
+
+    def _copy_db(self, memory_id: str):
+        raise NotImplementedError()
+
     @set_processing
     async def delete(self, meta: dict):
         """
@@ -462,6 +541,60 @@ class MemoryAgent(Agent):
     def _get(self, text, character=None, **query):
         raise NotImplementedError()
 
+    @set_processing
+    async def get_many(
+        self,
+        texts: list[str],
+        character=None,
+        where: list[dict] | None = None,
+        limit: int = 15,
+        **query,
+    ) -> list[list]:
+        """
+        Runs several memory queries at once, returns one result list per
+        text.
+
+        `query` filters apply to all texts, `where` optionally holds
+        additional filters per text.
+        """
+        queries = [
+            (text, {**query, **(where[idx] if where else {})})
+            for idx, text in enumerate(texts)
+        ]
+
+        with contextlib.ExitStack() as stack:
+            requests = []
+            for text, query_params in queries:
+                request = stack.enter_context(
+                    MemoryRequest(query=text, query_params=query_params)
+                )
+                request.max_distance = self.max_distance
+                requests.append(request)
+
+            return await asyncio.to_thread(
+                self._get_many, queries, requests, character, limit
+            )
+
+    def _get_many(
+        self,
+        queries: list[tuple[str, dict]],
+        requests: list[MemoryRequestState],
+        character=None,
+        limit: int = 15,
+    ) -> list[list]:
+        """
+        Runs each query through `_get`, backends override this to batch
+        queries.
+        """
+        results = []
+        for (text, query), request in zip(queries, requests):
+            token = memory_request.set(request)
+            try:
+                results.append(self._get(text, character, limit=limit, **query))
+            finally:
+                memory_request.reset(token)
+        return results
+
     @set_processing
     async def get_document(self, id):
         loop = asyncio.get_running_loop()
@@ -489,6 +622,7 @@ class MemoryAgent(Agent):
         """
 
         memory_context = []
+        memory_tokens = 0
 
         if not query:
             return memory_context
@@ -501,8 +635,9 @@ class MemoryAgent(Agent):
                 continue
 
             memory_context.append(memory)
+            memory_tokens += util.count_tokens_cached(memory)
 
-            if util.count_tokens(memory_context) >= max_tokens:
+            if memory_tokens >= max_tokens:
                 break
         return memory_context
 
@@ -550,15 +685,20 @@ class MemoryAgent(Agent):
 
         per_query_results: list[list[str]] = []
 
+        # Fetch potential memories for all queries in one batch. Empty
+        # queries are skipped, but keep their slot so that indexing stays
+        # consistent for the round-robin step that follows.
+        texts = [formatter(query) for query in queries if query]
+        batch_results = iter(
+            await self.get_many(texts, limit=limit, **where) if texts else []
+        )
+
         for query in queries:
-            # Skip empty queries so that we keep indexing consistent for the
-            # round-robin step that follows.
             if not query:
                 per_query_results.append([])
                 continue
 
-            # Fetch potential memories for this query.
-            raw_results = await self.get(formatter(query), limit=limit, **where)
+            raw_results = next(batch_results)
 
             # Apply filter and respect the `iterate` limit for this query.
             accepted: list[str] = []
@@ -577,6 +717,7 @@ class MemoryAgent(Agent):
         # budget.
 
         memory_context: list[str] = []
+        memory_tokens = 0
         idx = 0
         while True:
             added_any = False
@@ -593,10 +734,11 @@ class MemoryAgent(Agent):
                     continue
 
                 memory_context.append(memory)
+                memory_tokens += util.count_tokens_cached(memory)
                 added_any = True
 
                 # Check token budget after each addition.
-                if util.count_tokens(memory_context) >= max_tokens:
+                if memory_tokens >= max_tokens:
                     return memory_context
 
             if not added_any:
@@ -802,6 +944,13 @@ class ChromaDBMemoryAgent(MemoryAgent):
                 description="The device to use for embeddings.",
             ).model_dump()
 
+        cache_stats = EMBEDDING_CACHE.stats
+        details["embedding_cache"] = AgentDetail(
+            icon="mdi-cached",
+            value=f"{cache_stats['hits']} hits / {cache_stats['misses']} misses",
+            description=f"Embedding cache: {cache_stats['size']} entries, {cache_stats['hit_rate']:.0%} hit rate",
+        ).model_dump()
+
         if self.embeddings == "openai" and not self.openai_api_key:
             # return "No OpenAI API key set"
             details["error"] = {
@@ -868,7 +1017,21 @@ class ChromaDBMemoryAgent(MemoryAgent):
         embed_fn = self.db._embedding_function
         return embed_fn
 
+    @property
+    def embedding_cache_dir(self) -> str:
+        return os.path.join(
+            self.db_client.get_settings().persist_directory, "embedding-cache"
+        )
+
+    def _cached_embedding_function(self, ef) -> CachedEmbeddingFunction:
+        if self.persist_embedding_cache:
+            EMBEDDING_CACHE.load(self.embedding_cache_dir, self.fingerprint)
+        return CachedEmbeddingFunction(ef, self.fingerprint, EMBEDDING_CACHE)
+
     def make_collection_name(self, scene) -> str:
+        return self._collection_name(scene.memory_id)
+
+    def _collection_name(self, memory_id: str) -> str:
         # generate plain text collection name
         collection_name = f"{self.fingerprint}"
 
@@ -881,7 +1044,7 @@ class ChromaDBMemoryAgent(MemoryAgent):
         # Step 2: Ensure the result is exactly 32 characters long
         hashed_collection_name = md5_hash[:32]
 
-        return f"{scene.memory_id}-tm-{hashed_collection_name}"
+        return f"{memory_id}-tm-{hashed_collection_name}"
 
     async def count(self):
         await asyncio.sleep(0)
@@ -930,7 +1093,7 @@ class ChromaDBMemoryAgent(MemoryAgent):
             )
             self.db = self.db_client.get_or_create_collection(
                 collection_name,
-                embedding_function=openai_ef,
+                embedding_function=self._cached_embedding_function(openai_ef),
                 metadata=collection_metadata,
             )
         elif self.using_client_api_embeddings:
@@ -956,7 +1119,9 @@ class ChromaDBMemoryAgent(MemoryAgent):
             ef = embeddings_client.embeddings_function
 
             self.db = self.db_client.get_or_create_collection(
-                collection_name, embedding_function=ef, metadata=collection_metadata
+                collection_name,
+                embedding_function=self._cached_embedding_function(ef),
+                metadata=collection_metadata,
             )
         else:
             log.info(
@@ -981,7 +1146,9 @@ class ChromaDBMemoryAgent(MemoryAgent):
                 raise EmbeddingsModelLoadError(model_name, str(e))
 
             self.db = self.db_client.get_or_create_collection(
-                collection_name, embedding_function=ef, metadata=collection_metadata
+                collection_name,
+                embedding_function=self._cached_embedding_function(ef),
+                metadata=collection_metadata,
             )
 
         self.scene._memory_never_persisted = self.db.count() == 0
@@ -1020,6 +1187,9 @@ class ChromaDBMemoryAgent(MemoryAgent):
             "chromadb agent", status="closing db", collection_name=self.collection_name
         )
 
+        if self.persist_embedding_cache:
+            EMBEDDING_CACHE.save(self.embedding_cache_dir, self.fingerprint)
+
         if not scene.saved and not scene.saved_memory_session_id:
             # scene was never saved so we can discard the memory
             collection_name = self.make_collection_name(scene)
@@ -1079,17 +1249,19 @@ class ChromaDBMemoryAgent(MemoryAgent):
 
         # log.debug("chromadb agent add", text=text, meta=meta, id=id)
 
+        meta["content_hash"] = content_hash(text, meta)
+
         self.db.upsert(documents=[text], metadatas=metadatas, ids=ids)
 
-    def _add_many(self, objects: list[dict]):
+    def _prepare_many(self, objects: list[dict]) -> tuple[list, list, list]:
+        """
+        Normalizes objects into chromadb documents, metadatas and ids
+        """
         documents = []
         metadatas = []
         ids = []
         scene = self.scene
 
-        if not objects:
-            return
-
         # track seen documents by id
         seen_ids = set()
 
@@ -1110,12 +1282,108 @@ class ChromaDBMemoryAgent(MemoryAgent):
             meta["source"] = source
             if not meta.get("session"):
                 meta["session"] = scene.memory_session_id
+            meta["content_hash"] = content_hash(obj["text"], meta)
             metadatas.append(meta)
             uid = obj.get("id", f"{character}-{self.memory_tracker[character]}")
             ids.append(uid)
 
+        return documents, metadatas, ids
+
+    def _batches(self, *columns: list):
+        """
+        Yields the columns in slices that fit chromadb's max batch size
+        """
+        size = self.db_client.get_max_batch_size()
+        for start in range(0, len(columns[0]), size):
+            yield tuple(column[start : start + size] for column in columns)
+
+    def _add_many(self, objects: list[dict]):
+        if not objects:
+            return
+
+        documents, metadatas, ids = self._prepare_many(objects)
         self.db.upsert(documents=documents, metadatas=metadatas, ids=ids)
 
+    def _sync_many(self, objects: list[dict]) -> dict:
+        documents, metadatas, ids = self._prepare_many(objects)
+
+        existing = self.db.get(include=["metadatas"])
+        stored_hashes = {
+            uid: (meta or {}).get("content_hash")
+            for uid, meta in zip(existing["ids"], existing["metadatas"])
+        }
+
+        changed = [
+            idx
+            for idx, uid in enumerate(ids)
+            if stored_hashes.get(uid) != metadatas[idx]["content_hash"]
+        ]
+        wanted = set(ids)
+        removed = [uid for uid in stored_hashes if uid not in wanted]
+
+        if changed:
+            for batch in self._batches(
+                [documents[idx] for idx in changed],
+                [metadatas[idx] for idx in changed],
+                [ids[idx] for idx in changed],
+            ):
+                self.db.upsert(documents=batch[0], metadatas=batch[1], ids=batch[2])
+
+        for (batch,) in self._batches(removed):
+            self.db.delete(ids=batch)
+
+        stats = {
+            "total": len(ids),
+            "embedded": len(changed),
+            "removed": len(removed),
+        }
+        log.info(
+            "chromadb agent",
+            status="synced db",
+            collection_name=self.collection_name,
+            **stats,
+        )
+        return stats
+
+    def _copy_db(self, memory_id: str):
+        collection_name = self._collection_name(memory_id)
+
+        if collection_name == self.collection_name:
+            return
+
+        target = self.db_client.get_or_create_collection(
+            collection_name,
+            embedding_function=self.db._embedding_function,
+            metadata=self.db.metadata,
+        )
+
+        # embeddings are copied as is, nothing is re-embedded
+        batch_size = self.db_client.get_max_batch_size()
+        offset = 0
+        while True:
+            result = self.db.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=batch_size,
+                offset=offset,
+            )
+            if not result["ids"]:
+                break
+            target.upsert(
+                ids=result["ids"],
+                embeddings=result["embeddings"],
+                documents=result["documents"],
+                metadatas=result["metadatas"],
+            )
+            offset += len(result["ids"])
+
+        log.info(
+            "chromadb agent",
+            status="copied db",
+            source=self.collection_name,
+            target=collection_name,
+            count=offset,
+        )
+
     def _delete(self, meta: dict):
         if "ids" in meta:
             log.debug("chromadb agent delete", ids=meta["ids"])
@@ -1131,7 +1399,7 @@ class ChromaDBMemoryAgent(MemoryAgent):
         self.db.delete(where=where)
         log.debug("chromadb agent delete", meta=meta, where=where)
 
-    def _get(self, text, character=None, limit: int = 15, **kwargs):
+    def _build_where(self, character=None, **kwargs) -> dict | None:
         where = {}
 
         # this doesn't work because chromadb currently doesn't match
@@ -1156,6 +1424,11 @@ class ChromaDBMemoryAgent(MemoryAgent):
         elif not where["$and"]:
             where = None
 
+        return where
+
+    def _get(self, text, character=None, limit: int = 15, **kwargs):
+        where = self._build_where(character, **kwargs)
+
         log.debug("crhomadb agent get", text=text, where=where)
 
         try:
@@ -1164,6 +1437,59 @@ class ChromaDBMemoryAgent(MemoryAgent):
             log.error("chromadb agent", error="failed to query", details=e)
             return []
 
+        return self._collect_results(text, _results, 0, limit, memory_request.get())
+
+    def _get_many(
+        self,
+        queries: list[tuple[str, dict]],
+        requests: list[MemoryRequestState],
+        character=None,
+        limit: int = 15,
+    ) -> list[list[MemoryDocument]]:
+        # queries sharing the same filters are embedded and queried together
+        groups: dict[str, list[int]] = {}
+        wheres: dict[str, dict | None] = {}
+        for idx, (_, where_kwargs) in enumerate(queries):
+            where = self._build_where(character, **where_kwargs)
+            key = json.dumps(where, sort_keys=True, default=str)
+            groups.setdefault(key, []).append(idx)
+            wheres[key] = where
+
+        results: list[list[MemoryDocument]] = [[] for _ in queries]
+
+        for key, indexes in groups.items():
+            texts = [queries[idx][0] for idx in indexes]
+
+            log.debug("crhomadb agent get many", texts=len(texts), where=wheres[key])
+
+            try:
+                _results = self.db.query(
+                    query_texts=texts, where=wheres[key], n_results=limit
+                )
+            except Exception as e:
+                log.error("chromadb agent", error="failed to query", details=e)
+                continue
+
+            for row, idx in enumerate(indexes):
+                results[idx] = self._collect_results(
+                    queries[idx][0], _results, row, limit, requests[idx]
+                )
+
+        return results
+
+    def _collect_results(
+        self,
+        text: str,
+        _results: dict,
+        row: int,
+        limit: int,
+        active_memory_request: MemoryRequestState,
+    ) -> list[MemoryDocument]:
+        """
+        Turns row `row` of a chromadb query result into memory documents,
+        recording them on the memory request.
+        """
+
         # import json
         # print(json.dumps(_results["ids"], indent=2))
         # print(json.dumps(_results["distances"], indent=2))
@@ -1174,13 +1500,11 @@ class ChromaDBMemoryAgent(MemoryAgent):
 
         closest = None
 
-        active_memory_request = memory_request.get()
-
-        for i in range(len(_results["distances"][0])):
-            distance = _results["distances"][0][i]
+        for i in range(len(_results["distances"][row])):
+            distance = _results["distances"][row][i]
 
-            doc = _results["documents"][0][i]
-            meta = _results["metadatas"][0][i]
+            doc = _results["documents"][row][i]
+            meta = _results["metadatas"][row][i]
 
             active_memory_request.add_result(doc, distance, meta)
 
@@ -1205,7 +1529,7 @@ class ChromaDBMemoryAgent(MemoryAgent):
                 if date_prefix:
                     doc = f"{date_prefix}: {doc}"
 
-                doc = MemoryDocument(doc, meta, _results["ids"][0][i], raw)
+                doc = MemoryDocument(doc, meta, _results["ids"][row][i], raw)
 
                 results.append(doc)
                 active_memory_request.accept_result(str(doc), distance, meta)
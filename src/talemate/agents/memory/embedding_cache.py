@@ -0,0 +1,247 @@
+"""
+Embedding cache for the memory agent.
+
+The memory agent embeds the same texts over and over: revision checks embed
+the sentences of the most recent messages on every generation, and memory
+queries repeat as the scene progresses. `EmbeddingCache` keeps embeddings in
+an LRU keyed by the embedding configuration (`MemoryAgent.fingerprint`) and a
+hash of the text, and `CachedEmbeddingFunction` puts it in front of the
+embedding function used by the memory database.
+
+The cache can optionally be persisted to disk, one file per fingerprint.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+import structlog
+
+try:
+    from chromadb.api.types import EmbeddingFunction
+except ImportError:
+    EmbeddingFunction = object
+
+__all__ = [
+    "EMBEDDING_CACHE",
+    "CachedEmbeddingFunction",
+    "EmbeddingCache",
+]
+
+log = structlog.get_logger("talemate.agents.memory.embedding_cache")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU cache of embeddings keyed by (fingerprint, text hash).
+    """
+
+    def __init__(self, max_size: int = 50000):
+        self.max_size = max_size
+        self.entries: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.loaded: set[str] = set()
+        # embedding functions are called from executor threads
+        self._lock = threading.Lock()
+
+    def embed(
+        self,
+        fingerprint: str,
+        texts: list[str],
+        embed_fn: Callable[[list[str]], list],
+    ) -> list[np.ndarray]:
+        """
+        Returns embeddings for `texts`, only passing texts that are not
+        cached to `embed_fn` (in a single call).
+        """
+        keys = [(fingerprint, text_hash(text)) for text in texts]
+        embeddings: list[np.ndarray | None] = []
+        missing: dict[tuple[str, str], str] = {}
+
+        with self._lock:
+            for key, text in zip(keys, texts):
+                embedding = self.entries.get(key)
+                if embedding is not None:
+                    self.hits += 1
+                    self.entries.move_to_end(key)
+                elif key not in missing:
+                    self.misses += 1
+                    missing[key] = text
+                embeddings.append(embedding)
+
+        if not missing:
+            return embeddings
+
+        computed = dict(
+            zip(
+                missing.keys(),
+                (np.asarray(e) for e in embed_fn(list(missing.values()))),
+            )
+        )
+
+        with self._lock:
+            for key, embedding in computed.items():
+                self.entries[key] = embedding
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+        return [
+            embedding if embedding is not None else computed[key]
+            for key, embedding in zip(keys, embeddings)
+        ]
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.loaded.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.entries),
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+    # --- Persistence ---
+
+    @staticmethod
+    def path_for(directory: str, fingerprint: str) -> str:
+        return os.path.join(directory, f"{fingerprint}.npz")
+
+    def save(self, directory: str, fingerprint: str):
+        """
+        Writes all cached embeddings for `fingerprint` to `directory`
+        """
+        with self._lock:
+            items = [
+                (key[1], embedding)
+                for key, embedding in self.entries.items()
+                if key[0] == fingerprint
+            ]
+
+        if not items:
+            return
+
+        path = self.path_for(directory, fingerprint)
+        tmp_path = f"{path}.tmp.npz"
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            np.savez(
+                tmp_path,
+                keys=np.array([key for key, _ in items]),
+                embeddings=np.stack([embedding for _, embedding in items]),
+            )
+            os.replace(tmp_path, path)
+        except (OSError, ValueError) as exc:
+            log.error("embedding_cache.save", path=path, error=exc)
+
+    def load(self, directory: str, fingerprint: str):
+        """
+        Loads cached embeddings for `fingerprint` from `directory`, once per
+        fingerprint. Missing or unreadable files are ignored.
+        """
+        if fingerprint in self.loaded:
+            return
+        self.loaded.add(fingerprint)
+
+        path = self.path_for(directory, fingerprint)
+        if not os.path.exists(path):
+            return
+
+        try:
+            with np.load(path) as data:
+                keys = data["keys"]
+                embeddings = data["embeddings"]
+        except (OSError, ValueError, KeyError) as exc:
+            log.warning("embedding_cache.load", path=path, error=exc)
+            return
+
+        with self._lock:
+            for key, embedding in zip(keys, embeddings):
+                self.entries.setdefault((fingerprint, str(key)), embedding)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+        log.debug("embedding_cache.load", path=path, entries=len(keys))
+
+
+class _WrappedName:
+    """
+    `name` for `CachedEmbeddingFunction`: instances report the wrapped
+    function's name, the class itself (which chromadb registers by name)
+    reports its own.
+    """
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return lambda: "talemate-cached"
+        return instance.embedding_function.name
+
+
+class CachedEmbeddingFunction(EmbeddingFunction):
+    """
+    Wraps a chromadb embedding function with an `EmbeddingCache`.
+
+    Identifies as the wrapped function towards chromadb, so existing
+    collections open as before and the persisted collection configuration
+    refers to the wrapped function.
+    """
+
+    name = _WrappedName()
+
+    def __init__(
+        self,
+        embedding_function: EmbeddingFunction,
+        fingerprint: str,
+        cache: EmbeddingCache | None = None,
+    ):
+        self.embedding_function = embedding_function
+        self.fingerprint = fingerprint
+        self.cache = cache if cache is not None else EMBEDDING_CACHE
+
+    def __call__(self, input: list[str]) -> list:
+        return self.cache.embed(self.fingerprint, input, self.embedding_function)
+
+    def embed_query(self, input: list[str]) -> list:
+        # query embeddings can differ from document embeddings
+        return self.cache.embed(
+            f"{self.fingerprint}-query",
+            input,
+            self.embedding_function.embed_query,
+        )
+
+    def get_config(self) -> dict:
+        return self.embedding_function.get_config()
+
+    def is_legacy(self) -> bool:
+        return self.embedding_function.is_legacy()
+
+    def default_space(self):
+        return self.embedding_function.default_space()
+
+    def supported_spaces(self):
+        return self.embedding_function.supported_spaces()
+
+
+EMBEDDING_CACHE = EmbeddingCache()
@@ -10,12 +10,6 @@ import talemate.util as util
 from talemate.events import HistoryEvent
 from talemate.prompts import Prompt
 from .response_specs import SUMMARY_SPEC, CHUNK_CLEAN_SPEC
-from talemate.scene_message import (
-    DirectorMessage,
-    TimePassageMessage,
-    ContextInvestigationMessage,
-    ReinforcementMessage,
-)
 from talemate.world_state.templates import GenerationOptions
 from talemate.client import ClientBase
 from talemate.agents.base import (
@@ -34,6 +28,12 @@ from talemate.agents.memory.rag import MemoryRAGMixin
 from talemate.history import ArchiveEntry
 
 from .analyze_scene import SceneAnalyzationMixin
+from .archive_rebuild import (
+    ArchiveRebuildMixin,
+    scan_archive_chunk,
+    trim_to_termination,
+)
+from .archive_worker import ArchiveWorker
 from .context_history import ContextHistoryMixin
 from .layered_history import LayeredHistoryMixin
 from .tts_utils import TTSUtilsMixin
@@ -42,7 +42,7 @@ import talemate.agents.summarize.nodes  # noqa: F401
 from talemate.agents.summarize.websocket_handler import SummarizeWebsocketHandler
 
 if TYPE_CHECKING:
-    from talemate.tale_mate import Character
+    from talemate.tale_mate import Character, Scene
 
 log = structlog.get_logger("talemate.agents.summarize")
 
@@ -77,6 +77,7 @@ class SummarizeAgent(
     MemoryRAGMixin,
     ContextHistoryMixin,
     LayeredHistoryMixin,
+    ArchiveRebuildMixin,
     SceneAnalyzationMixin,
     TTSUtilsMixin,
     Agent,
@@ -89,6 +90,7 @@ class SummarizeAgent(
     verbose_name = "Summarizer"
     auto_squish = False
     websocket_handler = SummarizeWebsocketHandler
+    response_cache_functions = ("analyze_scene_for_next_action",)
 
     @classmethod
     def init_actions(cls) -> dict[str, AgentAction]:
@@ -157,6 +159,7 @@ class SummarizeAgent(
         self.client = client
 
         self.actions = SummarizeAgent.init_actions()
+        self.archive_worker: ArchiveWorker | None = None
 
     @property
     def threshold(self):
@@ -164,7 +167,12 @@ class SummarizeAgent(
 
     @property
     def estimated_entry_count(self):
-        all_tokens = sum([util.count_tokens(entry) for entry in self.scene.history])
+        # counted from the message text, unloaded messages stay unloaded
+        history = self.scene.history
+        all_tokens = sum(
+            util.count_tokens(history.peek(idx, "message", ""))
+            for idx in range(len(history))
+        )
         return all_tokens // self.threshold
 
     @property
@@ -183,6 +191,19 @@ class SummarizeAgent(
     def archive_instructions(self):
         return self.actions["archive"].config["instructions"].value
 
+    @property
+    def meta(self):
+        meta = super().meta
+
+        worker = self.archive_worker
+        if worker and worker.running:
+            meta["archive_worker"] = {
+                "pending": worker.pending,
+                "entries_built": worker.entries_built,
+            }
+
+        return meta
+
     def connect(self, scene):
         super().connect(scene)
         talemate.emit.async_signals.get("push_history.after").connect(
@@ -192,13 +213,30 @@ class SummarizeAgent(
     async def on_push_history(self, emission: HistoryEvent):
         """
         Called when a conversation is generated
+
+        Requests an archive update from the background worker, the turn does
+        not wait for the summarization.
         """
 
         generation_options = GenerationOptions(
             writing_style=self.scene.writing_style,
         )
 
-        await self.build_archive(self.scene, generation_options=generation_options)
+        task = self.get_archive_worker(self.scene).request(generation_options)
+        if task:
+            await self.set_background_processing(task)
+
+    def get_archive_worker(self, scene: "Scene") -> ArchiveWorker:
+        if not self.archive_worker or self.archive_worker.scene is not scene:
+            self.archive_worker = ArchiveWorker(self, scene)
+        return self.archive_worker
+
+    async def stop_archive_worker(self):
+        """
+        Stops background archiving, e.g., before the archive is rebuilt.
+        """
+        if self.archive_worker:
+            await self.archive_worker.cancel()
 
     def clean_result(self, result):
         if "#" in result:
@@ -262,7 +300,6 @@ class SummarizeAgent(
     async def build_archive(
         self, scene, generation_options: GenerationOptions | None = None
     ):
-        end = None
         enabled = self.actions["archive"].enabled
 
         log.debug("build_archive", enabled=enabled)
@@ -308,64 +345,28 @@ class SummarizeAgent(
         else:
             extra_context = None
 
-        tokens = 0
-        dialogue_entries = []
-        ts = "PT0S"
-        time_passage_termination = False
-
         token_threshold = self.actions["archive"].config["threshold"].value
 
         log.debug("build_archive", start=start, recent_entry=recent_entry)
 
-        if recent_entry:
-            ts = recent_entry.get("ts", ts)
-
-        # we ignore the most recent entry, as the user may still chose to
-        # regenerate it
-        for i in range(start, max(start, len(scene.history) - 1)):
-            dialogue = scene.history[i]
-
-            # log.debug("build_archive", idx=i, content=str(dialogue)[:64]+"...")
-
-            if isinstance(
-                dialogue,
-                (DirectorMessage, ContextInvestigationMessage, ReinforcementMessage),
-            ):
-                # these messages are not part of the dialogue and should not be summarized
-                if i == start:
-                    start += 1
-                continue
-
-            if isinstance(dialogue, TimePassageMessage):
-                log.debug("build_archive", time_passage_message=dialogue)
-                ts = util.iso8601_add(ts, dialogue.ts)
-
-                if i == start:
-                    log.debug(
-                        "build_archive",
-                        time_passage_message=dialogue,
-                        start=start,
-                        i=i,
-                        ts=ts,
-                    )
-                    start += 1
-                    continue
-                log.debug("build_archive", time_passage_message_termination=dialogue)
-                time_passage_termination = True
-                end = i - 1
-                break
-
-            tokens += util.count_tokens(dialogue)
-            dialogue_entries.append(dialogue)
-            if tokens > token_threshold:  #
-                end = i
-                break
-
-        if end is None:
+        ts = recent_entry.get("ts", "PT0S") if recent_entry else "PT0S"
+
+        chunk = scan_archive_chunk(scene.history, start, ts, token_threshold)
+
+        if not chunk:
             # nothing to archive yet
-            log.debug("build_archive", token_threshold=token_threshold, tokens=tokens)
             return
 
+        start, end, ts = chunk.start, chunk.end, chunk.ts
+        dialogue_entries = chunk.dialogue
+        time_passage_termination = chunk.time_passage_termination
+
+        # the summarization may run in the background while the history
+        # changes, so the range is located again by message id before it is
+        # archived
+        range_messages = scene.history[start : end + 1]
+        num_archived = len(scene.archived_history)
+
         log.debug(
             "build_archive",
             start=start,
@@ -388,50 +389,39 @@ class SummarizeAgent(
             # No TimePassageMessage, so we need to ask the AI to find a good point of termination
 
             terminating_line = await self.analyze_dialoge(dialogue_entries)
-
-            if terminating_line:
-                adjusted_dialogue = []
-                for line in dialogue_entries:
-                    if str(line) in terminating_line:
-                        break
-                    adjusted_dialogue.append(line)
-
-                # if difference start and end is less than 4, ignore the termination
-                if len(adjusted_dialogue) > 4:
-                    dialogue_entries = adjusted_dialogue
-                    end = start + len(dialogue_entries) - 1
-                else:
-                    log.debug(
-                        "build_archive",
-                        message="Ignoring termination",
-                        start=start,
-                        end=end,
-                        adjusted_dialogue=adjusted_dialogue,
-                    )
+            trimmed = trim_to_termination(dialogue_entries, terminating_line)
+            if len(trimmed) < len(dialogue_entries):
+                dialogue_entries = trimmed
+                end = start + len(dialogue_entries) - 1
 
         if dialogue_entries:
             if not extra_context:
                 # prepend scene intro to dialogue
                 dialogue_entries.insert(0, scene.intro)
 
-            summarized = None
-            retries = 5
-
-            while not summarized and retries > 0:
-                summarized = await self.summarize(
-                    "\n".join(map(str, dialogue_entries)),
-                    extra_context=extra_context,
-                    generation_options=generation_options,
-                )
-                retries -= 1
-
-            if not summarized:
-                raise IOError("Failed to summarize dialogue", dialogue=dialogue_entries)
+            summarized = await self.summarize_dialogue(
+                dialogue_entries,
+                extra_context=extra_context,
+                generation_options=generation_options,
+            )
 
         else:
             # AI has likely identified the first line as a scene change, so we can't summarize
             # just use the first line
-            summarized = str(scene.history[start])
+            summarized = str(range_messages[0])
+
+        position = self._locate_archive_range(
+            scene, range_messages[0].id, range_messages[end - start].id, num_archived
+        )
+        if not position:
+            log.warning(
+                "build_archive",
+                message="History changed during summarization, discarding",
+                start=start,
+                end=end,
+            )
+            return
+        start, end = position
 
         # determine the appropariate timestamp for the summarization
 
@@ -448,6 +438,49 @@ class SummarizeAgent(
 
         return True
 
+    async def summarize_dialogue(
+        self,
+        dialogue: list,
+        extra_context: list[str] | None = None,
+        generation_options: GenerationOptions | None = None,
+        retries: int = 5,
+    ) -> str:
+        """
+        Summarizes dialogue for an archive entry, retrying empty responses.
+        """
+        summarized = None
+
+        while not summarized and retries > 0:
+            summarized = await self.summarize(
+                "\n".join(map(str, dialogue)),
+                extra_context=extra_context,
+                generation_options=generation_options,
+            )
+            retries -= 1
+
+        if not summarized:
+            raise IOError("Failed to summarize dialogue", dialogue)
+
+        return summarized
+
+    @staticmethod
+    def _locate_archive_range(
+        scene: "Scene", start_id: int, end_id: int, num_archived: int
+    ) -> tuple[int, int] | None:
+        """
+        Returns the current (start, end) history indexes of a range that is
+        being archived, or None if the range or the archive changed.
+        """
+        if len(scene.archived_history) != num_archived:
+            return None
+
+        start = scene.history.index_of(start_id)
+        end = scene.history.index_of(end_id)
+        if start == -1 or end < start:
+            return None
+
+        return start, end
+
     @set_processing
     async def analyze_dialoge(self, dialogue):
         response, extracted = await Prompt.request(
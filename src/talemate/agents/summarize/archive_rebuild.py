@@ -0,0 +1,333 @@
+"""
+Summarizer agent mixin for rebuilding the history archive concurrently.
+
+`build_archive` finds one chunk of dialogue at a time and each summary
+is used as context for the next one, so rebuilding a long scene is one request
+after the other. The concurrent rebuild instead plans all chunk boundaries up
+front (the same time passage and token threshold rules), optionally runs the
+natural termination analysis for all chunks at once, then summarizes the
+chunks with as many requests in flight as the client allows. The layered
+history is built the same way afterwards, one layer at a time from the bottom
+up.
+
+Trade-off: since the chunks are summarized at the same time, a summary can not
+use the summaries before it as context.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+import structlog
+
+import talemate.util as util
+from talemate.emit import emit
+from talemate.history import ArchiveEntry
+from talemate.scene_message import (
+    ContextInvestigationMessage,
+    DirectorMessage,
+    ReinforcementMessage,
+    TimePassageMessage,
+)
+from talemate.util.async_tools import gather_limited
+from talemate.world_state.templates import GenerationOptions
+
+if TYPE_CHECKING:
+    from talemate.tale_mate import Scene
+
+__all__ = [
+    "ArchiveChunk",
+    "ArchiveRebuildMixin",
+    "plan_archive_chunks",
+    "scan_archive_chunk",
+    "trim_to_termination",
+]
+
+log = structlog.get_logger("talemate.agents.summarize.archive_rebuild")
+
+# a termination point is ignored if it would leave this few lines or less
+MIN_TERMINATED_LINES = 4
+
+
+@dataclasses.dataclass
+class ArchiveChunk:
+    start: int
+    end: int
+    ts: str
+    dialogue: list
+    time_passage_termination: bool = False
+
+
+def scan_archive_chunk(
+    history: list, start: int, ts: str, token_threshold: int
+) -> ArchiveChunk | None:
+    """
+    Finds the next chunk of history to archive, starting at `start`.
+
+    A chunk ends before a time passage or once its dialogue exceeds
+    `token_threshold`. Returns None if there is not enough dialogue yet.
+    """
+    tokens = 0
+    dialogue = []
+
+    # we ignore the most recent entry, as the user may still chose to
+    # regenerate it
+    for i in range(start, max(start, len(history) - 1)):
+        message = history[i]
+
+        if isinstance(
+            message,
+            (DirectorMessage, ContextInvestigationMessage, ReinforcementMessage),
+        ):
+            # these messages are not part of the dialogue and should not be summarized
+            if i == start:
+                start += 1
+            continue
+
+        if isinstance(message, TimePassageMessage):
+            ts = util.iso8601_add(ts, message.ts)
+
+            if i == start:
+                start += 1
+                continue
+
+            return ArchiveChunk(start, i - 1, ts, dialogue, True)
+
+        tokens += util.count_tokens(message)
+        dialogue.append(message)
+        if tokens > token_threshold:
+            return ArchiveChunk(start, i, ts, dialogue)
+
+    log.debug("scan_archive_chunk", token_threshold=token_threshold, tokens=tokens)
+    return None
+
+
+def plan_archive_chunks(
+    history: list, start: int, ts: str, token_threshold: int
+) -> list[ArchiveChunk]:
+    """
+    All chunks `build_archive` would archive one after the other, without
+    termination analysis.
+    """
+    chunks = []
+    while chunk := scan_archive_chunk(history, start, ts, token_threshold):
+        chunks.append(chunk)
+        start, ts = chunk.end + 1, chunk.ts
+    return chunks
+
+
+def trim_to_termination(dialogue: list, terminating_line: str | None) -> list:
+    """
+    Cuts the dialogue before the line the AI identified as a natural
+    termination point.
+
+    Returns the dialogue unchanged if there is no termination point or if it
+    would leave too little dialogue.
+    """
+    if not terminating_line:
+        return dialogue
+
+    trimmed = []
+    for line in dialogue:
+        if str(line) in terminating_line:
+            break
+        trimmed.append(line)
+
+    if len(trimmed) <= MIN_TERMINATED_LINES:
+        log.debug("trim_to_termination", message="Ignoring termination")
+        return dialogue
+
+    return trimmed
+
+
+class ArchiveRebuildMixin:
+    """
+    Summarizer agent mixin that rebuilds the archive and layered history with
+    concurrent requests.
+    """
+
+    @property
+    def rebuild_max_concurrent(self) -> int:
+        return self.client.max_concurrent_requests if self.client else 1
+
+    def _rebuild_apply_terminations(
+        self, chunks: list[ArchiveChunk], terminating_lines: list[str | None]
+    ) -> list[ArchiveChunk]:
+        """
+        Trims each chunk at its termination point. Dialogue that is cut off
+        is carried over to the start of the next chunk (the next chunk's own
+        termination point is in its original dialogue, so it still applies).
+        """
+        carry: list = []
+        carry_start = None
+
+        for chunk, terminating_line in zip(chunks, terminating_lines):
+            dialogue = carry + chunk.dialogue
+            start = carry_start if carry else chunk.start
+
+            if not chunk.time_passage_termination:
+                trimmed = trim_to_termination(dialogue, terminating_line)
+                if len(trimmed) < len(dialogue):
+                    carry = dialogue[len(trimmed) :]
+                    carry_start = start + len(trimmed)
+                    chunk.dialogue = trimmed
+                    chunk.start = start
+                    chunk.end = start + len(trimmed) - 1
+                    continue
+
+            carry = []
+            chunk.dialogue = dialogue
+            chunk.start = start
+
+        # cut off dialogue after the last chunk is left for the next pass
+        return chunks
+
+    async def _rebuild_analyze_chunk(self, chunk: ArchiveChunk) -> str | None:
+        if chunk.time_passage_termination:
+            # the time passage is the termination point
+            return None
+        return await self.analyze_dialoge(chunk.dialogue)
+
+    async def _rebuild_summarize_chunk(
+        self,
+        scene: "Scene",
+        chunk: ArchiveChunk,
+        extra_context: list[str] | None,
+        generation_options: GenerationOptions | None,
+    ) -> str:
+        if not chunk.dialogue:
+            # AI has likely identified the first line as a scene change, so we
+            # can't summarize, just use the first line
+            return str(scene.history[chunk.start])
+
+        dialogue = list(chunk.dialogue)
+        if not extra_context:
+            dialogue.insert(0, scene.intro)
+
+        return await self.summarize_dialogue(
+            dialogue, extra_context=extra_context, generation_options=generation_options
+        )
+
+    async def rebuild_archive_concurrently(
+        self,
+        scene: "Scene",
+        generation_options: GenerationOptions | None = None,
+        analyze_termination: bool = True,
+        callback: Callable[[], Awaitable] | None = None,
+    ) -> int:
+        """
+        Archives all of the scene's unarchived history, summarizing the chunks
+        concurrently.
+
+        The chunks are planned up front, dialogue that the termination
+        analysis cuts off the last chunk may still be above the threshold, so
+        the remaining history is planned again until nothing is left to
+        archive (as the sequential build_archive loop would).
+
+        Returns the number of archive entries added.
+        """
+        if not self.actions["archive"].enabled:
+            return 0
+
+        added = 0
+        while True:
+            entries = await self._rebuild_archive_pass(
+                scene, generation_options, analyze_termination
+            )
+            if not entries:
+                break
+            added += entries
+
+        scene.emit_status()
+        if callback:
+            await callback()
+
+        return added
+
+    async def _rebuild_archive_pass(
+        self,
+        scene: "Scene",
+        generation_options: GenerationOptions | None,
+        analyze_termination: bool,
+    ) -> int:
+        """
+        Plans the unarchived history into chunks and archives them, returns
+        the number of archive entries added.
+        """
+        start = 0
+        ts = "PT0S"
+        recent_entry = scene.archived_history[-1] if scene.archived_history else None
+        if recent_entry and recent_entry.get("end") is not None:
+            start = recent_entry["end"] + 1
+        if recent_entry:
+            ts = recent_entry.get("ts", ts)
+
+        # only the summaries that already exist can be used as context
+        num_previous = self.archive_include_previous
+        extra_context = None
+        if recent_entry and num_previous > 0:
+            extra_context = [
+                entry["text"] for entry in scene.archived_history[-num_previous:]
+            ]
+
+        chunks = plan_archive_chunks(scene.history, start, ts, self.archive_threshold)
+        if not chunks:
+            return 0
+
+        max_concurrent = self.rebuild_max_concurrent
+        total = len(chunks)
+        log.debug(
+            "rebuild_archive_concurrently",
+            chunks=total,
+            max_concurrent=max_concurrent,
+        )
+
+        if analyze_termination:
+            emit(
+                "status",
+                message=f"Analyzing {total} chunks of history for scene changes...",
+                status="busy",
+                data={"cancellable": True},
+            )
+            terminating_lines = await gather_limited(
+                [
+                    lambda chunk=chunk: self._rebuild_analyze_chunk(chunk)
+                    for chunk in chunks
+                ],
+                max_concurrent,
+            )
+            chunks = self._rebuild_apply_terminations(chunks, terminating_lines)
+
+        done = 0
+
+        def on_done(index: int, summary: str):
+            nonlocal done
+            done += 1
+            emit(
+                "status",
+                message=f"Rebuilding historical archive... {done}/{total}",
+                status="busy",
+                data={"cancellable": True},
+            )
+
+        summaries = await gather_limited(
+            [
+                lambda chunk=chunk: self._rebuild_summarize_chunk(
+                    scene, chunk, extra_context, generation_options
+                )
+                for chunk in chunks
+            ],
+            max_concurrent,
+            on_done=on_done,
+        )
+
+        for chunk, summary in zip(chunks, summaries):
+            await scene.push_archive(
+                ArchiveEntry(
+                    text=summary, start=chunk.start, end=chunk.end, ts=chunk.ts
+                )
+            )
+            scene.ts = chunk.ts
+
+        return total
@@ -0,0 +1,121 @@
+"""
+Background worker for the summarizer's history archive.
+
+`push_history.after` only requests an archive update, the summarization itself
+(`build_archive`, which asks the AI for a termination point, summarizes and
+then updates the layered history) runs in a task per scene, so the turn that
+crossed the token threshold does not wait for it.
+
+The work queue is the scene itself: whatever dialogue follows the end of the
+most recent archive entry is pending. Requests that arrive while the worker is
+busy are coalesced into one more pass, and each pass archives entries until
+nothing is left above the threshold. Because the pending range is derived from
+the saved scene, work that is interrupted (cancelled, scene closed) is picked
+up by the next request. Until then `context_history` includes the unsummarized
+range as raw dialogue.
+
+The worker only overlaps the next turn's requests if the summarizer's client
+has concurrent inference enabled, otherwise `ClientBase.send_prompt` runs the
+requests one at a time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import structlog
+
+from talemate.exceptions import GenerationCancelled
+from talemate.world_state.templates import GenerationOptions
+
+if TYPE_CHECKING:
+    from talemate.agents.summarize import SummarizeAgent
+    from talemate.tale_mate import Scene
+
+__all__ = ["ArchiveWorker"]
+
+log = structlog.get_logger("talemate.agents.summarize.archive_worker")
+
+
+class ArchiveWorker:
+    def __init__(self, agent: "SummarizeAgent", scene: "Scene"):
+        self.agent = agent
+        self.scene = scene
+        self.task: asyncio.Task | None = None
+        self.generation_options: GenerationOptions | None = None
+        # set when a request arrives, cleared when a pass starts
+        self.requested = asyncio.Event()
+        # archive entries built since the worker was created
+        self.entries_built: int = 0
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    @property
+    def pending(self) -> bool:
+        return self.requested.is_set()
+
+    def request(
+        self, generation_options: GenerationOptions | None = None
+    ) -> asyncio.Task | None:
+        """
+        Requests an archive pass, returns the worker task if a new one was
+        started (a running worker picks up the request when it is done with
+        its current pass).
+        """
+        self.generation_options = generation_options
+        self.requested.set()
+
+        if self.running:
+            return None
+
+        self.task = asyncio.create_task(self.run())
+        return self.task
+
+    @property
+    def stopped(self) -> bool:
+        scene = self.scene
+        if not scene.active or scene.cancel_requested:
+            return True
+        return self.agent.scene is not scene
+
+    async def run(self):
+        try:
+            while self.requested.is_set():
+                self.requested.clear()
+                while not self.stopped:
+                    more = await self.agent.build_archive(
+                        self.scene, generation_options=self.generation_options
+                    )
+                    if not more:
+                        break
+                    self.entries_built += 1
+                    self.scene.saved = False
+        except GenerationCancelled:
+            # the pending range stays in the scene and is picked up by the
+            # next request
+            log.info("archive worker cancelled", entries_built=self.entries_built)
+
+    async def cancel(self):
+        """
+        Stops the worker, an archive entry that is being built is discarded.
+        """
+        self.requested.clear()
+        task = self.task
+        if not task or task.done():
+            return
+
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def wait(self):
+        """
+        Waits for the worker to finish all pending passes.
+        """
+        while self.running:
+            await asyncio.shield(self.task)
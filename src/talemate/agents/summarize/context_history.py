@@ -8,8 +8,9 @@ via self.scene) because some callers construct standalone scenes.
 
 from __future__ import annotations
 
+import time
 import traceback
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
 
 import pydantic
 import structlog
@@ -21,14 +22,16 @@ from talemate.agents.base import (
     AgentActionNote,
 )
 from talemate.agents.context import active_agent
+from talemate.client.tokenizers import DEFAULT_TOKENIZER, Tokenizer
 from talemate.instance import get_agent
+from talemate.scene.history_cache import HistoryTokenCache
 from talemate.scene_message import (
     CharacterMessage,
     ContextInvestigationMessage,
     DirectorMessage,
     ReinforcementMessage,
 )
-from talemate.util import count_tokens
+from talemate.util import count_tokens, TOKEN_COUNT_CACHE
 from talemate.util.prompt import condensed
 import talemate.util as util
 
@@ -44,6 +47,33 @@ _PREVIEW_DEFAULT_BUDGET = 8192
 _BEST_FIT_MIN_DIALOGUE = 3
 
 
+def _budget_count_fn() -> Callable[[str], int]:
+    """The counting function for history budgets: the tokenizer of the
+    client the active agent generates with, ``count_tokens`` if the client
+    uses the default tokenizer."""
+    agent_context = active_agent.get()
+    agent = agent_context.agent if agent_context else None
+    tokenizer = getattr(getattr(agent, "client", None), "tokenizer", None)
+    if isinstance(tokenizer, Tokenizer) and tokenizer is not DEFAULT_TOKENIZER:
+        return tokenizer
+    return count_tokens
+
+
+def _count_tokens(source) -> int:
+    """Count tokens through the shared token count cache."""
+    return TOKEN_COUNT_CACHE.count(source, count_fn=_budget_count_fn())
+
+
+def _count_message_tokens(
+    message, conversation_format: str | None = None, mode: str | None = None
+) -> tuple[str, int]:
+    """Format a message and count its tokens through the shared token count
+    cache. Without a format the message is counted as ``str(message)``."""
+    return TOKEN_COUNT_CACHE.count_message(
+        message, conversation_format, mode, count_fn=_budget_count_fn()
+    )
+
+
 class _CollectedHistory(pydantic.BaseModel):
     """Intermediate result from the shared collection phase."""
 
@@ -230,6 +260,20 @@ class ContextHistoryMixin:
                         value=True,
                     ),
                 ),
+                "persist_token_cache": AgentActionConfig(
+                    type="bool",
+                    label="Persist Token Cache",
+                    description=(
+                        "Store formatted history entries and their token counts "
+                        "next to the scene save file so reloaded scenes don't "
+                        "need to recount them."
+                    ),
+                    value=False,
+                    condition=AgentActionConditional(
+                        attribute="manage_scene_history.config.best_fit",
+                        value=True,
+                    ),
+                ),
                 "dialogue_ratio": AgentActionConfig(
                     type="number",
                     title="Budget Distribution",
@@ -334,6 +378,10 @@ class ContextHistoryMixin:
             self.actions["manage_scene_history"].config["best_fit_max_dialogue"].value
         )
 
+    @property
+    def scene_history_persist_token_cache(self) -> bool:
+        return self.actions["manage_scene_history"].config["persist_token_cache"].value
+
     def _has_layered_history(self, scene: Scene) -> bool:
         """Check if layered history is available for the given scene."""
         return bool(
@@ -449,7 +497,9 @@ class ContextHistoryMixin:
         actor_direction_mode = get_agent("director").actor_direction_mode
         _is_qualifying = ContextHistoryMixin._is_dialogue_qualifying
 
+        # collected newest first, reversed before returning
         parts_dialogue: list[str] = []
+        dialogue_tokens = 0
         history_len = len(scene.history)
         dialogue_start_idx = history_len
         dialogue_messages_collected = 0
@@ -466,15 +516,18 @@ class ContextHistoryMixin:
             if not _is_qualifying(message, params):
                 continue
 
-            if count_tokens(parts_dialogue) + count_tokens(message) > budget:
+            _, message_tokens = _count_message_tokens(message)
+            if dialogue_tokens + message_tokens > budget:
                 break
 
             if max_count is not None and len(parts_dialogue) >= max_count:
                 break
 
-            parts_dialogue.insert(
-                0, message.as_format(conversation_format, mode=actor_direction_mode)
+            formatted, formatted_tokens = _count_message_tokens(
+                message, conversation_format, actor_direction_mode
             )
+            parts_dialogue.append(formatted)
+            dialogue_tokens += formatted_tokens
             dialogue_start_idx = i
 
             if isinstance(message, CharacterMessage):
@@ -482,6 +535,8 @@ class ContextHistoryMixin:
         else:
             exhausted = True
 
+        parts_dialogue.reverse()
+
         return parts_dialogue, dialogue_start_idx, exhausted
 
     @staticmethod
@@ -530,6 +585,21 @@ class ContextHistoryMixin:
 
         return text, chapter_number
 
+    def _history_token_cache(self, scene: Scene) -> HistoryTokenCache | None:
+        """Return the scene's history token cache, loading the persisted
+        cache on first use if persistence is enabled."""
+        cache: HistoryTokenCache | None = getattr(scene, "history_token_cache", None)
+        if cache is None:
+            return None
+
+        cache.persist = self.scene_history_persist_token_cache
+        if cache.persist and cache.loaded_from is None:
+            full_path = getattr(scene, "full_path", None)
+            if full_path:
+                cache.load(HistoryTokenCache.path_for(full_path), _budget_count_fn())
+
+        return cache
+
     @staticmethod
     def _context_history_collect_archived(
         scene: Scene,
@@ -574,7 +644,7 @@ class ContextHistoryMixin:
                 entry, scene.ts
             )
 
-            text_tokens = count_tokens(text)
+            text_tokens = _count_tokens(text)
             if archived_tokens + text_tokens > budget:
                 archived_boundary = i + 1
                 break
@@ -642,7 +712,7 @@ class ContextHistoryMixin:
             if chapter_number:
                 chapter_numbers.append(chapter_number)
 
-            text_tokens = count_tokens(text)
+            text_tokens = _count_tokens(text)
             if layer_tokens + text_tokens > budget:
                 layer_boundary = j + 1
                 break
@@ -868,6 +938,22 @@ class ContextHistoryMixin:
         """
         levels: list[_BestFitLevel] = []
 
+        cache = self._history_token_cache(scene)
+        started = time.perf_counter()
+        hits_before = cache.hits if cache else 0
+        misses_before = cache.misses if cache else 0
+
+        def _format_layered(entry: dict, scene_ts: str) -> str:
+            return self._context_history_format_layered_entry(entry, scene_ts)[0]
+
+        count_fn = _budget_count_fn()
+
+        def _format_and_count(kind: str, entry: dict, format_fn) -> tuple[str, int]:
+            if cache is None:
+                text = format_fn(entry, scene.ts)
+                return text, _count_tokens(text)
+            return cache.get(kind, entry, scene.ts, format_fn, count_fn)
+
         has_layered = self._has_layered_history(scene)
 
         if has_layered:
@@ -879,11 +965,11 @@ class ContextHistoryMixin:
                 formatted: list[str] = []
                 tokens: list[int] = []
                 for entry in layer:
-                    text, _ = self._context_history_format_layered_entry(
-                        entry, scene.ts
+                    text, text_tokens = _format_and_count(
+                        "layer", entry, _format_layered
                     )
                     formatted.append(text)
-                    tokens.append(count_tokens(text))
+                    tokens.append(text_tokens)
                 levels.append(
                     _BestFitLevel(
                         entries=layer,
@@ -918,9 +1004,11 @@ class ContextHistoryMixin:
                 formatted_arch: list[str] = []
                 tokens_arch: list[int] = []
                 for entry in enriched:
-                    text = self._context_history_format_archived_entry(entry, scene.ts)
+                    text, text_tokens = _format_and_count(
+                        "archived", entry, self._context_history_format_archived_entry
+                    )
                     formatted_arch.append(text)
-                    tokens_arch.append(count_tokens(text))
+                    tokens_arch.append(text_tokens)
                 levels.append(
                     _BestFitLevel(
                         entries=enriched,
@@ -938,6 +1026,17 @@ class ContextHistoryMixin:
             if dialogue_level is not None:
                 levels.append(dialogue_level)
 
+        if cache is not None:
+            hits = cache.hits - hits_before
+            misses = cache.misses - misses_before
+            cache.last_build = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "build_time_ms": round((time.perf_counter() - started) * 1000, 3),
+            }
+            log.debug("best_fit_build_levels", **cache.last_build)
+
         return levels
 
     @staticmethod
@@ -973,15 +1072,15 @@ class ContextHistoryMixin:
             if i < len(scene.history):
                 message = scene.history[i]
                 if _is_qualifying(message, params):
-                    text = message.as_format(
-                        conversation_format, mode=actor_direction_mode
+                    text, text_tokens = _count_message_tokens(
+                        message, conversation_format, actor_direction_mode
                     )
                     if exclude and text in exclude:
                         formatted.append("")
                         tokens.append(0)
                         continue
                     formatted.append(text)
-                    tokens.append(count_tokens(text))
+                    tokens.append(text_tokens)
                     continue
             formatted.append("")
             tokens.append(0)
@@ -1181,7 +1280,7 @@ class ContextHistoryMixin:
             scene, all_dialogue, params, min_count=min_count
         )
 
-        if exhausted and count_tokens(all_dialogue) <= budget:
+        if exhausted and _count_tokens(all_dialogue) <= budget:
             result.all_dialogue_fits = True
             result.all_dialogue = all_dialogue
             return result
@@ -1193,7 +1292,7 @@ class ContextHistoryMixin:
         min_dialogue = self._best_fit_ensure_min_dialogue(
             scene, [], params, min_count=min_count
         )
-        min_dialogue_tokens = count_tokens(min_dialogue)
+        min_dialogue_tokens = _count_tokens(min_dialogue)
         remaining_budget = max(budget - min_dialogue_tokens, 0)
 
         parts_dialogue, *_ = self._context_history_collect_dialogue(
@@ -1204,7 +1303,7 @@ class ContextHistoryMixin:
         )
         result.parts_dialogue = parts_dialogue
 
-        dialogue_tokens = count_tokens(parts_dialogue)
+        dialogue_tokens = _count_tokens(parts_dialogue)
         result.expansion_budget = max(budget - dialogue_tokens, 0)
 
         if result.expansion_budget <= 0:
@@ -1421,7 +1520,7 @@ class ContextHistoryMixin:
                     "layer_index": layer_num,
                     "label": f"Layer {layer_num}",
                     "entries": parts,
-                    "token_count": count_tokens(parts),
+                    "token_count": _count_tokens(parts),
                     "entry_count": len(parts),
                     "budget": layer_budget,
                 }
@@ -1436,7 +1535,7 @@ class ContextHistoryMixin:
                 "type": "archived",
                 "label": "Base Summarization Layer",
                 "entries": collected.parts_archived,
-                "token_count": count_tokens(collected.parts_archived),
+                "token_count": _count_tokens(collected.parts_archived),
                 "entry_count": len(collected.parts_archived),
                 "budget": budget_archived,
             }
@@ -1455,7 +1554,7 @@ class ContextHistoryMixin:
                 "type": "dialogue",
                 "label": "Dialogue",
                 "entries": dialogue_entries,
-                "token_count": count_tokens(dialogue_entries),
+                "token_count": _count_tokens(dialogue_entries),
                 "entry_count": len(dialogue_entries),
                 "budget": collected.budget_dialogue,
             }
@@ -1518,7 +1617,7 @@ class ContextHistoryMixin:
             if intro:
                 dialogue_entries.insert(0, intro)
 
-            dialogue_tokens = count_tokens(dialogue_entries)
+            dialogue_tokens = _count_tokens(dialogue_entries)
             sections: list[dict] = [
                 {
                     "type": "dialogue",
@@ -1567,7 +1666,7 @@ class ContextHistoryMixin:
                     else "Base Summarization Layer"
                 ),
                 "entries": parts,
-                "token_count": count_tokens(parts),
+                "token_count": _count_tokens(parts),
                 "entry_count": len(parts),
             }
             if level.type == "layer":
@@ -1584,7 +1683,7 @@ class ContextHistoryMixin:
             if intro:
                 dialogue_entries.insert(0, intro)
 
-        dialogue_tokens = count_tokens(dialogue_entries)
+        dialogue_tokens = _count_tokens(dialogue_entries)
 
         sections.append(
             {
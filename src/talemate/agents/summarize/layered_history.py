@@ -12,7 +12,14 @@ from talemate.exceptions import GenerationCancelled
 from talemate.world_state.templates import GenerationOptions
 from talemate.emit import emit
 from talemate.context import handle_generation_cancelled
-from talemate.history import LayeredArchiveEntry, HistoryEntry, entry_contained
+from talemate.history import (
+    LayeredArchiveEntry,
+    HistoryEntry,
+    entries_tokens,
+    entry_contained,
+    entry_tokens,
+)
+from talemate.util.async_tools import gather_limited
 import talemate.util as util
 
 if TYPE_CHECKING:
@@ -192,27 +199,22 @@ class LayeredHistoryMixin:
         Returns a list of summary texts.
         """
         summaries = []
-        current_chunk = chunks.copy()
-
-        while current_chunk:
-            partial_chunk = []
-            max_process_tokens = self.layered_history_max_process_tokens
-
-            # Build partial chunk up to max_process_tokens
-            while (
-                current_chunk
-                and util.count_tokens(
-                    "\n\n".join(chunk["text"] for chunk in partial_chunk)
-                )
-                < max_process_tokens
-            ):
-                partial_chunk.append(current_chunk.pop(0))
-
+        max_process_tokens = self.layered_history_max_process_tokens
+
+        # a chunk is closed once it reaches max_process_tokens, the entry
+        # that crosses the limit is still included
+        for partial_chunk, tokens_in_chunk in util.pack_items_by_tokens(
+            chunks,
+            max_process_tokens,
+            count_fn=entry_tokens,
+            separator_tokens=util.count_tokens("\n\n"),
+            overflow=True,
+        ):
             text_to_summarize = "\n\n".join(chunk["text"] for chunk in partial_chunk)
 
             log.debug(
                 "_split_and_summarize_chunks",
-                tokens_in_chunk=util.count_tokens(text_to_summarize),
+                tokens_in_chunk=tokens_in_chunk,
                 max_process_tokens=max_process_tokens,
             )
 
@@ -299,6 +301,44 @@ class LayeredHistoryMixin:
             return layered_history[layer_index][-1]["end"] + 1
         return 0
 
+    async def _lh_summarize_chunk(
+        self,
+        chunk: list[dict],
+        start_index: int,
+        end_index: int,
+        extra_context: str,
+        generation_options: GenerationOptions | None = None,
+    ) -> dict:
+        """
+        Summarize a chunk of entries into a layered history entry dict.
+        """
+        ts, ts_start, ts_end = self._lh_extract_timestamps(chunk)
+        text_length = entries_tokens(chunk)
+
+        summaries = await self._lh_split_and_summarize_chunks(
+            chunk,
+            extra_context,
+            generation_options=generation_options,
+        )
+
+        self._lh_validate_summary_length(summaries, text_length)
+
+        return LayeredArchiveEntry(
+            start=start_index,
+            end=end_index,
+            ts=ts,
+            ts_start=ts_start,
+            ts_end=ts_end,
+            text="\n\n".join(summaries),
+        ).model_dump(exclude_none=True)
+
+    def _lh_get_or_create_layer(self, layer_index: int) -> list[dict]:
+        layered_history = self.scene.layered_history
+        if layer_index >= len(layered_history):
+            layered_history.append([])
+            log.debug("_lh_get_or_create_layer", created_layer=layer_index)
+        return layered_history[layer_index]
+
     async def _lh_commit_chunk(
         self,
         chunk: list[dict],
@@ -312,22 +352,12 @@ class LayeredHistoryMixin:
         Summarize a chunk of entries and append the result to the target layer.
 
         Gets or creates the target layer, summarizes the chunk via
-        _lh_split_and_summarize_chunks, validates, creates a LayeredArchiveEntry,
-        and appends it.
+        _lh_summarize_chunk and appends the entry.
 
         Returns the created entry dict.
         """
-        layered_history = self.scene.layered_history
-
-        # Get or create target layer
-        if next_layer_index >= len(layered_history):
-            layered_history.append([])
-            log.debug("_lh_commit_chunk", created_layer=next_layer_index)
-        next_layer = layered_history[next_layer_index]
-
-        ts, ts_start, ts_end = self._lh_extract_timestamps(chunk)
+        next_layer = self._lh_get_or_create_layer(next_layer_index)
         extra_context = self._lh_build_extra_context(next_layer_index)
-        text_length = util.count_tokens("\n\n".join(c["text"] for c in chunk))
 
         num_entries_in_layer = len(next_layer)
 
@@ -338,23 +368,14 @@ class LayeredHistoryMixin:
             data={"cancellable": True},
         )
 
-        summaries = await self._lh_split_and_summarize_chunks(
+        entry = await self._lh_summarize_chunk(
             chunk,
+            start_index,
+            end_index,
             extra_context,
             generation_options=generation_options,
         )
 
-        self._lh_validate_summary_length(summaries, text_length)
-
-        entry = LayeredArchiveEntry(
-            start=start_index,
-            end=end_index,
-            ts=ts,
-            ts_start=ts_start,
-            ts_end=ts_end,
-            text="\n\n".join(summaries),
-        ).model_dump(exclude_none=True)
-
         next_layer.append(entry)
 
         emit(
@@ -365,95 +386,160 @@ class LayeredHistoryMixin:
 
         return entry
 
-    async def _lh_summarize_layer(
+    async def _lh_commit_chunks_concurrently(
         self,
-        source_layer: list[dict],
+        chunks: list[tuple[list[dict], int, int]],
         next_layer_index: int,
-        start_from: int,
+        estimated_entries: int,
+        max_concurrent: int,
         generation_options: GenerationOptions | None = None,
-    ) -> bool:
+    ) -> list[dict]:
         """
-        Iterate source_layer entries from start_from, accumulating into chunks.
-        When the token threshold is exceeded and the chunk has >= 2 entries,
-        commit via _lh_commit_chunk. After the loop, commit any remaining
-        chunk with >= 2 entries.
+        Summarize chunks with up to `max_concurrent` requests at once and
+        append the results to the target layer in order.
 
-        Returns True if any chunk was committed.
+        All chunks use the layer's extra context from before the batch.
         """
-        token_threshold = self.layered_history_threshold
-        current_chunk = []
-        current_tokens = 0
-        start_index = start_from
-        committed = False
+        next_layer = self._lh_get_or_create_layer(next_layer_index)
+        extra_context = self._lh_build_extra_context(next_layer_index)
 
-        total_tokens = util.count_tokens([entry["text"] for entry in source_layer])
-        estimated_entries = total_tokens // token_threshold
+        num_entries_in_layer = len(next_layer)
+        done = 0
 
-        for i in range(start_from, len(source_layer)):
-            entry = source_layer[i]
+        def on_done(index: int, entry: dict):
+            nonlocal done
+            done += 1
+            emit(
+                "status",
+                status="busy",
+                message=f"Updating layered history - layer {next_layer_index} - {num_entries_in_layer + done} / {estimated_entries}",
+                data={"cancellable": True},
+            )
 
-            # Skip static entries (manually added history without start/end)
-            if entry.get("end") is None:
-                continue
+        entries = await gather_limited(
+            [
+                lambda chunk=chunk, start=start, end=end: self._lh_summarize_chunk(
+                    chunk,
+                    start,
+                    end,
+                    extra_context,
+                    generation_options=generation_options,
+                )
+                for chunk, start, end in chunks
+            ],
+            max_concurrent,
+            on_done=on_done,
+        )
 
-            entry_tokens = util.count_tokens(entry["text"])
+        next_layer.extend(entries)
+        return entries
 
-            log.debug(
-                "summarize_to_layered_history",
-                entry=entry["text"][:100] + "...",
-                tokens=entry_tokens,
-                current_layer=next_layer_index - 1,
-            )
+    def _lh_plan_chunks(
+        self, source_layer: list[dict], next_layer_index: int, start_from: int
+    ) -> list[tuple[list[dict], int, int]]:
+        """
+        Iterate source_layer entries from start_from, accumulating into chunks.
+        A chunk is closed when the token threshold is exceeded and it has >= 2
+        entries. The remaining entries form a final chunk if it has >= 2
+        entries and reaches the threshold.
 
-            if current_tokens + entry_tokens > token_threshold:
-                if len(current_chunk) >= 2:
-                    await self._lh_commit_chunk(
-                        current_chunk,
-                        next_layer_index,
-                        start_index,
-                        i - 1,
-                        estimated_entries,
-                        generation_options=generation_options,
-                    )
-                    committed = True
-                    current_chunk = []
-                    current_tokens = 0
-                    start_index = i
+        Returns a list of (chunk, start_index, end_index).
+        """
+        token_threshold = self.layered_history_threshold
+
+        # Skip static entries (manually added history without start/end)
+        indexed_entries = [
+            (i, source_layer[i])
+            for i in range(start_from, len(source_layer))
+            if source_layer[i].get("end") is not None
+        ]
+
+        packed = list(
+            util.pack_items_by_tokens(
+                indexed_entries,
+                token_threshold,
+                count_fn=lambda indexed_entry: entry_tokens(indexed_entry[1]),
+                min_items=2,
+            )
+        )
 
-            current_chunk.append(entry)
-            current_tokens += entry_tokens
+        # a chunk spans from the end of the previous chunk up to the entry
+        # before the next chunk, the final chunk to the end of the layer
+        chunks = []
+        start_index = start_from
+        for n, (chunk, _) in enumerate(packed):
+            if n + 1 < len(packed):
+                end_index = packed[n + 1][0][0][0] - 1
+            else:
+                end_index = len(source_layer) - 1
+            chunks.append(([entry for _, entry in chunk], start_index, end_index))
+            start_index = end_index + 1
 
         # Final chunk: require >= 2 entries AND sufficient tokens to avoid
         # premature summarization from too little content. Entries below
         # the threshold are deferred until the next call brings more data.
-        if (
-            current_chunk
-            and len(current_chunk) >= 2
-            and current_tokens >= token_threshold
-        ):
-            await self._lh_commit_chunk(
-                current_chunk,
-                next_layer_index,
-                start_index,
-                len(source_layer) - 1,
-                estimated_entries,
-                generation_options=generation_options,
-            )
-            committed = True
+        remaining_tokens = packed[-1][1] if packed else 0
+        if chunks and (len(chunks[-1][0]) < 2 or remaining_tokens < token_threshold):
+            chunks.pop()
 
         log.debug(
             "summarize_to_layered_history",
-            tokens=current_tokens,
+            tokens=remaining_tokens,
             threshold=token_threshold,
             next_layer=next_layer_index,
+            chunks=len(chunks),
         )
 
-        return committed
+        return chunks
+
+    async def _lh_summarize_layer(
+        self,
+        source_layer: list[dict],
+        next_layer_index: int,
+        start_from: int,
+        generation_options: GenerationOptions | None = None,
+        max_concurrent: int = 1,
+    ) -> bool:
+        """
+        Summarize the chunks of source_layer (see _lh_plan_chunks) into
+        layered_history[next_layer_index].
+
+        Returns True if any chunk was committed.
+        """
+        chunks = self._lh_plan_chunks(source_layer, next_layer_index, start_from)
+        if not chunks:
+            return False
+
+        total_tokens = sum(entry_tokens(entry) for entry in source_layer)
+        estimated_entries = total_tokens // self.layered_history_threshold
+
+        if max_concurrent > 1 and len(chunks) > 1:
+            await self._lh_commit_chunks_concurrently(
+                chunks,
+                next_layer_index,
+                estimated_entries,
+                max_concurrent,
+                generation_options=generation_options,
+            )
+            return True
+
+        for chunk, start_index, end_index in chunks:
+            await self._lh_commit_chunk(
+                chunk,
+                next_layer_index,
+                start_index,
+                end_index,
+                estimated_entries,
+                generation_options=generation_options,
+            )
+
+        return True
 
     async def _lh_update_layers(
         self,
         max_layers: int,
         generation_options: GenerationOptions | None = None,
+        max_concurrent: int = 1,
     ) -> bool:
         """
         One pass over all existing layers, summarizing each into the next.
@@ -475,6 +561,7 @@ class LayeredHistoryMixin:
                 index + 1,
                 start_from,
                 generation_options=generation_options,
+                max_concurrent=max_concurrent,
             )
 
             if updated:
@@ -595,7 +682,9 @@ class LayeredHistoryMixin:
 
     @set_processing
     async def summarize_to_layered_history(
-        self, generation_options: GenerationOptions | None = None
+        self,
+        generation_options: GenerationOptions | None = None,
+        max_concurrent: int = 1,
     ):
         """
         Build and maintain the layered history — a summarized archive with
@@ -603,6 +692,9 @@ class LayeredHistoryMixin:
 
         Layer 0 summarizes archived_history, layer 1 summarizes layer 0, etc.
         Each entry's start/end are inclusive indices into the source layer.
+
+        With `max_concurrent` > 1 the chunks of a layer are summarized
+        concurrently, each layer is complete before the next one is built.
         """
 
         if not self.scene.archived_history:
@@ -630,6 +722,7 @@ class LayeredHistoryMixin:
                 0,
                 start_from,
                 generation_options=generation_options,
+                max_concurrent=max_concurrent,
             )
         except SummaryLongerThanOriginalError as exc:
             log.error("summarize_to_layered_history", error=exc, layer="base")
@@ -649,7 +742,9 @@ class LayeredHistoryMixin:
 
         # Higher layers: iterate until no more work is produced
         try:
-            while await self._lh_update_layers(max_layers, generation_options):
+            while await self._lh_update_layers(
+                max_layers, generation_options, max_concurrent=max_concurrent
+            ):
                 has_been_updated = True
             if has_been_updated:
                 emit("status", status="success", message="Layered history updated.")
@@ -695,7 +790,7 @@ class LayeredHistoryMixin:
         ts, ts_start, ts_end = self._lh_extract_timestamps(entries)
         extra_context = self._lh_build_extra_context(next_layer_index)
 
-        text_length = util.count_tokens("\n\n".join(e["text"] for e in entries))
+        text_length = entries_tokens(entries)
 
         summaries = await self._lh_split_and_summarize_chunks(
             entries,
@@ -52,6 +52,7 @@ from .f5tts import F5TTSMixin
 from .pocket_tts import PocketTTSMixin
 from .audio_tags import AudioTagsMixin
 from .util import parse_chunks, rejoin_chunks
+from .audio_cache import AUDIO_CACHE
 
 import talemate.agents.tts.nodes as tts_nodes  # noqa: F401
 
@@ -204,6 +205,21 @@ class TTSAgent(
                         label="Auto-generate for context investigation",
                         description="Generate audio for context investigation messages",
                     ),
+                    "max_concurrent": AgentActionConfig(
+                        type="number",
+                        value=3,
+                        min=1,
+                        max=8,
+                        step=1,
+                        label="Concurrent generations (remote APIs)",
+                        description="Number of chunks remote APIs (ElevenLabs, OpenAI, Google) generate at the same time. Local APIs generate one chunk at a time. Audio is always played in order.",
+                    ),
+                    "audio_cache": AgentActionConfig(
+                        type="bool",
+                        value=True,
+                        label="Cache generated audio",
+                        description="Keep generated audio on disk, so regenerating or replaying unchanged text does not generate it again.",
+                    ),
                 },
             ),
         }
@@ -238,6 +254,10 @@ class TTSAgent(
         self._queue_task: asyncio.Task | None = None
         self._queue_lock = asyncio.Lock()
 
+        # per api (concurrency, semaphore) bounding the chunks that are
+        # synthesized at the same time, see `_api_semaphore`
+        self._api_semaphores: dict[str, tuple[int, asyncio.Semaphore]] = {}
+
     # general helpers
 
     @property
@@ -284,6 +304,14 @@ class TTSAgent(
     def speaker_separation(self) -> str:
         return self.actions["_config"].config["speaker_separation"].value
 
+    @property
+    def max_concurrent_generations(self) -> int:
+        return int(self.actions["_config"].config["max_concurrent"].value)
+
+    @property
+    def audio_cache_enabled(self) -> bool:
+        return self.actions["_config"].config["audio_cache"].value
+
     @property
     def apis(self) -> list[str]:
         return self.actions["_config"].config["apis"].value
@@ -858,7 +886,12 @@ class TTSAgent(
     # ---------------------------------------------------------------------
 
     async def _process_queue(self, queue_id: str):
-        """Sequentially processes all GenerationContext objects in the queue.
+        """Processes all (context, chunk) pairs in the queue.
+
+        Synthesis is pipelined: the sub-chunks following the one that is
+        played next are already being prepared and synthesized (up to
+        `_api_max_concurrent` of the next sub-chunk's api), while the audio
+        is played strictly in queue order.
 
         Once the last context has been processed the queue state is reset so a
         future generation call will create a new queue (and therefore a new
@@ -866,28 +899,60 @@ class TTSAgent(
         that can target a specific queue instance.
         """
 
+        # sub-chunks of the most recently dequeued chunk that are not
+        # scheduled yet
+        sub_chunks: deque[tuple[GenerationContext, Chunk, Chunk]] = deque()
+        # scheduled synthesis tasks in playback order
+        in_flight: deque[tuple[asyncio.Task, Chunk]] = deque()
+
         try:
             while True:
-                async with self._queue_lock:
-                    if not self._generation_queue:
+                # keep the pipeline filled
+                while True:
+                    if not sub_chunks:
+                        async with self._queue_lock:
+                            if not self._generation_queue:
+                                break
+
+                            context, chunk = self._generation_queue.popleft()
+
+                            log.debug(
+                                "tts queue dequeue",
+                                queue_id=queue_id,
+                                total_items=len(self._generation_queue),
+                                chunk_type=chunk.type,
+                            )
+
+                        sub_chunks.extend(
+                            (context, chunk, _chunk)
+                            for _chunk in chunk.sub_chunks
+                            if _chunk.cleaned_text.strip()
+                        )
+                        continue
+
+                    if len(in_flight) >= self._api_max_concurrent(sub_chunks[0][2].api):
                         break
 
-                    context, chunk = self._generation_queue.popleft()
+                    context, chunk, _chunk = sub_chunks.popleft()
+                    task = asyncio.create_task(self._synthesize_chunk(_chunk, context))
+                    in_flight.append((task, chunk))
 
-                    log.debug(
-                        "tts queue dequeue",
-                        queue_id=queue_id,
-                        total_items=len(self._generation_queue),
-                        chunk_type=chunk.type,
-                    )
+                if not in_flight:
+                    break
 
-                # Process outside lock so other coroutines can enqueue
-                await self._generate_chunk(chunk, context)
+                task, chunk = in_flight.popleft()
+                wav_bytes = await task
+                if wav_bytes:
+                    self.play_audio(wav_bytes, chunk.message_id)
         except Exception as e:
             log.error(
                 "Error processing queue", error=e, traceback=traceback.format_exc()
             )
         finally:
+            # synthesis that is still running is not played anymore
+            for task, _ in in_flight:
+                task.cancel()
+
             # Clean up queue state after finishing (or on cancellation)
             async with self._queue_lock:
                 if queue_id == self._queue_id:
@@ -899,39 +964,105 @@ class TTSAgent(
     def current_queue_id(self) -> str | None:
         return self._queue_id
 
+    def _api_max_concurrent(self, api: str) -> int:
+        """
+        Number of chunks an api synthesizes at the same time.
+
+        Apis define `{api}_max_concurrent`, apis that don't (local models)
+        synthesize one chunk at a time.
+        """
+        return max(1, getattr(self, f"{api}_max_concurrent", 1))
+
+    def _api_semaphore(self, api: str) -> asyncio.Semaphore:
+        """
+        Returns the semaphore bounding concurrent synthesis for an api.
+        """
+        max_concurrent = self._api_max_concurrent(api)
+        current = self._api_semaphores.get(api)
+        if current is None or current[0] != max_concurrent:
+            current = (max_concurrent, asyncio.Semaphore(max_concurrent))
+            self._api_semaphores[api] = current
+        return current[1]
+
+    def _audio_cache_key(self, chunk: Chunk) -> str | None:
+        """
+        Returns the audio cache key for a chunk.
+
+        Apis define `{api}_audio_cache_settings(chunk)`, returning the model
+        and any agent settings that change the generated audio. Audio of apis
+        that don't is not cached.
+        """
+        settings_fn = getattr(self, f"{chunk.api}_audio_cache_settings", None)
+        if settings_fn is None:
+            return None
+
+        return AUDIO_CACHE.key(
+            api=chunk.api,
+            settings=settings_fn(chunk),
+            voice_id=chunk.voice.provider_id,
+            parameters=chunk.voice.parameters,
+            text=chunk.cleaned_text,
+        )
+
+    async def _synthesize_chunk(
+        self, chunk: Chunk, context: GenerationContext
+    ) -> bytes | None:
+        """Generate the audio for a single sub-chunk.
+
+        Served from the audio cache if the same text was generated with the
+        same voice before. Returns None if generation failed.
+        """
+
+        emission: VoiceGenerationEmission = VoiceGenerationEmission(
+            chunk=chunk, context=context
+        )
+
+        if chunk.prepare_fn:
+            await async_signals.get("agent.tts.prepare.before").send(emission)
+            await chunk.prepare_fn(chunk)
+            await async_signals.get("agent.tts.prepare.after").send(emission)
+
+        await async_signals.get("agent.tts.generate.before").send(emission)
+
+        cache_key = self._audio_cache_key(chunk) if self.audio_cache_enabled else None
+        wav_bytes = None
+        if cache_key:
+            wav_bytes = await asyncio.to_thread(AUDIO_CACHE.get, cache_key)
+
+        if wav_bytes:
+            log.info("Using cached audio", api=chunk.api, text=chunk.cleaned_text)
+        else:
+            async with self._api_semaphore(chunk.api):
+                log.info(
+                    "Generating audio",
+                    api=chunk.api,
+                    text=chunk.cleaned_text,
+                    parameters=chunk.voice.parameters,
+                    prepare_fn=chunk.prepare_fn,
+                )
+                try:
+                    wav_bytes = await chunk.generate_fn(chunk, context)
+                except Exception as e:
+                    log.error("Error generating audio", error=e, chunk=chunk)
+                    return None
+
+            if cache_key and wav_bytes:
+                await asyncio.to_thread(AUDIO_CACHE.put, cache_key, wav_bytes)
+
+        emission.wav_bytes = wav_bytes
+        await async_signals.get("agent.tts.generate.after").send(emission)
+        return emission.wav_bytes
+
     async def _generate_chunk(self, chunk: Chunk, context: GenerationContext):
-        """Generate audio for a single chunk (all its sub-chunks)."""
+        """Generate and play audio for a single chunk (all its sub-chunks)."""
 
         for _chunk in chunk.sub_chunks:
             if not _chunk.cleaned_text.strip():
                 continue
 
-            emission: VoiceGenerationEmission = VoiceGenerationEmission(
-                chunk=_chunk, context=context
-            )
-
-            if _chunk.prepare_fn:
-                await async_signals.get("agent.tts.prepare.before").send(emission)
-                await _chunk.prepare_fn(_chunk)
-                await async_signals.get("agent.tts.prepare.after").send(emission)
-
-            log.info(
-                "Generating audio",
-                api=chunk.api,
-                text=_chunk.cleaned_text,
-                parameters=_chunk.voice.parameters,
-                prepare_fn=_chunk.prepare_fn,
-            )
-
-            await async_signals.get("agent.tts.generate.before").send(emission)
-            try:
-                emission.wav_bytes = await _chunk.generate_fn(_chunk, context)
-            except Exception as e:
-                log.error("Error generating audio", error=e, chunk=_chunk)
-                continue
-            await async_signals.get("agent.tts.generate.after").send(emission)
-            self.play_audio(emission.wav_bytes, chunk.message_id)
-            await asyncio.sleep(0.1)
+            wav_bytes = await self._synthesize_chunk(_chunk, context)
+            if wav_bytes:
+                self.play_audio(wav_bytes, chunk.message_id)
 
     # Deprecated: kept for backward compatibility but no longer used.
     async def generate_chunks(self, context: GenerationContext):
@@ -0,0 +1,170 @@
+"""
+Audio cache for the TTS agent.
+
+Regenerating a message, replaying it or testing a voice again sends the same
+text to the same voice, and remote providers charge for every request. The
+TTS agent looks up each chunk in `AudioCache` before synthesizing it.
+
+Entries are keyed on the provider, the provider settings that change the
+generated audio (model, quality settings), the voice id and its parameters,
+and the cleaned chunk text. Audio is kept in a small in-memory
+LRU backed by one file per entry on disk, so the cache survives restarts.
+The disk store is pruned (oldest first) once it grows beyond
+`max_disk_bytes`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import structlog
+
+from talemate.path import TTS_AUDIO_CACHE_DIR
+
+__all__ = [
+    "AUDIO_CACHE",
+    "AudioCache",
+]
+
+log = structlog.get_logger("talemate.agents.tts.audio_cache")
+
+
+class AudioCache:
+    def __init__(
+        self,
+        max_size: int = 32,
+        path: Path | str | None = TTS_AUDIO_CACHE_DIR,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.max_size = max_size
+        self.path = Path(path) if path else None
+        self.max_disk_bytes = max_disk_bytes
+        self.entries: OrderedDict[str, bytes] = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def key(
+        api: str,
+        settings: dict,
+        voice_id: str,
+        parameters: dict,
+        text: str,
+    ) -> str:
+        payload = json.dumps(
+            {
+                "api": api,
+                "settings": settings,
+                "voice_id": voice_id,
+                "parameters": parameters,
+                "text": text,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _file(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}.audio"
+
+    def _remember(self, key: str, audio: bytes):
+        self.entries[key] = audio
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def get(self, key: str) -> bytes | None:
+        audio = self.entries.get(key)
+        if audio is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return audio
+
+        if self.path:
+            try:
+                audio = self._file(key).read_bytes()
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                log.warning("audio_cache.get", key=key, error=exc)
+            else:
+                self.hits += 1
+                self.disk_hits += 1
+                self._remember(key, audio)
+                return audio
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, audio: bytes):
+        self.stores += 1
+        self._remember(key, audio)
+
+        if not self.path:
+            return
+
+        path = self._file(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(audio)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            log.error("audio_cache.put", key=key, error=exc)
+            return
+
+        if self.stores % 50 == 0:
+            self.prune()
+
+    def disk_files(self) -> list[Path]:
+        if not self.path or not self.path.exists():
+            return []
+        return list(self.path.glob("*/*.audio"))
+
+    def prune(self):
+        """
+        Removes the oldest files once the disk store exceeds
+        `max_disk_bytes`.
+        """
+        files = [(file, file.stat()) for file in self.disk_files()]
+        excess = sum(stat.st_size for _, stat in files) - self.max_disk_bytes
+        if excess <= 0:
+            return
+
+        files.sort(key=lambda item: item[1].st_mtime)
+        for file, stat in files:
+            if excess <= 0:
+                break
+            file.unlink(missing_ok=True)
+            excess -= stat.st_size
+
+    def clear(self):
+        self.entries.clear()
+        for file in self.disk_files():
+            file.unlink(missing_ok=True)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+            "disk_size": len(self.disk_files()),
+        }
+
+
+AUDIO_CACHE = AudioCache()
@@ -199,6 +199,9 @@ class ChatterboxMixin:
     def chatterbox_chunk_size(self) -> int:
         return self.actions["chatterbox"].config["chunk_size"].value
 
+    def chatterbox_audio_cache_settings(self, chunk: Chunk) -> dict:
+        return {}
+
     @property
     def chatterbox_info(self) -> str:
         return CHATTERBOX_INFO
@@ -165,10 +165,17 @@ class ElevenLabsMixin:
     def elevenlabs_max_generation_length(self) -> int:
         return 1024
 
+    @property
+    def elevenlabs_max_concurrent(self) -> int:
+        return self.max_concurrent_generations
+
     @property
     def elevenlabs_model(self) -> str:
         return self.actions["elevenlabs"].config["model"].value
 
+    def elevenlabs_audio_cache_settings(self, chunk: Chunk) -> dict:
+        return {"model": chunk.model or self.elevenlabs_model}
+
     @property
     def elevenlabs_model_choices(self) -> list[str]:
         return [
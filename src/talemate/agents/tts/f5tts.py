@@ -280,6 +280,10 @@ class F5TTSMixin:
     def f5tts_nfe_step(self) -> int:
         return self.actions["f5tts"].config["nfe_step"].value
 
+    def f5tts_audio_cache_settings(self, chunk: Chunk) -> dict:
+        # exclamation marks are replaced in the chunk text (prepare_fn)
+        return {"model": self.f5tts_model_name, "nfe_step": self.f5tts_nfe_step}
+
     @property
     def f5tts_max_generation_length(self) -> int:
         return 1024
@@ -235,10 +235,17 @@ class GoogleMixin:
     def google_max_generation_length(self) -> int:
         return 1024
 
+    @property
+    def google_max_concurrent(self) -> int:
+        return self.max_concurrent_generations
+
     @property
     def google_model(self) -> str:
         return self.actions["google"].config["model"].value
 
+    def google_audio_cache_settings(self, chunk: Chunk) -> dict:
+        return {"model": chunk.model or self.google_model}
+
     @property
     def google_model_choices(self) -> list[str]:
         return [
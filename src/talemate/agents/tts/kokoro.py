@@ -165,6 +165,9 @@ class KokoroMixin:
     def kokoro_chunk_size(self) -> int:
         return self.actions["kokoro"].config["chunk_size"].value
 
+    def kokoro_audio_cache_settings(self, chunk: Chunk) -> dict:
+        return {}
+
     @property
     def kokoro_max_generation_length(self) -> int:
         return 256
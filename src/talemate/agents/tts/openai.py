@@ -146,10 +146,17 @@ class OpenAIMixin:
     def openai_max_generation_length(self) -> int:
         return 1024
 
+    @property
+    def openai_max_concurrent(self) -> int:
+        return self.max_concurrent_generations
+
     @property
     def openai_model(self) -> str:
         return self.actions["openai"].config["model"].value
 
+    def openai_audio_cache_settings(self, chunk: Chunk) -> dict:
+        return {"model": chunk.model or self.openai_model}
+
     @property
     def openai_model_choices(self) -> list[str]:
         return [
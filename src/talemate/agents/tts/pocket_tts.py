@@ -244,6 +244,16 @@ class PocketTTSMixin:
         value = int(self.actions["pocket_tts"].config["frames_after_eos"].value)
         return None if value <= 0 else value
 
+    def pocket_tts_audio_cache_settings(self, chunk: Chunk) -> dict:
+        return {
+            "variant": self.pocket_tts_variant,
+            "temp": self.pocket_tts_temp,
+            "lsd_decode_steps": self.pocket_tts_lsd_decode_steps,
+            "noise_clamp": self.pocket_tts_noise_clamp,
+            "eos_threshold": self.pocket_tts_eos_threshold,
+            "frames_after_eos": self.pocket_tts_frames_after_eos,
+        }
+
     @property
     def pocket_tts_configured(self) -> bool:
         try:
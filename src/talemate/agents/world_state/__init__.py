@@ -20,6 +20,7 @@ from talemate.scene_message import (
     ReinforcementMessage,
     TimePassageMessage,
 )
+from talemate.util.async_tools import gather_limited
 from talemate.util.response import extract_list
 
 
@@ -42,6 +43,7 @@ import talemate.agents.world_state.nodes
 
 if TYPE_CHECKING:
     from talemate.tale_mate import Character
+    from talemate.world_state import Reinforcement
 
 log = structlog.get_logger("talemate.agents.world_state")
 
@@ -77,6 +79,14 @@ class WorldStateAgent(CharacterProgressionMixin, AvatarMixin, Agent):
     agent_type = "world_state"
     verbose_name = "World State"
     websocket_handler = WorldStateWebsocketHandler
+    response_cache_functions = (
+        "analyze_text_and_extract_context",
+        "analyze_and_follow_instruction",
+        "analyze_text_and_answer_question",
+        "answer_query_true_or_false",
+        "identify_characters",
+        "extract_character_sheet",
+    )
 
     @classmethod
     def init_actions(cls) -> dict[str, AgentAction]:
@@ -564,12 +574,22 @@ class WorldStateAgent(CharacterProgressionMixin, AvatarMixin, Agent):
             extracted["response"], max_attributes=max_attributes
         )
 
+    @property
+    def reinforcements_max_concurrent(self) -> int:
+        return self.client.max_concurrent_requests if self.client else 1
+
     @set_processing
     async def update_reinforcements(self, force: bool = False, reset: bool = False):
         """
         Queries due worldstate re-inforcements
+
+        If the client supports concurrent inference the due reinforcements
+        are queried concurrently, the answers are then applied in the order
+        of the reinforcements.
         """
 
+        due = []
+
         for reinforcement in self.scene.world_state.reinforce:
             # Skip character reinforcements if require_active is True and character is not active
             if (
@@ -580,11 +600,44 @@ class WorldStateAgent(CharacterProgressionMixin, AvatarMixin, Agent):
                 continue
 
             if reinforcement.due <= 0 or force:
+                due.append(reinforcement)
+            else:
+                reinforcement.due -= 1
+
+        max_concurrent = self.reinforcements_max_concurrent
+
+        if max_concurrent <= 1 or len(due) <= 1:
+            for reinforcement in due:
                 await self.update_reinforcement(
                     reinforcement.question, reinforcement.character, reset=reset
                 )
-            else:
-                reinforcement.due -= 1
+            return
+
+        log.debug("update_reinforcements", due=len(due), max_concurrent=max_concurrent)
+
+        messages = [
+            self._reinforcement_message(reinforcement.question, reinforcement.character)
+            for reinforcement in due
+        ]
+
+        # history changes happen before any of the prompts are rendered, so
+        # every prompt sees the same scene
+        if reset:
+            for reinforcement, message in zip(due, messages):
+                self._reset_reinforcement_messages(reinforcement, message)
+
+        answers = await gather_limited(
+            [
+                lambda reinforcement=reinforcement: self._query_reinforcement(
+                    reinforcement, reset=reset
+                )
+                for reinforcement in due
+            ],
+            max_concurrent,
+        )
+
+        for reinforcement, message, answer in zip(due, messages, answers):
+            await self._apply_reinforcement(reinforcement, message, answer, reset=reset)
 
     @set_processing
     async def update_reinforcement(
@@ -597,7 +650,6 @@ class WorldStateAgent(CharacterProgressionMixin, AvatarMixin, Agent):
         if isinstance(character, self.scene.Character):
             character = character.name
 
-        message = None
         idx, reinforcement = await self.scene.world_state.find_reinforcement(
             question, character
         )
@@ -608,6 +660,20 @@ class WorldStateAgent(CharacterProgressionMixin, AvatarMixin, Agent):
             )
             return
 
+        message = self._reinforcement_message(question, character)
+
+        if reset:
+            self._reset_reinforcement_messages(reinforcement, message)
+
+        answer = await self._query_reinforcement(reinforcement, reset=reset)
+
+        return await self._apply_reinforcement(
+            reinforcement, message, answer, reset=reset
+        )
+
+    def _reinforcement_message(
+        self, question: str, character: str | None
+    ) -> ReinforcementMessage:
         message = ReinforcementMessage(message="")
         message.set_source(
             "world_state",
@@ -615,12 +681,25 @@ class WorldStateAgent(CharacterProgressionMixin, AvatarMixin, Agent):
             question=question,
             character=character,
         )
+        return message
 
-        if reset and reinforcement.insert == "sequential":
+    def _reset_reinforcement_messages(
+        self, reinforcement: "Reinforcement", message: ReinforcementMessage
+    ):
+        """
+        Removes all of the reinforcement's messages from the history
+        """
+        if reinforcement.insert == "sequential":
             self.scene.pop_history(
                 typ="reinforcement", meta_hash=message.meta_hash, all=True
             )
 
+    async def _query_reinforcement(
+        self, reinforcement: "Reinforcement", reset: bool = False
+    ) -> str:
+        """
+        Asks the AI for the reinforcement's answer, does not change the scene
+        """
         if reinforcement.insert == "sequential":
             kind = "analyze_freeform_medium_short"
         else:
@@ -654,8 +733,19 @@ class WorldStateAgent(CharacterProgressionMixin, AvatarMixin, Agent):
             ),
         )
 
-        answer = extracted["response"]
+        return extracted["response"]
 
+    async def _apply_reinforcement(
+        self,
+        reinforcement: "Reinforcement",
+        message: ReinforcementMessage,
+        answer: str,
+        reset: bool = False,
+    ) -> ReinforcementMessage:
+        """
+        Stores the answer on the reinforcement and updates the history and
+        the character detail or world entry
+        """
         reinforcement.answer = answer
         reinforcement.due = reinforcement.interval
 
@@ -20,23 +20,45 @@ The changelog system uses three types of files per scene:
 2. **Latest Snapshot** (`<scene>.latest.json`):
    - Cached state of the most recent revision
    - Used for optimization to avoid full reconstruction when computing new deltas
-
-3. **Changelog Log** (`<scene>.changelog.json`):
-   - Contains all delta entries with metadata
-   - Structure: {"version": 1, "base": "filename", "deltas": [...], "latest_rev": N}
-   - Each delta entry: {"rev": N, "ts": "ISO-timestamp", "delta": {...}, "meta": {...}}
+   - Rewritten on every save, so it is stored compact and written atomically
+     in a worker thread
+
+3. **Changelog Log** (`<scene>.changelog.<start_rev>.jsonl`):
+   - Append-only JSON-Lines file, one delta entry per line
+   - Each delta entry: {"rev": N, "ts": unix-seconds, "delta": {...}, "meta": {...}}
+   - Split into a new file once MAX_CHANGELOG_FILE_SIZE is reached
+   - Legacy `<scene>.changelog.<start_rev>.json` files
+     ({"version": 1, "base": "filename", "deltas": [...], "latest_rev": N})
+     are still read and are converted by `migrate_changelog` before the next append
+
+4. **Revision Index** (`<scene>.changelog-index.jsonl`):
+   - Append-only sidecar, one line per revision: {"rev", "ts", "file", "offset", "end"}
+   - `file` is the start_rev of the log file holding the revision, `offset` / `end`
+     are the byte range of its line
+   - Used to list revisions without parsing the logs and to seek directly to
+     the first delta needed during reconstruction
+   - Rebuilt from the log files whenever it's missing or out of sync
+
+5. **Checkpoints** (`<scene>.checkpoint.<rev>.json`):
+   - Full scene state at revision `rev`, as produced by replaying the deltas
+   - Written every CHECKPOINT_INTERVAL_REVS revisions or CHECKPOINT_INTERVAL_BYTES
+     of delta data, whichever comes first
+   - Can be backfilled for existing changelogs with `compact_changelog`
 
 Delta Storage:
 -------------
 Deltas are computed using DeepDiff and stored as serializable dictionaries.
-The system can reconstruct any revision by starting from the base snapshot
-and sequentially applying deltas up to the target revision.
+The system can reconstruct any revision by starting from the nearest checkpoint
+at or before the target revision (or the base snapshot if there is none) and
+sequentially applying deltas up to the target revision.
 
 Performance Optimization:
 ------------------------
 - Avoids full scene reconstruction on every delta computation by comparing
   against the latest snapshot instead of reconstructing from base + deltas
-- Updates the latest snapshot after each successful delta append
+- Updates the latest snapshot after each successful delta append (compact
+  JSON, written off the event loop)
+- Deltas are appended (and fsync'd) instead of rewriting the log file
 - Lazy initialization of changelog files only when needed
 
 Usage Example:
@@ -66,11 +88,14 @@ File Layout:
 └── changelog/
     ├── scene.json.base.json      # Base snapshot (rev 0)
     ├── scene.json.latest.json    # Latest snapshot (optimization)
-    └── scene.json.changelog.json # Delta log with metadata
+    ├── scene.json.changelog.0.jsonl  # Delta log with metadata
+    ├── scene.json.changelog-index.jsonl # rev -> log file offset
+    └── scene.json.checkpoint.50.json # Full snapshot at rev 50
 ```
 """
 
 from typing import TYPE_CHECKING
+import asyncio
 import json
 import os
 import structlog
@@ -93,6 +118,16 @@ log = structlog.get_logger("talemate.changelog")
 # Maximum file size before splitting to a new changelog file (in bytes)
 MAX_CHANGELOG_FILE_SIZE = 1000 * 1024  # 1MB
 
+# A full checkpoint is written after this many revisions ...
+CHECKPOINT_INTERVAL_REVS = 50
+
+# ... or after this many bytes of delta data, whichever comes first
+CHECKPOINT_INTERVAL_BYTES = 512 * 1024  # 512KB
+
+# Tracks revisions / delta bytes since the last checkpoint per scene changelog,
+# keyed by checkpoint path prefix. Populated lazily from disk.
+_checkpoint_state: dict[str, dict] = {}
+
 # Fields to exclude from delta computation (e.g., volatile session IDs)
 # Supports both exact paths and regex patterns
 EXCLUDE_FROM_DELTAS = [
@@ -184,7 +219,7 @@ async def save_changelog(scene: "Scene"):
 
 def _changelog_log_path(scene: "Scene", start_rev: int = 0):
     """
-    Get the path to a changelog log file for a scene.
+    Get the path to a (JSON-Lines) changelog log file for a scene.
 
     Creates the changelog directory if it doesn't exist.
 
@@ -196,11 +231,43 @@ def _changelog_log_path(scene: "Scene", start_rev: int = 0):
         str: Path to the changelog log file
     """
     os.makedirs(scene.changelog_dir, exist_ok=True)
+    return os.path.join(
+        scene.changelog_dir, f"{scene.filename}.changelog.{start_rev}.jsonl"
+    )
+
+
+def _legacy_changelog_log_path(scene: "Scene", start_rev: int = 0):
+    """
+    Get the path to a legacy (single JSON document) changelog log file.
+
+    Creates the changelog directory if it doesn't exist.
+
+    Args:
+        scene: The scene object
+        start_rev: The starting revision number for this changelog file
+
+    Returns:
+        str: Path to the legacy changelog log file
+    """
+    os.makedirs(scene.changelog_dir, exist_ok=True)
     return os.path.join(
         scene.changelog_dir, f"{scene.filename}.changelog.{start_rev}.json"
     )
 
 
+def _changelog_index_path(scene: "Scene") -> str:
+    """
+    Get the path to the rev -> log file offset index of a scene.
+
+    Args:
+        scene: The scene object
+
+    Returns:
+        str: Path to the revision index file
+    """
+    return os.path.join(scene.changelog_dir, f"{scene.filename}.changelog-index.jsonl")
+
+
 def _base_path(scene: "Scene") -> str:
     """
     Get the path to the base snapshot file for a scene.
@@ -230,6 +297,174 @@ def _latest_path(scene: "Scene") -> str:
     return os.path.join(scene.changelog_dir, f"{scene.filename}.latest.json")
 
 
+def _checkpoint_path(scene: "Scene", rev: int) -> str:
+    """
+    Get the path to the checkpoint file for a revision.
+
+    Args:
+        scene: The scene object
+        rev: The revision the checkpoint holds the full state of
+
+    Returns:
+        str: Path to the checkpoint file
+    """
+    return os.path.join(scene.changelog_dir, f"{scene.filename}.checkpoint.{rev}.json")
+
+
+def _write_latest(scene: "Scene", data: dict):
+    """
+    Write the latest snapshot atomically.
+
+    The latest snapshot is rewritten on every save, unlike the base snapshot
+    it is written without indentation.
+    """
+    path = _latest_path(scene)
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"), cls=SceneEncoder)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        log.error("write_latest_failed", error=e, path=path)
+
+
+async def _write_latest_async(scene: "Scene", data: dict):
+    """
+    Write the latest snapshot in a worker thread, so large scenes don't
+    block the event loop while saving.
+    """
+    await asyncio.to_thread(_write_latest, scene, data)
+
+
+def _get_checkpoint_files(scene: "Scene") -> list[tuple[int, str]]:
+    """
+    Get all checkpoint files for a scene, sorted by revision.
+
+    Returns:
+        list[tuple[int, str]]: List of (rev, file_path) tuples sorted by rev
+    """
+    pattern = os.path.join(
+        glob.escape(scene.changelog_dir),
+        f"{glob.escape(scene.filename)}.checkpoint.*.json",
+    )
+    result = []
+
+    for file_path in glob.glob(pattern):
+        parts = os.path.basename(file_path).split(".")
+        if len(parts) >= 4 and parts[-1] == "json" and parts[-3] == "checkpoint":
+            try:
+                result.append((int(parts[-2]), file_path))
+            except ValueError:
+                continue
+
+    return sorted(result)
+
+
+def _load_nearest_checkpoint(scene: "Scene", to_rev: int) -> tuple[int, dict] | None:
+    """
+    Load the checkpoint with the highest revision at or before `to_rev`.
+
+    Unreadable checkpoints are skipped in favor of older ones.
+
+    Returns:
+        tuple[int, dict] | None: (rev, scene data) or None if there is no usable checkpoint
+    """
+    for rev, file_path in reversed(_get_checkpoint_files(scene)):
+        if rev > to_rev:
+            continue
+        data = _read_json_or_default(file_path, None)
+        if isinstance(data, dict):
+            return rev, data
+    return None
+
+
+def _write_checkpoint(scene: "Scene", rev: int, data: dict):
+    """
+    Write a checkpoint file atomically, so a crash never leaves a truncated
+    checkpoint behind.
+    """
+    path = _checkpoint_path(scene, rev)
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, cls=SceneEncoder)
+        os.replace(tmp_path, path)
+        log.debug("changelog_checkpoint_written", rev=rev, path=path)
+    except Exception as e:
+        log.error("write_checkpoint_failed", error=e, path=path)
+
+
+def _checkpoint_state_key(scene: "Scene") -> str:
+    return os.path.join(scene.changelog_dir, scene.filename)
+
+
+def _get_checkpoint_state(scene: "Scene") -> dict:
+    """
+    Get revision / delta byte counters since the last checkpoint.
+
+    Computed from disk on first access and then kept up to date in memory
+    by `_record_delta_for_checkpoint`.
+
+    Returns:
+        dict: {"rev": last checkpoint rev, "bytes": delta bytes written since}
+    """
+    key = _checkpoint_state_key(scene)
+    state = _checkpoint_state.get(key)
+    if state is not None:
+        return state
+
+    checkpoints = _get_checkpoint_files(scene)
+    checkpoint_rev = checkpoints[-1][0] if checkpoints else 0
+    delta_bytes = 0
+
+    for entry in _iter_delta_entries(scene, after_rev=checkpoint_rev):
+        delta_bytes += len(json.dumps(entry))
+
+    state = {"rev": checkpoint_rev, "bytes": delta_bytes}
+    _checkpoint_state[key] = state
+    return state
+
+
+def _checkpoint_due(state: dict, rev: int) -> bool:
+    return (
+        rev - state["rev"] >= CHECKPOINT_INTERVAL_REVS
+        or state["bytes"] >= CHECKPOINT_INTERVAL_BYTES
+    )
+
+
+async def _record_delta_for_checkpoint(scene: "Scene", rev: int, entry_size: int):
+    """
+    Account for a newly written delta and write a checkpoint for `rev` if one
+    is due.
+
+    The checkpoint is built by replaying deltas (from the previous checkpoint)
+    rather than from the live scene so it matches exactly what replaying from
+    the base snapshot would produce.
+    """
+    state = _get_checkpoint_state(scene)
+    state["bytes"] += entry_size
+
+    if not _checkpoint_due(state, rev):
+        return
+
+    # reset before handing off, so saves made while the checkpoint is being
+    # written don't start another one
+    state["rev"] = rev
+    state["bytes"] = 0
+
+    await asyncio.to_thread(_write_replayed_checkpoint, scene, rev)
+
+
+def _write_replayed_checkpoint(scene: "Scene", rev: int):
+    """
+    Replay the scene data at `rev` and write it as a checkpoint. Runs in a
+    worker thread, see `_record_delta_for_checkpoint`.
+    """
+    _write_checkpoint(scene, rev, _replay_scene_data(scene, rev))
+
+
 def _utc_timestamp_now() -> int:
     """
     Get the current UTC timestamp in unix seconds.
@@ -287,22 +522,34 @@ def _get_changelog_files(scene: "Scene") -> list[tuple[int, str]]:
     Returns:
         list[tuple[int, str]]: List of (start_rev, file_path) tuples sorted by start_rev
     """
-    pattern = os.path.join(scene.changelog_dir, f"{scene.filename}.changelog.*.json")
+    pattern = os.path.join(scene.changelog_dir, f"{scene.filename}.changelog.*.json*")
     files = glob.glob(pattern)
-    result = []
+    result: dict[int, str] = {}
 
     for file_path in files:
         basename = os.path.basename(file_path)
-        # Extract start_rev from filename like "scene.json.changelog.123.json"
+        # Extract start_rev from filename like "scene.json.changelog.123.jsonl"
         parts = basename.split(".")
-        if len(parts) >= 4 and parts[-1] == "json" and parts[-3] == "changelog":
+        if (
+            len(parts) >= 4
+            and parts[-1] in ("json", "jsonl")
+            and parts[-3] == "changelog"
+        ):
             try:
                 start_rev = int(parts[-2])
-                result.append((start_rev, file_path))
             except ValueError:
                 continue
+            # If a migration was interrupted both files exist, the
+            # JSON-Lines file is written completely before the legacy file
+            # is removed, so it wins.
+            if start_rev not in result or _is_jsonl(file_path):
+                result[start_rev] = file_path
+
+    return sorted(result.items())
 
-    return sorted(result)
+
+def _is_jsonl(file_path: str) -> bool:
+    return file_path.endswith(".jsonl")
 
 
 def _get_latest_changelog_file(scene: "Scene") -> tuple[int, str]:
@@ -320,45 +567,262 @@ def _get_latest_changelog_file(scene: "Scene") -> tuple[int, str]:
         return (0, _changelog_log_path(scene, 0))
 
 
-def _ensure_log_initialized(scene: "Scene", start_rev: int = 0) -> dict:
+def _read_log_entries(file_path: str, offset: int = 0) -> list[dict]:
     """
-    Ensure a changelog log file exists and is properly initialized.
+    Read the delta entries of a changelog log file.
 
-    Creates a new changelog log file with default structure if it doesn't exist,
-    or loads and validates an existing one. Ensures the latest_rev field is
-    correctly set to the maximum revision number found in deltas.
+    JSON-Lines files can be read starting at a byte offset. A truncated last
+    line (e.g., from a crash during an append) is skipped. Legacy JSON files
+    are always read completely.
 
     Args:
-        scene: The scene object
-        start_rev: The starting revision for this changelog file
+        file_path: Path to the log file
+        offset: Byte offset to start reading at (JSON-Lines files only)
 
     Returns:
-        dict: The changelog log data structure containing version, base, deltas, start_rev, and latest_rev
-    """
-    log_path = _changelog_log_path(scene, start_rev)
-    base_filename = f"{scene.filename}.base.json"
-    default_content = {
-        "version": 1,
-        "base": base_filename,
-        "start_rev": start_rev,
-        "deltas": [],
-        "latest_rev": start_rev,
-    }
-    content = _read_json_or_default(log_path, default_content)
-    content.setdefault("version", 1)
-    content.setdefault("base", base_filename)
-    content.setdefault("start_rev", start_rev)
-    content.setdefault("deltas", [])
+        list[dict]: The delta entries in file order
+    """
+    if not _is_jsonl(file_path):
+        return _read_json_or_default(file_path, {}).get("deltas", [])
+
+    entries = []
     try:
-        max_rev = max(
-            [d.get("rev", start_rev) for d in content.get("deltas", [])] or [start_rev]
-        )
-    except Exception:
-        max_rev = start_rev
-    content["latest_rev"] = max(content.get("latest_rev", start_rev), max_rev)
-    if not os.path.exists(log_path):
-        _write_json(log_path, content)
-    return content
+        with open(file_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    log.warning("changelog_log_corrupt_line", path=file_path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        log.error("read_changelog_log", error=e, path=file_path)
+    return entries
+
+
+def _scan_log_index(file_path: str, start_rev: int) -> list[dict]:
+    """
+    Build index records for every entry of a changelog log file.
+
+    Legacy JSON files can't be seeked into, their records have no offsets.
+    """
+    if not _is_jsonl(file_path):
+        return [
+            {"rev": e.get("rev", 0), "ts": e.get("ts"), "file": start_rev}
+            for e in _read_log_entries(file_path)
+        ]
+
+    records = []
+    offset = 0
+    try:
+        with open(file_path, "rb") as f:
+            for line in f:
+                end = offset + len(line)
+                try:
+                    entry = json.loads(line) if line.strip() else None
+                except ValueError:
+                    entry = None
+                if entry is not None:
+                    records.append(
+                        {
+                            "rev": entry.get("rev", 0),
+                            "ts": entry.get("ts"),
+                            "file": start_rev,
+                            "offset": offset,
+                            "end": end,
+                        }
+                    )
+                offset = end
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def _append_line(path: str, data: dict) -> tuple[int, int]:
+    """
+    Append a JSON line to `path` and fsync it.
+
+    Returns:
+        tuple[int, int]: (offset, end) byte range of the written line
+    """
+    line = (json.dumps(data) + "\n").encode("utf-8")
+    with open(path, "ab") as f:
+        offset = f.tell()
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    return offset, offset + len(line)
+
+
+def _rebuild_index(scene: "Scene") -> list[dict]:
+    """
+    Rebuild the revision index from the changelog log files.
+
+    The index file is only written once there are no legacy log files left,
+    since their records can't carry offsets.
+    """
+    files = _get_changelog_files(scene)
+    index: list[dict] = []
+    for start_rev, file_path in files:
+        index.extend(_scan_log_index(file_path, start_rev))
+
+    index_path = _changelog_index_path(scene)
+    if files and all(_is_jsonl(fp) for _, fp in files):
+        tmp_path = f"{index_path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                for record in index:
+                    f.write(json.dumps(record) + "\n")
+            os.replace(tmp_path, index_path)
+        except Exception as e:
+            log.error("write_changelog_index", error=e, path=index_path)
+    elif os.path.exists(index_path):
+        os.remove(index_path)
+
+    return index
+
+
+def _load_index(scene: "Scene") -> list[dict]:
+    """
+    Load the revision index of a scene.
+
+    The index is trusted if its last record points at the end of the newest
+    log file, otherwise (missing index, legacy log files, interrupted append)
+    it is rebuilt from the log files.
+
+    Returns:
+        list[dict]: Index records in append (revision) order
+    """
+    files = _get_changelog_files(scene)
+    if not files:
+        return []
+
+    if _index_in_sync(scene, files):
+        return _read_log_entries(_changelog_index_path(scene))
+
+    return _rebuild_index(scene)
+
+
+def _index_in_sync(scene: "Scene", files: list[tuple[int, str]]) -> bool:
+    """
+    Check whether the last index record points at the end of the newest
+    log file. Only the tail of the index file is read.
+    """
+    last_start_rev, last_file = files[-1]
+    index_path = _changelog_index_path(scene)
+
+    if not _is_jsonl(last_file) or not os.path.exists(index_path):
+        return False
+
+    try:
+        with open(index_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(size - 1024, 0))
+            lines = f.read().splitlines()
+        record = json.loads(lines[-1]) if lines else None
+    except (OSError, ValueError):
+        return False
+
+    return (
+        isinstance(record, dict)
+        and record.get("file") == last_start_rev
+        and record.get("end") == _get_file_size(last_file)
+    )
+
+
+def migrate_changelog(scene: "Scene") -> int:
+    """
+    Convert legacy JSON changelog log files to the append-only JSON-Lines
+    format and rebuild the revision index.
+
+    Each JSON-Lines file is fully written before its legacy counterpart is
+    removed, so an interrupted migration can simply be run again.
+
+    Args:
+        scene: The scene object (only `filename` and `changelog_dir` are required)
+
+    Returns:
+        int: Number of migrated log files
+    """
+    migrated = 0
+
+    for start_rev, file_path in _get_changelog_files(scene):
+        if _is_jsonl(file_path):
+            continue
+
+        target = _changelog_log_path(scene, start_rev)
+        tmp_path = f"{target}.tmp"
+        entries = sorted(_read_log_entries(file_path), key=lambda e: e.get("rev", 0))
+
+        with open(tmp_path, "w") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, target)
+        os.remove(file_path)
+        migrated += 1
+
+    if migrated:
+        _rebuild_index(scene)
+        log.info("changelog_migrated", files=migrated, filename=scene.filename)
+
+    return migrated
+
+
+def _append_log_entry(scene: "Scene", entry: dict, estimated_size: int) -> str:
+    """
+    Append a delta entry to the newest changelog log file, starting a new
+    file when MAX_CHANGELOG_FILE_SIZE would be exceeded, and record it in
+    the revision index.
+
+    Args:
+        scene: The scene object
+        entry: The delta entry to append
+        estimated_size: Approximate serialized size of the entry
+
+    Returns:
+        str: Path of the log file the entry was appended to
+    """
+    start_rev, log_path = _get_latest_changelog_file(scene)
+
+    if not _is_jsonl(log_path):
+        migrate_changelog(scene)
+        start_rev, log_path = _get_latest_changelog_file(scene)
+
+    # make sure the index is in sync before appending to it
+    index_path = _changelog_index_path(scene)
+    files = _get_changelog_files(scene)
+    if files and not _index_in_sync(scene, files):
+        _rebuild_index(scene)
+
+    current_file_size = _get_file_size(log_path)
+
+    if (
+        current_file_size > 0
+        and (current_file_size + estimated_size) > MAX_CHANGELOG_FILE_SIZE
+    ):
+        # Create a new changelog file starting with this revision
+        start_rev = entry["rev"]
+        log_path = _changelog_log_path(scene, start_rev)
+        log.debug("changelog_file_split", new_file=log_path, start_rev=start_rev)
+
+    offset, end = _append_line(log_path, entry)
+    _append_line(
+        index_path,
+        {
+            "rev": entry["rev"],
+            "ts": entry.get("ts"),
+            "file": start_rev,
+            "offset": offset,
+            "end": end,
+        },
+    )
+    return log_path
 
 
 def _get_file_size(file_path: str) -> int:
@@ -471,14 +935,50 @@ def _apply_delta(data: dict, delta_obj: dict) -> dict:
         raise
 
 
+def _section_path(key: str) -> str:
+    return f"root[{key!r}]"
+
+
+def _section_has_exclusions(key: str) -> bool:
+    """
+    Whether any delta exclusion applies inside the given top-level section.
+    """
+    path = _section_path(key)
+    if any(excluded.startswith(path) for excluded in EXCLUDE_FROM_DELTAS):
+        return True
+    return bool(EXCLUDE_FROM_DELTAS_REGEX)
+
+
+def _tail_append_ops(key: str, prev: list, curr: list) -> dict | None:
+    """
+    If `curr` is `prev` with items appended, return the appended items as
+    `iterable_item_added` delta operations, otherwise None.
+    """
+    prev_len = len(prev)
+    if len(curr) <= prev_len or curr[:prev_len] != prev:
+        return None
+
+    path = _section_path(key)
+    return {f"{path}[{idx}]": curr[idx] for idx in range(prev_len, len(curr))}
+
+
 def _compute_delta(prev: dict, curr: dict) -> dict:
     """
     Compute the delta (difference) between two scene states.
 
-    Uses DeepDiff to calculate the changes needed to transform the previous
-    state into the current state. Returns an empty dict if no changes.
-    Automatically excludes paths in EXCLUDE_FROM_DELTAS and regex patterns
-    in EXCLUDE_FROM_DELTAS_REGEX.
+    The delta is scoped to the top-level sections that actually changed:
+
+    - Sections that are equal in both states are skipped (plain equality is
+      orders of magnitude cheaper than DeepDiff).
+    - List sections that only had items appended (e.g., `history`) are
+      recorded as `iterable_item_added` operations without diffing.
+    - Everything else is diffed with DeepDiff, which calculates the changes
+      needed to transform the previous state into the current state.
+
+    The result is a regular DeepDiff delta dict that can be applied to the
+    full scene state. Returns an empty dict if no changes. Automatically
+    excludes paths in EXCLUDE_FROM_DELTAS and regex patterns in
+    EXCLUDE_FROM_DELTAS_REGEX.
 
     Args:
         prev: The previous scene state
@@ -487,18 +987,60 @@ def _compute_delta(prev: dict, curr: dict) -> dict:
     Returns:
         dict: The delta containing the changes, or empty dict if no changes
     """
-    diff = deepdiff.DeepDiff(
-        prev,
-        curr,
-        ignore_order=False,
-        exclude_paths=EXCLUDE_FROM_DELTAS,
-        exclude_regex_paths=EXCLUDE_FROM_DELTAS_REGEX,
-        ignore_type_in_groups=[(type(None), str, int, float, bool, list, dict)],
+    missing = object()
+    prev_sections = {}
+    curr_sections = {}
+    appended: dict = {}
+
+    for key in list(prev.keys()) + [k for k in curr.keys() if k not in prev]:
+        prev_value = prev.get(key, missing)
+        curr_value = curr.get(key, missing)
+
+        if prev_value == curr_value:
+            continue
+
+        if _section_path(key) in EXCLUDE_FROM_DELTAS:
+            continue
+
+        if (
+            isinstance(prev_value, list)
+            and isinstance(curr_value, list)
+            and not _section_has_exclusions(key)
+        ):
+            ops = _tail_append_ops(key, prev_value, curr_value)
+            if ops is not None:
+                appended.update(ops)
+                continue
+
+        if prev_value is not missing:
+            prev_sections[key] = prev_value
+        if curr_value is not missing:
+            curr_sections[key] = curr_value
+
+    delta = {}
+
+    if prev_sections or curr_sections:
+        diff = deepdiff.DeepDiff(
+            prev_sections,
+            curr_sections,
+            ignore_order=False,
+            exclude_paths=EXCLUDE_FROM_DELTAS,
+            exclude_regex_paths=EXCLUDE_FROM_DELTAS_REGEX,
+            ignore_type_in_groups=[(type(None), str, int, float, bool, list, dict)],
+        )
+        if diff:
+            delta = diff._to_delta_dict()
+
+    if appended:
+        delta.setdefault("iterable_item_added", {}).update(appended)
+
+    log.debug(
+        "compute_delta",
+        diffed_sections=list(curr_sections.keys() | prev_sections.keys()),
+        appended_items=len(appended),
     )
-    if not diff:
-        return {}
 
-    return diff._to_delta_dict()
+    return delta
 
 
 def _serialize_scene_plain(scene: "Scene") -> dict:
@@ -559,11 +1101,6 @@ async def append_scene_delta(scene: "Scene", meta: dict | None = None) -> int |
 
     new_rev = latest_rev + 1
 
-    # Find the appropriate file to append to
-    start_rev, log_path = _get_latest_changelog_file(scene)
-    log_data = _ensure_log_initialized(scene, start_rev)
-
-    # Check if current file would exceed size limit after adding this delta
     new_delta_entry = {
         "rev": new_rev,
         "ts": _utc_timestamp_now(),
@@ -573,27 +1110,11 @@ async def append_scene_delta(scene: "Scene", meta: dict | None = None) -> int |
 
     # Estimate size of new entry (rough approximation)
     estimated_entry_size = len(json.dumps(new_delta_entry))
-    current_file_size = _get_file_size(log_path)
 
-    if (
-        current_file_size > 0
-        and (current_file_size + estimated_entry_size) > MAX_CHANGELOG_FILE_SIZE
-    ):
-        # Create a new changelog file starting with this revision
-        start_rev = new_rev
-        log_path = _changelog_log_path(scene, start_rev)
-        log_data = _ensure_log_initialized(scene, start_rev)
-        log.debug("changelog_file_split", new_file=log_path, start_rev=start_rev)
-
-    # Append to the appropriate file
-    deltas = log_data.get("deltas", [])
-    deltas.append(new_delta_entry)
-    log_data["deltas"] = deltas
-    log_data["latest_rev"] = new_rev
-
-    _write_json(log_path, log_data)
+    log_path = _append_log_entry(scene, new_delta_entry, estimated_entry_size)
     log.debug("append_scene_delta", rev=new_rev, file=log_path)
-    _write_json(_latest_path(scene), curr_data)
+    await _write_latest_async(scene, curr_data)
+    await _record_delta_for_checkpoint(scene, new_rev, estimated_entry_size)
     return new_rev
 
 
@@ -608,11 +1129,13 @@ def _get_overall_latest_revision(scene: "Scene") -> int:
     if not files:
         return 0
 
-    latest_rev = 0
+    latest_rev = max([r.get("rev", 0) for r in _load_index(scene)] or [0])
+
+    # legacy log files track latest_rev explicitly
     for start_rev, file_path in files:
-        log_data = _read_json_or_default(file_path, {})
-        file_latest = log_data.get("latest_rev", start_rev)
-        latest_rev = max(latest_rev, file_latest)
+        if not _is_jsonl(file_path):
+            log_data = _read_json_or_default(file_path, {})
+            latest_rev = max(latest_rev, log_data.get("latest_rev", start_rev))
 
     return latest_rev
 
@@ -632,13 +1155,89 @@ async def reconstruct_cleanup(data: dict) -> dict:
     return data
 
 
+def _iter_delta_entries(
+    scene: "Scene", after_rev: int = 0, to_rev: int | None = None
+) -> list[dict]:
+    """
+    Collect delta entries with `after_rev < rev <= to_rev` from all changelog
+    files, sorted by revision.
+
+    Changelog files that only hold revisions at or before `after_rev` are not
+    read.
+
+    Args:
+        scene: The scene object
+        after_rev: Only include revisions after this one
+        to_rev: Only include revisions up to this one, or None for all
+
+    Returns:
+        list[dict]: The delta entries in revision order
+    """
+    entries = []
+    files = _get_changelog_files(scene)
+
+    # byte offset of the first needed revision per (JSON-Lines) log file
+    offsets: dict[int, int] = {}
+    for record in _load_index(scene):
+        if record.get("rev", 0) > after_rev and record.get("offset") is not None:
+            file_start = record.get("file")
+            offsets[file_start] = min(
+                offsets.get(file_start, record["offset"]), record["offset"]
+            )
+
+    for idx, (start_rev, file_path) in enumerate(files):
+        if to_rev is not None and start_rev > to_rev:
+            break  # Files are sorted by start_rev, so we can stop here
+
+        # The next file starts where this one ends
+        if idx + 1 < len(files) and files[idx + 1][0] <= after_rev + 1:
+            continue
+
+        offset = offsets.get(start_rev, 0) if _is_jsonl(file_path) else 0
+
+        for entry in _read_log_entries(file_path, offset):
+            rev = entry.get("rev", 0)
+            if to_rev is not None and rev > to_rev:
+                break  # Deltas should be in order within a file
+            if rev > after_rev:
+                entries.append(entry)
+
+    # Sort deltas by revision number to ensure correct application order
+    entries.sort(key=lambda x: x.get("rev", 0))
+    return entries
+
+
+def _replay_scene_data(scene: "Scene", to_rev: int) -> dict:
+    """
+    Rebuild the raw scene data at `to_rev` by applying deltas to the nearest
+    checkpoint at or before `to_rev`, or to the base snapshot if there is none.
+    """
+    checkpoint = _load_nearest_checkpoint(scene, to_rev) if to_rev > 0 else None
+
+    if checkpoint:
+        from_rev, data = checkpoint
+    else:
+        from_rev, data = 0, _load_base_scene_data(scene)
+
+    if to_rev <= from_rev:
+        return data
+
+    for entry in _iter_delta_entries(scene, after_rev=from_rev, to_rev=to_rev):
+        delta_obj = entry.get("delta") or {}
+        if delta_obj:
+            data = _apply_delta(data, delta_obj)
+
+    return data
+
+
 async def reconstruct_scene_data(scene: "Scene", to_rev: int | None = None) -> dict:
     """
     Reconstruct scene data at a specific revision by applying deltas.
 
-    Starts from the base scene data (revision 0) and sequentially applies
-    all deltas up to the target revision to reconstruct the scene state.
-    Reads from all changelog files as needed.
+    Starts from the nearest checkpoint at or before the target revision (or
+    the base scene data at revision 0 if there is none) and sequentially
+    applies the remaining deltas up to the target revision.
+    Reads from changelog files as needed.
 
     Args:
         scene: The scene object to reconstruct
@@ -650,41 +1249,71 @@ async def reconstruct_scene_data(scene: "Scene", to_rev: int | None = None) -> d
     if to_rev is None:
         to_rev = _get_overall_latest_revision(scene)
 
-    data = _load_base_scene_data(scene)
+    data = _replay_scene_data(scene, to_rev)
+    data = await reconstruct_cleanup(data)
 
-    if to_rev <= 0:
-        data = await reconstruct_cleanup(data)
-        return data
+    return data
 
-    # Collect all deltas from all changelog files, up to target revision
-    all_deltas = []
-    files = _get_changelog_files(scene)
 
-    for start_rev, file_path in files:
-        if start_rev > to_rev:
-            break  # Files are sorted by start_rev, so we can stop here
+async def compact_changelog(scene: "Scene") -> dict:
+    """
+    Backfill checkpoints for an existing changelog.
 
-        log_data = _read_json_or_default(file_path, {})
-        file_deltas = log_data.get("deltas", [])
+    Replays the whole changelog once from the base snapshot and writes a
+    checkpoint wherever one is due according to CHECKPOINT_INTERVAL_REVS and
+    CHECKPOINT_INTERVAL_BYTES, so older revisions no longer need a replay
+    from revision 0. Existing checkpoints are kept.
 
-        for entry in file_deltas:
-            if entry.get("rev", 0) <= to_rev:
-                all_deltas.append(entry)
-            else:
-                break  # Deltas should be in order within a file
+    Args:
+        scene: The scene object whose changelog should be compacted
 
-    # Sort deltas by revision number to ensure correct application order
-    all_deltas.sort(key=lambda x: x.get("rev", 0))
+    Returns:
+        dict: {
+            "revisions": int,  # number of revisions in the changelog
+            "written": list[int],  # revisions checkpoints were written for
+            "checkpoints": int,  # total number of checkpoints after compaction
+        }
+    """
+    if not os.path.exists(_base_path(scene)):
+        return {"revisions": 0, "written": [], "checkpoints": 0}
+
+    existing = {rev for rev, _ in _get_checkpoint_files(scene)}
+    entries = _iter_delta_entries(scene)
+
+    data = _load_base_scene_data(scene)
+    state = {"rev": 0, "bytes": 0}
+    written: list[int] = []
 
-    # Apply deltas in order
-    for entry in all_deltas:
+    for entry in entries:
+        rev = entry.get("rev", 0)
         delta_obj = entry.get("delta") or {}
         if delta_obj:
             data = _apply_delta(data, delta_obj)
 
-    data = await reconstruct_cleanup(data)
+        state["bytes"] += len(json.dumps(entry))
 
-    return data
+        if rev in existing:
+            state = {"rev": rev, "bytes": 0}
+        elif _checkpoint_due(state, rev):
+            _write_checkpoint(scene, rev, data)
+            written.append(rev)
+            state = {"rev": rev, "bytes": 0}
+
+    # counters are re-read from disk on next append
+    _checkpoint_state.pop(_checkpoint_state_key(scene), None)
+
+    log.info(
+        "compact_changelog",
+        revisions=len(entries),
+        written=len(written),
+        filename=scene.filename,
+    )
+
+    return {
+        "revisions": len(entries),
+        "written": written,
+        "checkpoints": len(existing) + len(written),
+    }
 
 
 async def write_reconstructed_scene(
@@ -726,7 +1355,7 @@ def list_revisions(scene: "Scene") -> list[int]:
     """
     Get a list of all available revision numbers for a scene.
 
-    Searches all changelog files to collect revision numbers.
+    Reads the revision index instead of parsing the changelog files.
 
     Args:
         scene: The scene object to list revisions for
@@ -734,13 +1363,7 @@ def list_revisions(scene: "Scene") -> list[int]:
     Returns:
         list[int]: List of revision numbers sorted in ascending order
     """
-    all_revisions = []
-    files = _get_changelog_files(scene)
-
-    for _, file_path in files:
-        log_data = _read_json_or_default(file_path, {})
-        file_revisions = [d.get("rev", 0) for d in log_data.get("deltas", [])]
-        all_revisions.extend(file_revisions)
+    all_revisions = [record.get("rev", 0) for record in _load_index(scene)]
 
     return sorted(all_revisions, reverse=True)
 
@@ -753,14 +1376,11 @@ def list_revision_entries(scene: "Scene") -> list[dict]:
         list[dict]: [{"rev": int, "ts": int} ...] sorted by rev ascending
     """
     entries: list[dict] = []
-    files = _get_changelog_files(scene)
-    for _, file_path in files:
-        log_data = _read_json_or_default(file_path, {})
-        for entry in log_data.get("deltas", []):
-            rev = entry.get("rev")
-            ts = entry.get("ts")
-            if isinstance(rev, int) and isinstance(ts, int):
-                entries.append({"rev": rev, "ts": ts})
+    for record in _load_index(scene):
+        rev = record.get("rev")
+        ts = record.get("ts")
+        if isinstance(rev, int) and isinstance(ts, int):
+            entries.append({"rev": rev, "ts": ts})
     return sorted(entries, key=lambda x: x["rev"], reverse=True)
 
 
@@ -774,14 +1394,10 @@ def latest_revision_at(scene: "Scene", at_ts: int) -> int | None:
     Returns:
         int | None: revision number or None if none exist
     """
-    entries = list_revision_entries(scene)
-    best_rev = None
-    for e in entries:
+    for e in list_revision_entries(scene):
         if e["ts"] <= at_ts:
-            best_rev = e["rev"]
-        else:
-            break
-    return best_rev
+            return e["rev"]
+    return None
 
 
 def delete_changelog_files(scene: "Scene") -> dict:
@@ -807,6 +1423,9 @@ def delete_changelog_files(scene: "Scene") -> dict:
         files.append(base_path)
         files.append(latest_path)
         files.extend([fp for _, fp in _get_changelog_files(scene)])
+        files.extend([fp for _, fp in _get_checkpoint_files(scene)])
+        files.append(_changelog_index_path(scene))
+        _checkpoint_state.pop(_checkpoint_state_key(scene), None)
 
         # Delete files if they exist
         for fpath in set(files):
@@ -985,40 +1604,20 @@ class InMemoryChangelog:
             # Delta entry already has the correct revision number
             real_delta_entry = entry
 
-            # Find the appropriate changelog file to append to
-            start_rev, log_path = _get_latest_changelog_file(self.scene)
-            log_data = _ensure_log_initialized(self.scene, start_rev)
-
-            # Check if we need to create a new file due to size limits
             log.debug("commit_in_memory_deltas", real_delta_entry=real_delta_entry)
             estimated_size = len(json.dumps(real_delta_entry))
-            current_size = _get_file_size(log_path)
-
             entry_rev = real_delta_entry["rev"]
-            if (
-                current_size > 0
-                and (current_size + estimated_size) > MAX_CHANGELOG_FILE_SIZE
-            ):
-                # Create a new changelog file starting with this revision
-                start_rev = entry_rev
-                log_path = _changelog_log_path(self.scene, start_rev)
-                log_data = _ensure_log_initialized(self.scene, start_rev)
-                log.debug(
-                    "changelog_file_split", new_file=log_path, start_rev=start_rev
-                )
 
-            # Append the delta to the file
-            log_data["deltas"].append(real_delta_entry)
-            log_data["latest_rev"] = entry_rev
-
-            # Write the updated log data
-            _write_json(log_path, log_data)
+            # Append the delta to the newest changelog file
+            _append_log_entry(self.scene, real_delta_entry, estimated_size)
 
             committed_revs.append(entry_rev)
             log.debug("committed_in_memory_delta", rev=entry_rev)
 
+            await _record_delta_for_checkpoint(self.scene, entry_rev, estimated_size)
+
         # Update the latest snapshot file with the final scene state
-        _write_json(_latest_path(self.scene), self.last_state)
+        await _write_latest_async(self.scene, self.last_state)
 
         # Clear pending deltas but don't mark as committed so we can continue accumulating
         self.pending_deltas.clear()
@@ -1112,6 +1711,7 @@ async def ensure_changelogs_for_all_scenes(root: str | None = None) -> None:
                     else:
                         if not latest_exists:
                             _ensure_latest_initialized(scene_ref)
+                        migrate_changelog(scene_ref)
                 except Exception as e:
                     log.warning(
                         "ensure_scene_changelog_failed", path=str(scene_path), error=e
@@ -383,6 +383,18 @@ class Character(pydantic.BaseModel):
         Commits this character's details to the memory agent. (vectordb)
         """
 
+        items = self.memory_documents()
+
+        if items:
+            await memory_agent.add_many(items)
+
+        self.memory_dirty = False
+
+    def memory_documents(self) -> list[dict]:
+        """
+        Returns this character's details as memory agent documents
+        """
+
         items = []
 
         if not self.base_attributes or "description" not in self.base_attributes:
@@ -446,10 +458,7 @@ class Character(pydantic.BaseModel):
                 }
             )
 
-        if items:
-            await memory_agent.add_many(items)
-
-        self.memory_dirty = False
+        return items
 
     async def commit_single_attribute_to_memory(
         self, memory_agent, attribute: str, value: str
@@ -314,6 +314,7 @@ class AnthropicClient(ConcurrentInferenceMixin, EndpointOverrideMixin, ClientBas
                 content = event.delta.text
                 response += content
                 self.update_request_tokens(self.count_tokens(content))
+                self.stream_chunk(content)
 
             elif (
                 event.type == "content_block_delta"
@@ -2,6 +2,7 @@
 A unified client base, based on the openai API
 """
 
+import contextlib
 import ipaddress
 import logging
 import re
@@ -12,18 +13,33 @@ import asyncio
 import uuid
 from typing import Callable, Union, Literal, TYPE_CHECKING
 
+import httpx
 import pydantic
 import dataclasses
 import structlog
 import urllib3
+from openai import AsyncOpenAI
 
 import talemate.client.presets as presets
 import talemate.instance as instance
 import talemate.util as util
 from talemate.agents.context import active_agent
 from talemate.client.context import client_context_attribute
+from talemate.client.http_pool import HTTP_CLIENT_POOL, PoolSettings, pool_key
 from talemate.client.model_prompts import model_prompt, DEFAULT_TEMPLATE, PromptSpec
 from talemate.client.ratelimit import CounterRateLimiter
+from talemate.client.response_cache import RESPONSE_CACHE, CachedResponse
+from talemate.client.tokenizers import (
+    DEFAULT_TOKENIZER,
+    HFTokenizer,
+    TOKENIZERS,
+    Tokenizer,
+)
+from talemate.client.streaming import (
+    GenerationStream,
+    active_generation_stream,
+    is_streamable_kind,
+)
 from talemate.context import active_scene
 from talemate.prompts.base import Prompt, active_template_uid
 from talemate.emit import emit
@@ -61,6 +77,12 @@ INDIRECT_COERCION_PROMPT_REASONING = (
 
 DEFAULT_REASONING_PATTERN = r".*?</think>"
 
+# openai sdk default, used for pooling when no base url is configured
+OPENAI_DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+# requests agents may send at once to a client with concurrent inference
+MAX_CONCURRENT_REQUESTS = 4
+
 
 class ClientDisabledError(OSError):
     def __init__(self, client: "ClientBase"):
@@ -84,6 +106,7 @@ class PromptData(pydantic.BaseModel):
     preset_group: str | None = None
     reasoning: str | None = None
     template_uid: str | None = None
+    cached: bool = False
 
 
 class ErrorAction(pydantic.BaseModel):
@@ -285,6 +308,12 @@ class ClientBase:
     client_type = "base"
     request_information: RequestInformation | None = None
     status_request_timeout: int = 2
+    # seconds a status probe (or successful generation) keeps the cached
+    # status fresh
+    status_ttl: float = 10.0
+    status_checked_at: float | None = None
+    status_probe_latency: float | None = None
+    status_config_key: str | None = None
     rate_limit_counter: CounterRateLimiter = None
 
     class Meta(pydantic.BaseModel):
@@ -498,6 +527,20 @@ class ClientBase:
         """
         return getattr(self.client_config, "concurrent_inference_enabled", False)
 
+    @property
+    def request_lock(self) -> asyncio.Lock:
+        """
+        Serializes requests to clients that take one request at a time.
+
+        Requests keep their state (reasoning, token counts, request
+        information, processing status) on the client, so they must not
+        overlap unless concurrent inference is enabled.
+        """
+        lock = self.__dict__.get("_request_lock")
+        if lock is None:
+            lock = self._request_lock = asyncio.Lock()
+        return lock
+
     @property
     def supports_concurrent_inference(self) -> bool:
         """
@@ -508,6 +551,55 @@ class ClientBase:
             self.can_support_concurrent_inference and self.concurrent_inference_enabled
         )
 
+    @property
+    def max_concurrent_requests(self) -> int:
+        """
+        How many requests agents may send to this client at once.
+        """
+        if self.supports_concurrent_inference:
+            return MAX_CONCURRENT_REQUESTS
+        return 1
+
+    @property
+    def http_pool_settings(self) -> PoolSettings:
+        """
+        Connection pool limits, concurrent inference needs more connections
+        to the same host.
+        """
+        if self.supports_concurrent_inference:
+            return PoolSettings(
+                max_connections=32, max_keepalive_connections=16, http2=True
+            )
+        return PoolSettings(max_connections=8, max_keepalive_connections=4, http2=True)
+
+    def http_client(self, url: str | None = None) -> httpx.AsyncClient:
+        """
+        Returns the shared keep-alive http client for requests to `url`
+        (defaults to the api url). Credentials are passed as request headers.
+
+        The returned client is owned by the pool and must not be closed.
+        """
+        return HTTP_CLIENT_POOL.acquire(
+            self.name, pool_key(url or self.api_url), self.http_pool_settings
+        )
+
+    def openai_client(self, base_url: str | None, api_key: str) -> AsyncOpenAI:
+        """
+        Returns an AsyncOpenAI client that sends its requests through the
+        shared http client pool. Reused until the base url, api key or pool
+        change.
+        """
+        http_client = self.http_client(base_url or OPENAI_DEFAULT_BASE_URL)
+        key = (base_url, api_key, http_client)
+
+        if getattr(self, "_openai_client_key", None) != key:
+            self._openai_client = AsyncOpenAI(
+                base_url=base_url, api_key=api_key, http_client=http_client
+            )
+            self._openai_client_key = key
+
+        return self._openai_client
+
     @property
     def embeddings_function(self):
         return None
@@ -605,6 +697,8 @@ class ClientBase:
         if self.supports_embeddings:
             await self.remove_embeddings()
 
+        HTTP_CLIENT_POOL.release(self.name)
+
     async def reset_embeddings(self):
         self._embeddings_model_name = None
         self._embeddings_status = False
@@ -951,6 +1045,12 @@ class ClientBase:
             "request_information": self.request_information.model_dump()
             if self.request_information
             else None,
+            "status_probe_latency": round(self.status_probe_latency, 3)
+            if self.status_probe_latency is not None
+            else None,
+            "status_age": round(self.status_age, 1)
+            if self.status_age is not None
+            else None,
             "lock_template": self.lock_template,
             "system_prompts": self.system_prompts.model_dump(),
             "optimize_prompt_caching": self.optimize_prompt_caching,
@@ -991,10 +1091,55 @@ class ClientBase:
         except IndexError:
             return None
 
+    @property
+    def status_age(self) -> float | None:
+        """
+        Seconds since the status was last confirmed
+        """
+        if self.status_checked_at is None:
+            return None
+        return time.monotonic() - self.status_checked_at
+
+    @property
+    def current_status_config_key(self) -> str:
+        """
+        Changes whenever the client configuration changes
+        """
+        return self.client_config.model_dump_json()
+
+    @property
+    def status_fresh(self) -> bool:
+        """
+        Whether the cached status can be used without probing the api
+        """
+        return (
+            self.connected
+            and self.status_checked_at is not None
+            and self.status_config_key == self.current_status_config_key
+            and self.status_age < self.status_ttl
+        )
+
+    def invalidate_status(self):
+        """
+        Marks the cached status as stale, the next status call will probe
+        the api.
+        """
+        self.status_checked_at = None
+
+    def confirm_status(self):
+        """
+        Refreshes the cached status after the api was reached successfully
+        """
+        if self.status_config_key == self.current_status_config_key:
+            self.status_checked_at = time.monotonic()
+
     async def status(self):
         """
         Send a request to the API to retrieve the loaded AI model name.
         Raises an error if no model name is returned.
+
+        The api is only probed if the cached status is stale, otherwise the
+        cached status is emitted.
         :return: None
         """
         if self.processing:
@@ -1006,6 +1151,13 @@ class ClientBase:
             self.emit_status()
             return
 
+        if self.status_fresh:
+            self.emit_status()
+            return
+
+        config_key = self.current_status_config_key
+        time_start = time.monotonic()
+
         try:
             self.remote_model_name = await self.get_model_name()
         except Exception as e:
@@ -1015,9 +1167,13 @@ class ClientBase:
             self.log.warning("client status error", e=e, client=self.name)
             self.remote_model_name = None
             self.connected = False
+            self.invalidate_status()
             self.emit_status()
             return
 
+        self.status_checked_at = time.monotonic()
+        self.status_probe_latency = self.status_checked_at - time_start
+        self.status_config_key = config_key
         self.connected = True
 
         self.emit_status()
@@ -1207,7 +1363,7 @@ class ClientBase:
         Returns the generation response string.
         """
         while True:
-            self.new_request()
+            self.new_request(kind)
 
             try:
                 response = await self._cancelable_generate(
@@ -1218,6 +1374,10 @@ class ClientBase:
             except Exception as e:
                 self.log.error("generation error", e=traceback.format_exc())
                 status_code = self._extract_status_code(e)
+                if status_code is None:
+                    # no response from the api, re-probe before the next
+                    # generation
+                    self.invalidate_status()
                 error_message = get_error_message(status_code)
                 action = await self._prompt_generation_error(
                     error_message, status_code=status_code
@@ -1233,6 +1393,8 @@ class ClientBase:
             if isinstance(response, GenerationCancelled):
                 raise response
 
+            self.confirm_status()
+
             # Check for empty response
             if not response or not response.strip():
                 self.log.warning("empty response from generation")
@@ -1261,11 +1423,26 @@ class ClientBase:
                 return code
         return None
 
-    def new_request(self):
+    def new_request(self, kind: str | None = None):
         """
         Creates a new request information object.
+
+        If generation streaming is enabled and `kind` is streamable, also
+        opens a new generation stream.
         """
         self.request_information = RequestInformation()
+        # a stream still open at this point belongs to a failed attempt
+        self.close_generation_stream(discard=True)
+
+        if kind and self.stream_generations and is_streamable_kind(kind):
+            agent_context = active_agent.get()
+            active_generation_stream.set(
+                GenerationStream(
+                    client_name=self.name,
+                    kind=kind,
+                    agent=agent_context.agent.agent_type if agent_context else None,
+                )
+            )
 
     def end_request(self):
         """
@@ -1273,6 +1450,91 @@ class ClientBase:
         """
         self.request_information.end_time = time.time()
 
+    def emit_prompt_sent(
+        self,
+        kind: str,
+        prompt: str,
+        response: str,
+        prompt_tokens: int,
+        response_tokens: int,
+        time: float,
+        generation_parameters: dict,
+        cached: bool = False,
+    ):
+        agent_context = active_agent.get()
+        emit(
+            "prompt_sent",
+            data=PromptData(
+                kind=kind,
+                prompt=prompt,
+                response=response,
+                prompt_tokens=prompt_tokens,
+                response_tokens=response_tokens,
+                agent_stack=agent_context.agent_stack if agent_context else [],
+                client_name=self.name,
+                client_type=self.client_type,
+                time=time,
+                generation_parameters=generation_parameters,
+                inference_preset=client_context_attribute("inference_preset"),
+                preset_group=self.preset_group,
+                reasoning=self._reasoning_response,
+                template_uid=active_template_uid.get(),
+                cached=cached,
+            ).model_dump(),
+        )
+
+    def response_cache_enabled_for(self, kind: str) -> bool:
+        """
+        Whether the response to a prompt of `kind` may be served from and
+        stored in the response cache, the agent function sending it has to
+        opt in.
+        """
+        if not self.config.game.general.response_cache:
+            return False
+
+        agent_context = active_agent.get()
+        if not agent_context or not agent_context.agent:
+            return False
+
+        if not agent_context.agent.allow_response_cache(kind, agent_context.action):
+            return False
+
+        # jiggled randomness is asking for a different response
+        if client_context_attribute(
+            "nuke_repetition"
+        ) > 0.0 and self.jiggle_enabled_for(kind):
+            return False
+
+        return True
+
+    @property
+    def stream_generations(self) -> bool:
+        return self.config.game.general.stream_generations
+
+    @property
+    def generation_stream(self) -> GenerationStream | None:
+        """
+        The stream of the current generation, iterate it to receive the
+        response text as it comes in.
+        """
+        return active_generation_stream.get()
+
+    def stream_chunk(self, chunk: str):
+        """
+        Passes received response text to the active generation stream.
+
+        Streaming clients call this for every received piece of content.
+        """
+        stream = self.generation_stream
+        if stream:
+            stream.put(chunk)
+
+    def close_generation_stream(self, discard: bool = False):
+        stream = self.generation_stream
+        if stream:
+            stream.close(discard=discard)
+            active_generation_stream.set(None)
+
     def update_request_tokens(self, tokens: int, replace: bool = False):
         """
         Updates the request information object with the number of tokens received.
@@ -1375,15 +1637,25 @@ class ClientBase:
         Send a prompt to the AI and return its response.
         :param prompt: The text prompt to send (str or Prompt instance).
         :return: The AI's response text.
+
+        Unless concurrent inference is enabled requests wait for the
+        previous request to the client to finish (e.g. a background archive
+        summarization and the next turn).
         """
 
-        try:
-            return await self._send_prompt(
-                prompt, kind, finalize, retries, data_expected
-            )
-        except GenerationCancelled:
-            await self.abort_generation()
-            raise
+        if self.max_concurrent_requests > 1:
+            lock = contextlib.nullcontext()
+        else:
+            lock = self.request_lock
+
+        async with lock:
+            try:
+                return await self._send_prompt(
+                    prompt, kind, finalize, retries, data_expected
+                )
+            except GenerationCancelled:
+                await self.abort_generation()
+                raise
 
     async def _send_prompt(
         self,
@@ -1465,8 +1737,9 @@ class ClientBase:
             self._returned_response_tokens = None
             self._reasoning_response = None
 
+            # the status is never probed on the generation path, the client
+            # status loop refreshes it in the background
             self.emit_status(processing=True)
-            await self.status()
 
             prompt_param = self.generate_prompt_parameters(kind)
 
@@ -1523,8 +1796,6 @@ class ClientBase:
 
             prompt_param = finalize(prompt_param)
 
-            token_length = self.count_tokens(finalized_prompt)
-
             time_start = time.time()
             extra_stopping_strings = prompt_param.pop("extra_stopping_strings", [])
 
@@ -1532,7 +1803,6 @@ class ClientBase:
 
             self.log.info(
                 "Sending prompt",
-                token_length=token_length,
                 max_token_length=self.max_token_length,
                 parameters=prompt_param,
             )
@@ -1542,6 +1812,33 @@ class ClientBase:
                     "\n<|RESPONSE_LENGTH_INSTRUCTIONS|>", ""
                 )
 
+            cache_key = None
+            if self.response_cache_enabled_for(kind):
+                cache_key = RESPONSE_CACHE.key(
+                    finalized_prompt,
+                    self.client_type,
+                    self.model_name,
+                    kind,
+                    prompt_param,
+                    inference_preset=client_context_attribute("inference_preset"),
+                    preset_group=self.preset_group,
+                )
+                cached = RESPONSE_CACHE.get(cache_key)
+                if cached is not None:
+                    self.log.debug("response cache hit", kind=kind, key=cache_key)
+                    self._reasoning_response = cached.reasoning
+                    self.emit_prompt_sent(
+                        kind,
+                        finalized_prompt,
+                        cached.response,
+                        prompt_tokens=cached.prompt_tokens,
+                        response_tokens=cached.response_tokens,
+                        time=0,
+                        generation_parameters=prompt_param,
+                        cached=True,
+                    )
+                    return cached.response
+
             while True:
                 response = await self._generate_with_error_handling(
                     finalized_prompt, prompt_param, kind
@@ -1590,31 +1887,39 @@ class ClientBase:
                     response = response.split(stopping_string)[0]
                     break
 
-            agent_context = active_agent.get()
+            # only count the prompt if the backend didn't report it, the
+            # count is only reported so an estimate is good enough
+            prompt_tokens = self._returned_prompt_tokens or self.estimate_tokens(
+                finalized_prompt
+            )
+            response_tokens = self._returned_response_tokens or self.count_tokens(
+                response
+            )
 
-            emit(
-                "prompt_sent",
-                data=PromptData(
-                    kind=kind,
-                    prompt=finalized_prompt,
-                    response=response,
-                    prompt_tokens=self._returned_prompt_tokens or token_length,
-                    response_tokens=self._returned_response_tokens
-                    or self.count_tokens(response),
-                    agent_stack=agent_context.agent_stack if agent_context else [],
-                    client_name=self.name,
-                    client_type=self.client_type,
-                    time=time_end - time_start,
-                    generation_parameters=prompt_param,
-                    inference_preset=client_context_attribute("inference_preset"),
-                    preset_group=self.preset_group,
-                    reasoning=self._reasoning_response,
-                    template_uid=active_template_uid.get(),
-                ).model_dump(),
+            if cache_key and response.strip():
+                RESPONSE_CACHE.put(
+                    cache_key,
+                    CachedResponse(
+                        response=response,
+                        reasoning=self._reasoning_response,
+                        prompt_tokens=prompt_tokens,
+                        response_tokens=response_tokens,
+                    ),
+                )
+
+            self.emit_prompt_sent(
+                kind,
+                finalized_prompt,
+                response,
+                prompt_tokens=prompt_tokens,
+                response_tokens=response_tokens,
+                time=time_end - time_start,
+                generation_parameters=prompt_param,
             )
 
             return response
         except GenerationCancelled:
+            self.close_generation_stream(discard=True)
             # Finalize request timing so the token rate doesn't decay to ~0 after cancellation.
             # This also ensures the next emitted `client_status` contains stable request stats.
             if self.request_information and self.request_information.end_time is None:
@@ -1622,11 +1927,13 @@ class ClientBase:
                 self.end_request()
             raise
         except GenerationProcessingError as e:
+            self.close_generation_stream(discard=True)
             self.log.error("send_prompt error", e=e)
             emit("status", message=str(e), status="error")
             return ""
 
         finally:
+            self.close_generation_stream()
             self.emit_status(processing=False)
             self._returned_prompt_tokens = None
             self._returned_response_tokens = None
@@ -1634,8 +1941,63 @@ class ClientBase:
             if self.rate_limit_counter:
                 self.rate_limit_counter.increment()
 
+    @property
+    def tokenizer_file(self) -> str | None:
+        return getattr(self.client_config, "tokenizer_file", None)
+
+    @property
+    def tokenizer_config_key(self) -> tuple:
+        """
+        The tokenizer is resolved again whenever this changes
+        """
+        return (self.client_type, self.api_url, self.model_name, self.tokenizer_file)
+
+    @property
+    def tokenizer(self) -> Tokenizer:
+        return TOKENIZERS.get(self)
+
+    def make_tokenizer(self) -> Tokenizer:
+        """
+        Returns the tokenizer to count tokens for this client with.
+
+        Uses the configured tokenizer file if there is one, otherwise the
+        backend tokenizer (`make_backend_tokenizer`), falling back to the
+        default tiktoken encoding.
+        """
+        if self.tokenizer_file:
+            try:
+                return HFTokenizer(self.tokenizer_file)
+            except Exception as exc:
+                self.log.warning(
+                    "could not load tokenizer file",
+                    tokenizer_file=self.tokenizer_file,
+                    error=exc,
+                )
+
+        return self.make_backend_tokenizer() or DEFAULT_TOKENIZER
+
+    def make_backend_tokenizer(self) -> Tokenizer | None:
+        """
+        Override for backends that expose a tokenize endpoint
+        """
+        return None
+
     def count_tokens(self, content: str):
-        return util.count_tokens(content)
+        return TOKENIZERS.count(self.tokenizer, str(content))
+
+    def estimate_tokens(self, content: str) -> int:
+        """
+        Token count for `content` that never queries remote tokenizers, for
+        counts that are only reported (streamed chunks, prompt logs).
+        """
+        return TOKENIZERS.estimate(self.tokenizer, str(content))
+
+    async def count_tokens_async(self, content: str) -> int:
+        """
+        Token count for `content`, querying remote tokenizers directly.
+        """
+        counts = await TOKENIZERS.count_many(self.tokenizer, [str(content)])
+        return counts[0]
 
     def jiggle_randomness(self, prompt_config: dict, offset: float = 0.3) -> dict:
         """
@@ -202,6 +202,7 @@ class CohereClient(EndpointOverrideMixin, ClientBase):
                     response += chunk
                     # Track token usage incrementally
                     self.update_request_tokens(self.count_tokens(chunk))
+                    self.stream_chunk(chunk)
 
             self._returned_prompt_tokens = self.prompt_tokens(prompt)
             self._returned_response_tokens = self.response_tokens(response)
@@ -1,6 +1,5 @@
 import pydantic
 import structlog
-from openai import AsyncOpenAI
 
 from talemate.client.base import ClientBase, ErrorAction, CommonDefaults
 from talemate.client.registry import register
@@ -130,7 +129,7 @@ class DeepSeekClient(ClientBase):
         if not self.deepseek_api_key:
             raise Exception("No DeepSeek API key set")
 
-        client = AsyncOpenAI(api_key=self.deepseek_api_key, base_url=BASE_URL)
+        client = self.openai_client(BASE_URL, self.deepseek_api_key)
 
         human_message = {"role": "user", "content": prompt.strip()}
         system_message = {"role": "system", "content": self.get_system_message(kind)}
@@ -163,6 +162,7 @@ class DeepSeekClient(ClientBase):
                     response += content_piece
                     # Incrementally track token usage
                     self.update_request_tokens(self.count_tokens(content_piece))
+                    self.stream_chunk(content_piece)
 
             # Save token accounting for whole request
             self._returned_prompt_tokens = self.prompt_tokens(prompt)
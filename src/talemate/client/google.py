@@ -434,6 +434,7 @@ class GoogleClient(
                         reasoning += part.text
                     else:
                         response += part.text
+                        self.stream_chunk(part.text)
                     self.update_request_tokens(count_tokens(part.text))
             except Exception as e:
                 log.error("error processing chunk", e=e, chunk=chunk)
@@ -190,6 +190,7 @@ class GroqClient(EndpointOverrideMixin, ClientBase):
                     response += content_piece
                     # Incrementally track token usage
                     self.update_request_tokens(self.count_tokens(content_piece))
+                    self.stream_chunk(content_piece)
 
             return response
         except Exception:
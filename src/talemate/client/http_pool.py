@@ -0,0 +1,149 @@
+"""
+Shared HTTP connection pools for LLM clients.
+
+Clients used to create a fresh `httpx.AsyncClient` (or `AsyncOpenAI`) for
+every generation and status probe, paying a new TCP / TLS handshake for each
+request. `HTTPClientPool` hands out long-lived `httpx.AsyncClient` instances
+instead, keyed by:
+
+- the origin (scheme + host + port) of the api url
+- the pool settings (connection limits, HTTP/2)
+- the running event loop (httpx connections can not be shared across loops)
+
+Credentials are not part of the key, they are sent as per request headers.
+
+A talemate client holds one pool per origin it talks to. When a client asks
+for a pool of an origin with a different key (e.g., because its concurrency
+setting changed) its previous pool for that origin is released and closed
+once no other client uses it. All pools of a client are released with
+`release`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import importlib.util
+from urllib.parse import urlparse
+
+import httpx
+import structlog
+
+__all__ = [
+    "HTTP2_AVAILABLE",
+    "HTTP_CLIENT_POOL",
+    "HTTPClientPool",
+    "PoolSettings",
+    "pool_key",
+]
+
+log = structlog.get_logger("talemate.client.http_pool")
+
+# httpx only supports HTTP/2 if the h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclasses.dataclass(frozen=True)
+class PoolSettings:
+    max_connections: int = 8
+    max_keepalive_connections: int = 4
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+def pool_key(url: str) -> tuple[str]:
+    """
+    Returns the pool key for an api url
+    """
+    parts = urlparse(url or "")
+    return (f"{parts.scheme}://{parts.netloc}".lower(),)
+
+
+class HTTPClientPool:
+    def __init__(self):
+        self.clients: dict[tuple, httpx.AsyncClient] = {}
+        # owner -> origin -> key of the pool the owner currently uses for it
+        self.owners: dict[str, dict[str, tuple]] = {}
+
+    def acquire(
+        self, owner: str, key: tuple, settings: PoolSettings
+    ) -> httpx.AsyncClient:
+        """
+        Returns the pooled client for `key` and `settings`, creating it if
+        needed, and records `owner` as its user.
+        """
+        full_key = (key, settings, id(asyncio.get_running_loop()))
+
+        owned = self.owners.setdefault(owner, {})
+        previous = owned.get(key[0])
+        owned[key[0]] = full_key
+        if previous is not None and previous != full_key:
+            self._close_if_unused(previous)
+
+        client = self.clients.get(full_key)
+        if client is None or client.is_closed:
+            log.debug("creating http client pool", origin=key[0], settings=settings)
+            client = httpx.AsyncClient(
+                limits=settings.limits,
+                http2=settings.http2 and HTTP2_AVAILABLE,
+            )
+            self.clients[full_key] = client
+
+        return client
+
+    def release(self, owner: str):
+        """
+        Releases all pools used by `owner`, closing the unused ones
+        """
+        for previous in self.owners.pop(owner, {}).values():
+            self._close_if_unused(previous)
+
+    def _close_if_unused(self, full_key: tuple):
+        if any(full_key in owned.values() for owned in self.owners.values()):
+            return
+
+        client = self.clients.pop(full_key, None)
+        if client is None or client.is_closed:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        # clients bound to another loop can't be closed from here, their
+        # connections are dropped with the client
+        if full_key[2] != id(loop):
+            return
+
+        log.debug("closing http client pool", origin=full_key[0][0])
+        loop.create_task(close_when_idle(client))
+
+    async def close_all(self):
+        clients = list(self.clients.values())
+        self.clients = {}
+        self.owners = {}
+        for client in clients:
+            await client.aclose()
+
+
+async def close_when_idle(client: httpx.AsyncClient, poll_interval: float = 1.0):
+    """
+    Closes `client` once none of its connections are serving a request, so
+    a request still running on a released pool is not cut off.
+    """
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    while pool is not None and any(not conn.is_idle() for conn in pool.connections):
+        await asyncio.sleep(poll_interval)
+    await client.aclose()
+
+
+HTTP_CLIENT_POOL = HTTPClientPool()
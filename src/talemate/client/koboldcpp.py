@@ -1,6 +1,5 @@
 import random
 import json
-import sseclient
 import asyncio
 from typing import TYPE_CHECKING
 import requests
@@ -9,12 +8,10 @@ from chromadb.api.types import EmbeddingFunction, Documents, Embeddings
 # import urljoin
 from urllib.parse import urljoin, urlparse
 
-import httpx
 import pydantic
 import structlog
 from openai import AsyncOpenAI
 
-import talemate.util as util
 from talemate.client.base import (
     ClientBase,
     Defaults,
@@ -22,6 +19,7 @@ from talemate.client.base import (
     ClientEmbeddingsStatus,
 )
 from talemate.client.registry import register
+from talemate.client.tokenizers import KoboldCppTokenizer
 from talemate.client.vision import VisionConfig, vision_extra_fields, OpenAIVisionMixin
 from talemate.config.schema import Client as BaseClientConfig
 import talemate.emit.async_signals as async_signals
@@ -103,7 +101,7 @@ class KoboldCppClient(OpenAIVisionMixin, ClientBase):
         of which API mode is used for text generation.
         """
         api_key = self.api_key or "sk-1234"
-        return AsyncOpenAI(base_url=f"{self.url}/v1", api_key=api_key)
+        return self.openai_client(f"{self.url}/v1", api_key)
 
     @property
     def request_headers(self):
@@ -256,13 +254,13 @@ class KoboldCppClient(OpenAIVisionMixin, ClientBase):
         # otherwise, get the model name by doing a request to
         # the embeddings endpoint with a single character
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.embeddings_url,
-                json={"input": ["test"]},
-                timeout=2,
-                headers=self.request_headers,
-            )
+        client = self.http_client()
+        response = await client.post(
+            self.embeddings_url,
+            json={"input": ["test"]},
+            timeout=2,
+            headers=self.request_headers,
+        )
 
         response_data = response.json()
         self._embeddings_model_name = response_data.get("model")
@@ -270,35 +268,35 @@ class KoboldCppClient(OpenAIVisionMixin, ClientBase):
 
     async def get_embeddings_status(self):
         url_version = urljoin(self.api_url, "api/extra/version")
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url_version, timeout=2)
-            response_data = response.json()
-            self._embeddings_status = response_data.get("embeddings", False)
+        client = self.http_client()
+        response = await client.get(url_version, timeout=2)
+        response_data = response.json()
+        self._embeddings_status = response_data.get("embeddings", False)
 
-            if not self.embeddings_status or self.embeddings_model_name:
-                return
+        if not self.embeddings_status or self.embeddings_model_name:
+            return
 
-            await self.get_embeddings_model_name()
+        await self.get_embeddings_model_name()
 
-            log.debug(
-                "KoboldCpp embeddings are enabled, suggesting embeddings",
-                model_name=self.embeddings_model_name,
-            )
+        log.debug(
+            "KoboldCpp embeddings are enabled, suggesting embeddings",
+            model_name=self.embeddings_model_name,
+        )
 
-            await self.set_embeddings()
+        await self.set_embeddings()
 
-            emission = ClientEmbeddingsStatus(
-                client=self,
-                embedding_name=self.embeddings_model_name,
-            )
+        emission = ClientEmbeddingsStatus(
+            client=self,
+            embedding_name=self.embeddings_model_name,
+        )
 
-            await async_signals.get("client.embeddings_available").send(emission)
+        await async_signals.get("client.embeddings_available").send(emission)
 
-            if not emission.seen:
-                # the suggestion has not been seen by the memory agent
-                # yet, so we unset the embeddings model name so it will
-                # get suggested again
-                self._embeddings_model_name = None
+        if not emission.seen:
+            # the suggestion has not been seen by the memory agent
+            # yet, so we unset the embeddings model name so it will
+            # get suggested again
+            self._embeddings_model_name = None
 
     async def get_model_name(self):
         self.ensure_api_endpoint_specified()
@@ -307,12 +305,12 @@ class KoboldCppClient(OpenAIVisionMixin, ClientBase):
             return None
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.api_url_for_model,
-                    timeout=2,
-                    headers=self.request_headers,
-                )
+            client = self.http_client()
+            response = await client.get(
+                self.api_url_for_model,
+                timeout=2,
+                headers=self.request_headers,
+            )
         except Exception:
             self._embeddings_model_name = None
             raise
@@ -336,34 +334,22 @@ class KoboldCppClient(OpenAIVisionMixin, ClientBase):
 
         return model_name
 
+    def make_backend_tokenizer(self) -> KoboldCppTokenizer | None:
+        if not self.api_url:
+            return None
+        return KoboldCppTokenizer(
+            self, f"{self.url}/api/extra/tokencount", self.model_name
+        )
+
     async def tokencount(self, content: str) -> int:
         """
         KoboldCpp has a tokencount endpoint we can use to count tokens
         for the prompt and response
 
-        If the endpoint is not available, we will use the default token count estimate
+        If the endpoint is not available (kobold united), the default token
+        count estimate is used
         """
-
-        # extract scheme and host from api url
-
-        parts = urlparse(self.api_url)
-
-        url_tokencount = f"{parts.scheme}://{parts.netloc}/api/extra/tokencount"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url_tokencount,
-                json={"prompt": content},
-                timeout=None,
-                headers=self.request_headers,
-            )
-
-            if response.status_code == 404:
-                # kobold united doesn't have tokencount endpoint
-                return util.count_tokens(content)
-
-            tokencount = len(response.json().get("ids", []))
-            return tokencount
+        return await self.count_tokens_async(content)
 
     async def abort_generation(self):
         """
@@ -375,11 +361,11 @@ class KoboldCppClient(OpenAIVisionMixin, ClientBase):
 
         parts = urlparse(self.api_url)
         url_abort = f"{parts.scheme}://{parts.netloc}/api/extra/abort"
-        async with httpx.AsyncClient() as client:
-            await client.post(
-                url_abort,
-                headers=self.request_headers,
-            )
+        client = self.http_client()
+        await client.post(
+            url_abort,
+            headers=self.request_headers,
+        )
 
     async def generate(self, prompt: str, parameters: dict, kind: str):
         """
@@ -388,12 +374,9 @@ class KoboldCppClient(OpenAIVisionMixin, ClientBase):
         if self.is_openai:
             return await self._generate_openai(prompt, parameters, kind)
         else:
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(
-                None, self._generate_kcpp_stream, prompt, parameters, kind
-            )
+            return await self._generate_kcpp_stream(prompt, parameters, kind)
 
-    def _generate_kcpp_stream(self, prompt: str, parameters: dict, kind: str):
+    async def _generate_kcpp_stream(self, prompt: str, parameters: dict, kind: str):
         """
         Generates text from the given prompt and parameters.
         """
@@ -401,22 +384,24 @@ class KoboldCppClient(OpenAIVisionMixin, ClientBase):
 
         response = ""
         parameters["stream"] = True
-        stream_response = requests.post(
+        client = self.http_client()
+        async with client.stream(
+            "POST",
             self.api_url_for_generation,
             json=parameters,
             timeout=None,
             headers=self.request_headers,
-            stream=True,
-        )
-        stream_response.raise_for_status()
-
-        sse = sseclient.SSEClient(stream_response)
-
-        for event in sse.events():
-            payload = json.loads(event.data)
-            chunk = payload["token"]
-            response += chunk
-            self.update_request_tokens(self.count_tokens(chunk))
+        ) as stream_response:
+            stream_response.raise_for_status()
+
+            async for line in stream_response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                payload = json.loads(line[len("data:") :].strip())
+                chunk = payload["token"]
+                response += chunk
+                self.update_request_tokens(self.estimate_tokens(chunk))
+                self.stream_chunk(chunk)
 
         return response
 
@@ -429,21 +414,21 @@ class KoboldCppClient(OpenAIVisionMixin, ClientBase):
 
         self._returned_prompt_tokens = await self.tokencount(parameters["prompt"])
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.api_url_for_generation,
-                json=parameters,
-                timeout=None,
-                headers=self.request_headers,
-            )
-            response_data = response.json()
-            if self.is_openai:
-                response_text = response_data["choices"][0]["text"]
-            else:
-                response_text = response_data["results"][0]["text"]
+        client = self.http_client()
+        response = await client.post(
+            self.api_url_for_generation,
+            json=parameters,
+            timeout=None,
+            headers=self.request_headers,
+        )
+        response_data = response.json()
+        if self.is_openai:
+            response_text = response_data["choices"][0]["text"]
+        else:
+            response_text = response_data["results"][0]["text"]
 
-            self._returned_response_tokens = await self.tokencount(response_text)
-            return response_text
+        self._returned_response_tokens = await self.tokencount(response_text)
+        return response_text
 
     def jiggle_randomness(self, prompt_config: dict, offset: float = 0.3) -> dict:
         """
@@ -531,19 +516,19 @@ class KoboldCppClient(OpenAIVisionMixin, ClientBase):
 
         # Check if the koboldcpp server has a SD model available
         sd_models_url = urljoin(self.url, "/sdapi/v1/sd-models")
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url=sd_models_url, timeout=2)
-            except Exception as exc:
-                log.error(f"Failed to fetch sd models from {sd_models_url}", exc=exc)
-                return False
+        client = self.http_client()
+        try:
+            response = await client.get(url=sd_models_url, timeout=2)
+        except Exception as exc:
+            log.error(f"Failed to fetch sd models from {sd_models_url}", exc=exc)
+            return False
 
-            if response.status_code != 200:
-                return False
+        if response.status_code != 200:
+            return False
 
-            response_data = response.json()
+        response_data = response.json()
 
-            sd_model = response_data[0].get("model_name") if response_data else None
+        sd_model = response_data[0].get("model_name") if response_data else None
 
         # no SD model available, no setup needed
         if not sd_model:
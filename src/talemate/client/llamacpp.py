@@ -2,7 +2,6 @@ import json
 
 import pydantic
 import structlog
-import httpx
 from openai import AsyncOpenAI
 
 from talemate.client.base import (
@@ -12,6 +11,7 @@ from talemate.client.base import (
     ParameterReroute,
 )
 from talemate.client.registry import register
+from talemate.client.tokenizers import LlamaCppTokenizer
 from talemate.client.vision import VisionConfig, vision_extra_fields, OpenAIVisionMixin
 from talemate.config.schema import Client as BaseClientConfig
 from talemate.exceptions import GenerationProcessingError
@@ -117,11 +117,17 @@ class LlamaCppClient(OpenAIVisionMixin, ClientBase):
             return base
         return base + "/v1"
 
+    def make_backend_tokenizer(self) -> LlamaCppTokenizer | None:
+        if not self.api_url:
+            return None
+        base = self.api_url.strip().rstrip("/").removesuffix("/v1")
+        return LlamaCppTokenizer(self, f"{base}/tokenize", self.model_name)
+
     def make_client(self) -> AsyncOpenAI:
         # OpenAI SDK requires an api_key. llama.cpp may ignore auth; if the user
         # didn't configure a key, use a dummy value (same idea as LMStudioClient).
         api_key = self.api_key or "sk-1234"
-        return AsyncOpenAI(base_url=self._base_url_v1(), api_key=api_key)
+        return self.openai_client(self._base_url_v1(), api_key)
 
     async def get_model_name(self):
         if not self.api_url:
@@ -175,64 +181,64 @@ class LlamaCppClient(OpenAIVisionMixin, ClientBase):
             base = self.api_url.strip().rstrip("/")
             url = f"{base}/completion"
 
-            async with httpx.AsyncClient(timeout=None) as http:
-                async with http.stream(
-                    "POST",
-                    url,
-                    json=payload,
-                    headers=self.request_headers,
-                ) as r:
-                    if r.status_code >= 400:
-                        # llama.cpp returns OAI-style errors (see tools/server/README.md).
-                        raw_body = await r.aread()
-                        message = None
-                        try:
-                            data = json.loads(
-                                raw_body.decode("utf-8", errors="replace")
-                            )
-                            message = (data.get("error") or {}).get("message") or (
-                                data.get("error") or {}
-                            ).get("type")
-                        except Exception:
-                            pass
-
-                        if r.status_code in (401, 403):
-                            raise GenerationProcessingError(
-                                f"llama.cpp API: Invalid API key ({r.status_code})"
-                                + (f" - {message}" if message else "")
-                            )
-
+            http = self.http_client()
+            async with http.stream(
+                "POST",
+                url,
+                json=payload,
+                headers=self.request_headers,
+                timeout=None,
+            ) as r:
+                if r.status_code >= 400:
+                    # llama.cpp returns OAI-style errors (see tools/server/README.md).
+                    raw_body = await r.aread()
+                    message = None
+                    try:
+                        data = json.loads(raw_body.decode("utf-8", errors="replace"))
+                        message = (data.get("error") or {}).get("message") or (
+                            data.get("error") or {}
+                        ).get("type")
+                    except Exception:
+                        pass
+
+                    if r.status_code in (401, 403):
                         raise GenerationProcessingError(
-                            f"llama.cpp API error ({r.status_code})"
+                            f"llama.cpp API: Invalid API key ({r.status_code})"
                             + (f" - {message}" if message else "")
                         )
-                    async for line in r.aiter_lines():
-                        if not line or not line.startswith("data:"):
-                            continue
-                        raw = line[len("data:") :].strip()
-                        if raw == "[DONE]":
-                            break
-                        try:
-                            evt = json.loads(raw)
-                        except Exception:
-                            continue
-
-                        piece = evt.get("content")
-                        if piece:
-                            response += piece
-                            self.update_request_tokens(self.count_tokens(piece))
-
-                        if evt.get("stop") is True:
-                            # Don't break immediately; let the server finish the SSE stream
-                            # cleanly (avoids noisy generator-close warnings in some runtimes).
-                            continue
-
-                    # If we saw a stop event but didn't receive [DONE], the server will still
-                    # close the response; exiting the context will clean up the connection.
+
+                    raise GenerationProcessingError(
+                        f"llama.cpp API error ({r.status_code})"
+                        + (f" - {message}" if message else "")
+                    )
+                async for line in r.aiter_lines():
+                    if not line or not line.startswith("data:"):
+                        continue
+                    raw = line[len("data:") :].strip()
+                    if raw == "[DONE]":
+                        break
+                    try:
+                        evt = json.loads(raw)
+                    except Exception:
+                        continue
+
+                    piece = evt.get("content")
+                    if piece:
+                        response += piece
+                        self.update_request_tokens(self.estimate_tokens(piece))
+                        self.stream_chunk(piece)
+
+                    if evt.get("stop") is True:
+                        # Don't break immediately; let the server finish the SSE stream
+                        # cleanly (avoids noisy generator-close warnings in some runtimes).
+                        continue
+
+                # If we saw a stop event but didn't receive [DONE], the server will still
+                # close the response; exiting the context will clean up the connection.
 
             # Store overall token accounting once the stream is finished
-            self._returned_prompt_tokens = self.prompt_tokens(prompt)
-            self._returned_response_tokens = self.response_tokens(response)
+            self._returned_prompt_tokens = self.estimate_tokens(prompt)
+            self._returned_response_tokens = self.estimate_tokens(response)
 
             return response
         except GenerationProcessingError:
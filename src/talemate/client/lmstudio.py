@@ -1,5 +1,4 @@
 import pydantic
-from openai import AsyncOpenAI
 
 from talemate.client.base import ClientBase, ParameterReroute, CommonDefaults
 from talemate.client.registry import register
@@ -42,7 +41,7 @@ class LMStudioClient(ClientBase):
         return "sk-1234"
 
     def make_client(self):
-        return AsyncOpenAI(base_url=self.api_url + "/v1", api_key=self.api_key)
+        return self.openai_client(self.api_url + "/v1", self.api_key)
 
     async def get_model_name(self):
         client = self.make_client()
@@ -94,6 +93,7 @@ class LMStudioClient(ClientBase):
             response += content_piece
             # Track token usage incrementally
             self.update_request_tokens(self.count_tokens(content_piece))
+            self.stream_chunk(content_piece)
 
         # Store overall token accounting once the stream is finished
         self._returned_prompt_tokens = self.prompt_tokens(prompt)
@@ -198,6 +198,7 @@ class MistralAIClient(EndpointOverrideMixin, ClientBase):
                 self.update_request_tokens(
                     self.count_tokens(event.data.choices[0].delta.content)
                 )
+                self.stream_chunk(event.data.choices[0].delta.content)
             if event.data.usage:
                 completion_tokens += event.data.usage.completion_tokens
                 prompt_tokens += event.data.usage.prompt_tokens
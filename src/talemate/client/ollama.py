@@ -117,6 +117,10 @@ class OllamaClient(ClientBase):
             self.emit_status()
             return
 
+        if self.status_fresh:
+            self.emit_status()
+            return
+
         try:
             # instead of using the client (which apparently cannot set a timeout per endpoint)
             # we use httpx to check {api_url}/api/version to see if the server is running
@@ -130,6 +134,7 @@ class OllamaClient(ClientBase):
         except Exception as e:
             log.error("Failed to fetch models from Ollama", error=str(e))
             self.connected = False
+            self.invalidate_status()
             self.emit_status()
             return
 
@@ -232,6 +237,7 @@ class OllamaClient(ClientBase):
             content = part.response
             response += content
             self.update_request_tokens(self.count_tokens(content))
+            self.stream_chunk(content)
 
         # Extract the response text
         return response
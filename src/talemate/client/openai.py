@@ -227,7 +227,7 @@ class OpenAIClient(ConcurrentInferenceMixin, EndpointOverrideMixin, ClientBase):
         if not self.openai_api_key and not self.endpoint_override_base_url_configured:
             raise Exception("No OpenAI API key set")
 
-        client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+        client = self.openai_client(self.base_url, self.api_key)
 
         human_message = {"role": "user", "content": prompt.strip()}
         system_message = {"role": "system", "content": self.get_system_message(kind)}
@@ -297,6 +297,7 @@ class OpenAIClient(ConcurrentInferenceMixin, EndpointOverrideMixin, ClientBase):
                 response += content_piece
                 # Incrementally track token usage
                 self.update_request_tokens(self.count_tokens(content_piece))
+                self.stream_chunk(content_piece)
 
         return response
 
@@ -2,7 +2,6 @@ import random
 
 import pydantic
 import structlog
-from openai import AsyncOpenAI
 
 from talemate.client.base import ClientBase, ExtraField
 from talemate.client.registry import register
@@ -89,7 +88,7 @@ class OpenAICompatibleClient(ClientBase):
         Generates text from the given prompt and parameters.
         """
 
-        client = AsyncOpenAI(base_url=self.api_url, api_key=self.api_key)
+        client = self.openai_client(self.api_url, self.api_key)
 
         if self.api_handles_prompt_template:
             # OpenAI API handles prompt template
@@ -382,114 +382,111 @@ class OpenRouterClient(ConcurrentInferenceMixin, ClientBase):
         completion_tokens = 0
         prompt_tokens = 0
         try:
-            async with httpx.AsyncClient() as client:
-                async with client.stream(
-                    "POST",
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.openrouter_api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json=payload,
-                    timeout=120.0,  # 2 minute timeout for generation
-                ) as response:
-                    if response.status_code != 200:
-                        error_body = ""
-                        async for chunk in response.aiter_text():
-                            error_body += chunk
-                        error_msg = (
-                            f"OpenRouter API returned status {response.status_code}"
-                        )
-                        try:
-                            error_data = json.loads(error_body)
-                            if "error" in error_data:
-                                error_detail = error_data["error"]
-                                if isinstance(error_detail, dict):
-                                    error_msg = f"OpenRouter API Error: {error_detail.get('message', error_body)}"
-                                else:
-                                    error_msg = f"OpenRouter API Error: {error_detail}"
-                        except (json.JSONDecodeError, KeyError):
-                            error_msg = f"OpenRouter API Error ({response.status_code}): {error_body[:200]}"
-                        status_code = response.status_code
-
-                        # Remap 400 "not a valid model ID" to 404
-                        if status_code == 400 and "not a valid model" in error_msg:
-                            status_code = 404
-
-                        self.log.error(
-                            "openrouter_api_error",
-                            status=status_code,
-                            body=error_body[:500],
-                        )
-                        raise OpenRouterAPIError(error_msg, status_code)
-
+            client = self.http_client("https://openrouter.ai")
+            async with client.stream(
+                "POST",
+                "https://openrouter.ai/api/v1/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.openrouter_api_key}",
+                    "Content-Type": "application/json",
+                },
+                json=payload,
+                timeout=120.0,  # 2 minute timeout for generation
+            ) as response:
+                if response.status_code != 200:
+                    error_body = ""
                     async for chunk in response.aiter_text():
-                        buffer += chunk
+                        error_body += chunk
+                    error_msg = f"OpenRouter API returned status {response.status_code}"
+                    try:
+                        error_data = json.loads(error_body)
+                        if "error" in error_data:
+                            error_detail = error_data["error"]
+                            if isinstance(error_detail, dict):
+                                error_msg = f"OpenRouter API Error: {error_detail.get('message', error_body)}"
+                            else:
+                                error_msg = f"OpenRouter API Error: {error_detail}"
+                    except (json.JSONDecodeError, KeyError):
+                        error_msg = f"OpenRouter API Error ({response.status_code}): {error_body[:200]}"
+                    status_code = response.status_code
+
+                    # Remap 400 "not a valid model ID" to 404
+                    if status_code == 400 and "not a valid model" in error_msg:
+                        status_code = 404
+
+                    self.log.error(
+                        "openrouter_api_error",
+                        status=status_code,
+                        body=error_body[:500],
+                    )
+                    raise OpenRouterAPIError(error_msg, status_code)
+
+                async for chunk in response.aiter_text():
+                    buffer += chunk
+
+                    while True:
+                        # Find the next complete SSE line
+                        line_end = buffer.find("\n")
+                        if line_end == -1:
+                            break
+
+                        line = buffer[:line_end].strip()
+                        buffer = buffer[line_end + 1 :]
 
-                        while True:
-                            # Find the next complete SSE line
-                            line_end = buffer.find("\n")
-                            if line_end == -1:
+                        if line.startswith("data: "):
+                            data = line[6:]
+                            if data == "[DONE]":
                                 break
 
-                            line = buffer[:line_end].strip()
-                            buffer = buffer[line_end + 1 :]
+                            try:
+                                data_obj = json.loads(data)
 
-                            if line.startswith("data: "):
-                                data = line[6:]
-                                if data == "[DONE]":
-                                    break
+                                usage = data_obj.get("usage", {})
+                                completion_tokens += usage.get("completion_tokens", 0)
+                                prompt_tokens += usage.get("prompt_tokens", 0)
 
-                                try:
-                                    data_obj = json.loads(data)
+                                # OpenRouter may send chunks with empty choices
+                                # (e.g. usage-only or debug chunks)
+                                choices = data_obj.get("choices", [])
+                                if not choices:
+                                    continue
 
-                                    usage = data_obj.get("usage", {})
-                                    completion_tokens += usage.get(
-                                        "completion_tokens", 0
+                                delta = choices[0].get("delta", {})
+                                content = delta.get("content")
+                                reasoning = delta.get("reasoning")
+
+                                if reasoning:
+                                    reasoning_text += reasoning
+                                    self.update_request_tokens(
+                                        self.count_tokens(reasoning)
                                     )
-                                    prompt_tokens += usage.get("prompt_tokens", 0)
-
-                                    # OpenRouter may send chunks with empty choices
-                                    # (e.g. usage-only or debug chunks)
-                                    choices = data_obj.get("choices", [])
-                                    if not choices:
-                                        continue
-
-                                    delta = choices[0].get("delta", {})
-                                    content = delta.get("content")
-                                    reasoning = delta.get("reasoning")
-
-                                    if reasoning:
-                                        reasoning_text += reasoning
-                                        self.update_request_tokens(
-                                            self.count_tokens(reasoning)
-                                        )
-
-                                    if content:
-                                        response_text += content
-                                        # Update tokens as content streams in
-                                        self.update_request_tokens(
-                                            self.count_tokens(content)
-                                        )
-
-                                except (json.JSONDecodeError, KeyError):
-                                    pass
-
-                    # Extract the response content
-                    response_content = response_text
-                    self._returned_prompt_tokens = prompt_tokens
-                    self._returned_response_tokens = completion_tokens
-                    self._reasoning_response = reasoning_text
-
-                    self.log.debug(
-                        "generated response",
-                        response=response_content[:128] + " ..."
-                        if len(response_content) > 128
-                        else response_content,
-                        reasoning_length=len(reasoning_text),
-                    )
 
-                    return response_content
+                                if content:
+                                    response_text += content
+                                    # Update tokens as content streams in
+                                    self.update_request_tokens(
+                                        self.count_tokens(content)
+                                    )
+                                    self.stream_chunk(content)
+
+                            except (json.JSONDecodeError, KeyError):
+                                pass
+
+                # Extract the response content
+                response_content = response_text
+                self._returned_prompt_tokens = prompt_tokens
+                self._returned_response_tokens = completion_tokens
+                self._reasoning_response = reasoning_text
+
+                self.log.debug(
+                    "generated response",
+                    response=response_content[:128] + " ..."
+                    if len(response_content) > 128
+                    else response_content,
+                    reasoning_length=len(reasoning_text),
+                )
+
+                return response_content
 
         except Exception:
             raise
@@ -0,0 +1,185 @@
+"""
+Response cache for deterministic agent prompts.
+
+Many agent prompts (scene analysis, world state extraction, text queries,
+character card analysis) produce the same answer for the same input, yet
+regenerate / rewind flows and node graph reruns send identical prompts again.
+
+When enabled (`game.general.response_cache`), `ClientBase.send_prompt` looks
+up responses for agent functions that opt in through
+`Agent.allow_response_cache`. Prompts are never served from the cache when
+randomness is jiggled for them.
+
+Entries are keyed on a hash of the finalized prompt, the client type, model,
+inference preset and the final generation parameters. They are kept in an
+in-memory LRU backed by one json file per entry on disk, so the cache
+survives restarts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import pydantic
+import structlog
+
+from talemate.path import RESPONSE_CACHE_DIR
+
+__all__ = [
+    "CachedResponse",
+    "RESPONSE_CACHE",
+    "ResponseCache",
+]
+
+log = structlog.get_logger("talemate.client.response_cache")
+
+
+class CachedResponse(pydantic.BaseModel):
+    response: str
+    reasoning: str | None = None
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+    created: float = pydantic.Field(default_factory=time.time)
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_size: int = 500,
+        path: Path | str | None = RESPONSE_CACHE_DIR,
+        max_disk_entries: int = 5000,
+    ):
+        self.max_size = max_size
+        self.path = Path(path) if path else None
+        self.max_disk_entries = max_disk_entries
+        self.entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def key(
+        prompt: str,
+        client_type: str,
+        model_name: str | None,
+        kind: str,
+        parameters: dict,
+        inference_preset: str | None = None,
+        preset_group: str | None = None,
+    ) -> str:
+        payload = json.dumps(
+            {
+                "prompt": prompt,
+                "client_type": client_type,
+                "model": model_name,
+                "kind": kind,
+                "parameters": parameters,
+                "inference_preset": inference_preset,
+                "preset_group": preset_group,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _file(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}.json"
+
+    def _remember(self, key: str, entry: CachedResponse):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+        if self.path:
+            try:
+                entry = CachedResponse.model_validate_json(self._file(key).read_text())
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as exc:
+                log.warning("response_cache.get", key=key, error=exc)
+            else:
+                self.hits += 1
+                self.disk_hits += 1
+                self._remember(key, entry)
+                return entry
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, entry: CachedResponse):
+        self.stores += 1
+        self._remember(key, entry)
+
+        if not self.path:
+            return
+
+        path = self._file(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(entry.model_dump_json())
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            log.error("response_cache.put", key=key, error=exc)
+            return
+
+        if self.stores % 100 == 0:
+            self.prune()
+
+    def disk_files(self) -> list[Path]:
+        if not self.path or not self.path.exists():
+            return []
+        return list(self.path.glob("*/*.json"))
+
+    def prune(self):
+        """
+        Removes the oldest files once the disk store exceeds
+        `max_disk_entries`.
+        """
+        files = self.disk_files()
+        excess = len(files) - self.max_disk_entries
+        if excess <= 0:
+            return
+
+        files.sort(key=lambda file: file.stat().st_mtime)
+        for file in files[:excess]:
+            file.unlink(missing_ok=True)
+
+    def clear(self):
+        self.entries.clear()
+        for file in self.disk_files():
+            file.unlink(missing_ok=True)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+            "disk_size": len(self.disk_files()),
+        }
+
+
+RESPONSE_CACHE = ResponseCache()
@@ -0,0 +1,146 @@
+"""
+Token-level streaming of generations.
+
+Most clients receive their responses as a stream, but the text only becomes
+visible once `ClientBase.send_prompt` returns. When streaming is enabled
+(`game.general.stream_generations`) the client opens a `GenerationStream`
+for generations of a streamable kind (narration and dialogue) that:
+
+- forwards received text to the frontend as `generation_chunk` messages,
+  coalesced to at most one message per `emit_interval`
+- can be consumed in-process as an async iterator of text chunks
+
+When the generation finishes a final `generation_chunk` message with
+`done=True` is emitted. The frontend keeps showing the streamed preview until
+the resulting scene message arrives and replaces it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from contextvars import ContextVar
+from typing import AsyncIterator
+
+import structlog
+
+from talemate.emit import emit
+
+__all__ = [
+    "STREAMABLE_KINDS",
+    "GenerationStream",
+    "active_generation_stream",
+    "is_streamable_kind",
+]
+
+log = structlog.get_logger("talemate.client.streaming")
+
+# prompt kinds whose output is shown to the user as is (kinds are matched
+# by prefix, e.g., `narrate_medium`)
+STREAMABLE_KINDS = (
+    "conversation",
+    "narrate",
+)
+
+
+def is_streamable_kind(kind: str) -> bool:
+    return kind.startswith(STREAMABLE_KINDS)
+
+
+# the stream of the generation running in the current context, a context var
+# so concurrent generations on the same client don't share a stream
+active_generation_stream: ContextVar["GenerationStream | None"] = ContextVar(
+    "active_generation_stream", default=None
+)
+
+
+class GenerationStream:
+    """
+    The text of a single generation as it is received.
+    """
+
+    def __init__(
+        self,
+        client_name: str,
+        kind: str,
+        agent: str | None = None,
+        emit_interval: float = 0.05,
+    ):
+        self.request_id = str(uuid.uuid4())
+        self.client_name = client_name
+        self.kind = kind
+        self.agent = agent
+        self.emit_interval = emit_interval
+
+        self.text = ""
+        self.done = False
+
+        self._pending = ""
+        self._last_emit = 0.0
+        self._emitted = False
+        self._queue: asyncio.Queue[str | None] = asyncio.Queue()
+
+    def put(self, chunk: str):
+        """
+        Adds a received text chunk to the stream
+        """
+        if self.done or not chunk:
+            return
+
+        self.text += chunk
+        self._pending += chunk
+        self._queue.put_nowait(chunk)
+
+        now = time.monotonic()
+        if now - self._last_emit >= self.emit_interval:
+            self._flush(now)
+
+    def close(self, discard: bool = False):
+        """
+        Ends the stream, emitting any pending text and the `done` marker.
+
+        `discard` tells the frontend to drop the preview right away instead
+        of waiting for the resulting scene message (e.g., when the
+        generation was cancelled or is being retried).
+        """
+        if self.done:
+            return
+
+        self.done = True
+        self._queue.put_nowait(None)
+
+        if self._pending and not discard:
+            self._flush(time.monotonic())
+
+        # nothing was streamed, so there is no preview to replace
+        if self._emitted:
+            self._emit("", done=True, discard=discard)
+
+    def _flush(self, now: float):
+        self._emit(self._pending, done=False)
+        self._pending = ""
+        self._last_emit = now
+
+    def _emit(self, chunk: str, done: bool, discard: bool = False):
+        self._emitted = True
+        emit(
+            "generation_chunk",
+            websocket_passthrough=True,
+            data={
+                "request_id": self.request_id,
+                "client": self.client_name,
+                "kind": self.kind,
+                "agent": self.agent,
+                "chunk": chunk,
+                "done": done,
+                "discard": discard,
+            },
+        )
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        while True:
+            chunk = await self._queue.get()
+            if chunk is None:
+                return
+            yield chunk
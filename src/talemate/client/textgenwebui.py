@@ -1,10 +1,6 @@
 import random
 import re
 import json
-import sseclient
-import requests
-import asyncio
-import httpx
 import pydantic
 import structlog
 from openai import AsyncOpenAI
@@ -52,7 +48,7 @@ class TextGeneratorWebuiClient(OpenAIVisionMixin, ClientBase):
         base = self.api_url.rstrip("/")
         if not base.endswith("/v1"):
             base += "/v1"
-        return AsyncOpenAI(base_url=base, api_key=api_key)
+        return self.openai_client(base, api_key)
 
     @property
     def request_headers(self):
@@ -153,12 +149,12 @@ class TextGeneratorWebuiClient(OpenAIVisionMixin, ClientBase):
         return prompt, True
 
     async def get_model_name(self):
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.api_url}/v1/internal/model/info",
-                timeout=self.status_request_timeout,
-                headers=self.request_headers,
-            )
+        client = self.http_client()
+        response = await client.get(
+            f"{self.api_url}/v1/internal/model/info",
+            timeout=self.status_request_timeout,
+            headers=self.request_headers,
+        )
         if response.status_code == 404:
             raise Exception("Could not find model info (wrong api version?)")
         response_data = response.json()
@@ -173,19 +169,13 @@ class TextGeneratorWebuiClient(OpenAIVisionMixin, ClientBase):
         """
         Trigger the stop generation endpoint
         """
-        async with httpx.AsyncClient() as client:
-            await client.post(
-                f"{self.api_url}/v1/internal/stop-generation",
-                headers=self.request_headers,
-            )
-
-    async def generate(self, prompt: str, parameters: dict, kind: str):
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, self._generate, prompt, parameters, kind
+        client = self.http_client()
+        await client.post(
+            f"{self.api_url}/v1/internal/stop-generation",
+            headers=self.request_headers,
         )
 
-    def _generate(self, prompt: str, parameters: dict, kind: str):
+    async def generate(self, prompt: str, parameters: dict, kind: str):
         """
         Generates text from the given prompt and parameters.
         """
@@ -193,24 +183,27 @@ class TextGeneratorWebuiClient(OpenAIVisionMixin, ClientBase):
 
         response = ""
         parameters["stream"] = True
-        stream_response = requests.post(
+        client = self.http_client()
+        async with client.stream(
+            "POST",
             f"{self.api_url}/v1/completions",
             json=parameters,
             timeout=None,
             headers=self.request_headers,
-            stream=True,
-        )
-        stream_response.raise_for_status()
-
-        sse = sseclient.SSEClient(stream_response)
-
-        for event in sse.events():
-            if event.data == "[DONE]":
-                break
-            payload = json.loads(event.data)
-            chunk = payload["choices"][0]["text"]
-            response += chunk
-            self.update_request_tokens(self.count_tokens(chunk))
+        ) as stream_response:
+            stream_response.raise_for_status()
+
+            async for line in stream_response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                payload = json.loads(data)
+                chunk = payload["choices"][0]["text"]
+                response += chunk
+                self.update_request_tokens(self.count_tokens(chunk))
+                self.stream_chunk(chunk)
 
         return response
 
@@ -0,0 +1,404 @@
+"""
+Tokenizer registry for LLM clients.
+
+`talemate.util.count_tokens` counts everything with a single tiktoken
+encoding, which is only an approximation for most local models. Clients
+resolve a `Tokenizer` that matches their backend instead:
+
+- `HFTokenizer` if a `tokenizer_file` (a HuggingFace `tokenizer.json`) is
+  configured for the client and the `tokenizers` package is installed
+- a `RemoteTokenizer` for backends that expose a tokenize endpoint
+  (llama.cpp, KoboldCpp)
+- `TiktokenTokenizer` otherwise
+
+`TokenizerRegistry` keeps the resolved tokenizer per client and an LRU of
+token counts keyed by (tokenizer key, text hash). Tokenizer keys include the
+model name where the count depends on it.
+
+Remote tokenizers can only be reached asynchronously. Synchronous counts
+(e.g., context history budgets, which are computed during template
+rendering) are served from the LRU. On a miss they return a local estimate
+and the text is queued, so that a background task can count the queued texts
+for the next lookup. The tokenize endpoints take one text per request, so
+this is one (concurrency limited) request per queued text.
+
+Short texts (e.g., streamed response chunks) and other counts that are only
+reported, never budgeted against, use the local estimate and are not queued
+(`TokenizerRegistry.estimate`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import structlog
+
+from talemate.util import TIKTOKEN_ENCODING
+
+if TYPE_CHECKING:
+    from talemate.client.base import ClientBase
+
+__all__ = [
+    "DEFAULT_TOKENIZER",
+    "HFTokenizer",
+    "KoboldCppTokenizer",
+    "LlamaCppTokenizer",
+    "RemoteTokenizer",
+    "TOKENIZERS",
+    "TiktokenTokenizer",
+    "Tokenizer",
+    "TokenizerRegistry",
+]
+
+log = structlog.get_logger("talemate.client.tokenizers")
+
+# texts shorter than this (e.g., streamed response chunks) are counted
+# directly instead of going through the cache, remote tokenizers estimate them
+MIN_CACHED_LENGTH = 64
+
+# async counts of more text than this run in a worker thread
+THREADED_COUNT_LENGTH = 20000
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class Tokenizer:
+    """
+    Counts tokens for one tokenizer / model.
+    """
+
+    key: str = "tokenizer"
+
+    # remote tokenizers can not count synchronously
+    remote: bool = False
+
+    def __init__(self):
+        # incremented whenever queued counts resolved in the background
+        # differed from their estimates, so caches built on top of estimates
+        # know to recount
+        self.revision = 0
+
+    def count(self, text: str) -> int:
+        raise NotImplementedError()
+
+    async def count_many(self, texts: list[str]) -> list[int]:
+        if sum(len(text) for text in texts) < THREADED_COUNT_LENGTH:
+            return [self.count(text) for text in texts]
+        # keep long prompts from blocking the event loop
+        return await asyncio.to_thread(lambda: [self.count(text) for text in texts])
+
+    def __call__(self, text: str) -> int:
+        """
+        Counts through the registry cache, so tokenizers can be passed
+        wherever a counting function is expected.
+        """
+        return TOKENIZERS.count(self, text)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.key})"
+
+
+class TiktokenTokenizer(Tokenizer):
+    def __init__(self, encoding=None):
+        super().__init__()
+        self.encoding = encoding or TIKTOKEN_ENCODING
+        self.key = f"tiktoken:{self.encoding.name}"
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text))
+
+
+class HFTokenizer(Tokenizer):
+    """
+    Counts tokens with a local HuggingFace `tokenizer.json` file.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        from tokenizers import Tokenizer as _Tokenizer
+
+        self.tokenizer = _Tokenizer.from_file(path)
+        self.key = f"hf:{path}"
+
+    def count(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+    async def count_many(self, texts: list[str]) -> list[int]:
+        encodings = await asyncio.to_thread(
+            self.tokenizer.encode_batch, texts, add_special_tokens=False
+        )
+        return [len(encoding.ids) for encoding in encodings]
+
+
+class RemoteTokenizer(Tokenizer):
+    """
+    Counts tokens through a tokenize endpoint of the inference backend.
+    """
+
+    remote = True
+
+    # seconds to fall back to estimates after the endpoint failed
+    retry_interval: float = 60.0
+
+    def __init__(
+        self,
+        client: "ClientBase",
+        url: str,
+        model: str | None,
+        fallback: Tokenizer | None = None,
+        max_concurrency: int = 8,
+    ):
+        super().__init__()
+        self.client = client
+        self.url = url
+        self.key = f"{client.client_type}:{url}:{model}"
+        self.fallback = fallback or DEFAULT_TOKENIZER
+        self.max_concurrency = max_concurrency
+        self.pending: set[str] = set()
+        self.resolve_scheduled = False
+        self.unavailable_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.unavailable_until
+
+    def count(self, text: str) -> int:
+        # the backend can't be reached synchronously
+        return self.fallback.count(text)
+
+    def payload(self, text: str) -> dict:
+        raise NotImplementedError()
+
+    def parse(self, response: dict) -> int:
+        raise NotImplementedError()
+
+    async def count_many(self, texts: list[str]) -> list[int]:
+        # the tokenize endpoints count a single text per request
+        http = self.client.http_client(self.url)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def count_one(text: str) -> int:
+            async with semaphore:
+                response = await http.post(
+                    self.url,
+                    json=self.payload(text),
+                    headers=self.client.request_headers,
+                    timeout=10,
+                )
+                response.raise_for_status()
+                return self.parse(response.json())
+
+        return list(await asyncio.gather(*[count_one(text) for text in texts]))
+
+
+class LlamaCppTokenizer(RemoteTokenizer):
+    """
+    llama.cpp server `POST /tokenize`
+    """
+
+    def payload(self, text: str) -> dict:
+        return {"content": text}
+
+    def parse(self, response: dict) -> int:
+        return len(response["tokens"])
+
+
+class KoboldCppTokenizer(RemoteTokenizer):
+    """
+    KoboldCpp `POST /api/extra/tokencount`
+    """
+
+    def payload(self, text: str) -> dict:
+        return {"prompt": text}
+
+    def parse(self, response: dict) -> int:
+        if "ids" in response:
+            return len(response["ids"])
+        return response["value"]
+
+
+class TokenizerRegistry:
+    def __init__(self, max_size: int = 50000):
+        self.max_size = max_size
+        self.counts: OrderedDict[tuple[str, str], int] = OrderedDict()
+        # client name -> (tokenizer config key, tokenizer)
+        self.tokenizers: dict[str, tuple[tuple, Tokenizer]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.estimates = 0
+        self._lock = threading.Lock()
+
+    def get(self, client: "ClientBase") -> Tokenizer:
+        """
+        Returns the tokenizer for `client`, resolving it again whenever the
+        client's tokenizer configuration changes.
+        """
+        config_key = client.tokenizer_config_key
+        cached = self.tokenizers.get(client.name)
+        if cached and cached[0] == config_key:
+            return cached[1]
+
+        tokenizer = client.make_tokenizer()
+        log.debug("resolved tokenizer", client=client.name, tokenizer=tokenizer)
+        self.tokenizers[client.name] = (config_key, tokenizer)
+        return tokenizer
+
+    def _lookup(self, key: tuple[str, str]) -> int | None:
+        with self._lock:
+            tokens = self.counts.get(key)
+            if tokens is not None:
+                self.hits += 1
+                self.counts.move_to_end(key)
+            return tokens
+
+    def _store(self, key: tuple[str, str], tokens: int):
+        with self._lock:
+            self.counts[key] = tokens
+            self.counts.move_to_end(key)
+            while len(self.counts) > self.max_size:
+                self.counts.popitem(last=False)
+
+    def count(self, tokenizer: Tokenizer, text: str) -> int:
+        """
+        Synchronous token count for `text`.
+
+        For remote tokenizers a cache miss returns an estimate and queues the
+        text to be counted in the background. Short texts are never queued.
+        """
+        if len(text) < MIN_CACHED_LENGTH:
+            # remote tokenizers count with their fallback here
+            return tokenizer.count(text)
+
+        key = (tokenizer.key, text_hash(text))
+        tokens = self._lookup(key)
+        if tokens is not None:
+            return tokens
+
+        if tokenizer.remote:
+            self.estimates += 1
+            self._queue(tokenizer, text)
+            return tokenizer.count(text)
+
+        self.misses += 1
+        tokens = tokenizer.count(text)
+        self._store(key, tokens)
+        return tokens
+
+    def estimate(self, tokenizer: Tokenizer, text: str) -> int:
+        """
+        Cached count for `text` if there is one, otherwise the local count
+        (the fallback estimate for remote tokenizers). Nothing is queued.
+        """
+        if len(text) >= MIN_CACHED_LENGTH:
+            tokens = self._lookup((tokenizer.key, text_hash(text)))
+            if tokens is not None:
+                return tokens
+        if tokenizer.remote:
+            self.estimates += 1
+        return tokenizer.count(text)
+
+    async def count_many(self, tokenizer: Tokenizer, texts: list[str]) -> list[int]:
+        """
+        Token counts for `texts`, counting all cache misses together.
+        """
+        keys = [(tokenizer.key, text_hash(text)) for text in texts]
+        counts = [self._lookup(key) for key in keys]
+        missing = {
+            key: text
+            for key, text, tokens in zip(keys, texts, counts)
+            if tokens is None
+        }
+
+        if missing:
+            self.misses += len(missing)
+            try:
+                if tokenizer.remote and not tokenizer.available:
+                    raise ConnectionError("tokenize endpoint unavailable")
+                computed = await tokenizer.count_many(list(missing.values()))
+            except Exception as exc:
+                if not tokenizer.remote:
+                    raise
+                if tokenizer.available:
+                    log.warning(
+                        "remote tokenize failed", tokenizer=tokenizer, error=exc
+                    )
+                    tokenizer.unavailable_until = (
+                        time.monotonic() + tokenizer.retry_interval
+                    )
+                self.estimates += len(missing)
+                fallback = {key: tokenizer.count(text) for key, text in missing.items()}
+                return [
+                    tokens if tokens is not None else fallback[key]
+                    for key, tokens in zip(keys, counts)
+                ]
+
+            computed = dict(zip(missing.keys(), computed))
+            for key, tokens in computed.items():
+                self._store(key, tokens)
+            counts = [
+                tokens if tokens is not None else computed[key]
+                for key, tokens in zip(keys, counts)
+            ]
+
+        return counts
+
+    def _queue(self, tokenizer: RemoteTokenizer, text: str):
+        if not tokenizer.available:
+            return
+
+        tokenizer.pending.add(text)
+        if tokenizer.resolve_scheduled:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        tokenizer.resolve_scheduled = True
+        loop.create_task(self.resolve_pending(tokenizer))
+
+    async def resolve_pending(self, tokenizer: RemoteTokenizer):
+        """
+        Counts all texts queued for `tokenizer`
+        """
+        texts = list(tokenizer.pending)
+        tokenizer.pending.clear()
+        tokenizer.resolve_scheduled = False
+
+        if not texts:
+            return
+
+        counts = await self.count_many(tokenizer, texts)
+        # only invalidate derived caches if an estimate was off
+        if any(tokens != tokenizer.count(text) for text, tokens in zip(texts, counts)):
+            tokenizer.revision += 1
+
+    def clear(self):
+        with self._lock:
+            self.counts.clear()
+            self.tokenizers.clear()
+            self.hits = 0
+            self.misses = 0
+            self.estimates = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "estimates": self.estimates,
+            "size": len(self.counts),
+        }
+
+
+DEFAULT_TOKENIZER = TiktokenTokenizer()
+
+TOKENIZERS = TokenizerRegistry()
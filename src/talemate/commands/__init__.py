@@ -1,4 +1,5 @@
 from .base import TalemateCommand  # noqa: F401
+from .cmd_changelog import CmdCompactChangelog  # noqa: F401
 from .cmd_debug_tools import (
     CmdPromptChangeSectioning,  # noqa: F401
     CmdSummarizerUpdateLayeredHistory,  # noqa: F401
@@ -0,0 +1,28 @@
+from talemate.changelog import compact_changelog
+from talemate.commands.base import TalemateCommand
+from talemate.commands.manager import register
+
+
+@register
+class CmdCompactChangelog(TalemateCommand):
+    """
+    Command class for the 'changelog_compact' command
+    """
+
+    name = "changelog_compact"
+    description = "Write checkpoints for the scene changelog to speed up restores"
+    aliases = ["compact_changelog"]
+    sets_scene_unsaved = False
+
+    async def run(self):
+        if not self.scene.filename:
+            self.system_message("Scene has not been saved yet, nothing to compact")
+            return True
+
+        result = await compact_changelog(self.scene)
+
+        self.system_message(
+            f"Changelog compacted: {len(result['written'])} checkpoints written, "
+            f"{result['checkpoints']} total for {result['revisions']} revisions"
+        )
+        return True
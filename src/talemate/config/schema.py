@@ -78,6 +78,10 @@ class Client(pydantic.BaseModel):
     # whether or not to lock the prompt template
     lock_template: bool = False
 
+    # path to a HuggingFace tokenizer.json used to count tokens for this
+    # client (defaults to the backend tokenizer or tiktoken)
+    tokenizer_file: str | None = None
+
     # when enabled, volatile context (like long-term memory retrieval and
     # other dynamic content) is placed after the scene history instead of
     # before it. Since the scene history is the largest and most stable part
@@ -178,6 +182,9 @@ class General(pydantic.BaseModel):
     max_backscroll: int = 100
     add_default_character: bool = True
     show_agent_activity_bar: bool = True
+    stream_generations: bool = False
+    response_cache: bool = False
+    compact_scene_files: bool = False
 
 
 class StateReinforcementTemplate(pydantic.BaseModel):
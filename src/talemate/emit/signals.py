@@ -23,6 +23,7 @@ RateLimited = signal("rate_limited")
 RateLimitReset = signal("rate_limit_reset")
 GenerationError = signal("generation_error")
 GenerationErrorResponse = signal("generation_error_response")
+GenerationChunk = signal("generation_chunk")
 RequestClientStatus = signal("request_client_status")
 AgentStatus = signal("agent_status")
 RequestAgentStatus = signal("request_agent_status")
@@ -80,6 +81,7 @@ handlers = {
     "rate_limit_reset": RateLimitReset,
     "generation_error": GenerationError,
     "generation_error_response": GenerationErrorResponse,
+    "generation_chunk": GenerationChunk,
     "request_client_status": RequestClientStatus,
     "agent_status": AgentStatus,
     "request_agent_status": RequestAgentStatus,
@@ -1,59 +1,298 @@
+"""
+Scene library listing.
+
+`list_scenes_directory` answers from `SceneLibrary`, an index of the scene
+files (and character images) below `./scenes` that is kept in memory and
+persisted to disk, so searching does not walk the scenes directory on every
+request.
+
+The index is refreshed incrementally: at most once every `poll_interval`
+seconds the directory tree is walked again, skipping the `nodes`,
+`changelog` and `assets` subtrees entirely, and only files whose mtime or size
+changed are re-read for their metadata (title, cover image, characters).
+
+Reading the metadata means parsing the scene files, so the server refreshes
+in a worker thread (`SceneLibrary.refresh_async`) and answers from the last
+index in the meantime (`iter_scenes_directory`). A refresh swaps in a new
+entries dict once it is done, readers never see a partial index.
+"""
+
+from __future__ import annotations
+
+import asyncio
 import fnmatch
+import json
 import os
+import time
+from pathlib import Path
+from typing import AsyncIterator
+
+import pydantic
+import structlog
+
+from talemate.path import SCENE_LIBRARY_INDEX
+from talemate.util.fs import write_file_atomic
+
+__all__ = [
+    "SCENE_LIBRARY",
+    "SceneLibrary",
+    "SceneLibraryEntry",
+    "get_scene_library",
+    "iter_scenes_directory",
+    "list_scenes_directory",
+]
+
+log = structlog.get_logger("talemate.files")
+
+# subtrees that never contain scene files
+EXCLUDED_DIRS = {"nodes", "changelog", "assets"}
+
+SCENE_PATTERNS = ["*/*.json"]
+IMAGE_PATTERNS = ["characters/*.png", "characters/*.webp"]
+
+
+class SceneLibraryEntry(pydantic.BaseModel):
+    path: str
+    mtime: float
+    size: int
+    title: str = ""
+    cover_image: str | None = None
+    characters: list[str] = pydantic.Field(default_factory=list)
+
+    @property
+    def is_image(self) -> bool:
+        return not self.path.endswith(".json")
+
+    def matches(self, query: str) -> bool:
+        query = query.lower()
+        if query in self.path.lower() or query in self.title.lower():
+            return True
+        return any(query in name.lower() for name in self.characters)
+
+
+def _read_metadata(entry: SceneLibraryEntry):
+    if entry.is_image:
+        return
+
+    try:
+        with open(entry.path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as exc:
+        log.warning("scene library: could not read scene", path=entry.path, error=exc)
+        return
+
+    if not isinstance(data, dict):
+        return
+
+    entry.title = data.get("title") or data.get("name") or ""
+    entry.cover_image = (data.get("assets") or {}).get("cover_image")
+    entry.characters = list((data.get("character_data") or {}).keys())
+
+
+class SceneLibrary:
+    def __init__(
+        self,
+        root: Path | str,
+        index_path: Path | str | None = SCENE_LIBRARY_INDEX,
+        poll_interval: float = 2.0,
+    ):
+        self.root = str(root)
+        self.index_path = Path(index_path) if index_path else None
+        self.poll_interval = poll_interval
+        self.entries: dict[str, SceneLibraryEntry] = {}
+        self.refreshed_at: float | None = None
+        self.loaded = False
+        self._refresh_task: asyncio.Future | None = None
+
+    def _matches_pattern(self, path: str) -> bool:
+        rel_path = os.path.relpath(path, self.root)
+        return any(
+            fnmatch.fnmatch(rel_path, pattern)
+            for pattern in SCENE_PATTERNS + IMAGE_PATTERNS
+        )
+
+    def _walk(self):
+        """
+        Yields (path, stat) for all candidate files, excluded subtrees are
+        pruned before they are descended into.
+        """
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [name for name in dirnames if name not in EXCLUDED_DIRS]
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if not self._matches_pattern(path):
+                    continue
+                try:
+                    yield path, os.stat(path)
+                except OSError:
+                    continue
+
+    # --- Persistence ---
+
+    def load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        if not self.index_path or not self.index_path.exists():
+            return
+
+        try:
+            data = json.loads(self.index_path.read_text())
+        except (OSError, ValueError) as exc:
+            log.warning("scene library: could not read index", error=exc)
+            return
 
+        if data.get("root") != self.root:
+            return
 
-def list_scenes_directory(path: str = ".", list_images: bool = True) -> list:
+        entries = {}
+        for entry in data.get("entries", []):
+            try:
+                entry = SceneLibraryEntry(**entry)
+            except pydantic.ValidationError:
+                continue
+            entries[entry.path] = entry
+        self.entries = entries
+
+    def save(self, entries: dict[str, SceneLibraryEntry] | None = None):
+        if not self.index_path:
+            return
+
+        entries = self.entries if entries is None else entries
+        data = {
+            "root": self.root,
+            "entries": [entry.model_dump() for entry in entries.values()],
+        }
+
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            write_file_atomic(self.index_path, json.dumps(data).encode("utf-8"))
+        except OSError as exc:
+            log.error("scene library: could not write index", error=exc)
+
+    # --- Refresh ---
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Brings the index up to date with the scenes directory.
+
+        Returns True if any entry was added, changed or removed.
+        """
+        self.load()
+
+        now = time.monotonic()
+        if (
+            not force
+            and self.refreshed_at is not None
+            and now - self.refreshed_at < self.poll_interval
+        ):
+            return False
+
+        self.refreshed_at = now
+        changed = False
+        entries = {}
+
+        for path, stat in self._walk():
+            entry = self.entries.get(path)
+            if not (
+                entry and entry.mtime == stat.st_mtime and entry.size == stat.st_size
+            ):
+                entry = SceneLibraryEntry(
+                    path=path, mtime=stat.st_mtime, size=stat.st_size
+                )
+                _read_metadata(entry)
+                changed = True
+            entries[path] = entry
+
+        if len(entries) != len(self.entries):
+            # files were removed
+            changed = True
+
+        if changed:
+            self.entries = entries
+            log.debug("scene library refreshed", num_entries=len(entries))
+            self.save(entries)
+
+        return changed
+
+    async def refresh_async(self, force: bool = False) -> bool:
+        """
+        Runs `refresh` in a worker thread, concurrent callers wait for the
+        same refresh.
+        """
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(
+                asyncio.to_thread(self.refresh, force)
+            )
+        return await asyncio.shield(self._refresh_task)
+
+    def search(
+        self, query: str = "", list_images: bool = True, refresh: bool = True
+    ) -> list[SceneLibraryEntry]:
+        if refresh:
+            self.refresh()
+        return [
+            entry
+            for entry in sorted(self.entries.values(), key=lambda e: e.path)
+            if (list_images or not entry.is_image)
+            and (not query or entry.matches(query))
+        ]
+
+
+SCENE_LIBRARY: SceneLibrary | None = None
+
+
+def get_scene_library(root: str) -> SceneLibrary:
+    global SCENE_LIBRARY
+    if SCENE_LIBRARY is None or SCENE_LIBRARY.root != root:
+        SCENE_LIBRARY = SceneLibrary(root, index_path=SCENE_LIBRARY_INDEX)
+    return SCENE_LIBRARY
+
+
+def list_scenes_directory(
+    path: str = ".", list_images: bool = True, query: str = ""
+) -> list:
     """
     List all the scene files in the given directory.
     :param directory: Directory to list scene files from.
+    :param query: Only list scenes whose path, title or characters match.
     :return: List of scene files in the given directory.
     """
     current_dir = os.getcwd()
 
-    scenes = _list_files_and_directories(
-        os.path.join(current_dir, "scenes"), path, list_images=list_images
-    )
+    library = get_scene_library(os.path.join(current_dir, "scenes"))
 
-    return scenes
+    return [
+        entry.path for entry in library.search(query=query, list_images=list_images)
+    ]
 
 
-def _list_files_and_directories(root: str, path: str, list_images: bool = True) -> list:
-    """
-    List all the files and directories in the given root directory.
-    :param root: Root directory to list files and directories from.
-    :param path: Relative path to list files and directories from.
-    :return: List of files and directories in the given root directory.
+async def iter_scenes_directory(
+    list_images: bool = True, query: str = ""
+) -> AsyncIterator[list[str]]:
     """
-    # Define the file patterns to match
-    patterns = (
-        ["characters/*.png", "characters/*.webp", "*/*.json"]
-        if list_images
-        else ["*/*.json"]
-    )
-
-    items = []
-
-    # Walk through the directory tree
-    for dirpath, dirnames, filenames in os.walk(root):
-        # Check each file if it matches any of the patterns
-        for filename in filenames:
-            # Skip JSON files inside 'nodes' directories
-            if filename.endswith(".json") and "nodes" in dirpath.split(os.sep):
-                continue
+    Async variant of `list_scenes_directory` that keeps the event loop free.
 
-            # skip changelog files
-            if "changelog" in dirpath.split(os.sep):
-                continue
+    Yields the scene files from the last index right away, if there is one,
+    and again once a refresh (run in a worker thread) changed the index.
+    """
+    library = get_scene_library(os.path.join(os.getcwd(), "scenes"))
 
-            # skp assets directory
-            if "assets" in dirpath.split(os.sep):
-                continue
+    def listing() -> list[str]:
+        return [
+            entry.path
+            for entry in library.search(
+                query=query, list_images=list_images, refresh=False
+            )
+        ]
 
-            # Get the relative file path
-            rel_path = os.path.relpath(dirpath, root)
-            for pattern in patterns:
-                if fnmatch.fnmatch(os.path.join(rel_path, filename), pattern):
-                    items.append(os.path.join(dirpath, filename))
-                    break
+    if not library.loaded:
+        await asyncio.to_thread(library.load)
 
-    return items
+    if library.entries:
+        yield listing()
+        if await library.refresh_async():
+            yield listing()
+    else:
+        await library.refresh_async()
+        yield listing()
@@ -23,6 +23,7 @@ from talemate.history import (
     delete_history_entry,
     HistoryEntry,
     history_with_relative_time,
+    strip_entry_caches,
 )
 from talemate.game.engine.context_id.history import HistoryContextItem
 from talemate.util.time import amount_unit_to_iso8601_duration
@@ -345,7 +346,7 @@ class StaticArchiveEntries(Node):
             else:
                 break
 
-        entries = history_with_relative_time(entries, scene.ts)
+        entries = history_with_relative_time(strip_entry_caches(entries), scene.ts)
 
         self.set_output_values(
             {"entries": [HistoryEntry(**entry) for entry in entries]}
@@ -598,11 +599,12 @@ class ContextHistory(Node):
 
         characters = {}
 
-        for message in scene.history:
-            if message.typ == "character":
-                character_name = message.character_name
-                if character_name not in characters:
-                    characters[character_name] = scene.get_character(character_name)
+        # character names are peeked, unloaded messages stay unloaded
+        history = scene.history
+        for idx in history.positions_of_type("character"):
+            character_name = history.peek(idx, "character_name")
+            if character_name not in characters:
+                characters[character_name] = scene.get_character(character_name)
 
         self.set_output_values(
             {
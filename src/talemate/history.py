@@ -18,6 +18,7 @@ from talemate.emit import emit
 import talemate.emit.async_signals as async_signals
 from talemate.instance import get_agent
 from talemate.scene_message import SceneMessage, TimePassageMessage
+import talemate.util as util
 from talemate.util import (
     count_tokens,
     iso8601_diff_to_human,
@@ -120,6 +121,54 @@ class TimePassageEntry(pydantic.BaseModel):
     human: str
 
 
+# key the token count of an archived / layered history entry is cached under
+ENTRY_TOKENS_KEY = "_tokens"
+
+
+def entry_tokens(entry: dict) -> int:
+    """
+    Returns the token count of an archived or layered history entry's text.
+
+    The count is cached on the entry dict together with the hash of the text
+    it was counted for, so an entry whose text changed is counted again.
+    The cache is in-memory only, see `strip_entry_caches`.
+    """
+    text = entry["text"]
+    text_key = hash(text)
+    cached = entry.get(ENTRY_TOKENS_KEY)
+    if cached and cached[0] == text_key:
+        return cached[1]
+
+    tokens = util.count_tokens(text)
+    entry[ENTRY_TOKENS_KEY] = (text_key, tokens)
+    return tokens
+
+
+def entries_tokens(entries: list[dict], separator: str = "\n\n") -> int:
+    """
+    Returns the token count of the entries' texts joined by `separator`
+    (without joining and tokenizing them again).
+    """
+    if not entries:
+        return 0
+    tokens = sum(entry_tokens(entry) for entry in entries)
+    return tokens + util.count_tokens(separator) * (len(entries) - 1)
+
+
+def strip_entry_caches(entries: list[dict]) -> list[dict]:
+    """
+    Returns the entries without their cached token counts, for saving and
+    sending them to the frontend. Entries without a cached count are
+    returned as they are.
+    """
+    return [
+        {key: value for key, value in entry.items() if key != ENTRY_TOKENS_KEY}
+        if ENTRY_TOKENS_KEY in entry
+        else entry
+        for entry in entries
+    ]
+
+
 async def emit_archive_add(scene: "Scene", entry: ArchiveEntry):
     """
     Emits the archive_add signal for an archive entry
@@ -253,7 +302,7 @@ def compute_layer_stats(scene: "Scene", layer: int) -> dict:
 
     if layer == 0:
         layer_entries = scene.archived_history
-        layer_tokens = count_tokens([e["text"] for e in layer_entries])
+        layer_tokens = sum(entry_tokens(e) for e in layer_entries)
 
         referenced_source_tokens = 0
         referenced_source_count = 0
@@ -269,7 +318,7 @@ def compute_layer_stats(scene: "Scene", layer: int) -> dict:
                 referenced_source_count += len(referenced)
     elif 1 <= layer <= len(scene.layered_history):
         layer_entries = scene.layered_history[layer - 1]
-        layer_tokens = count_tokens([e["text"] for e in layer_entries])
+        layer_tokens = sum(entry_tokens(e) for e in layer_entries)
 
         if layer == 1:
             source_layer = scene.archived_history
@@ -284,9 +333,7 @@ def compute_layer_stats(scene: "Scene", layer: int) -> dict:
             end = entry.get("end")
             if start is not None and end is not None:
                 referenced = source_layer[start : end + 1]
-                referenced_source_tokens += count_tokens(
-                    [e["text"] for e in referenced]
-                )
+                referenced_source_tokens += sum(entry_tokens(e) for e in referenced)
                 referenced_source_count += len(referenced)
     else:
         raise ValueError(f"Layer {layer} does not exist")
@@ -419,7 +466,9 @@ def collect_time_passages(scene: "Scene") -> list[dict]:
     and returns them as TimePassageEntry dicts for the frontend.
     """
     passages = []
-    for idx, message in enumerate(scene.history):
+    # only time passages are loaded, other messages stay unloaded
+    for idx in scene.history.positions_of_type(TimePassageMessage.typ):
+        message = scene.history[idx]
         if isinstance(message, TimePassageMessage):
             amount, unit = iso8601_duration_to_amount_unit(message.ts)
             passages.append(
@@ -616,12 +665,23 @@ async def rebuild_history(
     scene: "Scene",
     callback: Callable | None = None,
     generation_options: GenerationOptions | None = None,
+    concurrent: bool = False,
+    analyze_termination: bool = True,
 ):
     """
     rebuilds all history for a scene
+
+    `concurrent` plans all archive chunks up front and summarizes them with
+    up to the summarizer client's concurrent request limit (opt-in, a client
+    without concurrent inference still summarizes one chunk at a time).
+    `analyze_termination` toggles the natural scene termination analysis in
+    concurrent mode.
     """
     summarizer = get_agent("summarizer")
 
+    # background archiving would race the rebuild
+    await summarizer.stop_archive_worker()
+
     # clear out archived history, but keep pre-established history
     scene.archived_history = [
         ah for ah in scene.archived_history if ah.get("end") is None
@@ -639,34 +699,46 @@ async def rebuild_history(
     total_entries = summarizer.estimated_entry_count
 
     try:
-        while True:
-            await asyncio.sleep(0.1)
-
-            if not scene.active:
-                # scene is no longer active
-                log.warning("Scene is no longer active, aborting rebuild of history")
-                emit("status", message="Rebuilding of archive aborted", status="info")
-                return
-
-            emit(
-                "status",
-                message=f"Rebuilding historical archive... {entries}/~{total_entries}",
-                status="busy",
-                data={"cancellable": True},
+        if concurrent:
+            await summarizer.rebuild_archive_concurrently(
+                scene,
+                generation_options=generation_options,
+                analyze_termination=analyze_termination,
+                callback=callback,
             )
+        else:
+            while True:
+                await asyncio.sleep(0.1)
+
+                if not scene.active:
+                    # scene is no longer active
+                    log.warning(
+                        "Scene is no longer active, aborting rebuild of history"
+                    )
+                    emit(
+                        "status", message="Rebuilding of archive aborted", status="info"
+                    )
+                    return
+
+                emit(
+                    "status",
+                    message=f"Rebuilding historical archive... {entries}/~{total_entries}",
+                    status="busy",
+                    data={"cancellable": True},
+                )
 
-            more = await summarizer.build_archive(
-                scene, generation_options=generation_options
-            )
+                more = await summarizer.build_archive(
+                    scene, generation_options=generation_options
+                )
 
-            scene.sync_time()
+                scene.sync_time()
 
-            if callback:
-                await callback()
+                if callback:
+                    await callback()
 
-            entries += 1
-            if not more:
-                break
+                entries += 1
+                if not more:
+                    break
     except GenerationCancelled as e:
         log.info("Generation cancelled, stopping rebuild of historical archive")
         emit("status", message="Rebuilding of archive cancelled", status="info")
@@ -682,7 +754,10 @@ async def rebuild_history(
 
     if summarizer.layered_history_enabled:
         emit("status", message="Rebuilding layered history...", status="busy")
-        await summarizer.summarize_to_layered_history()
+        await summarizer.summarize_to_layered_history(
+            generation_options=generation_options,
+            max_concurrent=summarizer.rebuild_max_concurrent if concurrent else 1,
+        )
 
     emit("status", message="Historical archive rebuilt", status="success")
 
@@ -736,6 +811,15 @@ async def character_activity(
     )
 
 
+def _invalidate_history_token_cache(scene: "Scene", entry_id: str | None):
+    """
+    Drops cached formatting / token counts for a history entry
+    """
+    cache = getattr(scene, "history_token_cache", None)
+    if cache is not None:
+        cache.invalidate(entry_id)
+
+
 async def update_history_entry(
     scene: "Scene", entry: HistoryEntry
 ) -> LayeredArchiveEntry | ArchiveEntry:
@@ -743,6 +827,8 @@ async def update_history_entry(
     Updates a history entry in the scene's archived history
     """
 
+    _invalidate_history_token_cache(scene, entry.id)
+
     if entry.layer == 0:
         # base layer
         archive_entry = ArchiveEntry(**entry.model_dump())
@@ -1043,6 +1129,8 @@ async def delete_history_entry(scene: "Scene", entry: HistoryEntry) -> ArchiveEn
     removed_raw = scene.archived_history.pop(remove_idx)
     removed_entry = ArchiveEntry(**removed_raw)
 
+    _invalidate_history_token_cache(scene, entry.id)
+
     if is_oldest_entry:
         # The removed first entry is always at 0s.  We therefore need to shift
         # the timeline by the timestamp of **what is now** the first entry so
@@ -24,8 +24,10 @@ from talemate.scene_message import (
     NarratorMessage,
     ReinforcementMessage,
     SceneMessage,
+    get_message_id,
     reset_message_id,
 )
+from talemate.scene.history import EAGER_LOAD_WINDOW, SceneHistory, UnloadedMessage
 from talemate.status import LoadingStatus, set_loading
 from talemate.world_state import WorldState
 from talemate.game.engine.nodes.registry import import_scene_node_definitions
@@ -805,23 +807,56 @@ def default_player_character() -> Player | None:
     )
 
 
-def _load_history(history):
+def _load_history(history, eager: int = EAGER_LOAD_WINDOW) -> SceneHistory:
+    """
+    Loads the serialized history, only the last `eager` messages are turned
+    into scene messages, older ones are materialized when accessed.
+    """
     _history = []
+    lazy_until = len(history) - eager
 
-    for text in history:
+    for idx, text in enumerate(history):
         if isinstance(text, str):
             _history.append(_prepare_legacy_history(text))
 
         elif isinstance(text, dict):
-            _history.append(_prepare_history(text))
+            if idx < lazy_until:
+                _history.append(_unloaded_history(text))
+            else:
+                _history.append(_prepare_history(text))
+
+    return SceneHistory(_history)
+
 
-    return _history
+def _unloaded_history(entry) -> UnloadedMessage:
+    cls = MESSAGES.get(entry.get("typ", "scene_message"), SceneMessage)
 
+    character_name = None
+    if issubclass(cls, CharacterMessage):
+        character_name = entry.get("message", "").partition(":")[0]
 
-def _prepare_history(entry):
+    # an empty source falls back to the message type's default on load
+    source = entry.get("source") or cls.source
+
+    # the id is reserved now so ids follow history order like eagerly
+    # loaded messages
+    return UnloadedMessage(
+        id=get_message_id(),
+        typ=cls.typ,
+        entry=entry,
+        loader=_prepare_history,
+        character_name=character_name,
+        source=source,
+    )
+
+
+def _prepare_history(entry, message_id: int | None = None):
     typ = entry.pop("typ", "scene_message")
     entry.pop("id", None)
 
+    if message_id is not None:
+        entry["id"] = message_id
+
     if entry.get("source") == "":
         entry.pop("source")
 
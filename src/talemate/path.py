@@ -6,6 +6,10 @@ __all__ = [
     "TEMPLATES_DIR",
     "TTS_DIR",
     "LOGS_DIR",
+    "RESPONSE_CACHE_DIR",
+    "SCENE_LIBRARY_INDEX",
+    "THUMBNAIL_CACHE_DIR",
+    "TTS_AUDIO_CACHE_DIR",
     "CONFIG_FILE",
     "relative_to_root",
 ]
@@ -15,6 +19,10 @@ SCENES_DIR = TALEMATE_ROOT / "scenes"
 TEMPLATES_DIR = TALEMATE_ROOT / "templates"
 TTS_DIR = TALEMATE_ROOT / "tts"
 LOGS_DIR = TALEMATE_ROOT / "logs"
+RESPONSE_CACHE_DIR = TALEMATE_ROOT / "cache" / "responses"
+SCENE_LIBRARY_INDEX = TALEMATE_ROOT / "cache" / "scene_library.json"
+THUMBNAIL_CACHE_DIR = TALEMATE_ROOT / "cache" / "thumbnails"
+TTS_AUDIO_CACHE_DIR = TALEMATE_ROOT / "cache" / "tts_audio"
 
 
 CONFIG_FILE = TALEMATE_ROOT / "config.yaml"
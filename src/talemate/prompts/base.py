@@ -6,8 +6,11 @@ changeable and extensible.
 """
 
 import asyncio
+import collections
+import copy
 import dataclasses
 import fnmatch
+import functools
 import json
 import traceback
 import yaml
@@ -17,7 +20,7 @@ import re
 import uuid
 from contextvars import ContextVar
 from datetime import datetime
-from typing import Any
+from typing import Any, Awaitable, Callable
 from enum import Enum
 
 import jinja2
@@ -43,6 +46,13 @@ from talemate.util.prompt import condensed, no_chapters, collapse_whitespace_lin
 from talemate.agents.context import active_agent
 from talemate.prompts.extensions import CaptureContextExtension
 from talemate.prompts.groups import get_group_template_path, resolve_template
+from talemate.prompts.prefetch import (
+    MISSING,
+    PLACEHOLDER,
+    QueryPrefetch,
+    QueryPrefetchAborted,
+    active_query_prefetch,
+)
 from talemate.prompts.response import (
     ResponseSpec,
     AsIsExtractor,
@@ -134,7 +144,17 @@ class GroupAwareLoader(jinja2.FileSystemLoader):
                 path = get_group_template_path(group, self.agent_type, template_name)
                 if path.exists():
                     source = path.read_text(encoding="utf-8")
-                    return source, str(path), lambda: path.stat().st_mtime
+                    mtime = path.stat().st_mtime
+
+                    # environments are cached, so the template needs to
+                    # report whether it's still up to date
+                    def uptodate() -> bool:
+                        try:
+                            return path.stat().st_mtime == mtime
+                        except OSError:
+                            return False
+
+                    return source, str(path), uptodate
 
                 # If explicit source not found, log warning and fall through to normal resolution
                 log.warning(
@@ -147,6 +167,126 @@ class GroupAwareLoader(jinja2.FileSystemLoader):
         return super().get_source(environment, template)
 
 
+class TemplateEnvironmentCache:
+    """
+    Process-wide cache of compiled jinja2 environments.
+
+    Environments are keyed by the resolved template directory list, the agent
+    type and the explicit template source overrides, so every distinct search
+    path only gets one environment (and one compiled template cache).
+
+    Templates are re-checked against their file mtime on load (jinja2
+    `auto_reload`) and compiled bytecode is persisted through a
+    `FileSystemBytecodeCache` so fresh processes skip the compile step as well.
+
+    Per-render state (the prompt instance and its bound helpers) must never be
+    written to `env.globals` on a cached environment - it is passed through the
+    render context instead.
+    """
+
+    def __init__(self, max_size: int = 64):
+        self.max_size = max_size
+        self.enabled = True
+        self.environments: dict[tuple, jinja2.Environment] = {}
+        self.bytecode_cache = jinja2.FileSystemBytecodeCache()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, template_dirs: list[str], agent_type: str, config) -> tuple:
+        prompts_config = getattr(config, "prompts", None)
+        template_sources = (
+            getattr(prompts_config, "template_sources", None) or {}
+            if prompts_config
+            else {}
+        )
+        return (
+            tuple(os.path.normpath(path) for path in template_dirs),
+            agent_type,
+            tuple(sorted(template_sources.items())),
+        )
+
+    def get(
+        self, template_dirs: list[str], agent_type: str, config
+    ) -> jinja2.Environment:
+        if not self.enabled:
+            return create_template_env(template_dirs, agent_type, config)
+
+        key = self.key(template_dirs, agent_type, config)
+        env = self.environments.get(key)
+
+        if env is not None:
+            self.hits += 1
+            return env
+
+        self.misses += 1
+
+        if len(self.environments) >= self.max_size:
+            # drop the oldest environment
+            self.environments.pop(next(iter(self.environments)))
+
+        env = create_template_env(
+            template_dirs, agent_type, config, bytecode_cache=self.bytecode_cache
+        )
+        self.environments[key] = env
+        return env
+
+    def clear(self):
+        self.environments.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def create_template_env(
+    template_dirs: list[str],
+    agent_type: str,
+    config,
+    bytecode_cache: jinja2.BytecodeCache | None = None,
+) -> jinja2.Environment:
+    """
+    Creates a jinja2 environment for the given template directories.
+
+    Only render-independent globals and filters are registered here, anything
+    bound to a prompt instance is added to the render context in `Prompt.render`.
+    """
+
+    env = jinja2.Environment(
+        # Use GroupAwareLoader to support explicit template_sources overrides
+        loader=GroupAwareLoader(template_dirs, agent_type, config),
+        extensions=[CaptureContextExtension],
+        bytecode_cache=bytecode_cache,
+        auto_reload=True,
+    )
+
+    env.globals["debug"] = lambda *a, **kw: log.debug(*a, **kw)
+    env.globals["random_as_str"] = lambda x, y: str(random.randint(x, y))
+    env.globals["random_choice"] = lambda x: random.choice(x)
+    env.globals["uuidgen"] = lambda: str(uuid.uuid4())
+    env.globals["to_int"] = lambda x: int(x)
+    env.globals["to_str"] = lambda x: str(x)
+    env.globals["len"] = lambda x: len(x)
+    env.globals["max"] = lambda x, y: max(x, y)
+    env.globals["min"] = lambda x, y: min(x, y)
+    env.globals["make_list"] = lambda: JoinableList()
+    env.globals["make_dict"] = lambda: {}
+    env.globals["join"] = lambda x, y: y.join(x)
+    env.globals["count_tokens"] = lambda x: count_tokens(dedupe_string(x, debug=False))
+    env.globals["limit_tokens"] = lambda text, limit: limit_tokens(text, limit)
+    env.globals["print"] = lambda x: print(x)
+    env.globals["json"] = lambda x: json.dumps(x, indent=2, cls=PydanticJsonEncoder)
+    env.globals["yaml"] = lambda x: yaml.dump(x)
+    env.globals["emit_system"] = lambda status, message: emit(
+        "system", status=status, message=message
+    )
+    env.globals["emit_narrator"] = lambda message: emit("system", message=message)
+    env.filters["condensed"] = condensed
+    env.filters["no_chapters"] = no_chapters
+
+    return env
+
+
+TEMPLATE_ENV_CACHE = TemplateEnvironmentCache()
+
+
 nest_asyncio.apply()
 
 SECTIONING_HANDLERS = {}
@@ -265,6 +405,9 @@ class Prompt:
     # Accumulated response length modifier (set by templates via mod_response_length)
     response_length_mod: int = dataclasses.field(default=0, init=False)
 
+    # Run the agent queries the template makes concurrently (two-pass render)
+    prefetch_queries: bool = True
+
     @classmethod
     def get(cls, uid: str, vars: dict = None):
         # split uid into agent_type and prompt_name
@@ -433,12 +576,8 @@ class Prompt:
             ]
         )
 
-        # Create a jinja2 environment with the appropriate template paths
-        # Use GroupAwareLoader to support explicit template_sources overrides
-        return jinja2.Environment(
-            loader=GroupAwareLoader(template_dirs, self.agent_type, self.config),
-            extensions=[CaptureContextExtension],
-        )
+        # Get the (cached) jinja2 environment for the resolved template paths
+        return TEMPLATE_ENV_CACHE.get(template_dirs, self.agent_type, self.config)
 
     def list_templates(self, search_pattern: str):
         env = self.template_env()
@@ -520,78 +659,9 @@ class Prompt:
             else {},
         }
 
-        env.globals["render_template"] = self.render_template
-        env.globals["render_and_request"] = self.render_and_request
-        env.globals["prompt_instance"] = self
-        env.globals["debug"] = lambda *a, **kw: log.debug(*a, **kw)
-        env.globals["set_prepared_response"] = self.set_prepared_response
-        env.globals["set_prepared_response_random"] = self.set_prepared_response_random
-        env.globals["set_json_response"] = self.set_json_response
-        env.globals["set_data_response"] = self.set_data_response
-        env.globals["disable_dedupe"] = self.disable_dedupe
-        env.globals["set_response_length_instructions"] = (
-            self.set_response_length_instructions
-        )
-        env.globals["has_response_length_instructions"] = (
-            self.has_response_length_instructions
-        )
-        env.globals["mod_response_length"] = self.mod_response_length
-        env.globals["random"] = self.random
-        env.globals["random_as_str"] = lambda x, y: str(random.randint(x, y))
-        env.globals["random_choice"] = lambda x: random.choice(x)
-        env.globals["query_scene"] = self.query_scene
-        env.globals["batch_query_scene"] = self.batch_query_scene
-        env.globals["query_memory"] = self.query_memory
-        env.globals["query_text"] = self.query_text
-        env.globals["query_text_eval"] = self.query_text_eval
-        env.globals["instruct_text"] = self.instruct_text
-        env.globals["agent_action"] = self.agent_action
-        env.globals["agent_config"] = self.agent_config
-        env.globals["volatile_context_placement"] = self.volatile_context_placement
-        env.globals["retrieve_memories"] = self.retrieve_memories
-        env.globals["time_diff"] = self.time_diff
-        env.globals["system_time"] = self.system_time
-        env.globals["uuidgen"] = lambda: str(uuid.uuid4())
-        env.globals["to_int"] = lambda x: int(x)
-        env.globals["to_str"] = lambda x: str(x)
-        env.globals["config"] = self.config
-        env.globals["li"] = self.get_bullet_num
-        env.globals["len"] = lambda x: len(x)
-        env.globals["max"] = lambda x, y: max(x, y)
-        env.globals["min"] = lambda x, y: min(x, y)
-        env.globals["join"] = lambda x, y: y.join(x)
-        env.globals["make_list"] = lambda: JoinableList()
-        env.globals["make_dict"] = lambda: {}
-        env.globals["join"] = lambda x, y: y.join(x)
-        env.globals["data_format_type"] = (
-            lambda: getattr(self.client, "data_format", None) or self.data_format_type
-        )
-        env.globals["count_tokens"] = lambda x: count_tokens(
-            dedupe_string(x, debug=False)
-        )
-        env.globals["limit_tokens"] = lambda text, limit: limit_tokens(text, limit)
-        env.globals["print"] = lambda x: print(x)
-        env.globals["json"] = lambda x: json.dumps(x, indent=2, cls=PydanticJsonEncoder)
-        env.globals["yaml"] = lambda x: yaml.dump(x)
-        env.globals["emit_status"] = self.emit_status
-        env.globals["emit_system"] = lambda status, message: emit(
-            "system", status=status, message=message
-        )
-        env.globals["llm_can_be_coerced"] = lambda: (
-            self.client.can_be_coerced if self.client else False
-        )
-        env.globals["llm_reason_enabled"] = lambda: (
-            self.client.reason_enabled if self.client else False
-        )
-        env.globals["text_to_chunks"] = self.text_to_chunks
-        env.globals["emit_narrator"] = lambda message: emit("system", message=message)
-        # Template-defined extractors
-        env.globals["set_anchor_extractor"] = self.set_anchor_extractor
-        env.globals["set_as_is_extractor"] = self.set_as_is_extractor
-        env.globals["set_after_anchor_extractor"] = self.set_after_anchor_extractor
-        env.globals["set_code_block_extractor"] = self.set_code_block_extractor
-        env.filters["condensed"] = condensed
-        env.filters["no_chapters"] = no_chapters
+        # Per-render helpers are bound to this prompt instance and passed via
+        # the render context, the environment itself is shared.
+        ctx.update(self.render_globals())
         ctx.update(self.vars)
 
         if "decensor" not in ctx:
@@ -613,7 +683,7 @@ class Prompt:
         sectioning_handler = SECTIONING_HANDLERS.get(self.sectioning_hander)
 
         try:
-            self.prompt = template.render(ctx)
+            self.prompt = self.render_queries(template, ctx)
             if not sectioning_handler:
                 log.warning(
                     "prompt.render",
@@ -623,6 +693,11 @@ class Prompt:
             else:
                 self.prompt = sectioning_handler(self)
         except jinja2.exceptions.TemplateError as e:
+            prefetch = active_query_prefetch.get()
+            if prefetch is not None and prefetch.discovering:
+                # likely caused by a placeholder answer, the outermost render
+                # falls back to a regular render
+                raise
             log.error("prompt.render", prompt=self.name, error=traceback.format_exc())
             emit(
                 "system",
@@ -633,8 +708,120 @@ class Prompt:
 
         self.prompt = self.render_cleanup(self.prompt)
 
+        prefetch = active_query_prefetch.get()
+        if prefetch is not None and prefetch.discovering:
+            # rendered with placeholder answers, don't keep it
+            prompt_text, self.prompt = self.prompt, None
+            return prompt_text
+
         return self.prompt
 
+    def render_queries(self, template: jinja2.Template, ctx: dict) -> str:
+        """
+        Renders `template`, prefetching the agent queries it makes
+        concurrently (see `talemate.prompts.prefetch`).
+        """
+        if not self.prefetch_queries or active_query_prefetch.get() is not None:
+            return template.render(ctx)
+
+        prefetch = QueryPrefetch()
+        state = self.render_state()
+        # both passes draw the same random values, so queries with random
+        # arguments match their prefetched results
+        random_state = random.getstate()
+
+        token = active_query_prefetch.set(prefetch)
+        try:
+            text = template.render(ctx)
+        except Exception as exc:
+            log.debug("prompt.render.prefetch aborted", prompt=self.name, reason=exc)
+            prefetch = None
+        finally:
+            active_query_prefetch.reset(token)
+
+        if prefetch is None:
+            self.restore_render_state(state)
+            return template.render(ctx)
+
+        # no query was answered with a placeholder, so the discovery pass is
+        # the final render
+        if not prefetch.placeholders:
+            return text
+
+        self.restore_render_state(state)
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(prefetch.resolve())
+        random.setstate(random_state)
+
+        token = active_query_prefetch.set(prefetch)
+        try:
+            return template.render(ctx)
+        finally:
+            active_query_prefetch.reset(token)
+
+    def render_state(self) -> dict:
+        """
+        Snapshot of the prompt state templates can modify while rendering
+        """
+        return {
+            field.name: copy.copy(getattr(self, field.name))
+            for field in dataclasses.fields(self)
+            if field.name not in ("client", "prompt")
+        }
+
+    def restore_render_state(self, state: dict):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def render_globals(self) -> dict:
+        """
+        Returns the template helpers that are bound to this prompt instance.
+        """
+        return {
+            "render_template": self.render_template,
+            "render_and_request": self.render_and_request,
+            "prompt_instance": self,
+            "set_prepared_response": self.set_prepared_response,
+            "set_prepared_response_random": self.set_prepared_response_random,
+            "set_json_response": self.set_json_response,
+            "set_data_response": self.set_data_response,
+            "disable_dedupe": self.disable_dedupe,
+            "set_response_length_instructions": self.set_response_length_instructions,
+            "has_response_length_instructions": self.has_response_length_instructions,
+            "mod_response_length": self.mod_response_length,
+            "random": self.random,
+            "query_scene": self.query_scene,
+            "batch_query_scene": self.batch_query_scene,
+            "query_memory": self.query_memory,
+            "query_text": self.query_text,
+            "query_text_eval": self.query_text_eval,
+            "instruct_text": self.instruct_text,
+            "agent_action": self.agent_action,
+            "agent_config": self.agent_config,
+            "volatile_context_placement": self.volatile_context_placement,
+            "retrieve_memories": self.retrieve_memories,
+            "time_diff": self.time_diff,
+            "system_time": self.system_time,
+            "config": self.config,
+            "li": self.get_bullet_num,
+            "data_format_type": lambda: (
+                getattr(self.client, "data_format", None) or self.data_format_type
+            ),
+            "emit_status": self.emit_status,
+            "llm_can_be_coerced": lambda: (
+                self.client.can_be_coerced if self.client else False
+            ),
+            "llm_reason_enabled": lambda: (
+                self.client.reason_enabled if self.client else False
+            ),
+            "text_to_chunks": self.text_to_chunks,
+            # Template-defined extractors
+            "set_anchor_extractor": self.set_anchor_extractor,
+            "set_as_is_extractor": self.set_as_is_extractor,
+            "set_after_anchor_extractor": self.set_after_anchor_extractor,
+            "set_code_block_extractor": self.set_code_block_extractor,
+        }
+
     def render_cleanup(self, prompt_text: str):
         """
         Performs deduplication and cleanup on the rendered prompt text.
@@ -673,6 +860,8 @@ class Prompt:
         if not self.client:
             raise ValueError("Prompt has no client set.")
 
+        self.prevent_discovery("render_and_request")
+
         prompt.dedupe_enabled = dedupe_enabled
 
         loop = asyncio.get_event_loop()
@@ -690,6 +879,47 @@ class Prompt:
         self.vars["bullet_num"] = _bullet_num + 1
         return _bullet_num
 
+    def run_query(
+        self,
+        name: str,
+        fn: Callable[..., Awaitable],
+        client: Any,
+        *args,
+        placeholder: Any = PLACEHOLDER,
+        **kwargs,
+    ):
+        """
+        Runs an agent query made by the template.
+
+        While a query prefetch is active the query is recorded during the
+        discovery pass and answered from the prefetched results afterwards
+        (see `talemate.prompts.prefetch`).
+        """
+        prefetch = active_query_prefetch.get()
+        if prefetch is not None:
+            result = prefetch.query(
+                name,
+                functools.partial(fn, *args, **kwargs),
+                client,
+                args,
+                kwargs,
+                placeholder=placeholder,
+            )
+            if result is not MISSING:
+                return result
+
+        loop = asyncio.get_event_loop()
+        return loop.run_until_complete(fn(*args, **kwargs))
+
+    def prevent_discovery(self, name: str):
+        """
+        Template helpers with side effects call this so they never run during
+        the discovery pass of a query prefetch.
+        """
+        prefetch = active_query_prefetch.get()
+        if prefetch is not None and prefetch.discovering:
+            raise QueryPrefetchAborted(name)
+
     def query_scene(
         self,
         query: str,
@@ -698,39 +928,50 @@ class Prompt:
         as_question_answer: bool = True,
         characters: list = None,
     ):
+        narrator = instance.get_agent("narrator")
+        query = query.format(**self.vars)
+
+        # scene.characters is a generator property
+        if characters is not None:
+            characters = list(characters)
+
+        return self.run_query(
+            "query_scene",
+            self._query_scene,
+            narrator.client,
+            query,
+            at_the_end=at_the_end,
+            as_narrative=as_narrative,
+            as_question_answer=as_question_answer,
+            characters=characters,
+        )
+
+    async def _query_scene(
+        self,
+        query: str,
+        at_the_end: bool,
+        as_narrative: bool,
+        as_question_answer: bool,
+        characters: list | None,
+    ) -> str:
         from talemate.agents.editor.revision import RevisionDisabled
         from talemate.agents.summarize.analyze_scene import SceneAnalysisDisabled
 
-        loop = asyncio.get_event_loop()
         narrator = instance.get_agent("narrator")
-        query = query.format(**self.vars)
 
         with RevisionDisabled(), SceneAnalysisDisabled():
-            if not as_question_answer:
-                return loop.run_until_complete(
-                    narrator.narrate_query(
-                        query,
-                        at_the_end=at_the_end,
-                        as_narrative=as_narrative,
-                        characters=characters,
-                    )
-                )
-
-            return " ".join(
-                [
-                    f"Question: {query}",
-                    "Answer: "
-                    + loop.run_until_complete(
-                        narrator.narrate_query(
-                            query,
-                            at_the_end=at_the_end,
-                            as_narrative=as_narrative,
-                            characters=characters,
-                        )
-                    ),
-                ]
+            answer = await narrator.narrate_query(
+                query,
+                at_the_end=at_the_end,
+                as_narrative=as_narrative,
+                characters=characters,
             )
 
+        if not as_question_answer:
+            return answer
+
+        return " ".join([f"Question: {query}", "Answer: " + answer])
+
     def batch_query_scene(
         self,
         queries: list[dict],
@@ -759,17 +1000,35 @@ class Prompt:
         Returns:
             Dict mapping query id to result string
         """
-        from talemate.agents.editor.revision import RevisionDisabled
-        from talemate.agents.summarize.analyze_scene import SceneAnalysisDisabled
-
         narrator = instance.get_agent("narrator")
-        client = narrator.client
 
         # Materialize characters to a list so generators aren't consumed
         # by the first query (scene.characters is a generator property)
         if characters is not None:
             characters = list(characters)
 
+        return self.run_query(
+            "batch_query_scene",
+            self._batch_query_scene,
+            narrator.client,
+            queries,
+            max_concurrent=max_concurrent,
+            characters=characters,
+            placeholder=collections.defaultdict(str),
+        )
+
+    async def _batch_query_scene(
+        self,
+        queries: list[dict],
+        max_concurrent: int,
+        characters: list | None,
+    ) -> dict[str, str]:
+        from talemate.agents.editor.revision import RevisionDisabled
+        from talemate.agents.summarize.analyze_scene import SceneAnalysisDisabled
+
+        narrator = instance.get_agent("narrator")
+        client = narrator.client
+
         # Check if client supports concurrent inference
         supports_concurrent = getattr(client, "supports_concurrent_inference", False)
 
@@ -831,8 +1090,6 @@ class Prompt:
                 results[query_id] = result
             return results
 
-        loop = asyncio.get_event_loop()
-
         with RevisionDisabled(), SceneAnalysisDisabled():
             if supports_concurrent:
                 log.debug(
@@ -841,14 +1098,14 @@ class Prompt:
                     num_queries=len(queries),
                     max_concurrent=max_concurrent,
                 )
-                return loop.run_until_complete(execute_concurrent(queries))
+                return await execute_concurrent(queries)
             else:
                 log.debug(
                     "batch_query_scene",
                     mode="sequential",
                     num_queries=len(queries),
                 )
-                return loop.run_until_complete(execute_sequential(queries))
+                return await execute_sequential(queries)
 
     def query_text(
         self,
@@ -857,42 +1114,58 @@ class Prompt:
         as_question_answer: bool = True,
         short: bool = False,
     ):
-        loop = asyncio.get_event_loop()
         world_state = instance.get_agent("world_state")
         query = query.format(**self.vars)
 
         if isinstance(text, list):
             text = "\n".join(text)
 
-        if not as_question_answer:
-            return loop.run_until_complete(
-                world_state.analyze_text_and_answer_question(
-                    text, query, response_length=10 if short else 512
-                )
-            )
+        return self.run_query(
+            "query_text",
+            self._query_text,
+            world_state.client,
+            query,
+            text,
+            as_question_answer=as_question_answer,
+            short=short,
+        )
 
-        return "\n".join(
-            [
-                f"Question: {query}",
-                "Answer: "
-                + loop.run_until_complete(
-                    world_state.analyze_text_and_answer_question(
-                        text, query, response_length=10 if short else 512
-                    )
-                ),
-            ]
+    async def _query_text(
+        self, query: str, text: str, as_question_answer: bool, short: bool
+    ) -> str:
+        world_state = instance.get_agent("world_state")
+        answer = await world_state.analyze_text_and_answer_question(
+            text, query, response_length=10 if short else 512
         )
 
+        if not as_question_answer:
+            return answer
+
+        return "\n".join([f"Question: {query}", "Answer: " + answer])
+
     def query_text_eval(self, query: str, text: str):
         query = f"{query} Answer with a yes or no."
         response = self.query_text(query, text, as_question_answer=False, short=True)
         return response.strip().lower().startswith("y")
 
     def query_memory(self, query: str, as_question_answer: bool = True, **kwargs):
-        loop = asyncio.get_event_loop()
-        memory = instance.get_agent("memory")
         query = query.format(**self.vars)
 
+        # memory queries don't go through an llm client, so they are not
+        # limited by one
+        return self.run_query(
+            "query_memory",
+            self._query_memory,
+            None,
+            query,
+            as_question_answer,
+            placeholder=[] if kwargs.get("iterate") else PLACEHOLDER,
+            **kwargs,
+        )
+
+    async def _query_memory(self, query: str, as_question_answer: bool, **kwargs):
+        memory = instance.get_agent("memory")
+
         exclude_history = kwargs.pop("exclude_history", False)
         if exclude_history:
             base_filter = kwargs.get("filter", lambda x: True)
@@ -902,9 +1175,9 @@ class Prompt:
 
         if not kwargs.get("iterate"):
             if not as_question_answer:
-                return loop.run_until_complete(memory.query(query, **kwargs))
+                return await memory.query(query, **kwargs)
 
-            answer = loop.run_until_complete(memory.query(query, **kwargs))
+            answer = await memory.query(query, **kwargs)
 
             return "\n".join(
                 [
@@ -913,37 +1186,47 @@ class Prompt:
                 ]
             )
         else:
-            return loop.run_until_complete(
-                memory.multi_query(
-                    [q for q in query.split("\n") if q.strip()], **kwargs
-                )
+            return await memory.multi_query(
+                [q for q in query.split("\n") if q.strip()], **kwargs
             )
 
     def instruct_text(self, instruction: str, text: str, as_list: bool = False):
-        loop = asyncio.get_event_loop()
         world_state = instance.get_agent("world_state")
         instruction = instruction.format(**self.vars)
 
         if isinstance(text, list):
             text = "\n".join(text)
 
-        response = loop.run_until_complete(
-            world_state.analyze_and_follow_instruction(text, instruction)
+        return self.run_query(
+            "instruct_text",
+            self._instruct_text,
+            world_state.client,
+            instruction,
+            text,
+            as_list=as_list,
+            placeholder=[] if as_list else PLACEHOLDER,
         )
 
+    async def _instruct_text(self, instruction: str, text: str, as_list: bool):
+        world_state = instance.get_agent("world_state")
+        response = await world_state.analyze_and_follow_instruction(text, instruction)
+
         if as_list:
             return extract_list(response)
         else:
             return response
 
     def retrieve_memories(self, lines: list[str], goal: str = None):
-        loop = asyncio.get_event_loop()
         world_state = instance.get_agent("world_state")
 
         lines = [str(line) for line in lines]
 
-        return loop.run_until_complete(
-            world_state.analyze_text_and_extract_context("\n".join(lines), goal=goal)
+        return self.run_query(
+            "retrieve_memories",
+            world_state.analyze_text_and_extract_context,
+            world_state.client,
+            "\n".join(lines),
+            goal=goal,
         )
 
     def agent_config(self, config_path: str):
@@ -979,12 +1262,17 @@ class Prompt:
         return "before_history"
 
     def agent_action(self, agent_name: str, _action_name: str, **kwargs):
+        self.prevent_discovery("agent_action")
         loop = asyncio.get_event_loop()
         agent = instance.get_agent(agent_name)
         action = getattr(agent, _action_name)
         return loop.run_until_complete(action(**kwargs))
 
     def emit_status(self, status: str, message: str, **kwargs):
+        prefetch = active_query_prefetch.get()
+        if prefetch is not None and prefetch.discovering:
+            return
+
         if kwargs:
             emit("status", status=status, message=message, data=kwargs)
         else:
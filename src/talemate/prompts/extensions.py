@@ -24,12 +24,16 @@ class CaptureContextExtension(Extension):
         lineno = next(parser.stream).lineno
         body = parser.parse_statements(["name:end_capture_context"], drop_needle=True)
         return nodes.CallBlock(
-            self.call_method("_capture", []), [], [], body
+            self.call_method("_capture", [nodes.Name("prompt_instance", "load")]),
+            [],
+            [],
+            body,
         ).set_lineno(lineno)
 
-    def _capture(self, caller):
+    def _capture(self, prompt, caller):
         content = caller()
-        prompt = self.environment.globals.get("prompt_instance")
+        # prompt_instance is passed through the render context, an undefined
+        # value (rendering outside of a Prompt) is falsy
         if prompt:
             current = getattr(prompt, "captured_context", "")
             prompt.captured_context = current + content
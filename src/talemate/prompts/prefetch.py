@@ -0,0 +1,195 @@
+"""
+Concurrent prefetch of the agent queries templates make while rendering.
+
+Templates call `query_scene`, `query_text`, `query_memory`, `instruct_text`
+and friends synchronously, so a template making five queries runs five
+round trips strictly one after another. `Prompt.render` avoids this by
+rendering in two passes:
+
+1. a discovery pass records the queries (answering each with a
+   placeholder) instead of running them
+2. the recorded queries run concurrently, limited per client by whether it
+   supports concurrent inference
+3. the final pass renders again and answers the queries from the results
+
+Queries of the final pass that weren't discovered (e.g., because their
+arguments depend on the answer to another query) run synchronously as
+before. If the discovery pass reaches a helper with side effects (e.g.,
+`agent_action`) or fails, the template is rendered once the regular way.
+
+Nested prompts rendered by the template share the prefetch of the outermost
+render.
+
+The second pass only pays off if queries actually run at the same time, so
+discovery is abandoned (and the template rendered once, the regular way) as
+soon as it records a query for a client without concurrent inference, unless
+a query for a client with concurrent inference was recorded before it. Memory
+queries don't go through a client and never abandon discovery.
+
+Prefetching is speculative: discovery answers queries with placeholders, so
+a template branching on an answer may record queries the final pass never
+makes. Those queries run and their results are dropped. The random state is
+the same in both passes, so arguments drawn from `random` match, but
+arguments that differ between passes for other reasons don't match a
+prefetched result and run again in the final pass.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable
+
+import structlog
+
+__all__ = [
+    "MISSING",
+    "PLACEHOLDER",
+    "QueryPrefetch",
+    "QueryPrefetchAborted",
+    "active_query_prefetch",
+    "call_key",
+]
+
+log = structlog.get_logger("talemate.prompts.prefetch")
+
+# the prefetch of the render in progress
+active_query_prefetch: ContextVar["QueryPrefetch | None"] = ContextVar(
+    "active_query_prefetch", default=None
+)
+
+# returned by `QueryPrefetch.query` if a query needs to run synchronously
+MISSING = object()
+
+# answer to text queries during discovery, queries whose arguments contain it
+# depend on another answer and are not prefetched
+PLACEHOLDER = "<|PENDING_QUERY|>"
+
+
+class QueryPrefetchAborted(Exception):
+    """
+    Raised during the discovery pass by template helpers that can not run
+    twice.
+    """
+
+    pass
+
+
+def _freeze(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    # objects (characters, callbacks) are the same instances in both passes
+    return ("id", id(value))
+
+
+def _depends_on_placeholder(value: Any) -> bool:
+    if isinstance(value, str):
+        return PLACEHOLDER in value
+    if isinstance(value, (list, tuple)):
+        return any(_depends_on_placeholder(item) for item in value)
+    if isinstance(value, dict):
+        return any(_depends_on_placeholder(item) for item in value.values())
+    return False
+
+
+def call_key(name: str, args: tuple, kwargs: dict) -> tuple:
+    return (name, _freeze(args), _freeze(kwargs))
+
+
+class QueryPrefetch:
+    def __init__(self):
+        self.discovering = True
+        # call key -> (factory, client)
+        self.calls: dict[tuple, tuple[Callable[[], Awaitable], Any]] = {}
+        self.results: dict[tuple, Any] = {}
+        self.errors: dict[tuple, BaseException] = {}
+        # number of placeholder answers given during discovery
+        self.placeholders = 0
+        # whether a query for a client with concurrent inference was recorded
+        self.concurrent = False
+        self._occurrences: dict[tuple, int] = {}
+
+    def _next_key(self, name: str, args: tuple, kwargs: dict) -> tuple:
+        # identical calls made more than once are kept apart, so each still
+        # gets its own answer
+        key = call_key(name, args, kwargs)
+        occurrence = self._occurrences.get(key, 0)
+        self._occurrences[key] = occurrence + 1
+        return (key, occurrence)
+
+    def query(
+        self,
+        name: str,
+        factory: Callable[[], Awaitable],
+        client: Any,
+        args: tuple,
+        kwargs: dict,
+        placeholder: Any = PLACEHOLDER,
+    ) -> Any:
+        """
+        Records the query during discovery (returning `placeholder`),
+        afterwards returns its result, or `MISSING` if it was not discovered.
+
+        Raises `QueryPrefetchAborted` during discovery if nothing recorded so
+        far could run concurrently.
+        """
+        key = self._next_key(name, args, kwargs)
+
+        if self.discovering:
+            limit = self._limit(client)
+            if limit is not None and limit > 1:
+                self.concurrent = True
+            elif limit == 1 and not self.concurrent:
+                raise QueryPrefetchAborted(f"{name}: client runs one query at a time")
+
+            self.placeholders += 1
+            if not _depends_on_placeholder((args, kwargs)):
+                self.calls[key] = (factory, client)
+            return placeholder
+
+        if key in self.errors:
+            raise self.errors.pop(key)
+
+        return self.results.pop(key, MISSING)
+
+    def _limit(self, client: Any) -> int | None:
+        # queries without a client (memory) are not limited
+        if client is None:
+            return None
+        return client.max_concurrent_requests
+
+    async def resolve(self):
+        """
+        Runs all discovered queries concurrently and ends discovery.
+        """
+        self.discovering = False
+        self._occurrences.clear()
+
+        semaphores: dict[int, asyncio.Semaphore | None] = {}
+
+        async def run(factory: Callable[[], Awaitable], client: Any) -> Any:
+            if id(client) not in semaphores:
+                limit = self._limit(client)
+                semaphores[id(client)] = asyncio.Semaphore(limit) if limit else None
+            semaphore = semaphores[id(client)]
+            if semaphore is None:
+                return await factory()
+            async with semaphore:
+                return await factory()
+
+        keys = list(self.calls)
+        log.debug("prefetching queries", num_queries=len(keys))
+        results = await asyncio.gather(
+            *[run(*self.calls[key]) for key in keys], return_exceptions=True
+        )
+        self.calls.clear()
+
+        for key, result in zip(keys, results):
+            if isinstance(result, BaseException):
+                self.errors[key] = result
+            else:
+                self.results[key] = result
@@ -1,12 +1,20 @@
 from typing import TYPE_CHECKING
+import asyncio
 import json
 import os
 import structlog
 from talemate.scene_message import SceneMessage
+from talemate.scene.history import SceneHistory, UnloadedMessage
 from talemate.game.engine.nodes.core import Graph, UNRESOLVED
 from talemate.game.engine.nodes.scene import SceneLoop
 
 from talemate.game.engine.nodes.layout import save_graph
+from talemate.util.fs import write_file_atomic
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 if TYPE_CHECKING:
     from talemate.tale_mate import Scene
@@ -27,13 +35,121 @@ def combine_paths(absolute, relative):
 
 class SceneEncoder(json.JSONEncoder):
     def default(self, obj):
-        if isinstance(obj, SceneMessage):
+        if isinstance(obj, (SceneMessage, UnloadedMessage)):
             return obj.__dict__()
         if obj is UNRESOLVED:
             return None
         return super().default(obj)
 
 
+def snapshot_scene_data(data):
+    """
+    Copies the containers (dicts, lists) of serialized scene data so it can be
+    encoded in a worker thread while the scene keeps changing.
+
+    Leaf values are shared, scene messages are encoded from their current
+    state. Unloaded history messages stay unloaded.
+    """
+    if isinstance(data, SceneHistory):
+        return data.snapshot()
+    if isinstance(data, dict):
+        return {key: snapshot_scene_data(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [snapshot_scene_data(value) for value in data]
+    return data
+
+
+def encode_scene_data(data: dict, compact: bool = False) -> bytes:
+    """
+    Encodes serialized scene data as json.
+
+    `compact` drops the indentation and uses orjson if it is installed.
+    """
+    if not compact:
+        return json.dumps(data, indent=2, cls=SceneEncoder).encode("utf-8")
+
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                data,
+                default=SceneEncoder().default,
+                # scene messages are dataclasses that need the encoder
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except TypeError as exc:
+            # e.g., integers orjson can't represent
+            log.warning("orjson encoding failed, using json", error=exc)
+
+    return json.dumps(data, separators=(",", ":"), cls=SceneEncoder).encode("utf-8")
+
+
+def write_scene_file(path: str, data: dict, compact: bool = False):
+    write_file_atomic(path, encode_scene_data(data, compact=compact))
+
+
+class SceneFileWriter:
+    """
+    Writes scene files in a worker thread.
+
+    Writes to a path that is already being written are coalesced: only the
+    most recent data is written once the current write is done, and everyone
+    who requested a write in the meantime waits for that one.
+    """
+
+    def __init__(self):
+        self.writing: set[str] = set()
+        # path -> (data, compact, future)
+        self.pending: dict[str, tuple[dict, bool, asyncio.Future]] = {}
+        self.writes = 0
+        self.coalesced = 0
+
+    async def write(self, path: str, data: dict, compact: bool = False):
+        """
+        Writes `data` to `path`. `data` must not be modified by the caller
+        afterwards (see `snapshot_scene_data`).
+        """
+        if path in self.writing:
+            pending = self.pending.get(path)
+            if pending:
+                self.coalesced += 1
+                future = pending[2]
+            else:
+                future = asyncio.get_running_loop().create_future()
+            self.pending[path] = (data, compact, future)
+            # a cancelled waiter doesn't cancel the write
+            await asyncio.shield(future)
+            return
+
+        self.writing.add(path)
+        try:
+            await self._write(path, data, compact)
+        finally:
+            try:
+                await self._write_pending(path)
+            finally:
+                self.writing.discard(path)
+
+    async def _write(self, path: str, data: dict, compact: bool):
+        self.writes += 1
+        await asyncio.to_thread(write_scene_file, path, data, compact)
+
+    async def _write_pending(self, path: str):
+        while path in self.pending:
+            data, compact, future = self.pending.pop(path)
+            try:
+                await self._write(path, data, compact)
+            except Exception as exc:
+                log.error("scene file write failed", path=path, error=exc)
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(None)
+
+
+SCENE_FILE_WRITER = SceneFileWriter()
+
+
 async def save_node_module(
     scene: "Scene", graph: "Graph", filename: str = None, set_as_main: bool = False
 ) -> str:
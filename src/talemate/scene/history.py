@@ -0,0 +1,474 @@
+"""
+Indexed scene history container.
+
+`SceneHistory` is a drop-in `list` of scene messages that maintains lookup
+indexes so the scene can find messages by id, type and character without
+scanning the whole history:
+
+- message id -> position
+- message type -> sorted positions
+- character name -> sorted positions (CharacterMessage only)
+
+Appends (the `push_history` hot path) and removals near the end of the
+history update the indexes incrementally. Any other mutation marks the
+indexes as stale and they are rebuilt on the next lookup.
+
+Message content can be edited in place without going through the list (e.g.
+`message.message = ...`). Lookups verify their result against the message
+and rebuild on mismatch, and `message_edited` should be called when a
+message's content changes so the character index stays accurate.
+
+Messages of a loaded scene can be kept unloaded (`UnloadedMessage`) until
+they are accessed. Only the recent window is turned into scene messages when
+the scene is loaded, older messages are materialized when they are read by
+position, slice or reverse iteration. The indexes are built from the
+unloaded messages without materializing them. Anything that needs the whole
+history (forward iteration, equality, sorting ...) loads all messages first.
+"""
+
+from __future__ import annotations
+
+import bisect
+from typing import Callable, Iterable
+
+import structlog
+
+from talemate.scene_message import CharacterMessage, SceneMessage
+
+__all__ = [
+    "EAGER_LOAD_WINDOW",
+    "SceneHistory",
+    "UnloadedMessage",
+]
+
+log = structlog.get_logger("talemate.scene.history")
+
+# Removals further than this from the end of the history rebuild the
+# indexes lazily instead of shifting every index entry after them.
+INCREMENTAL_REMOVE_WINDOW = 512
+
+# Number of messages at the end of the history that are materialized when a
+# scene is loaded, older messages are materialized on access.
+EAGER_LOAD_WINDOW = 500
+
+
+class UnloadedMessage:
+    """
+    Serialized scene message that has not been materialized yet.
+
+    Carries what the indexes and cheap lookups need (id, type, source,
+    character name) and the loader that turns the serialized entry into a
+    scene message.
+
+    The loader migrates entries of older scene files, so the entry is
+    normalized through it the first time it is serialized. An unloaded
+    message then serializes exactly like the loaded message would, and a
+    message that is read (and loaded) between two saves doesn't change the
+    saved scene.
+    """
+
+    __slots__ = (
+        "id",
+        "typ",
+        "source",
+        "character_name",
+        "entry",
+        "loader",
+        "normalized",
+    )
+
+    # attributes `SceneHistory.peek` answers from the placeholder itself
+    PEEK_ATTRS = ("id", "typ", "source", "secondary_source", "character_name")
+
+    def __init__(
+        self,
+        id: int,
+        typ: str,
+        entry: dict,
+        loader: Callable[[dict, int], SceneMessage],
+        character_name: str | None = None,
+        source: str = "",
+    ):
+        self.id = id
+        self.typ = typ
+        self.entry = entry
+        self.loader = loader
+        self.character_name = character_name
+        self.source = source
+        self.normalized = False
+
+    @property
+    def secondary_source(self) -> str:
+        # character messages answer with the character name, see
+        # `CharacterMessage.secondary_source`
+        if self.character_name is not None:
+            return self.character_name
+        return self.source
+
+    def load(self) -> SceneMessage:
+        # the loader may modify the entry, it is kept intact for saving
+        return self.loader(dict(self.entry), self.id)
+
+    def __dict__(self) -> dict:
+        if not self.normalized:
+            self.entry = self.load().__dict__()
+            self.normalized = True
+        return {**self.entry, "id": self.id}
+
+    def __repr__(self) -> str:
+        return f"UnloadedMessage(id={self.id}, typ={self.typ!r})"
+
+
+class SceneHistory(list):
+    """
+    List of scene messages with id, type and character lookup indexes.
+    """
+
+    def __init__(self, messages: Iterable[SceneMessage] = ()):
+        super().__init__(messages)
+        self._ids: dict[int, int] = {}
+        self._types: dict[str, list[int]] = {}
+        self._characters: dict[str, list[int]] = {}
+        self._stale = True
+        self._count_unloaded()
+
+    # --- Lazy loading ---
+
+    def _count_unloaded(self):
+        self._unloaded = sum(
+            1 for message in list.__iter__(self) if type(message) is UnloadedMessage
+        )
+
+    @property
+    def num_unloaded(self) -> int:
+        """
+        Number of messages that have not been materialized yet
+        """
+        return self._unloaded
+
+    def _get(self, idx: int) -> SceneMessage:
+        message = list.__getitem__(self, idx)
+        if type(message) is UnloadedMessage:
+            message = message.load()
+            list.__setitem__(self, idx, message)
+            self._unloaded -= 1
+        return message
+
+    def load_all(self):
+        """
+        Materializes all unloaded messages.
+        """
+        if not self._unloaded:
+            return
+        log.debug("loading history", num_unloaded=self._unloaded)
+        for idx in range(len(self)):
+            self._get(idx)
+
+    def peek(self, idx: int, attr: str, default=None):
+        """
+        Returns an attribute of the message at `idx` without materializing
+        it, unloaded messages answer from their serialized entry.
+        """
+        message = list.__getitem__(self, idx)
+        if type(message) is UnloadedMessage:
+            if attr in UnloadedMessage.PEEK_ATTRS:
+                return getattr(message, attr)
+            return message.entry.get(attr, default)
+        return getattr(message, attr, default)
+
+    def snapshot(self) -> list:
+        """
+        Returns a shallow copy of the history for serialization, unloaded
+        messages are kept unloaded.
+        """
+        return list(list.__iter__(self))
+
+    # --- Index maintenance ---
+
+    def _index(self, idx: int, message: SceneMessage):
+        self._ids[message.id] = idx
+        self._types.setdefault(message.typ, []).append(idx)
+        if isinstance(message, CharacterMessage) or (
+            type(message) is UnloadedMessage and message.character_name is not None
+        ):
+            self._characters.setdefault(message.character_name, []).append(idx)
+
+    def _rebuild(self):
+        self._ids = {}
+        self._types = {}
+        self._characters = {}
+        for idx, message in enumerate(list.__iter__(self)):
+            self._index(idx, message)
+        self._stale = False
+
+    def _ensure_index(self):
+        if self._stale:
+            self._rebuild()
+
+    def _unindex(self, idx: int, message: SceneMessage):
+        """
+        Removes the message at `idx` from the indexes and shifts all
+        positions after it. Must be called before the list itself is changed.
+        """
+
+        if self._ids.get(message.id) == idx:
+            del self._ids[message.id]
+
+        for shifted_idx in range(idx + 1, len(self)):
+            shifted = list.__getitem__(self, shifted_idx)
+            if self._ids.get(shifted.id) == shifted_idx:
+                self._ids[shifted.id] = shifted_idx - 1
+
+        for index in (self._types, self._characters):
+            for key in list(index.keys()):
+                positions = index[key]
+                start = bisect.bisect_left(positions, idx)
+                if start < len(positions) and positions[start] == idx:
+                    del positions[start]
+                for i in range(start, len(positions)):
+                    positions[i] -= 1
+                if not positions:
+                    del index[key]
+
+    def _remove_at(self, idx: int) -> SceneMessage:
+        if idx < 0:
+            idx += len(self)
+
+        message = self._get(idx)
+
+        if not self._stale:
+            if len(self) - idx <= INCREMENTAL_REMOVE_WINDOW:
+                self._unindex(idx, message)
+            else:
+                self._stale = True
+
+        list.__delitem__(self, idx)
+        return message
+
+    def invalidate(self):
+        """
+        Marks the indexes as stale, they will be rebuilt on the next lookup.
+        """
+        self._stale = True
+
+    def message_edited(self, message: SceneMessage):
+        """
+        Should be called when the content of a message changed in place.
+        """
+        if isinstance(message, CharacterMessage):
+            self._stale = True
+
+    # --- Lookups ---
+
+    def index_of(self, message_id: int) -> int:
+        """
+        Returns the position of the message with the given id, or -1
+        """
+        self._ensure_index()
+        idx = self._ids.get(message_id)
+
+        if idx is not None and idx < len(self):
+            if list.__getitem__(self, idx).id == message_id:
+                return idx
+
+        # message ids can be reassigned in place, fall back to a scan and
+        # rebuild the index if the message is found somewhere else
+        for idx in range(len(self) - 1, -1, -1):
+            if list.__getitem__(self, idx).id == message_id:
+                self._rebuild()
+                return idx
+
+        return -1
+
+    def get_by_id(self, message_id: int) -> SceneMessage | None:
+        idx = self.index_of(message_id)
+        if idx == -1:
+            return None
+        return self._get(idx)
+
+    def positions_of_type(self, typ: str) -> list[int]:
+        """
+        Returns the sorted positions of all messages of the given type.
+
+        The returned list is owned by the index and must not be modified.
+        """
+        self._ensure_index()
+        return self._types.get(typ, [])
+
+    def positions_of_character(self, character_name: str) -> list[int]:
+        """
+        Returns the sorted positions of all character messages for the given
+        character.
+
+        The returned list is owned by the index and must not be modified.
+        """
+        self._ensure_index()
+        positions = self._characters.get(character_name, [])
+
+        # guard against in-place edits that changed the character name
+        if positions:
+            message = list.__getitem__(self, positions[-1])
+            if message.character_name != character_name:
+                self._rebuild()
+                positions = self._characters.get(character_name, [])
+
+        return positions
+
+    def count_of_type_after(self, typ: str, idx: int) -> int:
+        """
+        Returns the number of messages of the given type at positions > idx
+        """
+        positions = self.positions_of_type(typ)
+        return len(positions) - bisect.bisect_right(positions, idx)
+
+    def __reduce_ex__(self, protocol):
+        # indexes are rebuilt on demand, only the messages are copied / pickled
+        return (self.__class__, (list(self),))
+
+    # --- list API ---
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if self._unloaded:
+                for idx in range(*key.indices(len(self))):
+                    self._get(idx)
+            return list.__getitem__(self, key)
+        return self._get(key)
+
+    def __iter__(self):
+        self.load_all()
+        return list.__iter__(self)
+
+    def __reversed__(self):
+        if not self._unloaded:
+            return list.__reversed__(self)
+        return self._iter_reversed()
+
+    def _iter_reversed(self):
+        # walking back from the end usually stops early (context building),
+        # only the messages that are reached are materialized
+        idx = len(self) - 1
+        while idx >= 0:
+            if idx < len(self):
+                yield self._get(idx)
+            idx -= 1
+
+    def __contains__(self, message) -> bool:
+        self.load_all()
+        return list.__contains__(self, message)
+
+    def __eq__(self, other) -> bool:
+        self.load_all()
+        if isinstance(other, SceneHistory):
+            other.load_all()
+        return list.__eq__(self, other)
+
+    def __ne__(self, other) -> bool:
+        return not self == other
+
+    __hash__ = None
+
+    def __add__(self, other):
+        self.load_all()
+        return list.__add__(self, other)
+
+    def __mul__(self, value: int):
+        self.load_all()
+        return list.__mul__(self, value)
+
+    __rmul__ = __mul__
+
+    def __repr__(self) -> str:
+        self.load_all()
+        return list.__repr__(self)
+
+    def index(self, message, *args) -> int:
+        self.load_all()
+        return list.index(self, message, *args)
+
+    def count(self, message) -> int:
+        self.load_all()
+        return list.count(self, message)
+
+    def copy(self) -> list:
+        self.load_all()
+        return list.copy(self)
+
+    def append(self, message: SceneMessage):
+        list.append(self, message)
+        if not self._stale:
+            self._index(len(self) - 1, message)
+
+    def extend(self, messages: Iterable[SceneMessage]):
+        start = len(self)
+        list.extend(self, messages)
+        if not self._stale:
+            for idx in range(start, len(self)):
+                self._index(idx, list.__getitem__(self, idx))
+
+    def __iadd__(self, messages: Iterable[SceneMessage]):
+        self.extend(messages)
+        return self
+
+    def insert(self, idx: int, message: SceneMessage):
+        list.insert(self, idx, message)
+        self._stale = True
+        if type(message) is UnloadedMessage:
+            self._unloaded += 1
+
+    def pop(self, idx: int = -1) -> SceneMessage:
+        if not len(self):
+            raise IndexError("pop from empty list")
+        return self._remove_at(idx)
+
+    def remove(self, message: SceneMessage):
+        idx = -1
+        if isinstance(message, SceneMessage):
+            idx = self.index_of(message.id)
+
+        if idx != -1:
+            candidate = self._get(idx)
+            if candidate is not message and candidate != message:
+                idx = -1
+
+        if idx == -1:
+            self.load_all()
+            idx = list.index(self, message)
+
+        self._remove_at(idx)
+
+    def __delitem__(self, key):
+        if isinstance(key, int):
+            self._remove_at(key)
+            return
+        list.__delitem__(self, key)
+        self._stale = True
+        self._count_unloaded()
+
+    def __setitem__(self, key, value):
+        list.__setitem__(self, key, value)
+        self._stale = True
+        self._count_unloaded()
+
+    def __imul__(self, value: int):
+        list.__imul__(self, value)
+        self._stale = True
+        self._count_unloaded()
+        return self
+
+    def clear(self):
+        list.clear(self)
+        self._ids = {}
+        self._types = {}
+        self._characters = {}
+        self._stale = False
+        self._unloaded = 0
+
+    def sort(self, *args, **kwargs):
+        self.load_all()
+        list.sort(self, *args, **kwargs)
+        self._stale = True
+
+    def reverse(self):
+        list.reverse(self)
+        self._stale = True
@@ -0,0 +1,213 @@
+"""
+Formatted history entry cache.
+
+The best-fit context history builder formats every archived and layered
+history entry with a timestamp relative to the current scene time and counts
+its tokens on every generation. Those entries rarely change between turns, so
+`HistoryTokenCache` keeps the formatted text and token count per entry.
+
+Cache keys are made from:
+
+- the entry kind (`archived` or `layer`)
+- the entry id
+- a hash of the entry text
+- the relative time bucket: the entry timestamps and the scene timestamp the
+  relative time was computed against
+
+Edits to an entry change its text hash and time passage changes the scene
+timestamp, so stale formatting is never served. `invalidate` drops entries
+explicitly, e.g., when a history entry is updated or deleted.
+
+The cache can optionally be persisted next to the scene save file so a
+reloaded scene starts warm.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Callable
+
+import structlog
+
+__all__ = [
+    "HistoryTokenCache",
+]
+
+log = structlog.get_logger("talemate.scene.history_cache")
+
+CACHE_FILE_VERSION = 1
+
+
+def text_hash(text: str) -> str:
+    """
+    Stable (across processes) hash of an entry text
+    """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class HistoryTokenCache:
+    """
+    LRU cache of formatted history entries and their token counts.
+    """
+
+    def __init__(self, max_size: int = 20000):
+        self.max_size = max_size
+        self.entries: OrderedDict[tuple, tuple[str, int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.persist = False
+        self.loaded_from: str | None = None
+        self.last_build: dict = {}
+        # token counts are only valid for the function (and its revision)
+        # that produced them
+        self._count_fn: Callable | None = None
+        self._count_fn_revision = None
+
+    @staticmethod
+    def make_key(kind: str, entry: dict, scene_ts: str) -> tuple:
+        return (
+            kind,
+            entry.get("id"),
+            text_hash(entry.get("text", "")),
+            entry.get("ts"),
+            entry.get("ts_start"),
+            entry.get("ts_end"),
+            scene_ts,
+        )
+
+    def get(
+        self,
+        kind: str,
+        entry: dict,
+        scene_ts: str,
+        format_fn: Callable[[dict, str], str],
+        count_fn: Callable[[str], int],
+    ) -> tuple[str, int]:
+        """
+        Returns the formatted text and token count for a history entry,
+        formatting and counting it through `format_fn` and `count_fn` on a
+        miss.
+        """
+
+        self._use_count_fn(count_fn)
+
+        key = self.make_key(kind, entry, scene_ts)
+        cached = self.entries.get(key)
+
+        if cached is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return cached
+
+        self.misses += 1
+        text = format_fn(entry, scene_ts)
+        cached = (text, count_fn(text))
+        self.entries[key] = cached
+
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+        return cached
+
+    def _use_count_fn(self, count_fn: Callable[[str], int]):
+        revision = getattr(count_fn, "revision", None)
+        if count_fn is not self._count_fn or revision != self._count_fn_revision:
+            self.entries.clear()
+            self._count_fn = count_fn
+            self._count_fn_revision = revision
+
+    def invalidate(self, entry_id: str | None = None):
+        """
+        Drops all cached formatting for the given entry id, or everything if
+        no id is given.
+        """
+        if entry_id is None:
+            self.entries.clear()
+            return
+
+        for key in [key for key in self.entries if key[1] == entry_id]:
+            del self.entries[key]
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.last_build = {}
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    # --- Persistence ---
+
+    @staticmethod
+    def path_for(save_file: str) -> str:
+        """
+        Cache file location for a scene save file. Uses a non-json extension
+        so it's never picked up as a scene.
+        """
+        return f"{os.path.splitext(save_file)[0]}.history-cache"
+
+    def save(self, path: str, scene_ts: str | None = None):
+        """
+        Writes the cache to `path` if persistence is enabled.
+
+        Only entries relative to `scene_ts` are written, everything else
+        would miss on the next load anyway.
+        """
+        if not self.persist or not path:
+            return
+
+        entries = [
+            [list(key), text, tokens]
+            for key, (text, tokens) in self.entries.items()
+            if scene_ts is None or key[-1] == scene_ts
+        ]
+
+        try:
+            with open(path, "w") as f:
+                json.dump(
+                    {
+                        "version": CACHE_FILE_VERSION,
+                        "tokenizer": getattr(self._count_fn, "key", None),
+                        "entries": entries,
+                    },
+                    f,
+                )
+        except OSError as exc:
+            log.error("history_cache.save", path=path, error=exc)
+
+    def load(self, path: str, count_fn: Callable[[str], int]):
+        """
+        Loads cache entries from `path`. Missing or unreadable files are
+        ignored.
+        """
+        self.loaded_from = path
+
+        if not path or not os.path.exists(path):
+            return
+
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as exc:
+            log.warning("history_cache.load", path=path, error=exc)
+            return
+
+        if data.get("version") != CACHE_FILE_VERSION:
+            return
+
+        # counts from another tokenizer are useless
+        if data.get("tokenizer") != getattr(count_fn, "key", None):
+            return
+
+        self._use_count_fn(count_fn)
+
+        for key, text, tokens in data.get("entries", []):
+            self.entries[tuple(key)] = (text, tokens)
+
+        log.debug("history_cache.load", path=path, entries=len(self.entries))
@@ -1006,13 +1006,13 @@ class SceneAssets:
         """
         cleaned = False
 
-        # Check message avatars in history
-        for message in self.scene.history:
-            if (
-                hasattr(message, "asset_id")
-                and message.asset_id
-                and not self.validate_asset_id(message.asset_id)
-            ):
+        # Check message avatars in history, without materializing messages
+        # that are not loaded yet
+        history = self.scene.history
+        for idx in range(len(history)):
+            asset_id = history.peek(idx, "asset_id")
+            if asset_id and not self.validate_asset_id(asset_id):
+                message = history[idx]
                 log.debug(
                     "Cleaning up message avatar",
                     message_id=message.id,
@@ -11,6 +11,7 @@ from talemate import VERSION
 from talemate.client.base import resolve_generation_error
 from talemate.config import get_config, Config, commit_config, update_config
 from talemate.client.system_prompts import RENDER_CACHE as SYSTEM_PROMPTS_CACHE
+from talemate.server.asset_server import ASSET_SERVER
 from talemate.server.websocket_server import WebsocketHandler
 from talemate.util.data import JSONEncoder
 from talemate.context import ActiveScene, Interaction
@@ -30,6 +31,17 @@ def get_active_frontend_handler():
     return _active_frontend_websocket_handler
 
 
+async def process_request(connection, request):
+    """
+    Serves asset endpoint requests on the websocket server, anything else
+    continues with the websocket handshake.
+    """
+    handler = _active_frontend_websocket_handler
+    return await ASSET_SERVER.process_request(
+        request, handler.scene if handler else None
+    )
+
+
 async def websocket_endpoint(websocket):
     global _active_frontend_websocket
     global _active_frontend_websocket_handler
@@ -187,7 +199,8 @@ async def websocket_endpoint(websocket):
                 elif action_type == "request_scenes_list":
                     query = data.get("query", "")
                     list_images = data.get("list_images", True)
-                    handler.request_scenes_list(query, list_images)
+                    # the scene library refresh runs in a worker thread
+                    asyncio.create_task(handler.request_scenes_list(query, list_images))
                 elif action_type == "configure_clients":
                     await update_config({"clients": data.get("clients")})
                     await instance.instantiate_clients()
@@ -203,7 +216,9 @@ async def websocket_endpoint(websocket):
                     handler.delete_message(data.get("id"))
                 elif action_type == "request_scene_assets":
                     log.debug("request_scene_assets", data=data)
-                    handler.request_scene_assets(data.get("asset_ids"))
+                    handler.request_scene_assets(
+                        data.get("asset_ids"), data.get("include_data", False)
+                    )
                 elif action_type == "request_file_image_data":
                     log.info("request_file_image_data", data=data)
                     handler.request_file_image_data(data.get("file_path"))
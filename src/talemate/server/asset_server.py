@@ -0,0 +1,300 @@
+"""
+HTTP endpoint for scene assets and file previews.
+
+Served on the websocket server's host and port (through the websocket
+server's `process_request` hook), so images don't travel base64 encoded
+through the websocket message queue, the frontend loads them by URL:
+
+- `/assets/<asset_id>` the asset of the scene loaded by the active frontend
+- `/assets/<asset_id>?w=<size>` a resized WebP thumbnail, cached on disk
+- `/files/<token>` a local file registered for preview (e.g., a character
+  card picked for import)
+
+Responses carry an ETag and support conditional (`If-None-Match`) and single
+range (`Range: bytes=...`) requests. Asset ids are content hashes, so asset
+responses and their thumbnails can be cached by the browser indefinitely.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import mimetypes
+import os
+import re
+import secrets
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Mapping
+from urllib.parse import parse_qs, urlsplit
+
+import structlog
+from PIL import Image
+from websockets.datastructures import Headers
+from websockets.http11 import Request, Response
+
+from talemate.path import THUMBNAIL_CACHE_DIR
+from talemate.util.fs import write_file_atomic
+
+if TYPE_CHECKING:
+    from talemate.tale_mate import Scene
+
+__all__ = [
+    "ASSET_SERVER",
+    "AssetResponse",
+    "AssetServer",
+    "THUMBNAIL_SIZES",
+]
+
+log = structlog.get_logger("talemate.server.asset_server")
+
+# requested thumbnail widths are rounded up to one of these
+THUMBNAIL_SIZES = (128, 256, 512, 1024)
+
+# number of registered preview files that are kept servable
+MAX_FILES = 64
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+STATUS_PHRASES = {
+    200: "OK",
+    206: "Partial Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    416: "Range Not Satisfiable",
+}
+
+
+@dataclass
+class AssetResponse:
+    status: int
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    def __post_init__(self):
+        # responses without a body (304, 404, 416) send a length of 0, so the
+        # connection can be reused without waiting for it to close
+        self.headers["Content-Length"] = str(len(self.body))
+
+    @property
+    def reason(self) -> str:
+        return STATUS_PHRASES.get(self.status, "")
+
+
+def thumbnail_size(width: str | None) -> int | None:
+    """
+    Rounds a requested thumbnail width up to the next supported size.
+    """
+    try:
+        width = int(width)
+    except (TypeError, ValueError):
+        return None
+
+    for size in THUMBNAIL_SIZES:
+        if width <= size:
+            return size
+    return THUMBNAIL_SIZES[-1]
+
+
+def content_response(
+    data: bytes,
+    etag: str,
+    media_type: str,
+    request_headers: Mapping[str, str],
+    cache_control: str,
+) -> AssetResponse:
+    """
+    Builds the response for `data`, answering conditional and range requests.
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        "Access-Control-Allow-Origin": "*",
+    }
+
+    if request_headers.get("If-None-Match") in (etag, "*"):
+        return AssetResponse(304, headers)
+
+    headers["Content-Type"] = media_type
+    size = len(data)
+    range_header = request_headers.get("Range")
+
+    if range_header and request_headers.get("If-Range", etag) == etag:
+        match = RANGE_RE.match(range_header.strip())
+        if not match or match.groups() == ("", ""):
+            # multiple or malformed ranges, serve the whole file
+            return AssetResponse(200, headers, data)
+
+        start, end = match.groups()
+        if start:
+            start = int(start)
+            end = min(int(end), size - 1) if end else size - 1
+        else:
+            # suffix range, the last n bytes
+            start = max(size - int(end), 0)
+            end = size - 1
+
+        if start >= size or start > end:
+            headers["Content-Range"] = f"bytes */{size}"
+            return AssetResponse(416, headers)
+
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return AssetResponse(206, headers, data[start : end + 1])
+
+    return AssetResponse(200, headers, data)
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write_thumbnail(source: str, target: Path, size: int):
+    with Image.open(source) as image:
+        image.thumbnail((size, size))
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        buffer = io.BytesIO()
+        image.save(buffer, "WEBP", quality=80)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    write_file_atomic(target, buffer.getvalue())
+
+
+class AssetServer:
+    def __init__(self, thumbnail_dir: Path | str = THUMBNAIL_CACHE_DIR):
+        self.thumbnail_dir = Path(thumbnail_dir)
+        # token -> path of files registered for preview
+        self.files: OrderedDict[str, str] = OrderedDict()
+
+    # --- URLs ---
+
+    @staticmethod
+    def asset_url(asset_id: str, width: int | None = None) -> str:
+        """
+        Returns the path of the asset endpoint, the frontend resolves it
+        against its backend URL.
+        """
+        url = f"/assets/{asset_id}"
+        if width:
+            url += f"?w={width}"
+        return url
+
+    def file_url(self, path: str) -> str:
+        """
+        Registers a local file for preview and returns the path of its
+        endpoint.
+        """
+        path = os.path.abspath(path)
+        for token, registered in self.files.items():
+            if registered == path:
+                self.files.move_to_end(token)
+                return f"/files/{token}"
+
+        token = secrets.token_urlsafe(16)
+        self.files[token] = path
+        while len(self.files) > MAX_FILES:
+            self.files.popitem(last=False)
+        return f"/files/{token}"
+
+    # --- Requests ---
+
+    async def process_request(
+        self, request: Request, scene: "Scene | None"
+    ) -> Response | None:
+        """
+        `process_request` hook of the websocket server.
+        """
+        response = await self.handle(request.path, request.headers, scene)
+        if response is None:
+            return None
+
+        return Response(
+            response.status, response.reason, Headers(response.headers), response.body
+        )
+
+    async def handle(
+        self,
+        path: str,
+        headers: Mapping[str, str],
+        scene: "Scene | None",
+    ) -> AssetResponse | None:
+        """
+        Answers asset and file requests, returns None for any other path so
+        the request is handled by the websocket server.
+        """
+        url = urlsplit(path)
+        parts = url.path.strip("/").split("/")
+
+        if len(parts) != 2 or parts[0] not in ("assets", "files"):
+            return None
+
+        try:
+            if parts[0] == "assets":
+                query = parse_qs(url.query)
+                width = query.get("w", [None])[0]
+                return await self.serve_asset(scene, parts[1], width, headers)
+            return await self.serve_file(parts[1], headers)
+        except OSError as exc:
+            log.error("asset_server", path=path, error=exc)
+            return AssetResponse(404)
+
+    async def serve_asset(
+        self,
+        scene: "Scene | None",
+        asset_id: str,
+        width: str | None,
+        headers: Mapping[str, str],
+    ) -> AssetResponse:
+        # asset ids are validated against the scene's library, so the path
+        # can not be used to reach other files
+        if not scene or asset_id not in scene.assets.assets:
+            return AssetResponse(404)
+
+        asset = scene.assets.get_asset(asset_id)
+        asset_path = scene.assets.asset_path(asset_id)
+        if not asset_path or not os.path.exists(asset_path):
+            return AssetResponse(404)
+
+        cache_control = "private, max-age=31536000, immutable"
+        size = thumbnail_size(width) if width else None
+
+        if size is None:
+            data = await asyncio.to_thread(_read, asset_path)
+            return content_response(
+                data, f'"{asset_id}"', asset.media_type, headers, cache_control
+            )
+
+        thumbnail = self.thumbnail_path(asset_id, size)
+        if not thumbnail.exists():
+            await asyncio.to_thread(_write_thumbnail, asset_path, thumbnail, size)
+
+        data = await asyncio.to_thread(_read, str(thumbnail))
+        return content_response(
+            data, f'"{asset_id}-{size}"', "image/webp", headers, cache_control
+        )
+
+    async def serve_file(self, token: str, headers: Mapping[str, str]) -> AssetResponse:
+        path = self.files.get(token)
+        if not path or not os.path.isfile(path):
+            return AssetResponse(404)
+
+        stat = os.stat(path)
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        data = await asyncio.to_thread(_read, path)
+        return content_response(
+            data,
+            f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+            media_type,
+            headers,
+            "no-cache",
+        )
+
+    def thumbnail_path(self, asset_id: str, size: int) -> Path:
+        return self.thumbnail_dir / asset_id[:2] / f"{asset_id}-{size}.webp"
+
+
+ASSET_SERVER = AssetServer()
@@ -4,6 +4,7 @@ import pydantic
 import structlog
 from talemate.instance import get_client
 from talemate.client.base import ClientBase
+from talemate.client.response_cache import RESPONSE_CACHE
 from talemate.path import LOGS_DIR
 from talemate.scene.state_editor import SceneStateEditor
 from talemate.scene.schema import SceneState
@@ -236,3 +237,17 @@ class DevToolsPlugin(Plugin):
             message=f"Prompt log dumped ({len(payload.prompts)} entries) to {output_path.name}",
             status="success",
         )
+
+    async def handle_get_response_cache_stats(self, data):
+        self.websocket_handler.queue_put(
+            {
+                "type": "devtools",
+                "action": "response_cache_stats",
+                "data": RESPONSE_CACHE.stats,
+            }
+        )
+
+    async def handle_clear_response_cache(self, data):
+        RESPONSE_CACHE.clear()
+        emit("status", message="Response cache cleared", status="success")
+        await self.handle_get_response_cache_stats(data)
@@ -168,7 +168,7 @@ def run_server(args):
     import talemate.game.engine.nodes.load_definitions
     import talemate.config
     import talemate.instance
-    from talemate.server.api import websocket_endpoint
+    from talemate.server.api import process_request, websocket_endpoint
 
     config = talemate.config.cleanup()
 
@@ -210,6 +210,8 @@ def run_server(args):
             websocket_endpoint,
             args.host,
             args.port,
+            # scene assets are served over http on the same port
+            process_request=process_request,
             max_size=50
             * 1024
             * 1024,  # 50MB limit to support import of scenes or cards with assets
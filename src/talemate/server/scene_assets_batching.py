@@ -3,6 +3,8 @@ import traceback
 
 import structlog
 
+from talemate.server.asset_server import ASSET_SERVER
+
 log = structlog.get_logger("talemate.server.scene_assets_batching")
 
 
@@ -12,9 +14,14 @@ class SceneAssetsBatchingMixin:
     # Debounce window for batching scene asset requests (in seconds)
     SCENE_ASSETS_BATCH_WINDOW_SECONDS = 0.1
 
+    # Width of the thumbnail URL sent along with the asset URL
+    SCENE_ASSETS_THUMBNAIL_WIDTH = 256
+
     def _init_scene_assets_batching(self):
         """Initialize scene assets batching state."""
         self._scene_assets_pending_ids: set[str] = set()
+        # ids the frontend needs the asset bytes of (e.g., to edit the image)
+        self._scene_assets_pending_data_ids: set[str] = set()
         self._scene_assets_batch_handle: asyncio.Handle | None = None
         self._loop = asyncio.get_event_loop()
 
@@ -24,25 +31,39 @@ class SceneAssetsBatchingMixin:
             self._scene_assets_batch_handle.cancel()
             self._scene_assets_batch_handle = None
         self._scene_assets_pending_ids.clear()
+        self._scene_assets_pending_data_ids.clear()
+
+    def _send_scene_assets_immediate(self, asset_ids, data_ids=()):
+        """
+        Send scene assets immediately without batching.
 
-    def _send_scene_assets_immediate(self, asset_ids):
-        """Send scene assets immediately without batching."""
+        Assets are sent as paths of the asset endpoint, the base64 encoded
+        bytes are only included for `data_ids`.
+        """
         scene_assets = self.scene.assets
 
         try:
             for asset_id in asset_ids:
-                asset = scene_assets.get_asset_bytes_as_base64(asset_id)
-                if not asset:
+                if asset_id not in scene_assets.assets:
                     continue
 
-                self.queue_put(
-                    {
-                        "type": "scene_asset",
-                        "asset_id": asset_id,
-                        "asset": asset,
-                        "media_type": scene_assets.get_asset(asset_id).media_type,
-                    }
-                )
+                message = {
+                    "type": "scene_asset",
+                    "asset_id": asset_id,
+                    "media_type": scene_assets.get_asset(asset_id).media_type,
+                    "url": ASSET_SERVER.asset_url(asset_id),
+                    "thumbnail_url": ASSET_SERVER.asset_url(
+                        asset_id, self.SCENE_ASSETS_THUMBNAIL_WIDTH
+                    ),
+                }
+
+                if asset_id in data_ids:
+                    asset = scene_assets.get_asset_bytes_as_base64(asset_id)
+                    if not asset:
+                        continue
+                    message["asset"] = asset
+
+                self.queue_put(message)
         except Exception:
             log.error("_send_scene_assets_immediate", error=traceback.format_exc())
 
@@ -62,24 +83,32 @@ class SceneAssetsBatchingMixin:
 
         # Snapshot pending IDs and clear the set
         pending = list(self._scene_assets_pending_ids)
+        pending_data = set(self._scene_assets_pending_data_ids)
         self._scene_assets_pending_ids.clear()
+        self._scene_assets_pending_data_ids.clear()
         self._scene_assets_batch_handle = None
 
         # Send all pending assets
-        self._send_scene_assets_immediate(pending)
+        self._send_scene_assets_immediate(pending, pending_data)
 
-    def request_scene_assets(self, asset_ids: list[str] | None):
+    def request_scene_assets(
+        self, asset_ids: list[str] | None, include_data: bool = False
+    ):
         """
         Request scene assets with debounced batching.
 
         Multiple requests within SCENE_ASSETS_BATCH_WINDOW_SECONDS will be
         batched together and sent once after the window expires.
+
+        `include_data` sends the base64 encoded asset along with its URLs.
         """
         if not asset_ids:
             return
 
         # Add all requested IDs to the pending set (deduplicates automatically)
         self._scene_assets_pending_ids.update(asset_ids)
+        if include_data:
+            self._scene_assets_pending_data_ids.update(asset_ids)
 
         # If no batch timer is active, schedule a flush
         if (
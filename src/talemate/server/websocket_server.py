@@ -14,7 +14,8 @@ from talemate.config import get_config, Config
 from talemate.context import ActiveScene
 from talemate.emit import Emission, Receiver, abort_wait_for_input, emit
 import talemate.emit.async_signals as async_signals
-from talemate.files import list_scenes_directory
+from talemate.files import iter_scenes_directory
+from talemate.history import strip_entry_caches
 from talemate.load import load_scene, SceneInitialization
 from talemate.scene_assets import Asset, get_media_type_from_file_path, VIS_TYPE
 from talemate.server import (
@@ -31,6 +32,7 @@ from talemate.server import (
     prompts,
     scene_assets as scene_assets_plugin,
 )
+from talemate.server.asset_server import ASSET_SERVER
 from talemate.server.scene_assets_batching import SceneAssetsBatchingMixin
 
 __all__ = [
@@ -606,32 +608,28 @@ class WebsocketHandler(SceneAssetsBatchingMixin, Receiver):
 
         return file_bytes
 
-    def request_scenes_list(self, query: str = "", list_images: bool = True):
-        scenes_list = list_scenes_directory(list_images=list_images)
-
-        if query:
-            filtered_list = [
-                scene for scene in scenes_list if query.lower() in scene.lower()
-            ]
-        else:
-            filtered_list = scenes_list
-
-        self.queue_put(
-            {
-                "type": "scenes_list",
-                "data": [
-                    {
-                        "path": scene,
-                        "label": "/".join(scene.split("/")[-2:]),
-                    }
-                    for scene in filtered_list
-                    if not os.path.isdir(scene)
-                ],
-            }
-        )
+    async def request_scenes_list(self, query: str = "", list_images: bool = True):
+        # searched in the scene library index, matching path, title and
+        # character names. The last index is sent right away, followed by an
+        # updated list if the refresh found changes.
+        async for scenes_list in iter_scenes_directory(
+            list_images=list_images, query=query
+        ):
+            self.queue_put(
+                {
+                    "type": "scenes_list",
+                    "data": [
+                        {
+                            "path": scene,
+                            "label": "/".join(scene.split("/")[-2:]),
+                        }
+                        for scene in scenes_list
+                    ],
+                }
+            )
 
     def request_scene_history(self):
-        history = [archived_history for archived_history in self.scene.archived_history]
+        history = strip_entry_caches(self.scene.archived_history)
 
         self.queue_put(
             {
@@ -645,7 +643,8 @@ class WebsocketHandler(SceneAssetsBatchingMixin, Receiver):
 
     def request_file_image_data(self, file_path: str):
         """
-        Read an image file from the given path and return it as a base64 data URL.
+        Sends the URL of an image file at the given path, other files are
+        sent as a base64 data URL.
         Used for displaying image previews when loading character cards from file paths.
         """
         try:
@@ -671,6 +670,18 @@ class WebsocketHandler(SceneAssetsBatchingMixin, Receiver):
                 )
                 return
 
+            # images are loaded by the frontend from the asset endpoint
+            if media_type.startswith("image/"):
+                self.queue_put(
+                    {
+                        "type": "file_image_data",
+                        "file_path": file_path,
+                        "url": ASSET_SERVER.file_url(file_path),
+                        "media_type": media_type,
+                    }
+                )
+                return
+
             # Read file and encode as base64
             with open(file_path, "rb") as f:
                 file_bytes = f.read()
@@ -29,6 +29,8 @@ log = structlog.get_logger("talemate.server.world_state_manager.history")
 
 class RegenerateHistoryPayload(pydantic.BaseModel):
     generation_options: world_state_templates.GenerationOptions | None = None
+    concurrent: bool = False
+    analyze_termination: bool = True
 
 
 class HistoryEntryPayload(pydantic.BaseModel):
@@ -119,6 +121,8 @@ class HistoryMixin:
                 self.scene,
                 callback=callback,
                 generation_options=payload.generation_options,
+                concurrent=payload.concurrent,
+                analyze_termination=payload.analyze_termination,
             )
         )
 
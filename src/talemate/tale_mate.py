@@ -1,4 +1,6 @@
 import asyncio
+import bisect
+import heapq
 import json
 import os
 import re
@@ -33,6 +35,8 @@ from talemate.exceptions import (
 from talemate.game.state import GameState
 from talemate.scene_assets import SceneAssets
 from talemate.scene.episodes import EpisodesManager
+from talemate.scene.history import SceneHistory
+from talemate.scene.history_cache import HistoryTokenCache
 from talemate.scene_message import (
     CharacterMessage,
     DirectorMessage,
@@ -50,7 +54,7 @@ from talemate.game.engine.nodes.core import GraphState
 from talemate.game.engine.nodes.layout import load_graph
 from talemate.game.engine.nodes.packaging import initialize_packages
 from talemate.scene.intent import SceneIntent
-from talemate.history import emit_archive_add, ArchiveEntry
+from talemate.history import emit_archive_add, ArchiveEntry, strip_entry_caches
 from talemate.character import Character
 from talemate.game.engine.context_id.character import (
     CharacterContext,
@@ -132,7 +136,8 @@ class Scene(Emitter):
     def __init__(self):
         self.actors = []
         self.helpers = []
-        self.history = []
+        self.history = SceneHistory()
+        self.history_token_cache = HistoryTokenCache()
         self.archived_history = []
         self.character_data = {}
         self.active_characters = []
@@ -331,6 +336,16 @@ class Scene(Emitter):
 
         return self._save_files
 
+    @property
+    def history(self) -> SceneHistory:
+        return self._history
+
+    @history.setter
+    def history(self, messages: list[SceneMessage]):
+        if not isinstance(messages, SceneHistory):
+            messages = SceneHistory(messages)
+        self._history = messages
+
     @property
     def num_history_entries(self):
         return len(self.history)
@@ -397,6 +412,10 @@ class Scene(Emitter):
         # deprecated; always False for compatibility
         return False
 
+    @property
+    def compact_scene_files(self) -> bool:
+        return self.config.game.general.compact_scene_files
+
     @property
     def auto_progress(self) -> bool:
         return self.config.game.general.auto_progress
@@ -603,11 +622,8 @@ class Scene(Emitter):
                         meta=message.meta,
                     )
                     continue
-                for idx in range(len(self.history) - 1, -1, -1):
-                    if (
-                        isinstance(self.history[idx], DirectorMessage)
-                        and self.history[idx].source == message.source
-                    ):
+                for idx in reversed(self.history.positions_of_type("director")):
+                    if self.history[idx].source == message.source:
                         self.history.pop(idx)
                         break
 
@@ -649,9 +665,9 @@ class Scene(Emitter):
                 return False
             return True
         elif isinstance(message, int):
-            message = self.find_message(message)
-            if message:
-                self.history.remove(message)
+            idx = self.history.index_of(message)
+            if idx != -1:
+                self.history.pop(idx)
                 return True
             return False
         else:
@@ -672,7 +688,13 @@ class Scene(Emitter):
         """
         iterations = 0
 
-        if not reverse:
+        if not max_iterations:
+            # without an iteration limit only messages of the requested type
+            # need to be visited
+            iter_range = list(self.history.positions_of_type(typ))
+            if not reverse:
+                iter_range.reverse()
+        elif not reverse:
             iter_range = range(len(self.history) - 1, -1, -1)
         else:
             iter_range = range(len(self.history))
@@ -710,64 +732,57 @@ class Scene(Emitter):
             if max_iterations and iterations >= max_iterations:
                 break
 
-        for message in to_remove:
+        # remove from the back so positions stay valid
+        for message in sorted(
+            to_remove, key=lambda m: self.history.index_of(m.id), reverse=True
+        ):
             self.history.remove(message)
 
     def find_message(self, typ: str, max_iterations: int = 100, **filters):
         """
         Finds the last message in the history that matches the given typ and source
         """
-        iterations = 0
-        for idx in range(len(self.history) - 1, -1, -1):
+        history_len = len(self.history)
+        for idx in reversed(self.history.positions_of_type(typ)):
             message: SceneMessage = self.history[idx]
 
-            iterations += 1
-            if iterations >= max_iterations:
+            # every message visited counts towards max_iterations
+            if history_len - idx >= max_iterations:
                 return None
 
-            if message.typ != typ:
-                continue
-
             for filter_name, filter_value in filters.items():
                 if getattr(message, filter_name, None) != filter_value:
                     continue
 
-            return self.history[idx]
+            return message
 
     def message_index(self, message_id: int) -> int:
         """
         Returns the index of the given message in the history
         """
-        for idx in range(len(self.history) - 1, -1, -1):
-            if self.history[idx].id == message_id:
-                return idx
-        return -1
+        return self.history.index_of(message_id)
 
     def get_message(self, message_id: int) -> SceneMessage:
         """
         Returns the message in the history with the given id
         """
-        for idx in range(len(self.history) - 1, -1, -1):
-            if self.history[idx].id == message_id:
-                return self.history[idx]
+        return self.history.get_by_id(message_id)
 
     def last_player_message(self) -> str:
         """
         Returns the last message from the player
         """
-        for idx in range(len(self.history) - 1, -1, -1):
-            if isinstance(self.history[idx], CharacterMessage):
-                if self.history[idx].source == "player":
-                    return self.history[idx]
+        for idx in reversed(self.history.positions_of_type("character")):
+            if self.history[idx].source == "player":
+                return self.history[idx]
 
     def last_message_by_character(self, character_name: str) -> SceneMessage:
         """
         Returns the last message from the given character
         """
-        for idx in range(len(self.history) - 1, -1, -1):
-            if isinstance(self.history[idx], CharacterMessage):
-                if self.history[idx].character_name == character_name:
-                    return self.history[idx]
+        positions = self.history.positions_of_character(character_name)
+        if positions:
+            return self.history[positions[-1]]
 
     def count_character_messages_since_director(
         self,
@@ -784,23 +799,25 @@ class Scene(Emitter):
 
         Returns 0 if no director message is found within max_iterations.
         """
-        count = 0
-        for idx in range(len(self.history) - 1, -1, -1):
-            if max_iterations is not None and idx < len(self.history) - max_iterations:
-                break
+        history = self.history
+        lowest_idx = 0
+        if max_iterations is not None:
+            lowest_idx = max(len(history) - max_iterations, 0)
 
-            message = self.history[idx]
+        if stop_on_time_passage:
+            time_positions = history.positions_of_type("time")
+            if time_positions:
+                lowest_idx = max(lowest_idx, time_positions[-1] + 1)
 
-            if isinstance(message, TimePassageMessage) and stop_on_time_passage:
+        for idx in reversed(history.positions_of_type("director")):
+            if idx < lowest_idx:
                 break
 
-            if isinstance(message, DirectorMessage):
-                if message.character_name == character_name:
-                    return count
-
-            if isinstance(message, CharacterMessage):
-                if message.character_name == character_name:
-                    count += 1
+            if history[idx].character_name == character_name:
+                character_positions = history.positions_of_character(character_name)
+                return len(character_positions) - bisect.bisect_right(
+                    character_positions, idx
+                )
 
         return 0  # No director message found
 
@@ -831,6 +848,16 @@ class Scene(Emitter):
         if not isinstance(typ, list):
             typ = [typ]
 
+        if not on_iterate:
+            return self._last_message_of_type_indexed(
+                typ,
+                source=source,
+                max_iterations=max_iterations,
+                stop_on_time_passage=stop_on_time_passage,
+                count_only_types=count_only_types,
+                **filters,
+            )
+
         num_iterations = 0
 
         for idx in range(len(self.history) - 1, -1, -1):
@@ -863,6 +890,67 @@ class Scene(Emitter):
             if valid:
                 return message
 
+    def _last_message_of_type_indexed(
+        self,
+        typ: list[str],
+        source: str = None,
+        max_iterations: int = None,
+        stop_on_time_passage: bool = False,
+        count_only_types: list[str] = None,
+        **filters,
+    ) -> SceneMessage | None:
+        """
+        Same as `last_message_of_type` (without `on_iterate`) but only visits
+        candidate messages using the history type index.
+        """
+        history = self.history
+        history_len = len(history)
+
+        lowest_idx = 0
+        if stop_on_time_passage:
+            time_positions = history.positions_of_type("time")
+            if time_positions:
+                # the time passage message itself stops the search as well
+                lowest_idx = time_positions[-1] + 1
+
+        candidates = heapq.merge(
+            *[reversed(history.positions_of_type(t)) for t in set(typ)],
+            reverse=True,
+        )
+
+        for idx in candidates:
+            if idx < lowest_idx:
+                return None
+
+            if max_iterations is not None:
+                if count_only_types is None:
+                    num_iterations = history_len - 1 - idx
+                else:
+                    num_iterations = sum(
+                        history.count_of_type_after(t, idx)
+                        for t in set(count_only_types)
+                    )
+                if num_iterations >= max_iterations:
+                    return None
+
+            message = history[idx]
+
+            if source and message.source != source:
+                continue
+
+            valid = True
+
+            for filter_name, filter_value in filters.items():
+                message_value = getattr(message, filter_name, None)
+                if message_value != filter_value:
+                    valid = False
+                    break
+
+            if valid:
+                return message
+
+        return None
+
     def collect_messages(
         self,
         typ: str | list[str] = None,
@@ -966,11 +1054,7 @@ class Scene(Emitter):
         await emit_archive_add(self, entry)
         emit(
             "archived_history",
-            data={
-                "history": [
-                    archived_history for archived_history in self.archived_history
-                ]
-            },
+            data={"history": strip_entry_caches(self.archived_history)},
         )
 
     def edit_message(self, message_id: int, message: str):
@@ -978,12 +1062,12 @@ class Scene(Emitter):
         Finds the message in `history` by its id and will update its contents
         """
 
-        for i, _message in enumerate(self.history):
-            if _message.id == message_id:
-                self.history[i].message = message
-                emit("message_edited", self.history[i], id=message_id)
-                self.log.info("Message edited", message=message, id=message_id)
-                return
+        _message = self.history.get_by_id(message_id)
+        if _message:
+            _message.message = message
+            self.history.message_edited(_message)
+            emit("message_edited", _message, id=message_id)
+            self.log.info("Message edited", message=message, id=message_id)
 
     async def add_actor(self, actor: Actor, commit_to_memory: bool = True):
         """
@@ -1196,22 +1280,26 @@ class Scene(Emitter):
         """
         Counts the number of messages in the history that match the given message_type and source
         If no message_type or source is given, will return the total number of messages in the history
+
+        Answered from the history indexes, unloaded messages stay unloaded.
         """
 
-        count = 0
+        history = self.history
 
-        for message in self.history:
-            if message_type and message.typ != message_type:
-                continue
-            if (
-                source
-                and message.source != source
-                and message.secondary_source != source
-            ):
-                continue
-            count += 1
+        if message_type:
+            positions = history.positions_of_type(message_type)
+        else:
+            positions = range(len(history))
+
+        if not source:
+            return len(positions)
 
-        return count
+        return sum(
+            1
+            for idx in positions
+            if source
+            in (history.peek(idx, "source"), history.peek(idx, "secondary_source"))
+        )
 
     def context_history(self, budget: int = 8192, **kwargs):
         return get_agent("summarizer").context_history(self, budget, **kwargs)
@@ -1221,17 +1309,15 @@ class Scene(Emitter):
         Delete a message from the history
         """
         log.debug(f"Deleting message {message_id}")
-        for i, message in enumerate(self.history):
-            if message.id == message_id:
-                self.history.pop(i)
-                log.info(f"Deleted message {message_id}")
-                emit("remove_message", "", id=message_id)
-
-                if isinstance(message, TimePassageMessage):
-                    self.sync_time()
-                    self.emit_status()
+        idx = self.history.index_of(message_id)
+        if idx != -1:
+            message = self.history.pop(idx)
+            log.info(f"Deleted message {message_id}")
+            emit("remove_message", "", id=message_id)
 
-                break
+            if isinstance(message, TimePassageMessage):
+                self.sync_time()
+                self.emit_status()
 
     def can_auto_save(self):
         """
@@ -1456,9 +1542,8 @@ class Scene(Emitter):
         # store time jumps by index
         time_jumps = []
 
-        for idx, message in enumerate(self.history):
-            if isinstance(message, TimePassageMessage):
-                time_jumps.append((idx, message.ts))
+        for idx in self.history.positions_of_type(TimePassageMessage.typ):
+            time_jumps.append((idx, self.history[idx].ts))
 
         # now make the timejumps cumulative, meaning that each time jump
         # will be the sum of all time jumps up to that point
@@ -1770,10 +1855,7 @@ class Scene(Emitter):
 
         if save_as:
             self.immutable_save = False
-            memory_agent = get_agent("memory")
-            memory_agent.close_db(self)
-            self.memory_id = str(uuid.uuid4())[:10]
-            await self.commit_to_memory()
+            await self.switch_memory_id()
 
         self.set_new_memory_session_id()
 
@@ -1784,14 +1866,20 @@ class Scene(Emitter):
         # Generate filename with date and normalized character name
         filepath = os.path.join(saves_dir, self.filename)
 
-        # Create a dictionary to store the scene data
-        scene_data = self.serialize
+        # Create a dictionary to store the scene data, encoding and writing
+        # it happens in a worker thread so it has to be a snapshot
+        scene_data = save.snapshot_scene_data(self.serialize)
 
         if not auto:
             emit("status", status="success", message="Saved scene")
 
-        with open(filepath, "w") as f:
-            json.dump(scene_data, f, indent=2, cls=save.SceneEncoder)
+        await save.SCENE_FILE_WRITER.write(
+            filepath, scene_data, compact=self.compact_scene_files
+        )
+
+        self.history_token_cache.save(
+            HistoryTokenCache.path_for(filepath), scene_ts=self.ts
+        )
 
         self.saved = True
 
@@ -1818,14 +1906,15 @@ class Scene(Emitter):
         memory_sesion_id will be randomized
         """
 
-        serialized = self.serialize
+        serialized = save.snapshot_scene_data(self.serialize)
         serialized["immutable_save"] = True
         serialized["memory_session_id"] = str(uuid.uuid4())[:10]
         serialized["saved_memory_session_id"] = self.memory_session_id
         serialized["memory_id"] = str(uuid.uuid4())[:10]
         filepath = os.path.join(self.save_dir, filename)
-        with open(filepath, "w") as f:
-            json.dump(serialized, f, indent=2, cls=save.SceneEncoder)
+        await save.SCENE_FILE_WRITER.write(
+            filepath, serialized, compact=self.compact_scene_files
+        )
 
     async def add_to_recent_scenes(self):
         log.debug("add_to_recent_scenes", filename=self.filename)
@@ -1834,13 +1923,13 @@ class Scene(Emitter):
         await config.set_dirty()
 
     async def commit_to_memory(self):
-        # will recommit scene to long term memory
+        # will sync the scene to long term memory, only documents that are
+        # new or changed since the last commit are embedded
 
         memory = get_agent("memory")
-        memory.drop_db()
         await memory.set_db()
 
-        archive_entries = []
+        documents = []
 
         for ah in self.archived_history:
             ts = ah.get("ts", "PT1S")
@@ -1854,7 +1943,7 @@ class Scene(Emitter):
             entry = ArchiveEntry(**ah)
 
             # await emit_archive_add(self, entry)
-            archive_entries.append(
+            documents.append(
                 {
                     "id": entry.id,
                     "text": entry.text,
@@ -1865,13 +1954,29 @@ class Scene(Emitter):
                 }
             )
 
-        if archive_entries:
-            await memory.add_many(archive_entries)
+        for character in self.characters:
+            documents.extend(character.memory_documents())
+
+        documents.extend(self.world_state.memory_documents())
+
+        await memory.sync_many(documents)
 
         for character in self.characters:
-            await character.commit_to_memory(memory)
+            character.memory_dirty = False
+
+    async def switch_memory_id(self):
+        """
+        Moves the scene to a new memory database.
 
-        await self.world_state.commit_to_memory(memory)
+        The new database starts out as a copy of the current one, so
+        committing the scene to it only embeds what changed.
+        """
+        memory_agent = get_agent("memory")
+        memory_id = str(uuid.uuid4())[:10]
+        await memory_agent.copy_db(memory_id)
+        memory_agent.close_db(self)
+        self.memory_id = memory_id
+        await self.commit_to_memory()
 
     def reset(self):
         # remove messages
@@ -1893,10 +1998,7 @@ class Scene(Emitter):
         self.actors = []
 
     async def reset_memory(self):
-        memory_agent = get_agent("memory")
-        memory_agent.close_db(self)
-        self.memory_id = str(uuid.uuid4())[:10]
-        await self.commit_to_memory()
+        await self.switch_memory_id()
 
         self.set_new_memory_session_id()
 
@@ -1987,8 +2089,10 @@ class Scene(Emitter):
             "title": scene.title,
             "history": scene.history,
             "environment": scene.environment,
-            "archived_history": scene.archived_history,
-            "layered_history": scene.layered_history,
+            "archived_history": strip_entry_caches(scene.archived_history),
+            "layered_history": [
+                strip_entry_caches(layer) for layer in scene.layered_history
+            ],
             "character_data": {
                 name: character.model_dump()
                 for name, character in scene.character_data.items()
@@ -1,4 +1,6 @@
 import re
+import weakref
+from collections import OrderedDict
 from typing import Callable
 
 import structlog
@@ -39,6 +41,125 @@ def count_tokens(source):
     return t
 
 
+class TokenCountCache:
+    """
+    LRU cache for token counts.
+
+    Plain text is keyed by the text itself, scene messages are keyed by
+    message id, revision and the format / mode they were rendered in. Cached
+    message entries also store the rendered text, so edits to a message
+    (which keep the id and revision) are detected and re-counted.
+
+    Entries are kept per counting function so that counts produced by
+    different tokenizers never mix. The counting function should be a
+    long-lived callable (module level function or tokenizer), entries are
+    dropped once it is garbage collected, or when its `revision` attribute
+    changes (tokenizers bump it once estimated counts became exact).
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.texts = weakref.WeakKeyDictionary()
+        self.messages = weakref.WeakKeyDictionary()
+        self.revisions = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def _store(
+        self, stores: weakref.WeakKeyDictionary, count_fn: Callable
+    ) -> OrderedDict:
+        revision = getattr(count_fn, "revision", None)
+        if self.revisions.get(count_fn, revision) != revision:
+            self.texts.pop(count_fn, None)
+            self.messages.pop(count_fn, None)
+        self.revisions[count_fn] = revision
+
+        store = stores.get(count_fn)
+        if store is None:
+            store = stores[count_fn] = OrderedDict()
+        return store
+
+    def _put(self, store: OrderedDict, key, value):
+        store[key] = value
+        if len(store) > self.max_size:
+            store.popitem(last=False)
+
+    def count(self, source, count_fn: Callable | None = None) -> int:
+        """
+        Cached equivalent of `count_tokens`.
+
+        Lists are counted as the sum of their items.
+        """
+        count_fn = count_fn or count_tokens
+
+        if isinstance(source, list):
+            return sum(self.count(item, count_fn) for item in source)
+
+        if not isinstance(source, (str, SceneMessage)):
+            return count_fn(source)
+
+        text = str(source)
+        store = self._store(self.texts, count_fn)
+        tokens = store.get(text)
+        if tokens is not None:
+            self.hits += 1
+            store.move_to_end(text)
+            return tokens
+
+        self.misses += 1
+        tokens = count_fn(text)
+        self._put(store, text, tokens)
+        return tokens
+
+    def count_message(
+        self,
+        message: SceneMessage,
+        format: str | None = None,
+        mode: str | None = None,
+        count_fn: Callable | None = None,
+    ) -> tuple[str, int]:
+        """
+        Returns the message rendered in the given format (or `str(message)` if
+        no format is given) and its token count.
+        """
+        count_fn = count_fn or count_tokens
+
+        if format is None:
+            text = str(message)
+        else:
+            text = message.as_format(format, mode=mode)
+
+        key = (message.id, message.rev, format, mode)
+        store = self._store(self.messages, count_fn)
+        cached = store.get(key)
+        if cached is not None and cached[0] == text:
+            self.hits += 1
+            store.move_to_end(key)
+            return text, cached[1]
+
+        self.misses += 1
+        tokens = count_fn(text)
+        self._put(store, key, (text, tokens))
+        return text, tokens
+
+    def clear(self):
+        self.texts.clear()
+        self.messages.clear()
+        self.revisions.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+TOKEN_COUNT_CACHE = TokenCountCache()
+
+
+def count_tokens_cached(source, count_fn: Callable | None = None) -> int:
+    """
+    Same as `count_tokens` but backed by the process-wide token count cache.
+    """
+    return TOKEN_COUNT_CACHE.count(source, count_fn)
+
+
 def limit_tokens(text: str, limit: int) -> str:
     """
     separate by linebreaks and pop off chunks until the total number of tokens is less than or equal to the limit.
@@ -122,6 +243,65 @@ def chunk_items_by_tokens(
         yield current_chunk
 
 
+def pack_items_by_tokens(
+    items: list,
+    max_tokens: int,
+    count_fn: Callable | None = None,
+    separator_tokens: int = 0,
+    min_items: int = 1,
+    overflow: bool = False,
+):
+    """
+    Generator that packs consecutive items into chunks of up to max_tokens.
+
+    Each item is counted once and the chunk size is kept as a running total,
+    so packing is linear in the number of items. Pass a `count_fn` that
+    returns a precomputed / cached count to avoid tokenizing at all.
+
+    Args:
+        items: List of items to pack
+        max_tokens: Token budget per chunk
+        count_fn: Function to count tokens for an item (default: count_tokens)
+        separator_tokens: Tokens added between two items of a chunk, e.g. the
+            count of the separator the items are joined with
+        min_items: A chunk is never closed with fewer items than this
+        overflow: If True the item that reaches max_tokens is still added
+            to the chunk (the chunk is closed once it is at or above
+            max_tokens), otherwise the chunk is closed before an item that
+            would exceed max_tokens
+
+    Yields:
+        tuple[list, int]: The chunk and its token count. The last chunk holds
+        the remaining items and may be below max_tokens.
+    """
+    count_fn = count_fn or count_tokens
+
+    chunk = []
+    chunk_tokens = 0
+
+    for item in items:
+        item_tokens = count_fn(item)
+
+        if chunk and len(chunk) >= min_items:
+            if overflow:
+                full = chunk_tokens >= max_tokens
+            else:
+                full = chunk_tokens + separator_tokens + item_tokens > max_tokens
+
+            if full:
+                yield chunk, chunk_tokens
+                chunk = []
+                chunk_tokens = 0
+
+        if chunk:
+            chunk_tokens += separator_tokens
+        chunk.append(item)
+        chunk_tokens += item_tokens
+
+    if chunk:
+        yield chunk, chunk_tokens
+
+
 def remove_substring_names(names: list[str]) -> list[str]:
     """
     Remove shorter names that appear as whole words within longer names.
@@ -1,11 +1,12 @@
 import asyncio
 import structlog
 from functools import wraps
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional
 
 __all__ = [
     "cleanup_pending_tasks",
     "debounce",
+    "gather_limited",
     "shared_debounce",
 ]
 
@@ -133,3 +134,37 @@ async def cleanup_pending_tasks():
     # Wait for them to finish
     if pending:
         await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def gather_limited(
+    factories: list[Callable[[], Awaitable[Any]]],
+    limit: int,
+    on_done: Callable[[int, Any], None] | None = None,
+) -> list[Any]:
+    """
+    Runs the awaitables created by `factories` with at most `limit` of them
+    running at once and returns their results in order.
+
+    `on_done(index, result)` is called as each one completes. If one fails
+    the others are cancelled and the exception is raised.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(index: int, factory: Callable[[], Awaitable[Any]]) -> Any:
+        async with semaphore:
+            result = await factory()
+        if on_done:
+            on_done(index, result)
+        return result
+
+    tasks = [
+        asyncio.create_task(run(i, factory)) for i, factory in enumerate(factories)
+    ]
+
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,55 @@
+import os
+import stat
+import tempfile
+
+__all__ = ["write_file_atomic"]
+
+
+def _read_umask() -> int:
+    # the umask can only be read by setting it, this is done once at import
+    # since changing it is not thread safe
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+UMASK = _read_umask()
+
+
+def _file_mode(path: str) -> int:
+    """
+    Mode for a file written to `path`: the mode of the existing file, or the
+    default mode of a new file.
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+
+def write_file_atomic(path: str | os.PathLike, content: bytes):
+    """
+    Writes `content` to a temporary file next to `path` and renames it into
+    place, so a crash mid-write never leaves a truncated file behind.
+
+    The file keeps the mode of the file it replaces (new files get the
+    default mode), temporary files would otherwise leave it owner-only.
+    """
+    path = os.fspath(path)
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
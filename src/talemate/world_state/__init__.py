@@ -571,23 +571,26 @@ class WorldState(BaseModel):
         )
 
     async def commit_to_memory(self, memory_agent):
+        await memory_agent.add_many(self.memory_documents())
+
+    def memory_documents(self) -> list[dict]:
+        """
+        Returns the manual context entries as memory agent documents
+        """
+
         def is_simple_type(value):
             """Check if value is a simple type that memory database accepts."""
             return isinstance(value, (int, str, float, bool, type(None)))
 
-        await memory_agent.add_many(
-            [
-                {
-                    **manual_context.model_dump(),
-                    "meta": {
-                        k: v
-                        for k, v in manual_context.meta.items()
-                        if is_simple_type(v)
-                    },
-                }
-                for manual_context in self.manual_context.values()
-            ]
-        )
+        return [
+            {
+                **manual_context.model_dump(),
+                "meta": {
+                    k: v for k, v in manual_context.meta.items() if is_simple_type(v)
+                },
+            }
+            for manual_context in self.manual_context.values()
+        ]
 
     def manual_context_for_world(self) -> dict[str, ManualContext]:
         """
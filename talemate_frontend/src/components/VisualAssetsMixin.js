@@ -11,10 +11,10 @@
  *   - character: object with name property
  * 
  * Provides:
- * - base64ById: data property for caching loaded asset base64 data
+ * - base64ById: data property for caching loaded assets (asset URL, or base64 data)
  * - assetsMap: computed property for accessing scene assets
  * - isDragging: data property for drag state
- * - getAssetSrc(assetId): method to generate data URL for an asset
+ * - getAssetSrc(assetId): method to generate the image src for an asset
  * - loadAssets(assetIds): method to request missing asset data
  * - handleSceneAssetMessage(data): method to process scene_asset websocket messages
  * - onDragOver(e): drag handler method
@@ -29,6 +29,8 @@
  * - saveGeneratedImage(base64, request, namePrefix): method to save generated image as scene asset
  */
 
+import { assetSrc, sceneAssetThumbnailValue, sceneAssetValue } from '../utils/assetSrc.js';
+
 /**
  * Creates a scene assets requester that batches and debounces asset requests.
  * 
@@ -104,6 +106,7 @@ export default {
     data() {
         return {
             base64ById: {},
+            thumbnailById: {},
             isDragging: false,
         }
     },
@@ -114,11 +117,14 @@ export default {
     },
     methods: {
         getAssetSrc(assetId) {
-            const base64 = this.base64ById[assetId];
-            if (!base64) return '';
             const asset = this.assetsMap[assetId];
-            const mediaType = asset?.media_type || 'image/png';
-            return `data:${mediaType};base64,${base64}`;
+            return assetSrc(this.base64ById[assetId], asset?.media_type);
+        },
+
+        getAssetThumbnailSrc(assetId) {
+            const asset = this.assetsMap[assetId];
+            const value = this.thumbnailById[assetId] || this.base64ById[assetId];
+            return assetSrc(value, asset?.media_type);
         },
         
         loadAssets(assetIds) {
@@ -130,9 +136,10 @@ export default {
         
         handleSceneAssetMessage(data) {
             if (data.type === 'scene_asset') {
-                const { asset_id, asset } = data;
+                const { asset_id } = data;
                 if (asset_id) {
-                    this.base64ById = { ...this.base64ById, [asset_id]: asset };
+                    this.base64ById = { ...this.base64ById, [asset_id]: sceneAssetValue(data) };
+                    this.thumbnailById = { ...this.thumbnailById, [asset_id]: sceneAssetThumbnailValue(data) };
                 }
             }
         },
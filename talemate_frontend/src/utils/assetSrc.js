@@ -0,0 +1,59 @@
+import { backendHttpUrl } from './backendUrl.js';
+
+/**
+ * Scene assets are served by the backend over HTTP; `scene_asset` messages
+ * carry the asset `url` (and a `thumbnail_url`) as paths on the backend, the
+ * base64 encoded `asset` is only included when it was explicitly requested.
+ *
+ * Asset caches in the components hold either of those, these helpers turn a
+ * cached value into an image src.
+ */
+
+/**
+ * Returns an image src for a cached asset value: backend paths are resolved
+ * to backend URLs, URLs and data URLs are returned as they are, raw base64
+ * is wrapped in a data URL.
+ */
+export function assetSrc(value, mediaType = 'image/png') {
+    if (!value) return '';
+    // raw base64 of a jpeg starts with '/9j/', match the backend paths only
+    if (/^\/(assets|files)\//.test(value)) return backendHttpUrl(value);
+    if (/^(https?:|data:|blob:)/.test(value)) return value;
+    return `data:${mediaType};base64,${value}`;
+}
+
+/**
+ * Returns the value to cache for a `scene_asset` message.
+ */
+export function sceneAssetValue(message) {
+    return message.asset || message.url || null;
+}
+
+/**
+ * Returns the value to cache for a `scene_asset` message shown as a
+ * thumbnail (avatars, grids).
+ */
+export function sceneAssetThumbnailValue(message) {
+    return message.asset || message.thumbnail_url || message.url || null;
+}
+
+/**
+ * Resolves a cached asset value to a base64 data URL, fetching the asset
+ * from the backend if the value is a URL.
+ */
+export async function assetDataUrl(value, mediaType = 'image/png') {
+    const src = assetSrc(value, mediaType);
+    if (!src || src.startsWith('data:')) return src;
+
+    const response = await fetch(src);
+    if (!response.ok) {
+        throw new Error(`Could not load asset: ${response.status}`);
+    }
+    const blob = await response.blob();
+    return new Promise((resolve, reject) => {
+        const reader = new FileReader();
+        reader.onload = () => resolve(reader.result);
+        reader.onerror = () => reject(reader.error);
+        reader.readAsDataURL(blob);
+    });
+}
@@ -0,0 +1,31 @@
+/**
+ * URLs of the talemate backend.
+ *
+ * The websocket URL comes from `VITE_TALEMATE_BACKEND_WEBSOCKET_URL` or
+ * defaults to port 5050 on the host the frontend was loaded from. HTTP
+ * endpoints of the backend (scene assets, file previews) are served on the
+ * same host and port, with the scheme matching the websocket (ws -> http,
+ * wss -> https).
+ */
+
+/**
+ * Returns the URL of the backend websocket.
+ */
+export function backendWebsocketUrl() {
+    const envWebsocketUrl = import.meta.env.VITE_TALEMATE_BACKEND_WEBSOCKET_URL;
+    // Check if the env value is a valid URL (not a placeholder like ${VITE_...})
+    if (envWebsocketUrl && envWebsocketUrl.startsWith('ws')) {
+        return envWebsocketUrl;
+    }
+    return `ws://${window.location.hostname}:5050/ws`;
+}
+
+/**
+ * Resolves a path of a backend HTTP endpoint (e.g. `/assets/<id>`) to an
+ * absolute URL.
+ */
+export function backendHttpUrl(path) {
+    const url = new URL(path, backendWebsocketUrl());
+    url.protocol = url.protocol === 'wss:' ? 'https:' : 'http:';
+    return url.toString();
+}
@@ -0,0 +1,113 @@
+"""
+Benchmark for context history dialogue collection.
+
+Builds a synthetic 5,000 message scene and times `context_history` for
+several budgets, comparing the previous quadratic token accounting (re-counting
+the collected dialogue on every step) with the running-total accounting backed
+by the shared token count cache (cold and warm).
+
+Usage:
+    python tests/benchmarks/bench_context_history.py [num_messages]
+"""
+
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(_ROOT / "src"))
+sys.path.insert(0, str(_ROOT / "tests"))
+
+import structlog
+import yaml
+
+import talemate.config.state as config_state
+from talemate.agents.summarize.context_history import ContextHistoryParams
+from talemate.config.schema import Config
+from talemate.instance import get_agent
+from talemate.scene_message import CharacterMessage, NarratorMessage
+from talemate.util import TOKEN_COUNT_CACHE, count_tokens
+
+from conftest import MockScene, bootstrap_scene
+
+BUDGETS = [8192, 16384, 32768]
+
+WORDS = (
+    "the forest was quiet as the travelers moved along the ancient road "
+    "lantern light flickered across the stones while distant thunder rolled "
+    "she paused to listen and then turned back toward the village gate"
+).split()
+
+
+def use_example_config():
+    with open(_ROOT / "config.example.yaml", "r") as f:
+        config_state.CONFIG = Config.model_validate(yaml.safe_load(f) or {})
+
+
+def make_scene(num_messages: int) -> MockScene:
+    rng = random.Random(42)
+    scene = MockScene()
+    bootstrap_scene(scene)
+    for i in range(num_messages):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120)))
+        if i % 3 == 2:
+            scene.history.append(NarratorMessage(message=text))
+        else:
+            name = "Elena" if i % 2 else "Marcus"
+            scene.history.append(CharacterMessage(message=f'{name}: "{text}"'))
+    return scene
+
+
+def legacy_collect_dialogue(scene, budget: int) -> list[str]:
+    """Reference implementation of the previous quadratic accounting."""
+    conversation_format = scene.conversation_format
+    mode = get_agent("director").actor_direction_mode
+    parts_dialogue = []
+    for i in range(len(scene.history) - 1, -1, -1):
+        message = scene.history[i]
+        if count_tokens(parts_dialogue) + count_tokens(message) > budget:
+            break
+        parts_dialogue.insert(0, message.as_format(conversation_format, mode=mode))
+    return parts_dialogue
+
+
+def timed(fn, *args, **kwargs) -> tuple[float, object]:
+    t_start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - t_start, result
+
+
+def main(num_messages: int = 5000):
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+    use_example_config()
+    scene = make_scene(num_messages)
+    summarizer = get_agent("summarizer")
+    collect = summarizer._context_history_collect_dialogue
+    params = ContextHistoryParams()
+
+    print(f"scene: {num_messages} messages")
+    for budget in BUDGETS:
+        legacy_time, legacy = timed(legacy_collect_dialogue, scene, budget)
+
+        TOKEN_COUNT_CACHE.clear()
+        cold_time, (parts, *_) = timed(collect, scene, budget, params)
+        warm_time, _ = timed(collect, scene, budget, params)
+        history_time, _ = timed(summarizer.context_history, scene, budget)
+
+        assert parts == legacy, "dialogue collection differs from reference"
+
+        print(
+            f"budget {budget:>6}: {len(parts):>4} messages | "
+            f"legacy {legacy_time * 1000:8.1f} ms | "
+            f"cold {cold_time * 1000:7.1f} ms | "
+            f"warm {warm_time * 1000:6.2f} ms | "
+            f"context_history {history_time * 1000:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
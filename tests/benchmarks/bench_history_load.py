@@ -0,0 +1,105 @@
+"""
+Benchmark for loading the scene history.
+
+Serializes synthetic scenes of 10,000 and 100,000 messages and times turning
+the parsed history into scene messages, once eagerly (every message) and once
+lazily (only the recent window). Json parsing is timed separately. For the
+lazy history it also times walking back over the recent window, as context
+building does, and finally materializing all messages.
+
+Usage:
+    python tests/benchmarks/bench_history_load.py [num_messages ...]
+"""
+
+import json
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(_ROOT / "src"))
+
+import structlog
+
+from talemate.load import _load_history
+from talemate.save import SceneEncoder
+from talemate.scene.history import EAGER_LOAD_WINDOW
+from talemate.scene_message import (
+    CharacterMessage,
+    NarratorMessage,
+    TimePassageMessage,
+    reset_message_id,
+)
+
+SIZES = [10_000, 100_000]
+
+WORDS = (
+    "the forest was quiet as the travelers moved along the ancient road "
+    "lantern light flickered across the stones while distant thunder rolled "
+    "she paused to listen and then turned back toward the village gate"
+).split()
+
+
+def make_history(num_messages: int) -> str:
+    rng = random.Random(42)
+    history = []
+    for i in range(num_messages):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120)))
+        if i % 50 == 49:
+            history.append(TimePassageMessage(ts="PT1H", message="1 hour later"))
+        elif i % 3 == 2:
+            history.append(NarratorMessage(message=text, source="ai"))
+        else:
+            name = "Elena" if i % 2 else "Marcus"
+            history.append(CharacterMessage(message=f'{name}: "{text}"', source="ai"))
+    return json.dumps(history, cls=SceneEncoder)
+
+
+def timed(fn, *args, **kwargs) -> tuple[float, object]:
+    t_start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - t_start, result
+
+
+def load(serialized: str, eager: int) -> tuple[float, object]:
+    # loading modifies the parsed entries, parse them again for every run
+    data = json.loads(serialized)
+    reset_message_id()
+    return timed(_load_history, data, eager=eager)
+
+
+def walk_recent(history, num_messages: int = EAGER_LOAD_WINDOW * 2):
+    for idx, _ in enumerate(reversed(history)):
+        if idx == num_messages:
+            break
+
+
+def main(sizes: list[int]):
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+
+    for num_messages in sizes:
+        serialized = make_history(num_messages)
+        parse_time, _ = timed(json.loads, serialized)
+        eager_time, eager = load(serialized, num_messages)
+        lazy_time, lazy = load(serialized, EAGER_LOAD_WINDOW)
+        walk_time, _ = timed(walk_recent, lazy)
+        load_all_time, _ = timed(lazy.load_all)
+
+        assert [m.id for m in lazy] == [m.id for m in eager]
+
+        print(
+            f"{num_messages:>7} messages ({len(serialized) / 1e6:6.1f} MB) | "
+            f"json {parse_time * 1000:7.1f} ms | "
+            f"eager {eager_time * 1000:7.1f} ms | "
+            f"lazy {lazy_time * 1000:7.1f} ms | "
+            f"walk {EAGER_LOAD_WINDOW * 2} {walk_time * 1000:5.1f} ms | "
+            f"load_all {load_all_time * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
@@ -0,0 +1,110 @@
+"""
+Benchmark for packing layered history entries into chunks.
+
+Builds 10,000 synthetic archive entries and times splitting them into
+`max_process_tokens` sized chunks, comparing the previous packing (re-joining
+and re-counting the partial chunk for every entry that is added) with
+`util.pack_items_by_tokens` over the token counts cached on the entries (cold,
+then warm as on every later pass of the layered history update).
+
+Usage:
+    python tests/benchmarks/bench_layered_packing.py [num_entries] [max_tokens]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(_ROOT / "src"))
+
+from talemate.history import ArchiveEntry, entry_tokens
+from talemate.util import count_tokens, pack_items_by_tokens
+
+NUM_ENTRIES = 10_000
+MAX_TOKENS = 768
+
+WORDS = (
+    "the forest was quiet as the travelers moved along the ancient road "
+    "lantern light flickered across the stones while distant thunder rolled "
+    "she paused to listen and then turned back toward the village gate"
+).split()
+
+
+def make_entries(num_entries: int) -> list[dict]:
+    rng = random.Random(42)
+    return [
+        ArchiveEntry(
+            text=" ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 150))),
+            start=i * 10,
+            end=i * 10 + 9,
+        ).model_dump(exclude_none=True)
+        for i in range(num_entries)
+    ]
+
+
+def pack_joined(entries: list[dict], max_tokens: int) -> list[list[dict]]:
+    """
+    The previous packing: the partial chunk is joined and counted again
+    before every entry is added.
+    """
+    chunks = []
+    remaining = entries.copy()
+    while remaining:
+        partial = []
+        while (
+            remaining
+            and count_tokens("\n\n".join(entry["text"] for entry in partial))
+            < max_tokens
+        ):
+            partial.append(remaining.pop(0))
+        chunks.append(partial)
+    return chunks
+
+
+def pack_cached(entries: list[dict], max_tokens: int) -> list[list[dict]]:
+    return [
+        chunk
+        for chunk, _ in pack_items_by_tokens(
+            entries,
+            max_tokens,
+            count_fn=entry_tokens,
+            separator_tokens=count_tokens("\n\n"),
+            overflow=True,
+        )
+    ]
+
+
+def timed(fn, *args) -> tuple[float, object]:
+    t_start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t_start, result
+
+
+def main(num_entries: int, max_tokens: int):
+    entries = make_entries(num_entries)
+
+    joined_time, joined = timed(pack_joined, entries, max_tokens)
+    cold_time, cold = timed(pack_cached, entries, max_tokens)
+    warm_time, warm = timed(pack_cached, entries, max_tokens)
+
+    # counting the joined text may merge tokens across the separator, so the
+    # boundaries can differ slightly from the summed counts
+    matching = sum(
+        [e["end"] for e in a] == [e["end"] for e in b] for a, b in zip(joined, cold)
+    )
+    assert [len(chunk) for chunk in cold] == [len(chunk) for chunk in warm]
+
+    print(
+        f"{num_entries} entries, max {max_tokens} tokens | "
+        f"joined {joined_time * 1000:8.1f} ms ({len(joined)} chunks) | "
+        f"cached cold {cold_time * 1000:7.1f} ms ({len(cold)} chunks, "
+        f"{matching} identical) | "
+        f"cached warm {warm_time * 1000:6.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [NUM_ENTRIES, MAX_TOKENS][len(args) :]))
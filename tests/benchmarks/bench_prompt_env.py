@@ -0,0 +1,131 @@
+"""
+Benchmark for the cached prompt template environment.
+
+Renders narrator and conversation templates in a loop, once with the
+process-wide template environment cache enabled and once with it disabled.
+
+Usage:
+    python tests/benchmarks/bench_prompt_env.py [iterations]
+"""
+
+import logging
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock
+
+_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(_ROOT / "src"))
+sys.path.insert(0, str(_ROOT / "tests"))
+
+import structlog
+import yaml
+
+import talemate.config.state as config_state
+import talemate.instance as instance
+from talemate.agents.context import ActiveAgent
+from talemate.config.schema import Config
+from talemate.context import active_scene
+from talemate.prompts.base import TEMPLATE_ENV_CACHE, Prompt
+
+from prompts.helpers import (
+    create_base_context,
+    create_mock_character,
+    create_mock_scene,
+)
+
+TEMPLATES = [
+    "narrator.system",
+    "narrator.narrate-scene",
+    "narrator.narrate-progress",
+    "narrator.paraphrase",
+    "conversation.system",
+    "conversation.dialogue-movie_script",
+]
+
+
+def use_example_config():
+    with open(_ROOT / "config.example.yaml", "r") as f:
+        config_state.CONFIG = Config.model_validate(yaml.safe_load(f) or {})
+
+
+class DisabledActionConfig(dict):
+    """agent_config() lookups resolve to a disabled setting."""
+
+    def get(self, key, default=None):
+        return Mock(value=False)
+
+
+def mock_agents():
+    for agent_type in ("narrator", "conversation", "director", "editor"):
+        agent = Mock()
+        agent.agent_type = agent_type
+        agent.actions = {
+            action: Mock(config=DisabledActionConfig())
+            for action in ("content", "direct")
+        }
+        agent.rag_build = AsyncMock(return_value=[])
+        instance.AGENTS[agent_type] = agent
+    return instance.AGENTS["narrator"]
+
+
+def render_all(scene, iterations: int) -> float:
+    character = create_mock_character()
+    character.random_dialogue_examples = Mock(return_value=[])
+    vars = create_base_context(scene)
+    vars.update(
+        character=character,
+        talking_character=character,
+        main_character=character,
+        characters=[character],
+        formatted_names=character.name,
+        scene_and_dialogue=[],
+        scene_and_dialogue_budget=2048,
+        actor_instructions="",
+        actor_instructions_offset=3,
+        task_instructions="",
+        text="The wind picked up as the travelers reached the clearing.",
+    )
+
+    t_start = time.perf_counter()
+    for _ in range(iterations):
+        for uid in TEMPLATES:
+            Prompt.get(uid, vars=dict(vars)).render()
+    return time.perf_counter() - t_start
+
+
+def main(iterations: int = 50):
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+    use_example_config()
+    scene = create_mock_scene()
+    scene.count_messages = Mock(return_value=10)
+    token = active_scene.set(scene)
+    narrator = mock_agents()
+
+    try:
+        results = {}
+        with ActiveAgent(narrator, render_all):
+            for enabled in (False, True):
+                TEMPLATE_ENV_CACHE.clear()
+                TEMPLATE_ENV_CACHE.enabled = enabled
+                # warm up (bytecode cache, config)
+                render_all(scene, 1)
+                results[enabled] = render_all(scene, iterations)
+    finally:
+        TEMPLATE_ENV_CACHE.enabled = True
+        active_scene.reset(token)
+
+    renders = iterations * len(TEMPLATES)
+    for enabled, elapsed in results.items():
+        label = "cached" if enabled else "uncached"
+        print(
+            f"{label:>9}: {elapsed:.3f}s for {renders} renders "
+            f"({elapsed / renders * 1000:.2f} ms/render)"
+        )
+    print(f"  speedup: {results[False] / results[True]:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -105,6 +105,9 @@ class MockMemoryAgent(talemate.agents.memory.MemoryAgent):
     async def delete(self, filters: dict):
         pass
 
+    async def sync_many(self, items: list[dict]):
+        pass
+
 
 class MockScene(Scene):
     """Real Scene subclass with auto_progress forced on."""
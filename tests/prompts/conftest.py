@@ -135,6 +135,7 @@ def mock_llm_client():
     client.reason_enabled = False
     client.double_coercion = None
     client.name = "test-client"
+    client.max_concurrent_requests = 1
     return client
 
 
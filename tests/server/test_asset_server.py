@@ -0,0 +1,179 @@
+"""
+Tests for the HTTP asset endpoint served next to the websocket server.
+"""
+
+import hashlib
+import io
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import websockets
+from PIL import Image
+
+from talemate.server.asset_server import AssetServer, content_response
+
+
+def png_bytes(width: int = 800, height: int = 600) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class FakeAssets:
+    def __init__(self, directory):
+        self.directory = directory
+        self.assets = {}
+
+    def add(self, data: bytes) -> str:
+        asset_id = hashlib.sha256(data).hexdigest()
+        (self.directory / f"{asset_id}.png").write_bytes(data)
+        self.assets[asset_id] = SimpleNamespace(
+            id=asset_id, file_type="png", media_type="image/png"
+        )
+        return asset_id
+
+    def get_asset(self, asset_id):
+        return self.assets[asset_id]
+
+    def asset_path(self, asset_id):
+        return str(self.directory / f"{asset_id}.png")
+
+
+@pytest.fixture
+def scene(tmp_path):
+    assets_dir = tmp_path / "assets"
+    assets_dir.mkdir()
+    return SimpleNamespace(assets=FakeAssets(assets_dir))
+
+
+@pytest.fixture
+def server(tmp_path):
+    return AssetServer(thumbnail_dir=tmp_path / "thumbnails")
+
+
+def test_range_requests():
+    data = b"0123456789"
+    etag = '"abc"'
+
+    def get(headers):
+        return content_response(data, etag, "text/plain", headers, "no-cache")
+
+    assert get({"Range": "bytes=2-4"}).body == b"234"
+    assert get({"Range": "bytes=2-4"}).headers["Content-Range"] == "bytes 2-4/10"
+    assert get({"Range": "bytes=7-"}).body == b"789"
+    assert get({"Range": "bytes=-3"}).body == b"789"
+    assert get({"Range": "bytes=20-"}).status == 416
+    # a stale If-Range serves the whole content
+    assert get({"Range": "bytes=2-4", "If-Range": '"old"'}).status == 200
+
+
+def test_conditional_request():
+    response = content_response(b"x", '"abc"', "text/plain", {}, "no-cache")
+    assert response.status == 200
+
+    response = content_response(
+        b"x", '"abc"', "text/plain", {"If-None-Match": '"abc"'}, "no-cache"
+    )
+    assert response.status == 304
+    assert response.body == b""
+
+
+def test_content_length():
+    data = b"0123456789"
+    etag = '"abc"'
+
+    def get(headers):
+        return content_response(data, etag, "text/plain", headers, "no-cache")
+
+    assert get({}).headers["Content-Length"] == "10"
+    assert get({"Range": "bytes=2-4"}).headers["Content-Length"] == "3"
+    assert get({"Range": "bytes=20-"}).headers["Content-Length"] == "0"
+    assert get({"If-None-Match": etag}).headers["Content-Length"] == "0"
+
+
+async def test_serves_scene_asset(server, scene):
+    data = png_bytes()
+    asset_id = scene.assets.add(data)
+
+    response = await server.handle(f"/assets/{asset_id}", {}, scene)
+
+    assert response.status == 200
+    assert response.body == data
+    assert response.headers["ETag"] == f'"{asset_id}"'
+    assert response.headers["Content-Type"] == "image/png"
+
+
+async def test_unknown_assets_are_not_served(server, scene):
+    response = await server.handle("/assets/missing", {}, scene)
+    assert response.status == 404
+    assert response.headers["Content-Length"] == "0"
+    assert (await server.handle("/assets/x", {}, None)).status == 404
+
+
+async def test_other_paths_are_left_to_the_websocket(server, scene):
+    assert await server.handle("/ws", {}, scene) is None
+    assert await server.handle("/assets/../../etc/passwd", {}, scene) is None
+
+
+async def test_thumbnail_is_resized_webp_and_cached(server, scene):
+    asset_id = scene.assets.add(png_bytes())
+
+    response = await server.handle(f"/assets/{asset_id}?w=200", {}, scene)
+
+    assert response.headers["Content-Type"] == "image/webp"
+    assert response.headers["ETag"] == f'"{asset_id}-256"'
+    with Image.open(io.BytesIO(response.body)) as image:
+        assert image.format == "WEBP"
+        assert image.size == (256, 192)
+
+    thumbnail = server.thumbnail_path(asset_id, 256)
+    assert thumbnail.exists()
+
+    # served from the disk cache once generated
+    (scene.assets.directory / f"{asset_id}.png").write_bytes(b"not an image")
+    response = await server.handle(f"/assets/{asset_id}?w=256", {}, scene)
+    assert response.status == 200
+
+
+async def test_registered_files(server, tmp_path):
+    path = tmp_path / "card.png"
+    path.write_bytes(png_bytes(10, 10))
+
+    url = server.file_url(str(path))
+    assert url == server.file_url(str(path))
+    assert url.startswith("/files/")
+
+    response = await server.handle(url, {}, None)
+    assert response.status == 200
+    assert response.headers["Content-Type"] == "image/png"
+
+    assert (await server.handle("/files/unknown", {}, None)).status == 404
+
+
+async def test_served_by_websocket_server(server, scene):
+    data = png_bytes()
+    asset_id = scene.assets.add(data)
+
+    async def process_request(connection, request):
+        return await server.process_request(request, scene)
+
+    async def endpoint(websocket):
+        await websocket.send("hello")
+
+    async with websockets.serve(
+        endpoint, "127.0.0.1", 0, process_request=process_request
+    ) as ws_server:
+        port = ws_server.sockets[0].getsockname()[1]
+
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                f"http://127.0.0.1:{port}/assets/{asset_id}",
+                headers={"Range": "bytes=0-9"},
+            )
+        assert response.status_code == 206
+        assert response.content == data[:10]
+        assert response.headers["Content-Length"] == "10"
+
+        async with websockets.connect(f"ws://127.0.0.1:{port}/ws") as websocket:
+            assert await websocket.recv() == "hello"
@@ -0,0 +1,224 @@
+"""
+Tests for the concurrent rebuild of the history archive and layered history.
+
+The AI boundary (analyze_dialoge, summarize, summarize_events) is mocked, the
+chunk planning and commit order run on a real Scene and SummarizeAgent.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+import talemate.util as util
+from talemate.agents.summarize.archive_rebuild import (
+    ArchiveChunk,
+    plan_archive_chunks,
+)
+from talemate.client.base import MAX_CONCURRENT_REQUESTS
+from talemate.context import ActiveScene
+from talemate.history import rebuild_history
+from talemate.scene_message import CharacterMessage, TimePassageMessage
+from talemate.util.async_tools import gather_limited
+
+from conftest import MockScene, bootstrap_scene
+
+
+@pytest.fixture(autouse=True)
+def mock_count_tokens():
+    with patch.object(util, "count_tokens", side_effect=lambda s: len(str(s))):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def suppress_emit():
+    with (
+        patch("talemate.agents.summarize.archive_rebuild.emit"),
+        patch("talemate.agents.summarize.layered_history.emit"),
+        patch("talemate.history.emit"),
+        patch("talemate.tale_mate.emit"),
+    ):
+        yield
+
+
+@pytest.fixture
+def scene_with_summarizer():
+    scene = MockScene()
+    scene.active = True
+    summarizer = bootstrap_scene(scene)["summarizer"]
+    summarizer.actions["archive"].config["threshold"].value = 512
+    summarizer.actions["archive"].config["include_previous"].value = 0
+    summarizer.actions["layered_history"].enabled = False
+
+    for i in range(40):
+        if i == 17:
+            scene.history.append(TimePassageMessage(ts="PT1H", message="1 hour"))
+        scene.history.append(CharacterMessage(f"Elena: line {i} " + "." * 100))
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def summarize(text, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return "summary of " + text.split("\n")[-1][:15]
+
+    async def analyze_dialoge(dialogue):
+        return None
+
+    summarizer.summarize = summarize
+    summarizer.analyze_dialoge = analyze_dialoge
+    summarizer.max_in_flight = lambda: max_in_flight
+
+    with ActiveScene(scene):
+        yield scene, summarizer
+
+
+def ranges(entries):
+    return [(entry["start"], entry["end"], entry["ts"]) for entry in entries]
+
+
+async def sequential_archive(scene, summarizer):
+    while await summarizer.build_archive(scene):
+        pass
+    return list(scene.archived_history)
+
+
+async def test_plan_matches_sequential_build(scene_with_summarizer):
+    scene, summarizer = scene_with_summarizer
+
+    planned = plan_archive_chunks(scene.history, 0, "PT0S", 512)
+    archived = await sequential_archive(scene, summarizer)
+
+    assert [(c.start, c.end, c.ts) for c in planned] == ranges(archived)
+    # the time passage closes a chunk early
+    assert any(chunk.time_passage_termination for chunk in planned)
+
+
+async def test_concurrent_rebuild_matches_sequential(scene_with_summarizer):
+    scene, summarizer = scene_with_summarizer
+    sequential = ranges(await sequential_archive(scene, summarizer))
+    scene.archived_history = []
+
+    with patch.object(type(summarizer), "rebuild_max_concurrent", 4):
+        added = await summarizer.rebuild_archive_concurrently(scene)
+
+    assert added == len(sequential)
+    assert ranges(scene.archived_history) == sequential
+    assert 1 < summarizer.max_in_flight() <= 4
+
+
+async def test_concurrency_follows_client(scene_with_summarizer):
+    scene, summarizer = scene_with_summarizer
+
+    assert summarizer.rebuild_max_concurrent == 1
+    await summarizer.rebuild_archive_concurrently(scene)
+
+    assert summarizer.max_in_flight() == 1
+
+
+async def test_concurrency_limit_comes_from_client(scene_with_summarizer):
+    scene, summarizer = scene_with_summarizer
+
+    with patch.object(type(summarizer.client), "supports_concurrent_inference", True):
+        assert summarizer.rebuild_max_concurrent == MAX_CONCURRENT_REQUESTS
+        assert summarizer.client.max_concurrent_requests == MAX_CONCURRENT_REQUESTS
+
+
+async def test_cut_off_tail_is_archived(scene_with_summarizer):
+    scene, summarizer = scene_with_summarizer
+    summarizer.actions["archive"].config["threshold"].value = 1300
+
+    async def analyze_dialoge(dialogue):
+        # a scene change a few lines before the end of every chunk
+        if len(dialogue) > 6:
+            return str(dialogue[-3])
+        return None
+
+    summarizer.analyze_dialoge = analyze_dialoge
+    sequential = ranges(await sequential_archive(scene, summarizer))
+    scene.archived_history = []
+
+    with patch.object(type(summarizer), "rebuild_max_concurrent", 4):
+        added = await summarizer.rebuild_archive_concurrently(scene)
+
+    # chunks that carry cut off dialogue can differ from the sequential
+    # ones, the archive covers as much of the history either way
+    archived = ranges(scene.archived_history)
+    assert added == len(archived)
+    assert archived[-1][1] == sequential[-1][1]
+
+
+async def test_terminations_carry_over(scene_with_summarizer):
+    scene, summarizer = scene_with_summarizer
+    lines = [CharacterMessage(f"Elena: {i}") for i in range(16)]
+    chunks = [
+        ArchiveChunk(0, 7, "PT0S", lines[0:8]),
+        ArchiveChunk(8, 15, "PT0S", lines[8:16]),
+    ]
+
+    chunks = summarizer._rebuild_apply_terminations(chunks, ["Elena: 6", None])
+
+    assert (chunks[0].start, chunks[0].end) == (0, 5)
+    # the cut off lines start the next chunk
+    assert (chunks[1].start, chunks[1].end) == (6, 15)
+    assert [str(line) for line in chunks[1].dialogue[:2]] == ["Elena: 6", "Elena: 7"]
+
+
+async def test_rebuild_history_concurrent(scene_with_summarizer):
+    scene, summarizer = scene_with_summarizer
+    sequential = ranges(await sequential_archive(scene, summarizer))
+
+    with (
+        patch("talemate.history.purge_all_history_from_memory"),
+        patch.object(scene, "commit_to_memory"),
+    ):
+        await rebuild_history(scene, concurrent=True)
+
+    assert ranges(scene.archived_history) == sequential
+
+
+async def test_layers_are_built_concurrently(scene_with_summarizer):
+    scene, summarizer = scene_with_summarizer
+    summarizer.actions["layered_history"].enabled = True
+    summarizer.actions["layered_history"].config["threshold"].value = 60
+    summarizer.actions["layered_history"].config["max_layers"].value = 2
+    summarizer.actions["layered_history"].config["max_process_tokens"].value = 200
+
+    async def summarize_events(text, **kwargs):
+        await asyncio.sleep(0.01)
+        return "S" * max(10, len(text) * 6 // 10)
+
+    summarizer.summarize_events = summarize_events
+
+    await sequential_archive(scene, summarizer)
+    await summarizer.summarize_to_layered_history()
+    sequential = [ranges(layer) for layer in scene.layered_history]
+
+    scene.layered_history = []
+    await summarizer.summarize_to_layered_history(max_concurrent=4)
+
+    assert [ranges(layer) for layer in scene.layered_history] == sequential
+    assert scene.layered_history[0]
+
+
+async def test_gather_limited_cancels_on_error():
+    cancelled = []
+
+    async def fail():
+        raise ValueError("boom")
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    with pytest.raises(ValueError):
+        await gather_limited([slow, fail, slow], limit=3)
+
+    assert cancelled == [True, True]
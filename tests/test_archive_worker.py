@@ -0,0 +1,204 @@
+"""
+Tests for the summarizer's background archive worker.
+
+Covers that push_history does not wait for the summarization, that requests
+are coalesced and that build_archive locates its range again when the history
+changed while it was summarizing.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+import talemate.util as util
+from talemate.client.base import ClientBase
+from talemate.context import ActiveScene
+from talemate.scene_message import CharacterMessage, DirectorMessage
+
+from conftest import MockScene, bootstrap_scene
+
+
+@pytest.fixture
+def scene_with_summarizer():
+    scene = MockScene()
+    scene.active = True
+    summarizer = bootstrap_scene(scene)["summarizer"]
+    summarizer.actions["archive"].config["threshold"].value = 512
+    summarizer.actions["archive"].config["include_previous"].value = 0
+    summarizer.actions["layered_history"].enabled = False
+
+    with ActiveScene(scene):
+        yield scene, summarizer
+
+
+@pytest.fixture(autouse=True)
+def mock_count_tokens():
+    with patch.object(util, "count_tokens", side_effect=lambda s: len(str(s))):
+        yield
+
+
+def add_dialogue(scene, count: int, start: int = 0):
+    for i in range(start, start + count):
+        scene.history.append(CharacterMessage(f"Elena: line {i} " + "." * 100))
+
+
+async def test_push_history_does_not_wait_for_archive(scene_with_summarizer):
+    scene, summarizer = scene_with_summarizer
+    release = asyncio.Event()
+    calls = []
+
+    async def build_archive(scene, generation_options=None):
+        calls.append(len(scene.history))
+        await release.wait()
+        return False
+
+    summarizer.build_archive = build_archive
+
+    await asyncio.wait_for(summarizer.on_push_history(None), timeout=1)
+
+    worker = summarizer.archive_worker
+    assert worker.running
+    assert summarizer.status == "busy_bg"
+
+    release.set()
+    await worker.wait()
+    assert calls == [0]
+
+
+async def test_requests_are_coalesced(scene_with_summarizer):
+    scene, summarizer = scene_with_summarizer
+    release = asyncio.Event()
+    calls = []
+
+    async def build_archive(scene, generation_options=None):
+        calls.append(generation_options.writing_style)
+        await release.wait()
+        return False
+
+    summarizer.build_archive = build_archive
+
+    for _ in range(5):
+        await summarizer.on_push_history(None)
+        await asyncio.sleep(0)
+
+    release.set()
+    await summarizer.archive_worker.wait()
+
+    # one pass for the first request, one for everything that arrived
+    # while it was running
+    assert len(calls) == 2
+
+
+async def test_worker_archives_until_caught_up(scene_with_summarizer):
+    scene, summarizer = scene_with_summarizer
+    add_dialogue(scene, 16)
+
+    async def analyze_dialoge(dialogue):
+        return None
+
+    async def summarize(text, **kwargs):
+        return "summary"
+
+    summarizer.analyze_dialoge = analyze_dialoge
+    summarizer.summarize = summarize
+
+    with patch("talemate.tale_mate.emit"), patch("talemate.agents.base.emit"):
+        await summarizer.on_push_history(None)
+        await summarizer.archive_worker.wait()
+
+    assert [(e["start"], e["end"]) for e in scene.archived_history] == [
+        (0, 4),
+        (5, 9),
+        (10, 14),
+    ]
+    assert summarizer.archive_worker.entries_built == 3
+
+
+async def test_cancel_requested_stops_worker(scene_with_summarizer):
+    scene, summarizer = scene_with_summarizer
+    calls = []
+
+    async def build_archive(scene, generation_options=None):
+        calls.append(1)
+        return True
+
+    summarizer.build_archive = build_archive
+    scene.cancel_requested = True
+
+    await summarizer.on_push_history(None)
+    await summarizer.archive_worker.wait()
+
+    assert calls == []
+    # the flag is left for the foreground generation
+    assert scene.cancel_requested
+
+
+async def test_range_is_located_after_history_changed(scene_with_summarizer):
+    scene, summarizer = scene_with_summarizer
+    scene.history.append(DirectorMessage("Keep it short", source="director"))
+    add_dialogue(scene, 8)
+
+    async def analyze_dialoge(dialogue):
+        return None
+
+    async def summarize(text, **kwargs):
+        # the director message before the range is replaced meanwhile
+        scene.history.pop(0)
+        return "summary"
+
+    summarizer.analyze_dialoge = analyze_dialoge
+    summarizer.summarize = summarize
+
+    with patch("talemate.tale_mate.emit"), patch("talemate.agents.base.emit"):
+        assert await summarizer.build_archive(scene)
+
+    entry = scene.archived_history[-1]
+    assert (entry["start"], entry["end"]) == (0, 4)
+    assert str(scene.history[entry["end"]]).startswith("Elena: line 4")
+
+
+async def test_range_is_discarded_if_removed(scene_with_summarizer):
+    scene, summarizer = scene_with_summarizer
+    add_dialogue(scene, 8)
+
+    async def analyze_dialoge(dialogue):
+        return None
+
+    async def summarize(text, **kwargs):
+        scene.history.clear()
+        return "summary"
+
+    summarizer.analyze_dialoge = analyze_dialoge
+    summarizer.summarize = summarize
+
+    assert not await summarizer.build_archive(scene)
+    assert scene.archived_history == []
+
+
+class SlowClient(ClientBase):
+    def __init__(self):
+        super().__init__(name="slow")
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _send_prompt(self, prompt, *args, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return prompt
+
+
+@pytest.mark.parametrize("concurrent, expected", [(False, 1), (True, 3)])
+async def test_requests_overlap_only_with_concurrent_inference(concurrent, expected):
+    client = SlowClient()
+
+    with patch.object(SlowClient, "supports_concurrent_inference", concurrent):
+        # e.g. an archive pass running while the next turn is generated
+        responses = await asyncio.gather(
+            *(client.send_prompt(f"prompt {i}") for i in range(3))
+        )
+
+    assert responses == ["prompt 0", "prompt 1", "prompt 2"]
+    assert client.max_in_flight == expected
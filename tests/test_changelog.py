@@ -2,6 +2,7 @@ import os
 import json
 import tempfile
 import shutil
+import threading
 import pytest
 from unittest.mock import Mock
 
@@ -15,11 +16,13 @@ from talemate.changelog import (
     rollback_scene_to_revision,
     delete_changelog_files,
     _changelog_log_path,
+    _legacy_changelog_log_path,
+    _changelog_index_path,
+    _read_log_entries,
     _base_path,
     _latest_path,
     _read_json_or_default,
     _write_json,
-    _ensure_log_initialized,
     _load_base_scene_data,
     _load_latest_scene_data,
     _ensure_latest_initialized,
@@ -32,7 +35,13 @@ from talemate.changelog import (
     _get_file_size,
     MAX_CHANGELOG_FILE_SIZE,
     InMemoryChangelog,
+    compact_changelog,
+    migrate_changelog,
+    list_revision_entries,
+    latest_revision_at,
+    _get_checkpoint_files,
 )
+import talemate.changelog as changelog
 
 
 @pytest.fixture
@@ -60,7 +69,7 @@ def mock_scene(temp_dir):
 def test_changelog_log_path(mock_scene):
     """Test changelog log path generation."""
     expected = os.path.join(
-        mock_scene.changelog_dir, "test_scene.json.changelog.0.json"
+        mock_scene.changelog_dir, "test_scene.json.changelog.0.jsonl"
     )
     result = _changelog_log_path(mock_scene, 0)
     assert result == expected
@@ -68,7 +77,7 @@ def test_changelog_log_path(mock_scene):
 
     # Test with different start revision
     expected = os.path.join(
-        mock_scene.changelog_dir, "test_scene.json.changelog.123.json"
+        mock_scene.changelog_dir, "test_scene.json.changelog.123.jsonl"
     )
     result = _changelog_log_path(mock_scene, 123)
     assert result == expected
@@ -134,46 +143,24 @@ def test_write_json(temp_dir):
     assert result == test_data
 
 
-def test_ensure_log_initialized_new_log(mock_scene):
-    """Test initializing a new changelog log."""
-    result = _ensure_log_initialized(mock_scene, 0)
-
-    expected_structure = {
-        "version": 1,
-        "base": "test_scene.json.base.json",
-        "start_rev": 0,
-        "deltas": [],
-        "latest_rev": 0,
-    }
-
-    assert result == expected_structure
-
-    # Verify file was created
+def test_read_log_entries_jsonl(mock_scene):
+    """Test reading a JSON-Lines changelog log, skipping a truncated tail."""
     log_path = _changelog_log_path(mock_scene, 0)
-    assert os.path.exists(log_path)
+    with open(log_path, "w") as f:
+        f.write(json.dumps({"rev": 1}) + "\n")
+        f.write(json.dumps({"rev": 2}) + "\n")
+        f.write('{"rev": 3, "del')
 
+    assert _read_log_entries(log_path) == [{"rev": 1}, {"rev": 2}]
 
-def test_ensure_log_initialized_existing_log(mock_scene):
-    """Test loading existing changelog log."""
-    log_path = _changelog_log_path(mock_scene, 0)
-    existing_data = {
-        "version": 1,
-        "base": "test_scene.json.base.json",
-        "start_rev": 0,
-        "deltas": [{"rev": 1}, {"rev": 3}, {"rev": 2}],
-        "latest_rev": 2,
-    }
 
-    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+def test_read_log_entries_legacy(mock_scene):
+    """Test reading a legacy JSON changelog log."""
+    log_path = _legacy_changelog_log_path(mock_scene, 0)
     with open(log_path, "w") as f:
-        json.dump(existing_data, f)
-
-    result = _ensure_log_initialized(mock_scene, 0)
+        json.dump({"version": 1, "deltas": [{"rev": 1}, {"rev": 2}]}, f)
 
-    # Should update latest_rev to max of deltas
-    assert result["latest_rev"] == 3
-    assert result["deltas"] == existing_data["deltas"]
-    assert result["start_rev"] == 0
+    assert _read_log_entries(log_path) == [{"rev": 1}, {"rev": 2}]
 
 
 def test_load_base_scene_data(mock_scene):
@@ -340,13 +327,11 @@ async def test_append_scene_delta_with_change(mock_scene):
 
     # Check that changelog log was updated
     _, log_path = _get_latest_changelog_file(mock_scene)
-    with open(log_path, "r") as f:
-        log_data = json.load(f)
+    deltas = _read_log_entries(log_path)
 
-    assert log_data["latest_rev"] == 1
-    assert len(log_data["deltas"]) == 1
-    assert log_data["deltas"][0]["rev"] == 1
-    assert log_data["deltas"][0]["meta"] == {"action": "add_character"}
+    assert len(deltas) == 1
+    assert deltas[0]["rev"] == 1
+    assert deltas[0]["meta"] == {"action": "add_character"}
 
 
 @pytest.mark.asyncio
@@ -387,7 +372,7 @@ async def test_reconstruct_scene_data_with_deltas(mock_scene):
         "latest_rev": 1,
     }
 
-    log_path = _changelog_log_path(mock_scene, 0)
+    log_path = _legacy_changelog_log_path(mock_scene, 0)
     with open(log_path, "w") as f:
         json.dump(log_data, f)
 
@@ -405,9 +390,6 @@ async def test_write_reconstructed_scene(mock_scene):
     with open(base_path, "w") as f:
         json.dump(base_data, f)
 
-    # Initialize log
-    _ensure_log_initialized(mock_scene, 0)
-
     output_path = await write_reconstructed_scene(mock_scene, 0, "custom_output.json")
 
     expected_path = os.path.join(mock_scene.save_dir, "custom_output.json")
@@ -428,8 +410,6 @@ async def test_write_reconstructed_scene_default_filename(mock_scene):
     with open(base_path, "w") as f:
         json.dump(base_data, f)
 
-    _ensure_log_initialized(mock_scene, 0)
-
     output_path = await write_reconstructed_scene(mock_scene, 0)
 
     expected_filename = "test_scene-rev-0.json"
@@ -452,7 +432,7 @@ def test_list_revisions_with_deltas(mock_scene):
         "latest_rev": 3,
     }
 
-    log_path = _changelog_log_path(mock_scene, 0)
+    log_path = _legacy_changelog_log_path(mock_scene, 0)
     os.makedirs(os.path.dirname(log_path), exist_ok=True)
     with open(log_path, "w") as f:
         json.dump(log_data, f)
@@ -476,7 +456,7 @@ async def test_rollback_scene_to_revision_invalid_rev(mock_scene):
         "latest_rev": 2,
     }
 
-    log_path = _changelog_log_path(mock_scene, 0)
+    log_path = _legacy_changelog_log_path(mock_scene, 0)
     os.makedirs(os.path.dirname(log_path), exist_ok=True)
     with open(log_path, "w") as f:
         json.dump(log_data, f)
@@ -507,8 +487,6 @@ async def test_rollback_scene_to_revision_with_backup(mock_scene):
         json.dump(current_data, f)
 
     # Setup log with revision 1
-    _ensure_log_initialized(mock_scene, 0)
-
     result_path = await rollback_scene_to_revision(mock_scene, 0, create_backup=True)
 
     # Check that current file was updated to base data
@@ -539,8 +517,6 @@ async def test_rollback_scene_to_revision_no_backup(mock_scene):
     with open(current_path, "w") as f:
         json.dump({"version": "current"}, f)
 
-    _ensure_log_initialized(mock_scene, 0)
-
     await rollback_scene_to_revision(mock_scene, 0, create_backup=False)
 
     # Should not create backup directory
@@ -569,10 +545,9 @@ async def test_append_scene_delta_with_exclusions(mock_scene):
 
     # Check the delta only contains character changes
     _, log_path = _get_latest_changelog_file(mock_scene)
-    with open(log_path, "r") as f:
-        log_data = json.load(f)
+    deltas = _read_log_entries(log_path)
 
-    delta_entry = log_data["deltas"][0]
+    delta_entry = deltas[0]
     delta = delta_entry["delta"]
 
     # Should have character changes but not memory session changes
@@ -632,10 +607,9 @@ async def test_append_scene_delta_with_regex_exclusions(mock_scene):
 
     # Check that delta contains both character and due field changes since no regex exclusion is active
     _, log_path = _get_latest_changelog_file(mock_scene)
-    with open(log_path, "r") as f:
-        log_data = json.load(f)
+    deltas = _read_log_entries(log_path)
 
-    delta_entry = log_data["deltas"][0]
+    delta_entry = deltas[0]
     delta = delta_entry["delta"]
 
     # Get all changed paths
@@ -722,9 +696,9 @@ def test_get_changelog_files_multiple(mock_scene):
     os.makedirs(mock_scene.changelog_dir, exist_ok=True)
 
     files = [
-        (0, _changelog_log_path(mock_scene, 0)),
-        (100, _changelog_log_path(mock_scene, 100)),
-        (50, _changelog_log_path(mock_scene, 50)),
+        (0, _legacy_changelog_log_path(mock_scene, 0)),
+        (100, _legacy_changelog_log_path(mock_scene, 100)),
+        (50, _legacy_changelog_log_path(mock_scene, 50)),
     ]
 
     for start_rev, path in files:
@@ -751,12 +725,12 @@ def test_get_latest_changelog_file_multiple(mock_scene):
 
     # Create multiple files
     for start_rev in [0, 50, 100]:
-        path = _changelog_log_path(mock_scene, start_rev)
+        path = _legacy_changelog_log_path(mock_scene, start_rev)
         with open(path, "w") as f:
             json.dump({"start_rev": start_rev, "deltas": []}, f)
 
     result = _get_latest_changelog_file(mock_scene)
-    expected_path = _changelog_log_path(mock_scene, 100)
+    expected_path = _legacy_changelog_log_path(mock_scene, 100)
     assert result == (100, expected_path)
 
 
@@ -778,7 +752,7 @@ def test_get_overall_latest_revision_multiple_files(mock_scene):
     ]
 
     for start_rev, data in files_data:
-        path = _changelog_log_path(mock_scene, start_rev)
+        path = _legacy_changelog_log_path(mock_scene, start_rev)
         with open(path, "w") as f:
             json.dump(data, f)
 
@@ -1019,11 +993,10 @@ async def test_in_memory_changelog_preserves_metadata(mock_scene):
 
     # Check that metadata was preserved in the changelog
     _, log_path = _get_latest_changelog_file(mock_scene)
-    with open(log_path, "r") as f:
-        log_data = json.load(f)
+    deltas = _read_log_entries(log_path)
 
-    assert len(log_data["deltas"]) == 1
-    delta_entry = log_data["deltas"][0]
+    assert len(deltas) == 1
+    delta_entry = deltas[0]
     assert delta_entry["meta"] == test_meta
 
 
@@ -1065,6 +1038,21 @@ async def test_in_memory_changelog_updates_latest_snapshot(mock_scene):
     assert latest_data == final_scene_data
 
 
+@pytest.mark.asyncio
+async def test_latest_snapshot_is_written_compact(mock_scene):
+    await save_changelog(mock_scene)
+
+    mock_scene.serialize = {**mock_scene.serialize, "characters": [{"name": "Bob"}]}
+    assert await append_scene_delta(mock_scene) == 1
+
+    with open(_latest_path(mock_scene), "r") as f:
+        raw = f.read()
+
+    assert "\n" not in raw and ", " not in raw
+    assert json.loads(raw) == mock_scene.serialize
+    assert not os.path.exists(_latest_path(mock_scene) + ".tmp")
+
+
 @pytest.mark.asyncio
 async def test_in_memory_changelog_integration_with_existing_revisions(mock_scene):
     """Test that InMemoryChangelog works correctly with existing revisions."""
@@ -1162,7 +1150,7 @@ async def test_reconstruct_scene_data_with_deltas_disconnects_shared_context(
         "latest_rev": 1,
     }
 
-    log_path = _changelog_log_path(mock_scene, 0)
+    log_path = _legacy_changelog_log_path(mock_scene, 0)
     with open(log_path, "w") as f:
         json.dump(log_data, f)
 
@@ -1366,3 +1354,315 @@ async def test_delete_changelog_files_with_wrong_scene_reference(temp_dir):
     assert len(result.get("deleted", [])) >= 2, (
         "Should have deleted at least base and latest"
     )
+
+
+# ---------------------------------------------------------------------------
+# Checkpoints
+# ---------------------------------------------------------------------------
+
+
+async def _append_revisions(scene, count: int, start: int = 0):
+    for i in range(start, start + count):
+        scene.serialize = {
+            "characters": [{"name": f"Char {n}"} for n in range(i + 1)],
+            "entries": [],
+            "metadata": {"version": "1.0"},
+        }
+        await append_scene_delta(scene)
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_written_every_n_revisions(mock_scene, monkeypatch):
+    monkeypatch.setattr(changelog, "CHECKPOINT_INTERVAL_REVS", 5)
+    await save_changelog(mock_scene)
+    await _append_revisions(mock_scene, 12)
+
+    assert [rev for rev, _ in _get_checkpoint_files(mock_scene)] == [5, 10]
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_written_after_n_bytes(mock_scene, monkeypatch):
+    monkeypatch.setattr(changelog, "CHECKPOINT_INTERVAL_BYTES", 1)
+    await save_changelog(mock_scene)
+    await _append_revisions(mock_scene, 3)
+
+    assert [rev for rev, _ in _get_checkpoint_files(mock_scene)] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_written_off_event_loop(mock_scene, monkeypatch):
+    monkeypatch.setattr(changelog, "CHECKPOINT_INTERVAL_REVS", 2)
+    await save_changelog(mock_scene)
+
+    threads = []
+    original_write = changelog._write_checkpoint
+
+    def _tracking_write(scene, rev, data):
+        threads.append(threading.get_ident())
+        return original_write(scene, rev, data)
+
+    monkeypatch.setattr(changelog, "_write_checkpoint", _tracking_write)
+    await _append_revisions(mock_scene, 4)
+
+    assert len(threads) == 2
+    assert threading.get_ident() not in threads
+    assert [rev for rev, _ in _get_checkpoint_files(mock_scene)] == [2, 4]
+
+
+@pytest.mark.asyncio
+async def test_reconstruct_from_checkpoint_matches_full_replay(mock_scene, monkeypatch):
+    monkeypatch.setattr(changelog, "CHECKPOINT_INTERVAL_REVS", 4)
+    await save_changelog(mock_scene)
+    await _append_revisions(mock_scene, 10)
+
+    with_checkpoints = [
+        await reconstruct_scene_data(mock_scene, to_rev=rev) for rev in range(11)
+    ]
+
+    for _, path in _get_checkpoint_files(mock_scene):
+        os.remove(path)
+
+    without_checkpoints = [
+        await reconstruct_scene_data(mock_scene, to_rev=rev) for rev in range(11)
+    ]
+
+    assert with_checkpoints == without_checkpoints
+    assert len(with_checkpoints[7]["characters"]) == 7
+
+
+@pytest.mark.asyncio
+async def test_reconstruct_starts_at_nearest_checkpoint(mock_scene, monkeypatch):
+    monkeypatch.setattr(changelog, "CHECKPOINT_INTERVAL_REVS", 4)
+    await save_changelog(mock_scene)
+    await _append_revisions(mock_scene, 6)
+
+    applied = []
+    original_apply = changelog._apply_delta
+
+    def _tracking_apply(data, delta):
+        applied.append(delta)
+        return original_apply(data, delta)
+
+    monkeypatch.setattr(changelog, "_apply_delta", _tracking_apply)
+    await reconstruct_scene_data(mock_scene, to_rev=6)
+
+    # checkpoint at 4, only revisions 5 and 6 are replayed
+    assert len(applied) == 2
+
+
+@pytest.mark.asyncio
+async def test_in_memory_changelog_commit_writes_checkpoints(mock_scene, monkeypatch):
+    monkeypatch.setattr(changelog, "CHECKPOINT_INTERVAL_REVS", 2)
+    await save_changelog(mock_scene)
+
+    async with InMemoryChangelog(mock_scene) as in_memory:
+        for i in range(3):
+            mock_scene.serialize = {"characters": [{"name": str(i)}], "entries": []}
+            await in_memory.append_delta()
+        await in_memory.commit()
+
+    assert [rev for rev, _ in _get_checkpoint_files(mock_scene)] == [2]
+
+
+@pytest.mark.asyncio
+async def test_compact_changelog_backfills_checkpoints(mock_scene, monkeypatch):
+    await save_changelog(mock_scene)
+    await _append_revisions(mock_scene, 9)
+    assert _get_checkpoint_files(mock_scene) == []
+
+    expected = await reconstruct_scene_data(mock_scene, to_rev=7)
+
+    monkeypatch.setattr(changelog, "CHECKPOINT_INTERVAL_REVS", 3)
+    result = await compact_changelog(mock_scene)
+
+    assert result["written"] == [3, 6, 9]
+    assert result["revisions"] == 9
+    assert await reconstruct_scene_data(mock_scene, to_rev=7) == expected
+
+    # running it again keeps the existing checkpoints
+    result = await compact_changelog(mock_scene)
+    assert result["written"] == []
+    assert result["checkpoints"] == 3
+
+
+@pytest.mark.asyncio
+async def test_delete_changelog_files_removes_checkpoints(mock_scene, monkeypatch):
+    monkeypatch.setattr(changelog, "CHECKPOINT_INTERVAL_REVS", 2)
+    await save_changelog(mock_scene)
+    await _append_revisions(mock_scene, 4)
+    assert _get_checkpoint_files(mock_scene)
+
+    delete_changelog_files(mock_scene)
+    assert _get_checkpoint_files(mock_scene) == []
+
+
+# ---------------------------------------------------------------------------
+# Append-only log format
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_append_scene_delta_appends_lines(mock_scene):
+    await save_changelog(mock_scene)
+    await _append_revisions(mock_scene, 3)
+
+    _, log_path = _get_latest_changelog_file(mock_scene)
+    assert log_path.endswith(".jsonl")
+    with open(log_path) as f:
+        lines = f.read().splitlines()
+    assert [json.loads(line)["rev"] for line in lines] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_revision_index_records_offsets(mock_scene):
+    await save_changelog(mock_scene)
+    await _append_revisions(mock_scene, 3)
+
+    index = _read_log_entries(_changelog_index_path(mock_scene))
+    assert [r["rev"] for r in index] == [1, 2, 3]
+
+    _, log_path = _get_latest_changelog_file(mock_scene)
+    with open(log_path, "rb") as f:
+        f.seek(index[1]["offset"])
+        assert json.loads(f.readline())["rev"] == 2
+
+    entries = list_revision_entries(mock_scene)
+    assert [e["rev"] for e in entries] == [3, 2, 1]
+    assert latest_revision_at(mock_scene, entries[0]["ts"]) == 3
+    assert latest_revision_at(mock_scene, 0) is None
+
+
+@pytest.mark.asyncio
+async def test_revision_index_rebuilt_when_out_of_sync(mock_scene):
+    await save_changelog(mock_scene)
+    await _append_revisions(mock_scene, 2)
+
+    # simulate a crash between appending the delta and the index record
+    index_path = _changelog_index_path(mock_scene)
+    with open(index_path) as f:
+        lines = f.read().splitlines()
+    with open(index_path, "w") as f:
+        f.write(lines[0] + "\n")
+
+    assert list_revisions(mock_scene) == [2, 1]
+
+    await _append_revisions(mock_scene, 1, start=2)
+    assert list_revisions(mock_scene) == [3, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_migrate_legacy_changelog(mock_scene):
+    await save_changelog(mock_scene)
+    import deepdiff
+
+    base = {"characters": [], "entries": [], "metadata": {"version": "1.0"}}
+    modified = {**base, "characters": [{"name": "Alice"}]}
+    delta = deepdiff.DeepDiff(base, modified)._to_delta_dict()
+
+    legacy_path = _legacy_changelog_log_path(mock_scene, 0)
+    with open(legacy_path, "w") as f:
+        json.dump(
+            {
+                "version": 1,
+                "deltas": [{"rev": 1, "ts": 1672531200, "delta": delta, "meta": {}}],
+                "latest_rev": 1,
+            },
+            f,
+        )
+    with open(_latest_path(mock_scene), "w") as f:
+        json.dump(modified, f)
+
+    # legacy files are readable before migration
+    assert list_revisions(mock_scene) == [1]
+
+    # and migrated on the next append
+    mock_scene.serialize = {**modified, "characters": [{"name": "Bob"}]}
+    assert await append_scene_delta(mock_scene) == 2
+
+    assert not os.path.exists(legacy_path)
+    assert [rev for rev, _ in _get_changelog_files(mock_scene)] == [0]
+    assert list_revisions(mock_scene) == [2, 1]
+    assert (await reconstruct_scene_data(mock_scene, to_rev=1))["characters"] == [
+        {"name": "Alice"}
+    ]
+    assert migrate_changelog(mock_scene) == 0
+
+
+# ---------------------------------------------------------------------------
+# Scoped deltas
+# ---------------------------------------------------------------------------
+
+
+def _message(i: int) -> dict:
+    return {"message": f"line {i}", "id": i, "typ": "narrator", "flags": 0}
+
+
+def test_compute_delta_history_append_is_tail_operation(monkeypatch):
+    prev = {"history": [_message(i) for i in range(5)], "name": "scene"}
+    curr = {"history": [_message(i) for i in range(7)], "name": "scene"}
+
+    def _no_deepdiff(*args, **kwargs):
+        raise AssertionError("DeepDiff should not run for tail appends")
+
+    monkeypatch.setattr(changelog.deepdiff, "DeepDiff", _no_deepdiff)
+    delta = _compute_delta(prev, curr)
+
+    assert delta == {
+        "iterable_item_added": {
+            "root['history'][5]": _message(5),
+            "root['history'][6]": _message(6),
+        }
+    }
+    assert _apply_delta(prev, delta) == curr
+
+
+def test_compute_delta_only_diffs_changed_sections(monkeypatch):
+    prev = {
+        "history": [_message(i) for i in range(3)],
+        "archived_history": [{"text": "a"}],
+        "world_state": {"reinforce": [], "manual_context": {}},
+        "name": "scene",
+    }
+    curr = {
+        "history": [_message(i) for i in range(3)],
+        "archived_history": [{"text": "a"}],
+        "world_state": {"reinforce": [], "manual_context": {"x": 1}},
+        "name": "renamed",
+    }
+
+    seen = []
+    original = changelog.deepdiff.DeepDiff
+
+    def _tracking_deepdiff(t1, t2, **kwargs):
+        seen.append(set(t1.keys()) | set(t2.keys()))
+        return original(t1, t2, **kwargs)
+
+    monkeypatch.setattr(changelog.deepdiff, "DeepDiff", _tracking_deepdiff)
+    delta = _compute_delta(prev, curr)
+
+    assert seen == [{"world_state", "name"}]
+    assert _apply_delta(prev, delta) == curr
+
+
+def test_compute_delta_mixed_changes_replay():
+    prev = {
+        "history": [_message(i) for i in range(4)],
+        "archived_history": [{"text": "a"}],
+        "context": "old",
+    }
+    edited = [_message(i) for i in range(5)]
+    edited[1]["message"] = "edited"
+    curr = {
+        "history": edited,
+        "archived_history": [{"text": "a"}, {"text": "b"}],
+        "intro": "added",
+    }
+
+    assert _apply_delta(prev, _compute_delta(prev, curr)) == curr
+
+
+def test_compute_delta_excluded_section_changes_are_ignored():
+    prev = {"memory_session_id": "a", "world_state": {"characters": {}, "x": 1}}
+    curr = {"memory_session_id": "b", "world_state": {"characters": {"A": 1}, "x": 1}}
+
+    assert _compute_delta(prev, curr) == {}
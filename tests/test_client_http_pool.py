@@ -0,0 +1,204 @@
+"""
+Tests for the shared HTTP connection pools used by LLM clients, run against a
+local stub server that counts TCP connections.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from talemate.client.base import ClientBase
+from talemate.client.http_pool import HTTP_CLIENT_POOL
+from talemate.config.schema import Client as ClientConfig
+
+MODELS_RESPONSE = {
+    "object": "list",
+    "data": [{"id": "stub-model", "object": "model", "created": 0, "owned_by": "x"}],
+}
+
+
+class StubServer:
+    """
+    Minimal HTTP/1.1 keep-alive server that counts accepted connections.
+    """
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+        self.server: asyncio.AbstractServer | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode().split("\r\n")
+                path = lines[0].split(" ")[1]
+                headers = {
+                    key.strip().lower(): value.strip()
+                    for key, _, value in (line.partition(":") for line in lines[1:])
+                    if key
+                }
+                length = int(headers.get("content-length", 0))
+                if length:
+                    await reader.readexactly(length)
+
+                self.requests += 1
+                body = json.dumps(
+                    MODELS_RESPONSE if path.endswith("/models") else {"ok": True}
+                ).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Connection: keep-alive\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+class StubClient(ClientBase):
+    client_type = "stub"
+
+    def __init__(self, api_url: str, **kwargs):
+        super().__init__(name="stub", **kwargs)
+        self._config = ClientConfig(type="stub", name="stub", api_url=api_url)
+
+    @property
+    def client_config(self) -> ClientConfig:
+        return self._config
+
+    @property
+    def can_support_concurrent_inference(self) -> bool:
+        return True
+
+    @property
+    def concurrent_inference_enabled(self) -> bool:
+        return getattr(self, "_concurrent", False)
+
+
+@pytest.fixture
+async def server():
+    server = StubServer()
+    await server.start()
+    yield server
+    await HTTP_CLIENT_POOL.close_all()
+    await server.stop()
+
+
+async def test_requests_reuse_one_connection(server):
+    client = StubClient(server.url)
+
+    for _ in range(5):
+        response = await client.http_client().get(f"{server.url}/ping")
+        assert response.json() == {"ok": True}
+
+    assert server.requests == 5
+    assert server.connections == 1
+
+
+async def test_unpooled_requests_open_a_connection_each(server):
+    for _ in range(3):
+        async with httpx.AsyncClient() as http:
+            await http.get(f"{server.url}/ping")
+
+    assert server.connections == 3
+
+
+async def test_openai_client_reuses_pooled_connection(server):
+    client = StubClient(server.url)
+
+    openai_client = client.openai_client(f"{server.url}/v1", "sk-test")
+    for _ in range(3):
+        models = await client.openai_client(f"{server.url}/v1", "sk-test").models.list()
+        assert models.data[0].id == "stub-model"
+
+    assert client.openai_client(f"{server.url}/v1", "sk-test") is openai_client
+    assert server.connections == 1
+
+
+async def test_openai_and_direct_requests_share_one_pool(server):
+    client = StubClient(server.url)
+
+    # e.g., the KoboldCpp client uses a dummy key for the OpenAI sdk but
+    # sends its own requests without one
+    openai_client = client.openai_client(f"{server.url}/v1", "sk-1234")
+    http = client.http_client()
+    for _ in range(3):
+        await client.openai_client(f"{server.url}/v1", "sk-1234").models.list()
+        await client.http_client().get(f"{server.url}/ping")
+
+    assert client.http_client() is http
+    assert client.openai_client(f"{server.url}/v1", "sk-1234") is openai_client
+    assert not http.is_closed
+    assert server.connections == 1
+
+
+async def test_client_holds_one_pool_per_origin(server):
+    client = StubClient(server.url)
+
+    local = client.http_client()
+    remote = client.http_client("https://openrouter.ai")
+    await asyncio.sleep(0.05)
+
+    assert local is not remote
+    assert client.http_client() is local
+    assert not local.is_closed and not remote.is_closed
+
+
+async def test_clients_share_pool_for_same_origin(server):
+    first = StubClient(server.url)
+    second = StubClient(f"{server.url}/api/v1")
+    second.name = "stub-2"
+
+    assert first.http_client() is second.http_client()
+
+
+async def test_config_change_replaces_and_closes_pool(server):
+    client = StubClient(server.url)
+    old = client.http_client()
+    await old.get(f"{server.url}/ping")
+
+    client._concurrent = True
+    new = client.http_client()
+
+    assert new is not old
+    assert client.http_pool_settings.max_connections > 8
+
+    # the released pool is closed once its connections are idle
+    for _ in range(20):
+        if old.is_closed:
+            break
+        await asyncio.sleep(0.05)
+    assert old.is_closed
+
+    await new.get(f"{server.url}/ping")
+    assert server.connections == 2
+
+
+async def test_destroy_releases_pool(server):
+    client = StubClient(server.url)
+    http = client.http_client()
+
+    await client.destroy()
+    await asyncio.sleep(0.05)
+
+    assert http.is_closed
@@ -0,0 +1,138 @@
+"""
+Tests for the cached client status, which keeps generations from probing the
+api before every request.
+"""
+
+import pytest
+
+from talemate.client.base import ClientBase
+from talemate.client.context import ClientContext
+from talemate.config.schema import Client as ClientConfig
+
+
+class ProbeCountingClient(ClientBase):
+    client_type = "stub"
+
+    def __init__(self, **kwargs):
+        super().__init__(name="stub", **kwargs)
+        self._config = ClientConfig(type="stub", name="stub", model="model-a")
+        self.probes = 0
+        self.fail_probe = False
+        self.fail_generation = False
+        self.emitted: list[dict] = []
+
+    @property
+    def client_config(self) -> ClientConfig:
+        return self._config
+
+    async def get_model_name(self):
+        self.probes += 1
+        if self.fail_probe:
+            raise ConnectionError("unreachable")
+        return "model-a"
+
+    def tune_prompt_parameters(self, parameters: dict, kind: str):
+        pass
+
+    def emit_status(self, processing: bool = None):
+        if processing is not None:
+            self.processing = processing
+        self.emitted.append(self._common_status_data())
+
+    async def _prompt_generation_error(self, error_message, status_code=None):
+        return "ignore"
+
+    async def generate(self, prompt: str, parameters: dict, kind: str):
+        if self.fail_generation:
+            raise ConnectionError("connection reset")
+        return "Hello."
+
+
+@pytest.fixture
+def client():
+    return ProbeCountingClient()
+
+
+async def send(client: ClientBase) -> str:
+    with ClientContext(requires_active_scene=False):
+        return await client.send_prompt("Continue.", kind="narrate")
+
+
+async def test_status_is_cached(client):
+    await client.status()
+    await client.status()
+
+    assert client.probes == 1
+    assert client.connected
+    assert client.status_fresh
+
+
+async def test_status_probes_again_once_stale(client):
+    await client.status()
+    client.status_checked_at -= client.status_ttl + 1
+
+    await client.status()
+
+    assert client.probes == 2
+
+
+async def test_config_change_invalidates_status(client):
+    await client.status()
+    client.client_config.model = "model-b"
+
+    assert not client.status_fresh
+    await client.status()
+    assert client.probes == 2
+
+
+async def test_failed_probe_is_not_cached(client):
+    client.fail_probe = True
+    await client.status()
+    await client.status()
+
+    assert client.probes == 2
+    assert not client.connected
+
+
+async def test_generation_does_not_probe_fresh_status(client):
+    await client.status()
+
+    for _ in range(3):
+        assert await send(client) == "Hello."
+
+    assert client.probes == 1
+
+
+async def test_generation_never_probes(client):
+    assert await send(client) == "Hello."
+    assert client.probes == 0
+
+    await client.status()
+    client.status_checked_at -= client.status_ttl + 1
+    assert await send(client) == "Hello."
+
+    assert client.probes == 1
+    # a successful generation refreshes the cached status
+    assert client.status_fresh
+
+
+async def test_connection_error_invalidates_status(client):
+    await client.status()
+    client.fail_generation = True
+
+    await send(client)
+
+    assert not client.status_fresh
+    assert client.probes == 1
+
+    # the next background refresh probes the api again
+    await client.status()
+    assert client.probes == 2
+
+
+async def test_status_data_exposes_probe_latency_and_age(client):
+    await client.status()
+
+    data = client.emitted[-1]
+    assert data["status_probe_latency"] is not None
+    assert data["status_age"] < 1
@@ -15,6 +15,7 @@ from unittest.mock import Mock, patch
 
 import talemate.util as util
 from conftest import MockScene, bootstrap_scene
+from talemate.scene.history_cache import HistoryTokenCache
 from talemate.scene_message import (
     CharacterMessage,
     NarratorMessage,
@@ -3396,3 +3397,49 @@ class TestBuildPreviewParity:
         scene.ts = test_data["basic_scene"]["ts"]
         scene.intro = "A stormy night begins."
         self._assert_parity(summarizer, scene, budget=5000, overrides=overrides)
+
+
+# ---------------------------------------------------------------------------
+# Tests: Best-fit history token cache
+# ---------------------------------------------------------------------------
+
+
+class TestBestFitHistoryTokenCache:
+    """The best-fit builder caches formatted summary entries per scene."""
+
+    def _make_scene(self, summarizer, test_data):
+        TestBestFit._enable_best_fit(summarizer)
+        return TestBestFit._make_test_scene(test_data)
+
+    def test_second_build_hits_cache(self, summarizer, test_data):
+        scene = self._make_scene(summarizer, test_data)
+        first = scene.context_history(budget=2000)
+        cache = scene.history_token_cache
+        assert cache.last_build["misses"] > 0
+
+        second = scene.context_history(budget=2000)
+        assert second == first
+        assert cache.last_build["misses"] == 0
+        assert cache.last_build["hit_rate"] == 1.0
+        assert "build_time_ms" in cache.last_build
+
+    def test_time_passage_reformats_entries(self, summarizer, test_data):
+        scene = self._make_scene(summarizer, test_data)
+        scene.context_history(budget=2000)
+
+        scene.ts = "P10D"
+        uncached = scene.history_token_cache
+        scene.history_token_cache = HistoryTokenCache()
+        expected = scene.context_history(budget=2000)
+
+        scene.history_token_cache = uncached
+        assert scene.context_history(budget=2000) == expected
+        assert uncached.last_build["hits"] == 0
+
+    def test_edited_entry_is_reformatted(self, summarizer, test_data):
+        scene = self._make_scene(summarizer, test_data)
+        scene.context_history(budget=2000)
+
+        scene.archived_history[-1]["text"] = _pad("Rewritten", TestBestFit.ARCH_CHARS)
+        scene.context_history(budget=2000)
+        assert scene.history_token_cache.last_build["misses"] == 1
@@ -0,0 +1,126 @@
+"""
+Unit tests for the memory agent embedding cache.
+"""
+
+import numpy as np
+import pytest
+
+from talemate.agents.memory.embedding_cache import (
+    CachedEmbeddingFunction,
+    EmbeddingCache,
+)
+
+
+class CountingEmbed:
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def __call__(self, texts: list[str]) -> list:
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+@pytest.fixture
+def cache():
+    return EmbeddingCache()
+
+
+def test_only_missing_texts_are_embedded(cache):
+    embed = CountingEmbed()
+
+    first = cache.embed("fp", ["a", "bb"], embed)
+    second = cache.embed("fp", ["bb", "ccc", "a"], embed)
+
+    assert embed.calls == [["a", "bb"], ["ccc"]]
+    assert [list(e) for e in second] == [[2.0, 1.0], [3.0, 1.0], [1.0, 1.0]]
+    assert np.array_equal(first[0], second[2])
+    assert cache.hits == 2
+    assert cache.misses == 3
+
+
+def test_duplicate_texts_are_embedded_once(cache):
+    embed = CountingEmbed()
+
+    result = cache.embed("fp", ["a", "a", "b"], embed)
+
+    assert embed.calls == [["a", "b"]]
+    assert len(result) == 3
+
+
+def test_fingerprint_separates_entries(cache):
+    embed = CountingEmbed()
+
+    cache.embed("fp-1", ["a"], embed)
+    cache.embed("fp-2", ["a"], embed)
+
+    assert len(embed.calls) == 2
+
+
+def test_lru_eviction():
+    cache = EmbeddingCache(max_size=2)
+    embed = CountingEmbed()
+
+    cache.embed("fp", ["a", "b"], embed)
+    cache.embed("fp", ["a"], embed)  # a becomes most recent
+    cache.embed("fp", ["c"], embed)  # evicts b
+
+    embed.calls.clear()
+    cache.embed("fp", ["a", "b"], embed)
+    assert embed.calls == [["b"]]
+
+
+def test_persistence_round_trip(cache, tmp_path):
+    embed = CountingEmbed()
+    cache.embed("fp", ["a", "bb"], embed)
+    cache.embed("other", ["x"], embed)
+    cache.save(str(tmp_path), "fp")
+
+    restored = EmbeddingCache()
+    restored.load(str(tmp_path), "fp")
+    embed.calls.clear()
+
+    result = restored.embed("fp", ["bb", "a"], embed)
+
+    assert embed.calls == []
+    assert [list(e) for e in result] == [[2.0, 1.0], [1.0, 1.0]]
+    assert len(restored.entries) == 2
+
+
+def test_cached_embedding_function_with_chromadb():
+    chromadb = pytest.importorskip("chromadb")
+    from chromadb.api.types import Documents, EmbeddingFunction
+
+    class NamedEmbeddingFunction(EmbeddingFunction):
+        def __init__(self):
+            self.embedded: list[str] = []
+
+        def __call__(self, input: Documents):
+            self.embedded.extend(input)
+            return [np.array([float(len(text)), 1.0, 0.5]) for text in input]
+
+        @staticmethod
+        def name() -> str:
+            return "named"
+
+        def get_config(self) -> dict:
+            return {}
+
+        @staticmethod
+        def build_from_config(config: dict) -> "NamedEmbeddingFunction":
+            return NamedEmbeddingFunction()
+
+    client = chromadb.EphemeralClient()
+    ef = NamedEmbeddingFunction()
+    client.get_or_create_collection("embedding-cache-test", embedding_function=ef)
+
+    cached_ef = CachedEmbeddingFunction(ef, "fp", EmbeddingCache())
+    try:
+        collection = client.get_or_create_collection(
+            "embedding-cache-test", embedding_function=cached_ef
+        )
+        collection.upsert(ids=["a"], documents=["hello"])
+        collection.upsert(ids=["b"], documents=["hello"])
+        assert ef.embedded == ["hello"]
+        assert cached_ef.cache.hits == 1
+    finally:
+        client.delete_collection("embedding-cache-test")
@@ -7,6 +7,7 @@ based on TimePassageMessage entries in scene.history.
 
 import types
 
+from talemate.scene.history import SceneHistory
 from talemate.scene_message import CharacterMessage, TimePassageMessage
 from talemate.tale_mate import Scene
 
@@ -33,7 +34,7 @@ def make_scene(
     """Build a minimal Scene-like namespace with the fix_time methods bound."""
     scene = types.SimpleNamespace(
         ts=ts,
-        history=history,
+        history=SceneHistory(history),
         archived_history=archived_history,
         layered_history=layered_history or [],
     )
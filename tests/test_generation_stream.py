@@ -0,0 +1,163 @@
+"""
+Tests for token-level streaming of generations to the frontend.
+"""
+
+import asyncio
+
+import pytest
+
+from talemate.client.base import ClientBase
+from talemate.client.context import ClientContext
+from talemate.client.streaming import GenerationStream, is_streamable_kind
+from talemate.config.schema import Client as ClientConfig, Config
+from talemate.emit.signals import handlers
+
+
+class StreamingStubClient(ClientBase):
+    client_type = "stub"
+
+    def __init__(self, chunks: list[str], stream_generations: bool = True, **kwargs):
+        super().__init__(name="stub", **kwargs)
+        self.chunks = chunks
+        self._config = ClientConfig(type="stub", name="stub")
+        self._app_config = Config()
+        self._app_config.game.general.stream_generations = stream_generations
+        self.seen_streams: list[GenerationStream | None] = []
+
+    @property
+    def config(self) -> Config:
+        return self._app_config
+
+    @property
+    def client_config(self) -> ClientConfig:
+        return self._config
+
+    def tune_prompt_parameters(self, parameters: dict, kind: str):
+        pass
+
+    def emit_status(self, processing: bool = None):
+        pass
+
+    async def generate(self, prompt: str, parameters: dict, kind: str):
+        self.seen_streams.append(self.generation_stream)
+        response = ""
+        for chunk in self.chunks:
+            response += chunk
+            self.update_request_tokens(self.count_tokens(chunk))
+            self.stream_chunk(chunk)
+            await asyncio.sleep(0)
+        return response
+
+
+async def send(client: ClientBase, kind: str) -> str:
+    with ClientContext(requires_active_scene=False):
+        return await client.send_prompt("Continue.", kind=kind)
+
+
+@pytest.fixture
+def chunk_messages():
+    messages = []
+
+    def receiver(emission):
+        messages.append(emission.data)
+
+    handlers["generation_chunk"].connect(receiver)
+    yield messages
+    handlers["generation_chunk"].disconnect(receiver)
+
+
+def test_streamable_kinds():
+    assert is_streamable_kind("conversation")
+    assert is_streamable_kind("narrate_medium")
+    assert not is_streamable_kind("analyze_freeform")
+    assert not is_streamable_kind("summarize")
+
+
+async def test_stream_emits_chunks_and_done(chunk_messages):
+    stream = GenerationStream("stub", "narrate", emit_interval=0)
+
+    for chunk in ["Once", " upon", " a time"]:
+        stream.put(chunk)
+    stream.close()
+
+    assert [m["chunk"] for m in chunk_messages] == ["Once", " upon", " a time", ""]
+    assert [m["done"] for m in chunk_messages] == [False, False, False, True]
+    assert {m["request_id"] for m in chunk_messages} == {stream.request_id}
+    assert stream.text == "Once upon a time"
+
+
+async def test_stream_coalesces_chunks(chunk_messages):
+    stream = GenerationStream("stub", "narrate", emit_interval=60)
+
+    for chunk in ["a", "b", "c"]:
+        stream.put(chunk)
+    stream.close()
+
+    # the first chunk is emitted right away, the rest is flushed on close
+    assert [m["chunk"] for m in chunk_messages] == ["a", "bc", ""]
+
+
+async def test_stream_iterator_receives_every_chunk():
+    stream = GenerationStream("stub", "narrate")
+    received = []
+
+    async def consume():
+        async for chunk in stream:
+            received.append(chunk)
+
+    task = asyncio.create_task(consume())
+    for chunk in ["x", "y", "z"]:
+        stream.put(chunk)
+        await asyncio.sleep(0)
+    stream.close()
+    await asyncio.wait_for(task, 1)
+
+    assert received == ["x", "y", "z"]
+
+
+async def test_empty_stream_emits_nothing(chunk_messages):
+    stream = GenerationStream("stub", "narrate")
+    stream.close()
+
+    assert chunk_messages == []
+
+
+async def test_discarded_stream_drops_pending_text(chunk_messages):
+    stream = GenerationStream("stub", "narrate", emit_interval=60)
+    stream.put("a")
+    stream.put("b")
+    stream.close(discard=True)
+
+    assert [m["chunk"] for m in chunk_messages] == ["a", ""]
+    assert chunk_messages[-1]["discard"] is True
+
+
+async def test_send_prompt_streams_response(chunk_messages):
+    client = StreamingStubClient(["The door", " creaks", " open."])
+
+    response = await send(client, "narrate")
+
+    assert response == "The door creaks open."
+    assert "".join(m["chunk"] for m in chunk_messages) == response
+    assert chunk_messages[-1]["done"] is True
+    assert chunk_messages[-1]["discard"] is False
+    assert chunk_messages[-1]["kind"] == "narrate"
+    assert client.seen_streams[0] is not None
+    assert client.generation_stream is None
+
+
+async def test_send_prompt_does_not_stream_other_kinds(chunk_messages):
+    client = StreamingStubClient(["{}"])
+
+    await send(client, "analyze_freeform")
+
+    assert chunk_messages == []
+    assert client.seen_streams == [None]
+
+
+async def test_send_prompt_streaming_is_opt_in(chunk_messages):
+    client = StreamingStubClient(["Hello."], stream_generations=False)
+
+    await send(client, "narrate")
+
+    assert chunk_messages == []
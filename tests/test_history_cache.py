@@ -0,0 +1,79 @@
+"""
+Unit tests for the formatted history entry cache.
+"""
+
+from talemate.scene.history_cache import HistoryTokenCache
+
+
+def _format(entry: dict, scene_ts: str) -> str:
+    return f"[{entry.get('ts')} @ {scene_ts}] {entry['text']}"
+
+
+def _count(text: str) -> int:
+    return len(text)
+
+
+ENTRY = {"id": "abc", "text": "The storm passed.", "ts": "PT1H"}
+
+
+class TestHistoryTokenCache:
+    def test_get_caches_formatted_text_and_tokens(self):
+        cache = HistoryTokenCache()
+        text, tokens = cache.get("archived", ENTRY, "PT2H", _format, _count)
+        assert text == _format(ENTRY, "PT2H")
+        assert tokens == len(text)
+
+        assert cache.get("archived", ENTRY, "PT2H", _format, _count) == (text, tokens)
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_scene_time_and_text_are_part_of_the_key(self):
+        cache = HistoryTokenCache()
+        cache.get("archived", ENTRY, "PT2H", _format, _count)
+        cache.get("archived", ENTRY, "PT3H", _format, _count)
+        cache.get("archived", {**ENTRY, "text": "edited"}, "PT2H", _format, _count)
+        assert cache.misses == 3
+
+    def test_invalidate_by_entry_id(self):
+        cache = HistoryTokenCache()
+        cache.get("archived", ENTRY, "PT2H", _format, _count)
+        cache.get("archived", {**ENTRY, "id": "other"}, "PT2H", _format, _count)
+        cache.invalidate("abc")
+        assert [key[1] for key in cache.entries] == ["other"]
+
+    def test_count_function_change_clears_entries(self):
+        cache = HistoryTokenCache()
+        cache.get("archived", ENTRY, "PT2H", _format, _count)
+        _, tokens = cache.get("archived", ENTRY, "PT2H", _format, lambda text: 1)
+        assert tokens == 1
+        assert cache.misses == 2
+
+    def test_persistence_round_trip(self, tmp_path):
+        path = HistoryTokenCache.path_for(str(tmp_path / "scene.json"))
+        assert path.endswith(".history-cache")
+
+        cache = HistoryTokenCache()
+        cache.get("archived", ENTRY, "PT1H", _format, _count)
+        cache.get("archived", ENTRY, "PT2H", _format, _count)
+
+        cache.save(path)
+        assert not (tmp_path / "scene.history-cache").exists()
+
+        cache.persist = True
+        cache.save(path, scene_ts="PT2H")
+
+        loaded = HistoryTokenCache()
+        loaded.load(path, _count)
+        assert len(loaded.entries) == 1
+        loaded.get("archived", ENTRY, "PT2H", _format, _count)
+        assert loaded.hits == 1
+
+    def test_load_ignores_missing_and_corrupt_files(self, tmp_path):
+        cache = HistoryTokenCache()
+        cache.load(str(tmp_path / "missing.history-cache"), _count)
+        assert not cache.entries
+
+        corrupt = tmp_path / "corrupt.history-cache"
+        corrupt.write_text("{not json")
+        cache.load(str(corrupt), _count)
+        assert not cache.entries
@@ -0,0 +1,186 @@
+"""
+Tests for loading the scene history lazily, materializing older messages
+only when they are accessed.
+"""
+
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from conftest import MockClientContext, MockScene, bootstrap_scene
+
+from talemate import save
+from talemate.character import Character
+from talemate.context import ActiveScene
+from talemate.history import collect_time_passages
+from talemate.load import _load_history
+from talemate.scene.history import SceneHistory, UnloadedMessage
+from talemate.scene_message import (
+    CharacterMessage,
+    NarratorMessage,
+    TimePassageMessage,
+    reset_message_id,
+)
+from talemate.tale_mate import Actor
+
+
+def _serialized_history(n: int = 100) -> list[dict]:
+    messages = []
+    for i in range(n):
+        if i % 10 == 5:
+            messages.append(TimePassageMessage(ts="PT1H", message="1 hour later"))
+        elif i % 2:
+            messages.append(NarratorMessage(message=f"narration {i}", source="ai"))
+        else:
+            name = "Elena" if i % 4 else "Marcus"
+            messages.append(CharacterMessage(message=f"{name}: line {i}", source="ai"))
+    return json.loads(json.dumps(messages, cls=save.SceneEncoder))
+
+
+@pytest.fixture
+def data():
+    return _serialized_history()
+
+
+def load(data: list[dict], eager: int) -> SceneHistory:
+    reset_message_id()
+    return _load_history(json.loads(json.dumps(data)), eager=eager)
+
+
+def test_only_recent_window_is_loaded(data):
+    history = load(data, eager=10)
+
+    assert len(history) == 100
+    assert history.num_unloaded == 90
+    assert history[-1].message == "narration 99"
+    assert history.num_unloaded == 90
+
+
+def test_lazy_history_matches_eager_history(data):
+    eager = load(data, eager=len(data))
+    lazy = load(data, eager=10)
+
+    assert [m.__dict__() for m in lazy] == [m.__dict__() for m in eager]
+    assert lazy.num_unloaded == 0
+
+
+def test_messages_materialize_on_access(data):
+    history = load(data, eager=10)
+
+    message = history[3]
+    assert isinstance(message, NarratorMessage)
+    assert history[3] is message
+    assert history.num_unloaded == 89
+
+    assert [m.message for m in history[20:23]] == [
+        "Marcus: line 20",
+        "narration 21",
+        "Elena: line 22",
+    ]
+    assert history.num_unloaded == 86
+
+
+def test_reverse_iteration_only_loads_what_it_reaches(data):
+    history = load(data, eager=10)
+
+    for idx, message in enumerate(reversed(history)):
+        if idx == 19:
+            break
+
+    assert message.message == "Marcus: line 80"
+    assert history.num_unloaded == 80
+
+
+def test_indexes_do_not_materialize(data):
+    history = load(data, eager=10)
+
+    assert history.positions_of_type("time")[:2] == [5, 15]
+    assert history.positions_of_character("Marcus")[:2] == [0, 4]
+    assert history.index_of(history[-1].id) == 99
+    assert history.num_unloaded == 90
+
+    # ids follow history order, as with eager loading
+    message = history.get_by_id(2)
+    assert message is history[1]
+    assert history.num_unloaded == 89
+
+
+def test_removal_keeps_unloaded_count(data):
+    history = load(data, eager=10)
+
+    removed = history.pop(0)
+    del history[0:5]
+    history.insert(0, removed)
+
+    assert history.num_unloaded == 84
+    assert len(history) == 95
+    assert history[0] is removed
+
+
+def test_save_keeps_messages_unloaded(data):
+    history = load(data, eager=10)
+
+    encoded = save.encode_scene_data(
+        save.snapshot_scene_data({"history": history}), compact=True
+    )
+
+    assert history.num_unloaded == 90
+    saved = json.loads(encoded)["history"]
+    assert [entry["message"] for entry in saved] == [entry["message"] for entry in data]
+    assert [entry["id"] for entry in saved] == list(range(1, 101))
+
+
+def test_unloaded_messages_serialize_like_loaded_messages(data):
+    history = load(data, eager=10)
+
+    # narrator entries of the fixture have no meta, the loader migrates it
+    assert "meta" not in data[1]
+    before = history.snapshot()[1].__dict__()
+    assert before == history[1].__dict__()
+
+    # reading the message between two saves doesn't change the saved entry
+    history = load(data, eager=10)
+    first = save.encode_scene_data(
+        save.snapshot_scene_data({"history": history}), compact=True
+    )
+    history[1]
+    second = save.encode_scene_data(
+        save.snapshot_scene_data({"history": history}), compact=True
+    )
+    assert first == second
+
+
+def test_count_messages_does_not_materialize(data):
+    scene = MockScene()
+    scene.history = load(data, eager=10)
+
+    assert scene.count_messages() == 100
+    assert scene.count_messages(message_type="time") == 10
+    assert scene.count_messages(source="Marcus") == 25
+    assert scene.count_messages(message_type="narrator", source="ai") == 40
+    assert len(collect_time_passages(scene)) == 10
+    # only the time passages are loaded
+    assert scene.history.num_unloaded == 81
+
+    scene.history.load_all()
+    assert scene.count_messages(source="Marcus") == 25
+    assert scene.count_messages(message_type="narrator", source="ai") == 40
+
+
+async def test_conversation_turn_keeps_old_messages_unloaded():
+    scene = MockScene()
+    conversation = bootstrap_scene(scene)["conversation"]
+    conversation.rag_build = AsyncMock(return_value=[])
+    for name in ("Elena", "Marcus"):
+        await scene.add_actor(
+            Actor(Character(name=name), conversation), commit_to_memory=False
+        )
+    scene.history = load(_serialized_history(2500), eager=10)
+
+    with ActiveScene(scene):
+        async with MockClientContext() as responses:
+            responses.append("Elena: Hello there.")
+            await conversation.converse(scene.get_character("Elena").actor)
+
+    assert scene.history.num_unloaded > 0
+    assert type(scene.history.snapshot()[0]) is UnloadedMessage
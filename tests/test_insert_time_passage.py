@@ -16,6 +16,7 @@ from talemate.history import (
     delete_time_passage_by_id,
     update_time_passage_by_id,
 )
+from talemate.scene.history import SceneHistory
 from talemate.scene_message import CharacterMessage, TimePassageMessage
 from talemate.tale_mate import Scene
 
@@ -42,7 +43,7 @@ def make_scene(
     """Build a minimal Scene-like namespace with fix_time and message_index."""
     scene = types.SimpleNamespace(
         ts=ts,
-        history=history,
+        history=SceneHistory(history),
         archived_history=archived_history,
         layered_history=layered_history or [],
     )
@@ -12,7 +12,7 @@ from unittest.mock import patch
 import talemate.util as util
 from talemate.context import ActiveScene
 from talemate.exceptions import GenerationCancelled
-from talemate.history import ArchiveEntry
+from talemate.history import ArchiveEntry, ENTRY_TOKENS_KEY
 from talemate.agents.summarize.layered_history import SummaryLongerThanOriginalError
 
 from conftest import MockScene, bootstrap_scene
@@ -618,6 +618,110 @@ class TestChunkSplitting:
         assert parts[0] == "Part1"
         assert parts[1] == "Part2"
 
+    async def test_split_matches_joined_text_packing(self, scene_with_summarizer):
+        """Packing with cached per-entry counts splits like re-counting the joined text."""
+        scene, summarizer = scene_with_summarizer
+        summarizer.actions["layered_history"].config["max_process_tokens"].value = 100
+
+        def reference_split(entries, max_process_tokens):
+            parts = []
+            remaining = entries.copy()
+            while remaining:
+                partial = []
+                while (
+                    remaining
+                    and len("\n\n".join(e["text"] for e in partial))
+                    < max_process_tokens
+                ):
+                    partial.append(remaining.pop(0))
+                parts.append("\n\n".join(e["text"] for e in partial))
+            return parts
+
+        entries = [
+            {"text": _pad(f"E{i}", 10 + (i * 37) % 90), "end": i} for i in range(40)
+        ]
+
+        call_log = summarizer._test_call_log
+        call_log.clear()
+        await summarizer._lh_split_and_summarize_chunks(entries, "")
+
+        assert [c["text"] for c in call_log] == reference_split(entries, 100)
+
+    async def test_entry_tokens_counted_once(self, scene_with_summarizer):
+        """Entry token counts are cached on the entries across passes."""
+        scene, summarizer = scene_with_summarizer
+        scene.archived_history = make_archived_entries(20, chars_per_entry=40)
+
+        with patch.object(
+            util, "count_tokens", side_effect=_char_count_tokens
+        ) as count_tokens:
+            summarizer._lh_plan_chunks(scene.archived_history, 0, 0)
+            counted = [c.args[0] for c in count_tokens.call_args_list]
+            assert len(counted) == len(scene.archived_history)
+
+            count_tokens.reset_mock()
+            summarizer._lh_plan_chunks(scene.archived_history, 0, 0)
+            assert count_tokens.call_count == 0
+
+            # edited text is counted again
+            scene.archived_history[3]["text"] = "edited"
+            summarizer._lh_plan_chunks(scene.archived_history, 0, 0)
+            assert [c.args[0] for c in count_tokens.call_args_list] == ["edited"]
+
+    async def test_cached_counts_not_serialized(self, scene_with_summarizer):
+        scene, summarizer = scene_with_summarizer
+        scene.archived_history = make_archived_entries(8, chars_per_entry=40)
+
+        await summarizer.summarize_to_layered_history()
+
+        assert ENTRY_TOKENS_KEY in scene.archived_history[0]
+        serialized = scene.serialize
+        for entry in serialized["archived_history"]:
+            assert ENTRY_TOKENS_KEY not in entry
+        for layer in serialized["layered_history"]:
+            for entry in layer:
+                assert ENTRY_TOKENS_KEY not in entry
+
+    async def test_cached_counts_not_emitted(self, scene_with_summarizer):
+        scene, summarizer = scene_with_summarizer
+        scene.archived_history = make_archived_entries(8, chars_per_entry=40)
+
+        await summarizer.summarize_to_layered_history()
+        assert ENTRY_TOKENS_KEY in scene.archived_history[0]
+
+        with (
+            patch("talemate.tale_mate.emit") as emit,
+            patch("talemate.tale_mate.emit_archive_add"),
+        ):
+            await scene.push_archive(
+                ArchiveEntry(text="new entry", start=40, end=41, ts="PT1S")
+            )
+
+        emitted = emit.call_args.kwargs["data"]["history"]
+        assert len(emitted) == len(scene.archived_history)
+        for entry in emitted:
+            assert ENTRY_TOKENS_KEY not in entry
+
+
+class TestTokenPacking:
+    """Tests for util.pack_items_by_tokens."""
+
+    def test_closes_before_exceeding(self):
+        packed = list(util.pack_items_by_tokens(["aaa", "bb", "cccc", "d"], 5))
+        assert packed == [(["aaa", "bb"], 5), (["cccc", "d"], 5)]
+
+    def test_overflow_and_separator(self):
+        packed = list(
+            util.pack_items_by_tokens(
+                ["aaa", "bb", "cccc", "d"], 5, separator_tokens=2, overflow=True
+            )
+        )
+        assert packed == [(["aaa", "bb"], 7), (["cccc", "d"], 7)]
+
+    def test_min_items(self):
+        packed = list(util.pack_items_by_tokens(["aaaaaa", "b", "c"], 5, min_items=2))
+        assert packed == [(["aaaaaa", "b"], 7), (["c"], 1)]
+
 
 # ---------------------------------------------------------------------------
 # E. Validation
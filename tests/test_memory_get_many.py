@@ -0,0 +1,114 @@
+"""
+Unit tests for batched memory retrieval in the ChromaDB memory agent.
+"""
+
+import types
+
+import numpy as np
+import pytest
+
+chromadb = pytest.importorskip("chromadb")
+
+from chromadb.api.types import Documents, EmbeddingFunction  # noqa: E402
+
+from talemate.agents.memory import ChromaDBMemoryAgent  # noqa: E402
+from talemate.agents.memory.context import (  # noqa: E402
+    MemoryRequestState,
+    memory_request,
+)
+
+
+class KeywordEmbeddingFunction(EmbeddingFunction):
+    KEYWORDS = ["castle", "forest", "river", "dragon"]
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def __call__(self, input: Documents):
+        self.calls.append(list(input))
+        return [
+            np.array([1.0 if kw in text else 0.01 for kw in self.KEYWORDS])
+            for text in input
+        ]
+
+    @staticmethod
+    def name() -> str:
+        return "keyword"
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(ChromaDBMemoryAgent, "fingerprint", "test-embeddings")
+    monkeypatch.setattr(ChromaDBMemoryAgent, "max_distance", 0.5)
+    agent = ChromaDBMemoryAgent.__new__(ChromaDBMemoryAgent)
+    agent.memory_tracker = {}
+    agent.scene = types.SimpleNamespace(memory_session_id="session-1")
+    agent.db_client = chromadb.EphemeralClient()
+    agent.embedding_fn = KeywordEmbeddingFunction()
+    agent.collection_name = agent._collection_name("scene-a")
+    agent.db = agent.db_client.get_or_create_collection(
+        agent.collection_name,
+        embedding_function=agent.embedding_fn,
+        metadata={"hnsw:space": "cosine"},
+    )
+    agent._add_many(
+        [
+            {"id": "1", "text": "the castle walls", "meta": {"typ": "history"}},
+            {"id": "2", "text": "a dark forest", "meta": {"typ": "history"}},
+            {"id": "3", "text": "the river bank", "meta": {"typ": "details"}},
+            {"id": "4", "text": "a sleeping dragon", "meta": {"typ": "details"}},
+        ]
+    )
+    agent.embedding_fn.calls.clear()
+    yield agent
+    agent.db_client.delete_collection(agent.collection_name)
+
+
+def _requests(n: int) -> list[MemoryRequestState]:
+    return [MemoryRequestState(query=f"q{i}") for i in range(n)]
+
+
+def _ids(results: list) -> list[list[str]]:
+    return [[doc.id for doc in docs] for docs in results]
+
+
+def test_get_many_embeds_all_queries_in_one_batch(agent):
+    texts = ["castle", "forest", "dragon"]
+    requests = _requests(3)
+
+    results = agent._get_many([(text, {}) for text in texts], requests, limit=2)
+
+    assert agent.embedding_fn.calls == [texts]
+    assert [docs[0].id for docs in results] == ["1", "2", "4"]
+    for request, docs in zip(requests, results):
+        assert request.results
+        assert len(request.accepted_results) == len(docs)
+
+
+def test_get_many_matches_single_queries(agent):
+    texts = ["castle", "river"]
+    batched = agent._get_many([(text, {}) for text in texts], _requests(2), limit=3)
+
+    singles = []
+    for text, request in zip(texts, _requests(2)):
+        token = memory_request.set(request)
+        try:
+            singles.append(agent._get(text, limit=3))
+        finally:
+            memory_request.reset(token)
+
+    assert _ids(batched) == _ids(singles)
+
+
+def test_get_many_groups_differing_filters(agent):
+    queries = [
+        ("castle", {"typ": "history"}),
+        ("dragon", {"typ": "details"}),
+        ("forest", {"typ": "history"}),
+    ]
+
+    results = agent._get_many(queries, _requests(3), limit=2)
+
+    assert sorted(agent.embedding_fn.calls) == [["castle", "forest"], ["dragon"]]
+    assert [docs[0].id for docs in results] == ["1", "4", "2"]
+    assert all(doc.meta["typ"] == "details" for doc in results[1])
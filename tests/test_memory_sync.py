@@ -0,0 +1,121 @@
+"""
+Unit tests for the incremental long-term memory sync of the ChromaDB memory
+agent.
+"""
+
+import types
+
+import numpy as np
+import pytest
+
+chromadb = pytest.importorskip("chromadb")
+
+from chromadb.api.types import Documents, EmbeddingFunction  # noqa: E402
+
+from talemate.agents.memory import ChromaDBMemoryAgent, content_hash  # noqa: E402
+
+
+class CountingEmbeddingFunction(EmbeddingFunction):
+    def __init__(self):
+        self.embedded: list[str] = []
+
+    def __call__(self, input: Documents):
+        self.embedded.extend(input)
+        return [np.array([float(len(text)), 1.0, 0.5]) for text in input]
+
+    @staticmethod
+    def name() -> str:
+        return "counting"
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(ChromaDBMemoryAgent, "fingerprint", "test-embeddings")
+    agent = ChromaDBMemoryAgent.__new__(ChromaDBMemoryAgent)
+    agent.memory_tracker = {}
+    agent.scene = types.SimpleNamespace(memory_session_id="session-1")
+    agent.db_client = chromadb.EphemeralClient()
+    agent.embedding_fn = CountingEmbeddingFunction()
+    agent.collection_name = agent._collection_name("scene-a")
+    agent.db = agent.db_client.get_or_create_collection(
+        agent.collection_name,
+        embedding_function=agent.embedding_fn,
+        metadata={"hnsw:space": "cosine"},
+    )
+    yield agent
+    for collection in agent.db_client.list_collections():
+        agent.db_client.delete_collection(collection.name)
+
+
+def _documents(texts: dict[str, str]) -> list[dict]:
+    return [
+        {"id": uid, "text": text, "meta": {"typ": "history", "ts": "PT1S"}}
+        for uid, text in texts.items()
+    ]
+
+
+def test_content_hash_ignores_session():
+    meta = {"typ": "history", "session": "a"}
+    assert content_hash("text", meta) == content_hash(
+        "text", {**meta, "session": "b", "content_hash": "x"}
+    )
+    assert content_hash("text", meta) != content_hash("other", meta)
+    assert content_hash("text", meta) != content_hash("text", {"typ": "details"})
+
+
+def test_sync_only_embeds_changed_documents(agent):
+    stats = agent._sync_many(_documents({"a": "one", "b": "two", "c": "three"}))
+    assert stats == {"total": 3, "embedded": 3, "removed": 0}
+
+    agent.embedding_fn.embedded.clear()
+    stats = agent._sync_many(_documents({"a": "one", "b": "changed", "d": "four"}))
+
+    assert stats == {"total": 3, "embedded": 2, "removed": 1}
+    assert sorted(agent.embedding_fn.embedded) == ["changed", "four"]
+
+    stored = agent.db.get()
+    assert dict(zip(stored["ids"], stored["documents"])) == {
+        "a": "one",
+        "b": "changed",
+        "d": "four",
+    }
+
+
+def test_sync_is_noop_when_nothing_changed(agent):
+    documents = _documents({"a": "one", "b": "two"})
+    agent._sync_many(documents)
+    agent.embedding_fn.embedded.clear()
+
+    stats = agent._sync_many(_documents({"a": "one", "b": "two"}))
+
+    assert stats["embedded"] == 0
+    assert agent.embedding_fn.embedded == []
+
+
+def test_sync_reembeds_documents_without_hash(agent):
+    agent.db.upsert(ids=["a"], documents=["one"], metadatas=[{"typ": "history"}])
+    agent.embedding_fn.embedded.clear()
+
+    stats = agent._sync_many(_documents({"a": "one"}))
+
+    assert stats["embedded"] == 1
+
+
+def test_copy_db_does_not_reembed(agent):
+    agent._sync_many(_documents({"a": "one", "b": "two"}))
+    agent.embedding_fn.embedded.clear()
+
+    agent._copy_db("scene-b")
+
+    target = agent.db_client.get_collection(
+        agent._collection_name("scene-b"),
+        embedding_function=agent.embedding_fn,
+    )
+    assert agent.embedding_fn.embedded == []
+    assert sorted(target.get()["ids"]) == ["a", "b"]
+    assert target.metadata == agent.db.metadata
+
+    agent.db = target
+    agent.collection_name = target.name
+    stats = agent._sync_many(_documents({"a": "one", "b": "two"}))
+    assert stats["embedded"] == 0
@@ -0,0 +1,61 @@
+"""
+Unit tests for the process-wide prompt template environment cache.
+"""
+
+import pytest
+
+from talemate.prompts.base import TEMPLATE_ENV_CACHE, Prompt
+
+
+@pytest.fixture(autouse=True)
+def clear_env_cache():
+    TEMPLATE_ENV_CACHE.clear()
+    yield
+    TEMPLATE_ENV_CACHE.clear()
+
+
+class TestTemplateEnvironmentCache:
+    def test_same_agent_type_shares_environment(self):
+        env_a = Prompt.get("narrator.system").template_env()
+        env_b = Prompt.get("narrator.paraphrase").template_env()
+        assert env_a is env_b
+        assert TEMPLATE_ENV_CACHE.hits == 1
+        assert TEMPLATE_ENV_CACHE.misses == 1
+
+    def test_different_agent_type_gets_own_environment(self):
+        env_a = Prompt.get("narrator.system").template_env()
+        env_b = Prompt.get("conversation.system").template_env()
+        assert env_a is not env_b
+
+    def test_disabled_cache_builds_fresh_environment(self):
+        TEMPLATE_ENV_CACHE.enabled = False
+        try:
+            env_a = Prompt.get("narrator.system").template_env()
+            env_b = Prompt.get("narrator.system").template_env()
+        finally:
+            TEMPLATE_ENV_CACHE.enabled = True
+        assert env_a is not env_b
+        assert TEMPLATE_ENV_CACHE.misses == 0
+
+    def test_render_does_not_leak_prompt_into_env_globals(self):
+        prompt = Prompt.from_text("{{ prompt_instance.name }}", agent_type="narrator")
+        prompt.name = "leak-check"
+        assert prompt.render() == "leak-check"
+        assert "prompt_instance" not in prompt.template_env().globals
+
+    def test_nested_renders_keep_their_own_prompt_instance(self):
+        inner = Prompt.from_text("inner", agent_type="narrator")
+        outer = Prompt.from_text(
+            "{{ render() }}|{{ prompt_instance.vars.label }}",
+            agent_type="narrator",
+            vars={"label": "outer", "render": lambda: inner.render()},
+        )
+        assert outer.render() == "inner|outer"
+
+    def test_capture_context_uses_render_prompt_instance(self):
+        prompt = Prompt.from_text(
+            "before {% capture_context %}captured{% end_capture_context %} after",
+            agent_type="narrator",
+        )
+        assert prompt.render() == "before captured after"
+        assert prompt.captured_context == "captured"
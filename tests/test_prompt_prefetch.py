@@ -0,0 +1,196 @@
+"""
+Tests for the concurrent prefetch of agent queries made by templates.
+"""
+
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+from talemate.prompts.base import Prompt
+
+
+class FakeWorldState:
+    def __init__(self, concurrent: bool = True, delay: float = 0.05):
+        self.client = Mock(max_concurrent_requests=3 if concurrent else 1)
+        self.delay = delay
+        self.calls: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def analyze_text_and_answer_question(self, text, query, **kwargs):
+        self.calls.append(query)
+        answer = f"{query} -> {len(self.calls)}"
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return answer
+
+
+@pytest.fixture
+def world_state():
+    return FakeWorldState()
+
+
+@pytest.fixture
+def agents(world_state):
+    agents = {"world_state": world_state}
+    with patch("talemate.instance.get_agent", side_effect=agents.get):
+        yield agents
+
+
+def render(template: str, prefetch_queries: bool = True, **vars) -> str:
+    prompt = Prompt.from_text(template, vars=vars, agent_type="narrator")
+    prompt.prefetch_queries = prefetch_queries
+    return prompt.render()
+
+
+THREE_QUERIES = (
+    "{{ query_text('a', 'text', as_question_answer=False) }}|"
+    "{{ query_text('b', 'text', as_question_answer=False) }}|"
+    "{{ query_text('c', 'text', as_question_answer=False) }}"
+)
+
+
+async def test_queries_run_concurrently(agents, world_state):
+    result = render(THREE_QUERIES)
+
+    assert sorted(world_state.calls) == ["a", "b", "c"]
+    assert world_state.max_in_flight == 3
+    for query in "abc":
+        assert f"{query} -> " in result
+
+
+async def test_queries_run_one_at_a_time_without_concurrent_inference(agents):
+    world_state = agents["world_state"] = FakeWorldState(concurrent=False)
+
+    render(THREE_QUERIES)
+
+    assert len(world_state.calls) == 3
+    assert world_state.max_in_flight == 1
+
+
+async def test_no_discovery_without_concurrent_inference(agents):
+    agents["world_state"] = FakeWorldState(concurrent=False)
+    rendered = Mock(return_value="x")
+
+    render("{{ counter() }}|" + THREE_QUERIES, counter=rendered)
+
+    # discovery is abandoned at the first query, the template renders once
+    # more the regular way
+    assert rendered.call_count == 2
+    assert agents["world_state"].calls == ["a", "b", "c"]
+
+
+async def test_memory_queries_are_prefetched_without_concurrent_inference(agents):
+    agents["world_state"] = FakeWorldState(concurrent=False)
+    memory = FakeWorldState(delay=0.05)
+
+    async def query(query, **kwargs):
+        return await memory.analyze_text_and_answer_question("", query)
+
+    agents["memory"] = Mock(query=query)
+
+    render(
+        "{{ query_memory('a', as_question_answer=False) }}|"
+        "{{ query_memory('b', as_question_answer=False) }}"
+    )
+
+    assert memory.max_in_flight == 2
+
+
+async def test_random_arguments_match_prefetched_results(agents, world_state):
+    template = (
+        "{{ query_text('a' ~ random(1, 1000000), 'text', as_question_answer=False) }}|"
+        "{{ query_text('b' ~ random(1, 1000000), 'text', as_question_answer=False) }}"
+    )
+
+    render(template)
+
+    assert len(world_state.calls) == 2
+    assert world_state.max_in_flight == 2
+
+
+async def test_prefetch_can_be_disabled(agents, world_state):
+    result = render(THREE_QUERIES, prefetch_queries=False)
+
+    assert result == "a -> 1|b -> 2|c -> 3"
+    assert world_state.max_in_flight == 1
+
+
+async def test_template_without_queries_renders_once(agents):
+    rendered = Mock(return_value="x")
+
+    assert render("{{ counter() }}", counter=rendered) == "x"
+    assert rendered.call_count == 1
+
+
+async def test_dependent_query_runs_after_prefetch(agents, world_state):
+    template = (
+        "{% set first = query_text('a', 'text', as_question_answer=False) %}"
+        "{{ query_text(first, 'text', as_question_answer=False) }}"
+    )
+
+    result = render(template)
+
+    # `a` is prefetched, the second query depends on its answer
+    assert world_state.calls == ["a", "a -> 1"]
+    assert result == "a -> 1 -> 2"
+
+
+async def test_identical_queries_are_answered_separately(agents, world_state):
+    template = (
+        "{{ query_text('a', 'text', as_question_answer=False) }}|"
+        "{{ query_text('a', 'text', as_question_answer=False) }}"
+    )
+
+    result = render(template)
+
+    assert len(world_state.calls) == 2
+    assert len(set(result.split("|"))) == 2
+
+
+async def test_nested_prompts_share_the_prefetch(agents, world_state):
+    inner = Prompt.from_text(
+        "{{ query_text('inner', 'text', as_question_answer=False) }}",
+        agent_type="narrator",
+    )
+    template = "{{ query_text('outer', 'text', as_question_answer=False) }}|{{ inner.render() }}"
+
+    result = render(template, inner=inner)
+
+    assert sorted(world_state.calls) == ["inner", "outer"]
+    assert world_state.max_in_flight == 2
+    assert "inner -> " in result
+    assert inner.prompt == result.split("|")[1]
+
+
+async def test_side_effects_fall_back_to_regular_render(agents, world_state):
+    action = Mock(return_value=asyncio.sleep(0, result="done"))
+    agents["director"] = Mock(act=action)
+    template = (
+        "{{ query_text('a', 'text', as_question_answer=False) }}|"
+        "{{ agent_action('director', 'act') }}"
+    )
+
+    result = render(template)
+
+    assert result == "a -> 1|done"
+    assert action.call_count == 1
+    assert world_state.calls == ["a"]
+
+
+async def test_template_state_is_not_applied_twice(agents):
+    prompt = Prompt.from_text(
+        "{{ mod_response_length(100) }}{{ li() }}"
+        "{{ query_text('a', 'text', as_question_answer=False) }}",
+        agent_type="narrator",
+    )
+
+    prompt.render()
+
+    assert prompt.response_length_mod == 100
+    assert prompt.vars["bullet_num"] == 2
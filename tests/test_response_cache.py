@@ -0,0 +1,185 @@
+"""
+Tests for the response cache of deterministic agent prompts.
+"""
+
+import pytest
+
+import talemate.client.base as client_base
+from talemate.agents.context import ActiveAgentContext, active_agent
+from talemate.client.base import ClientBase
+from talemate.client.context import ClientContext
+from talemate.client.response_cache import CachedResponse, ResponseCache
+from talemate.config.schema import Client as ClientConfig, Config
+from talemate.emit.signals import handlers
+
+
+class StubAgent:
+    verbose_name = "Stub"
+
+    def allow_response_cache(self, kind: str, agent_function_name: str) -> bool:
+        return agent_function_name == "analyze"
+
+    def allow_repetition_break(self, kind, agent_function_name, auto=False):
+        return True
+
+    def inject_prompt_paramters(self, parameters, kind, agent_function_name):
+        pass
+
+
+async def analyze():
+    pass
+
+
+async def narrate():
+    pass
+
+
+class CountingClient(ClientBase):
+    client_type = "stub"
+
+    def __init__(self, response_cache: bool = True, **kwargs):
+        super().__init__(name="stub", **kwargs)
+        self._config = ClientConfig(type="stub", name="stub", model="model-a")
+        self._app_config = Config()
+        self._app_config.game.general.response_cache = response_cache
+        self.generations = 0
+
+    @property
+    def config(self) -> Config:
+        return self._app_config
+
+    @property
+    def client_config(self) -> ClientConfig:
+        return self._config
+
+    def tune_prompt_parameters(self, parameters: dict, kind: str):
+        parameters["temperature"] = 0.5
+
+    def emit_status(self, processing: bool = None):
+        pass
+
+    async def generate(self, prompt: str, parameters: dict, kind: str):
+        self.generations += 1
+        return f"response {self.generations}"
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ResponseCache(path=tmp_path)
+    monkeypatch.setattr(client_base, "RESPONSE_CACHE", cache)
+    return cache
+
+
+@pytest.fixture
+def prompts_sent():
+    prompts = []
+
+    def receiver(emission):
+        prompts.append(emission.data)
+
+    handlers["prompt_sent"].connect(receiver)
+    yield prompts
+    handlers["prompt_sent"].disconnect(receiver)
+
+
+async def send(client: ClientBase, fn=analyze, prompt: str = "Analyze.", **context):
+    token = active_agent.set(ActiveAgentContext(agent=StubAgent(), fn=fn))
+    try:
+        with ClientContext(requires_active_scene=False, **context):
+            return await client.send_prompt(prompt, kind="analyze_freeform")
+    finally:
+        active_agent.reset(token)
+
+
+def test_cache_lru(tmp_path):
+    cache = ResponseCache(max_size=1, path=None)
+    cache.put("a", CachedResponse(response="A"))
+    cache.put("b", CachedResponse(response="B"))
+
+    assert cache.get("a") is None
+    assert cache.get("b").response == "B"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_survives_restart(tmp_path):
+    ResponseCache(path=tmp_path).put("key", CachedResponse(response="A"))
+
+    cache = ResponseCache(path=tmp_path)
+    assert cache.get("key").response == "A"
+    assert cache.disk_hits == 1
+
+
+def test_clear_removes_disk_entries(tmp_path):
+    cache = ResponseCache(path=tmp_path)
+    cache.put("key", CachedResponse(response="A"))
+    cache.clear()
+
+    assert ResponseCache(path=tmp_path).get("key") is None
+
+
+def test_prune_keeps_newest_entries(tmp_path):
+    cache = ResponseCache(path=tmp_path, max_disk_entries=2)
+    for key in ("aa", "bb", "cc"):
+        cache.put(key, CachedResponse(response=key))
+    cache.prune()
+
+    assert cache.stats["disk_size"] == 2
+
+
+def test_key_depends_on_model_and_parameters():
+    key = ResponseCache.key("prompt", "stub", "model-a", "analyze", {"temp": 0.5})
+
+    assert key == ResponseCache.key(
+        "prompt", "stub", "model-a", "analyze", {"temp": 0.5}
+    )
+    assert key != ResponseCache.key(
+        "prompt", "stub", "model-b", "analyze", {"temp": 0.5}
+    )
+    assert key != ResponseCache.key(
+        "prompt", "stub", "model-a", "analyze", {"temp": 0.7}
+    )
+
+
+async def test_repeated_prompt_is_served_from_cache(cache, prompts_sent):
+    client = CountingClient()
+
+    assert await send(client) == "response 1"
+    assert await send(client) == "response 1"
+
+    assert client.generations == 1
+    assert cache.hits == 1
+    assert [p["cached"] for p in prompts_sent] == [False, True]
+
+
+async def test_different_prompt_is_not_served_from_cache(cache):
+    client = CountingClient()
+
+    await send(client)
+    assert await send(client, prompt="Analyze again.") == "response 2"
+
+
+async def test_agent_function_has_to_opt_in(cache):
+    client = CountingClient()
+
+    await send(client, fn=narrate)
+    await send(client, fn=narrate)
+
+    assert client.generations == 2
+    assert cache.stats["size"] == 0
+
+
+async def test_cache_is_opt_in(cache):
+    client = CountingClient(response_cache=False)
+
+    await send(client)
+    await send(client)
+
+    assert client.generations == 2
+
+
+async def test_jiggled_prompts_bypass_cache(cache):
+    client = CountingClient()
+
+    await send(client)
+    assert await send(client, nuke_repetition=0.5) == "response 2"
+    assert cache.hits == 0
@@ -0,0 +1,218 @@
+"""
+Unit tests for the indexed scene history container and the scene lookups
+that use it.
+"""
+
+import copy
+import random
+
+import pytest
+
+from talemate.scene.history import SceneHistory
+from talemate.scene_message import (
+    CharacterMessage,
+    DirectorMessage,
+    NarratorMessage,
+    TimePassageMessage,
+)
+from conftest import MockScene
+
+
+def _make_history(n: int = 200, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    messages = []
+    for i in range(n):
+        roll = rng.random()
+        if roll < 0.5:
+            name = rng.choice(["Elena", "Marcus", "Player"])
+            messages.append(
+                CharacterMessage(
+                    message=f"{name}: line {i}",
+                    source="player" if name == "Player" else "ai",
+                )
+            )
+        elif roll < 0.75:
+            messages.append(NarratorMessage(message=f"narration {i}", source="ai"))
+        elif roll < 0.95:
+            messages.append(
+                DirectorMessage(
+                    message=f"direction {i}",
+                    source="ai",
+                    meta={"character": rng.choice(["Elena", "Marcus"])},
+                )
+            )
+        else:
+            messages.append(TimePassageMessage(ts="PT1H", message="1 hour later"))
+    return messages
+
+
+@pytest.fixture
+def scene():
+    scene = MockScene()
+    scene.history = _make_history()
+    return scene
+
+
+class TestSceneHistory:
+    def test_lookups(self):
+        messages = _make_history()
+        history = SceneHistory(messages)
+
+        for idx, message in enumerate(messages):
+            assert history.index_of(message.id) == idx
+            assert history.get_by_id(message.id) is message
+
+        assert history.index_of(-1) == -1
+        assert history.positions_of_type("narrator") == [
+            i for i, m in enumerate(messages) if m.typ == "narrator"
+        ]
+        assert history.positions_of_character("Elena") == [
+            i
+            for i, m in enumerate(messages)
+            if isinstance(m, CharacterMessage) and m.character_name == "Elena"
+        ]
+
+    def test_append_and_pop_keep_index_in_sync(self):
+        history = SceneHistory(_make_history(50))
+        history.index_of(0)  # build index
+
+        message = NarratorMessage(message="new")
+        history.append(message)
+        assert history.index_of(message.id) == len(history) - 1
+        assert history.positions_of_type("narrator")[-1] == len(history) - 1
+
+        removed = history.pop(10)
+        assert history.index_of(removed.id) == -1
+        for idx, message in enumerate(history):
+            assert history.index_of(message.id) == idx
+        assert history.positions_of_type("director") == [
+            i for i, m in enumerate(history) if m.typ == "director"
+        ]
+
+    def test_remove_and_insert(self):
+        messages = _make_history(50)
+        history = SceneHistory(messages)
+        target = messages[20]
+
+        history.remove(target)
+        assert history.get_by_id(target.id) is None
+
+        history.insert(5, target)
+        assert history.index_of(target.id) == 5
+        for idx, message in enumerate(history):
+            assert history.index_of(message.id) == idx
+
+    def test_in_place_id_change_is_detected(self):
+        messages = _make_history(10)
+        history = SceneHistory(messages)
+        history.index_of(0)
+
+        old_id = messages[3].id
+        messages[3].id = 999999
+        assert history.index_of(999999) == 3
+        assert history.index_of(old_id) == -1
+
+    def test_message_edited_updates_character_index(self):
+        message = CharacterMessage(message="Elena: hello")
+        history = SceneHistory([message])
+        assert history.positions_of_character("Elena") == [0]
+
+        message.message = "Marcus: hello"
+        history.message_edited(message)
+        assert history.positions_of_character("Marcus") == [0]
+        assert history.positions_of_character("Elena") == []
+
+    def test_copy_does_not_share_index(self):
+        history = SceneHistory(_make_history(10))
+        history.index_of(0)
+        copied = copy.copy(history)
+        assert isinstance(copied, SceneHistory)
+        copied.pop()
+        assert len(copied) == len(history) - 1
+        assert history.index_of(history[-1].id) == len(history) - 1
+
+
+class TestSceneLookups:
+    def test_history_assignment_wraps_list(self, scene):
+        scene.history = list(scene.history)
+        assert isinstance(scene.history, SceneHistory)
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"typ": "character"},
+            {"typ": ["narrator", "director"]},
+            {"typ": "character", "source": "player"},
+            {"typ": "director", "max_iterations": 5},
+            {"typ": "narrator", "stop_on_time_passage": True},
+            {
+                "typ": "director",
+                "max_iterations": 3,
+                "count_only_types": ["character"],
+            },
+            {"typ": "director", "character_name": "Marcus"},
+            {"typ": "scene"},
+        ],
+    )
+    def test_last_message_of_type_matches_linear_scan(self, scene, kwargs):
+        while scene.history:
+            indexed = scene.last_message_of_type(**kwargs)
+            linear = scene.last_message_of_type(on_iterate=lambda m: None, **kwargs)
+            assert indexed is linear
+            scene.history.pop()
+
+    def test_count_character_messages_since_director(self, scene):
+        for name in ("Elena", "Marcus"):
+            for stop in (False, True):
+                for max_iterations in (None, 10):
+                    expected = 0
+                    count = 0
+                    for idx in range(len(scene.history) - 1, -1, -1):
+                        if (
+                            max_iterations is not None
+                            and idx < len(scene.history) - max_iterations
+                        ):
+                            break
+                        message = scene.history[idx]
+                        if isinstance(message, TimePassageMessage) and stop:
+                            break
+                        if (
+                            isinstance(message, DirectorMessage)
+                            and message.character_name == name
+                        ):
+                            expected = count
+                            break
+                        if (
+                            isinstance(message, CharacterMessage)
+                            and message.character_name == name
+                        ):
+                            count += 1
+
+                    assert (
+                        scene.count_character_messages_since_director(
+                            name,
+                            max_iterations=max_iterations,
+                            stop_on_time_passage=stop,
+                        )
+                        == expected
+                    )
+
+    def test_pop_message_by_id(self, scene):
+        message = scene.history[42]
+        assert scene.pop_message(message.id) is True
+        assert scene.get_message(message.id) is None
+        assert scene.pop_message(message.id) is False
+
+    def test_pop_history_all_of_type(self, scene):
+        scene.pop_history("director", all=True)
+        assert not any(m.typ == "director" for m in scene.history)
+        assert scene.history.positions_of_type("director") == []
+
+    def test_delete_and_edit_message(self, scene):
+        message = scene.history[10]
+        scene.delete_message(message.id)
+        assert scene.message_index(message.id) == -1
+
+        character = scene.history[scene.history.positions_of_type("character")[-1]]
+        scene.edit_message(character.id, "Someone: changed")
+        assert scene.last_message_by_character("Someone") is character
@@ -0,0 +1,165 @@
+"""
+Tests for the scene library index behind `list_scenes_directory`.
+"""
+
+import json
+import os
+import threading
+
+import pytest
+
+import talemate.files as files
+from talemate.files import SceneLibrary
+
+
+def write_scene(path, title: str = "", characters: tuple = (), cover: str = None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                "title": title,
+                "character_data": {name: {} for name in characters},
+                "assets": {"cover_image": cover},
+            }
+        )
+    )
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "scenes"
+    write_scene(root / "castle" / "castle.json", "The Castle", ("Elena",), "abc")
+    write_scene(root / "forest" / "forest.json", "Dark Forest", ("Marcus",))
+    write_scene(root / "castle" / "nodes" / "graph.json")
+    write_scene(root / "castle" / "changelog" / "castle.json.base.json")
+    write_scene(root / "castle" / "assets" / "meta.json")
+    (root / "characters").mkdir()
+    (root / "characters" / "elena.png").write_bytes(b"png")
+    return root
+
+
+@pytest.fixture
+def library(root, tmp_path):
+    return SceneLibrary(root, index_path=tmp_path / "index.json", poll_interval=0)
+
+
+def paths(entries, root) -> list[str]:
+    return [os.path.relpath(entry.path, root) for entry in entries]
+
+
+def test_excluded_directories_are_pruned(library, root, monkeypatch):
+    walked = []
+    walk = os.walk
+
+    def recording_walk(top):
+        for dirpath, dirnames, filenames in walk(top):
+            walked.append(os.path.basename(dirpath))
+            yield dirpath, dirnames, filenames
+
+    monkeypatch.setattr(files.os, "walk", recording_walk)
+
+    assert paths(library.search(), root) == [
+        "castle/castle.json",
+        "characters/elena.png",
+        "forest/forest.json",
+    ]
+    assert not {"nodes", "changelog", "assets"} & set(walked)
+
+
+def test_metadata_is_indexed(library, root):
+    entry = library.search("castle")[0]
+
+    assert entry.title == "The Castle"
+    assert entry.cover_image == "abc"
+    assert entry.characters == ["Elena"]
+
+
+def test_search_matches_title_and_characters(library, root):
+    assert paths(library.search("dark"), root) == ["forest/forest.json"]
+    assert paths(library.search("marcus"), root) == ["forest/forest.json"]
+    assert paths(library.search("elena", list_images=False), root) == [
+        "castle/castle.json"
+    ]
+
+
+def test_only_changed_files_are_reread(library, root, monkeypatch):
+    library.search()
+
+    read = []
+    read_metadata = files._read_metadata
+
+    def recording_read(entry):
+        read.append(os.path.relpath(entry.path, root))
+        read_metadata(entry)
+
+    monkeypatch.setattr(files, "_read_metadata", recording_read)
+
+    write_scene(root / "forest" / "forest.json", "Bright Forest Path", ("Marcus",))
+    write_scene(root / "lake" / "lake.json", "Lake")
+    (root / "castle" / "castle.json").unlink()
+
+    assert library.refresh()
+    assert sorted(read) == ["forest/forest.json", "lake/lake.json"]
+    assert paths(library.search("forest"), root) == ["forest/forest.json"]
+    assert not library.search("castle")
+
+
+def test_refresh_is_throttled(library, root):
+    library.poll_interval = 60
+    library.search()
+
+    write_scene(root / "lake" / "lake.json", "Lake")
+
+    assert not library.search("lake")
+    assert library.refresh(force=True)
+    assert library.search("lake")
+
+
+def test_index_survives_restart(library, root, tmp_path, monkeypatch):
+    library.search()
+
+    monkeypatch.setattr(
+        files, "_read_metadata", lambda entry: pytest.fail("re-read unchanged file")
+    )
+
+    restarted = SceneLibrary(root, index_path=tmp_path / "index.json")
+    assert restarted.search("marcus")[0].title == "Dark Forest"
+
+
+def test_list_scenes_directory(root, monkeypatch):
+    monkeypatch.chdir(root.parent)
+    monkeypatch.setattr(files, "SCENE_LIBRARY", None)
+    monkeypatch.setattr(files, "SCENE_LIBRARY_INDEX", None)
+
+    assert files.list_scenes_directory(list_images=False, query="elena") == [
+        str(root / "castle" / "castle.json")
+    ]
+
+
+async def test_iter_scenes_directory_serves_last_index_then_refreshes(
+    root, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(root.parent)
+    monkeypatch.setattr(files, "SCENE_LIBRARY", None)
+    monkeypatch.setattr(files, "SCENE_LIBRARY_INDEX", tmp_path / "index.json")
+
+    threads = []
+    read_metadata = files._read_metadata
+
+    def recording_read(entry):
+        threads.append(threading.current_thread())
+        read_metadata(entry)
+
+    monkeypatch.setattr(files, "_read_metadata", recording_read)
+
+    # no index yet, the first answer waits for the refresh
+    listings = [listing async for listing in files.iter_scenes_directory(query="lake")]
+    assert listings == [[]]
+    assert threading.main_thread() not in threads
+
+    write_scene(root / "lake" / "lake.json", "Lake")
+    files.SCENE_LIBRARY.refreshed_at = None
+
+    # the last index is served first, the refreshed one follows
+    listings = [listing async for listing in files.iter_scenes_directory(query="lake")]
+    assert listings == [[], [str(root / "lake" / "lake.json")]]
@@ -0,0 +1,167 @@
+"""
+Tests for writing scene files off the event loop.
+"""
+
+import asyncio
+import json
+import os
+import stat
+import threading
+
+import pytest
+
+import talemate.save as save
+from talemate.scene_message import CharacterMessage
+from talemate.util.fs import UMASK
+
+
+SCENE_DATA = {
+    "name": "Test",
+    "history": [CharacterMessage("Elmer: Hello.", source="ai")],
+    "agent_state": {"director": {1: "one"}},
+}
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_encoded_scene_data_round_trips(compact):
+    encoded = save.encode_scene_data(SCENE_DATA, compact=compact)
+    data = json.loads(encoded)
+
+    assert data["history"][0]["message"] == "Elmer: Hello."
+    assert data["agent_state"]["director"]["1"] == "one"
+    assert (b"\n" not in encoded) is compact
+
+
+def test_compact_encoding_without_orjson(monkeypatch):
+    monkeypatch.setattr(save, "orjson", None)
+    encoded = save.encode_scene_data(SCENE_DATA, compact=True)
+    assert json.loads(encoded)["name"] == "Test"
+    assert b"\n" not in encoded
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    path = str(tmp_path / "scene.json")
+    save.write_scene_file(path, {"name": "a"})
+    save.write_scene_file(path, {"name": "b"})
+
+    assert json.loads(open(path).read())["name"] == "b"
+    assert os.listdir(tmp_path) == ["scene.json"]
+
+
+def test_failed_write_keeps_previous_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "scene.json")
+    save.write_scene_file(path, {"name": "a"})
+
+    with pytest.raises(TypeError):
+        save.write_scene_file(path, {"name": object()})
+
+    assert json.loads(open(path).read())["name"] == "a"
+    assert os.listdir(tmp_path) == ["scene.json"]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="posix file modes")
+def test_atomic_write_keeps_file_mode(tmp_path):
+    path = str(tmp_path / "scene.json")
+    save.write_scene_file(path, {"name": "a"})
+
+    # new files get the default mode, not the owner-only temporary file mode
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~UMASK
+
+    os.chmod(path, 0o664)
+    save.write_scene_file(path, {"name": "b"})
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o664
+
+
+def test_snapshot_copies_containers():
+    data = {"history": [{"text": "a"}], "state": {"x": [1]}}
+    snapshot = save.snapshot_scene_data(data)
+
+    data["history"].append({"text": "b"})
+    data["history"][0]["text"] = "changed"
+    data["state"]["x"].append(2)
+
+    assert snapshot == {"history": [{"text": "a"}], "state": {"x": [1]}}
+
+
+@pytest.fixture
+def slow_writes(monkeypatch):
+    """
+    Records writes, each one blocking until `release` is set
+    """
+    written = []
+    release = threading.Event()
+
+    def write_scene_file(path, data, compact=False):
+        release.wait(5)
+        written.append((path, data["name"]))
+
+    monkeypatch.setattr(save, "write_scene_file", write_scene_file)
+    return written, release
+
+
+async def test_write_does_not_block_event_loop(slow_writes):
+    written, release = slow_writes
+    writer = save.SceneFileWriter()
+
+    task = asyncio.create_task(writer.write("scene.json", {"name": "a"}))
+    await asyncio.sleep(0.01)
+
+    # the loop keeps running while the write is in flight
+    assert not task.done()
+    release.set()
+    await task
+
+    assert written == [("scene.json", "a")]
+
+
+async def test_writes_in_flight_are_coalesced(slow_writes):
+    written, release = slow_writes
+    writer = save.SceneFileWriter()
+
+    first = asyncio.create_task(writer.write("scene.json", {"name": "a"}))
+    await asyncio.sleep(0.01)
+    others = [
+        asyncio.create_task(writer.write("scene.json", {"name": name}))
+        for name in "bcd"
+    ]
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(first, *others)
+
+    assert written == [("scene.json", "a"), ("scene.json", "d")]
+    assert writer.coalesced == 2
+    assert not writer.writing
+
+
+async def test_writes_to_other_paths_are_not_coalesced(slow_writes):
+    written, release = slow_writes
+    writer = save.SceneFileWriter()
+    release.set()
+
+    await asyncio.gather(
+        writer.write("a.json", {"name": "a"}), writer.write("b.json", {"name": "b"})
+    )
+
+    assert sorted(written) == [("a.json", "a"), ("b.json", "b")]
+
+
+async def test_failed_pending_write_is_raised_to_waiters(monkeypatch):
+    release = threading.Event()
+
+    def write_scene_file(path, data, compact=False):
+        release.wait(5)
+        if data["name"] == "bad":
+            raise OSError("disk full")
+
+    monkeypatch.setattr(save, "write_scene_file", write_scene_file)
+    writer = save.SceneFileWriter()
+
+    first = asyncio.create_task(writer.write("scene.json", {"name": "a"}))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(writer.write("scene.json", {"name": "bad"}))
+    await asyncio.sleep(0.01)
+    release.set()
+
+    await first
+    with pytest.raises(OSError):
+        await second
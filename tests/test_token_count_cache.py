@@ -0,0 +1,66 @@
+"""
+Unit tests for the shared token count cache.
+"""
+
+from talemate.scene_message import CharacterMessage
+from talemate.util import TokenCountCache
+
+
+def _char_count(source) -> int:
+    """Deterministic token counter: 1 char = 1 token."""
+    return len(str(source))
+
+
+class TestTokenCountCache:
+    def test_count_text_is_cached(self):
+        cache = TokenCountCache()
+        assert cache.count("hello", _char_count) == 5
+        assert cache.count("hello", _char_count) == 5
+        assert cache.misses == 1
+        assert cache.hits == 1
+
+    def test_count_list_sums_items(self):
+        cache = TokenCountCache()
+        assert cache.count(["ab", "cde"], _char_count) == 5
+
+    def test_max_size_evicts_oldest(self):
+        cache = TokenCountCache(max_size=2)
+        for text in ("a", "b", "c"):
+            cache.count(text, _char_count)
+        assert list(cache.texts[_char_count].keys()) == ["b", "c"]
+
+    def test_count_message_uses_format(self):
+        cache = TokenCountCache()
+        message = CharacterMessage(message="Elena: Hello there.")
+        text, tokens = cache.count_message(message, "narrative", count_fn=_char_count)
+        assert text == "Hello there."
+        assert tokens == len("Hello there.")
+
+    def test_count_message_without_format_uses_str(self):
+        cache = TokenCountCache()
+        message = CharacterMessage(message="Elena: Hello there.")
+        text, tokens = cache.count_message(message, count_fn=_char_count)
+        assert text == str(message)
+        assert tokens == len(str(message))
+
+    def test_count_message_detects_edits(self):
+        cache = TokenCountCache()
+        message = CharacterMessage(message="Elena: Hi.")
+        cache.count_message(message, "chat", count_fn=_char_count)
+        cache.count_message(message, "chat", count_fn=_char_count)
+        assert cache.hits == 1
+
+        message.message = "Elena: Hello, traveler."
+        text, tokens = cache.count_message(message, "chat", count_fn=_char_count)
+        assert text == "Elena: Hello, traveler."
+        assert tokens == len(text)
+        assert cache.misses == 2
+
+    def test_counts_are_kept_per_count_function(self):
+        cache = TokenCountCache()
+
+        def double_count(source) -> int:
+            return 2 * len(str(source))
+
+        assert cache.count("abc", _char_count) == 3
+        assert cache.count("abc", double_count) == 6
@@ -0,0 +1,259 @@
+"""
+Tests for the client tokenizer registry.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from talemate.client.base import ClientBase
+from talemate.client.llamacpp import LlamaCppClient
+from talemate.client.tokenizers import (
+    DEFAULT_TOKENIZER,
+    HFTokenizer,
+    LlamaCppTokenizer,
+    Tokenizer,
+    TokenizerRegistry,
+)
+from talemate.config.schema import Client as ClientConfig
+from talemate.scene.history_cache import HistoryTokenCache
+from talemate.util import TokenCountCache
+
+LONG_TEXT = "The quick brown fox jumps over the lazy dog. " * 4
+
+
+class WordTokenizer(Tokenizer):
+    key = "words"
+
+    def __init__(self):
+        super().__init__()
+        self.counted: list[str] = []
+
+    def count(self, text: str) -> int:
+        self.counted.append(text)
+        return len(text.split())
+
+
+class StubClient(ClientBase):
+    client_type = "stub"
+
+    def __init__(self, **config):
+        super().__init__(name="stub")
+        self._config = ClientConfig(type="stub", name="stub", **config)
+
+    @property
+    def client_config(self) -> ClientConfig:
+        return self._config
+
+
+class StubLlamaCppClient(LlamaCppClient):
+    def __init__(self, handler):
+        self.name = "llamacpp"
+        self.remote_model_name = "model-a"
+        self._config = ClientConfig(
+            type="llamacpp", name="llamacpp", api_url="http://llama.local:8080/v1"
+        )
+        self.transport = httpx.MockTransport(handler)
+
+    @property
+    def client_config(self) -> ClientConfig:
+        return self._config
+
+    def http_client(self, url=None) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self.transport)
+
+
+def tokenize_handler(requests: list[str], fail: bool = False):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if fail:
+            return httpx.Response(404)
+        content = json.loads(request.content)["content"]
+        requests.append(content)
+        return httpx.Response(200, json={"tokens": [0] * len(content.split())})
+
+    return handler
+
+
+@pytest.fixture
+def registry():
+    return TokenizerRegistry()
+
+
+def test_counts_are_cached_by_tokenizer_and_text(registry):
+    tokenizer = WordTokenizer()
+
+    assert registry.count(tokenizer, LONG_TEXT) == 36
+    assert registry.count(tokenizer, LONG_TEXT) == 36
+
+    assert tokenizer.counted == [LONG_TEXT]
+    assert registry.hits == 1
+
+
+def test_short_texts_bypass_cache(registry):
+    tokenizer = WordTokenizer()
+
+    registry.count(tokenizer, "a b")
+    registry.count(tokenizer, "a b")
+
+    assert len(tokenizer.counted) == 2
+    assert len(registry.counts) == 0
+
+
+def test_lru_eviction():
+    registry = TokenizerRegistry(max_size=1)
+    tokenizer = WordTokenizer()
+
+    registry.count(tokenizer, LONG_TEXT)
+    registry.count(tokenizer, LONG_TEXT + "x")
+    registry.count(tokenizer, LONG_TEXT)
+
+    assert tokenizer.counted.count(LONG_TEXT) == 2
+
+
+def test_client_defaults_to_tiktoken():
+    client = StubClient()
+    assert client.tokenizer is DEFAULT_TOKENIZER
+    assert client.count_tokens(LONG_TEXT) == DEFAULT_TOKENIZER.count(LONG_TEXT)
+
+
+def test_client_uses_configured_tokenizer_file(tmp_path):
+    tokenizers = pytest.importorskip("tokenizers")
+
+    vocab = {"[UNK]": 0, "hello": 1, "world": 2}
+    hf = tokenizers.Tokenizer(
+        tokenizers.models.WordLevel(vocab=vocab, unk_token="[UNK]")
+    )
+    hf.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    path = str(tmp_path / "tokenizer.json")
+    hf.save(path)
+
+    client = StubClient(tokenizer_file=path)
+
+    assert isinstance(client.tokenizer, HFTokenizer)
+    assert client.count_tokens("hello world hello") == 3
+
+
+def test_client_falls_back_if_tokenizer_file_is_missing(tmp_path):
+    client = StubClient(tokenizer_file=str(tmp_path / "missing.json"))
+    assert client.tokenizer is DEFAULT_TOKENIZER
+
+
+async def test_llamacpp_counts_through_tokenize_endpoint():
+    requests = []
+    client = StubLlamaCppClient(tokenize_handler(requests))
+
+    tokenizer = client.tokenizer
+    assert isinstance(tokenizer, LlamaCppTokenizer)
+    assert tokenizer.url == "http://llama.local:8080/tokenize"
+    assert "model-a" in tokenizer.key
+
+    assert await client.count_tokens_async(LONG_TEXT) == 36
+    assert await client.count_tokens_async(LONG_TEXT) == 36
+    assert requests == [LONG_TEXT]
+
+
+async def test_remote_sync_miss_is_estimated_then_resolved(registry):
+    requests = []
+    client = StubLlamaCppClient(tokenize_handler(requests))
+    tokenizer = client.make_backend_tokenizer()
+    texts = [f"{LONG_TEXT} {i}" for i in range(3)]
+
+    estimates = [registry.count(tokenizer, text) for text in texts]
+    assert estimates == [DEFAULT_TOKENIZER.count(text) for text in texts]
+    assert tokenizer.pending == set(texts)
+
+    # queued texts are counted in one background batch
+    await asyncio.sleep(0.05)
+
+    assert sorted(requests) == texts
+    assert tokenizer.revision == 1
+    assert [registry.count(tokenizer, text) for text in texts] == [37] * 3
+
+
+async def test_remote_short_texts_and_estimates_are_not_queued(registry):
+    requests = []
+    client = StubLlamaCppClient(tokenize_handler(requests))
+    tokenizer = client.make_backend_tokenizer()
+
+    # e.g., streamed response chunks
+    for chunk in ["Hello", " there", ", traveler."]:
+        assert registry.count(tokenizer, chunk) == DEFAULT_TOKENIZER.count(chunk)
+    assert registry.estimate(tokenizer, LONG_TEXT) == DEFAULT_TOKENIZER.count(LONG_TEXT)
+
+    await asyncio.sleep(0.05)
+
+    assert not tokenizer.pending
+    assert requests == []
+    assert tokenizer.revision == 0
+
+
+async def test_revision_is_kept_if_estimates_were_exact(registry):
+    def handler(request: httpx.Request) -> httpx.Response:
+        content = json.loads(request.content)["content"]
+        tokens = DEFAULT_TOKENIZER.count(content)
+        return httpx.Response(200, json={"tokens": [0] * tokens})
+
+    client = StubLlamaCppClient(handler)
+    tokenizer = client.make_backend_tokenizer()
+
+    registry.count(tokenizer, LONG_TEXT)
+    await asyncio.sleep(0.05)
+
+    assert tokenizer.revision == 0
+    # the resolved count is cached all the same
+    assert registry.estimate(tokenizer, LONG_TEXT) == DEFAULT_TOKENIZER.count(LONG_TEXT)
+    assert registry.hits == 1
+
+
+async def test_remote_failure_falls_back_to_estimate(registry):
+    client = StubLlamaCppClient(tokenize_handler([], fail=True))
+    tokenizer = client.make_backend_tokenizer()
+
+    counts = await registry.count_many(tokenizer, [LONG_TEXT])
+
+    assert counts == [DEFAULT_TOKENIZER.count(LONG_TEXT)]
+    assert not tokenizer.available
+    assert len(registry.counts) == 0
+
+    # no further requests are queued while the endpoint is unavailable
+    registry.count(tokenizer, LONG_TEXT)
+    assert not tokenizer.pending
+
+
+class RevisedCounter:
+    revision = 0
+
+    def __call__(self, text: str) -> int:
+        return len(text.split())
+
+
+def test_token_count_cache_drops_entries_on_revision_change():
+    cache = TokenCountCache()
+    counter = RevisedCounter()
+
+    cache.count(LONG_TEXT, counter)
+    cache.count(LONG_TEXT, counter)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    counter.revision = 1
+    cache.count(LONG_TEXT, counter)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_history_token_cache_recounts_on_revision_change():
+    cache = HistoryTokenCache()
+    counter = RevisedCounter()
+    entry = {"id": "1", "text": LONG_TEXT}
+
+    def format_fn(entry, scene_ts):
+        return entry["text"]
+
+    cache.get("archived", entry, "PT1H", format_fn, counter)
+    cache.get("archived", entry, "PT1H", format_fn, counter)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    counter.revision = 1
+    cache.get("archived", entry, "PT1H", format_fn, counter)
+    assert (cache.hits, cache.misses) == (1, 2)
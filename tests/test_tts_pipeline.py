@@ -0,0 +1,222 @@
+"""
+Tests for the TTS agent's pipelined generation queue and audio cache.
+
+The provider's generate function is faked, the queue, scheduling and cache
+run on a real TTSAgent.
+"""
+
+import asyncio
+import os
+
+import pytest
+from unittest.mock import patch
+
+from talemate.agents.tts import TTSAgent
+from talemate.agents.tts.audio_cache import AudioCache
+from talemate.agents.tts.schema import Chunk, GenerationContext, Voice
+
+
+class FakeProvider:
+    def __init__(self, delays: dict[str, float] | None = None):
+        self.delays = delays or {}
+        self.calls: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.release: asyncio.Event | None = None
+
+    async def generate(self, chunk: Chunk, context: GenerationContext) -> bytes:
+        text = chunk.cleaned_text
+        self.calls.append(text)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.release:
+                await self.release.wait()
+            await asyncio.sleep(self.delays.get(text, 0.01))
+        finally:
+            self.in_flight -= 1
+        return text.encode("utf-8")
+
+
+@pytest.fixture
+def audio_cache(tmp_path):
+    cache = AudioCache(path=tmp_path)
+    with patch("talemate.agents.tts.AUDIO_CACHE", cache):
+        yield cache
+
+
+@pytest.fixture
+def played():
+    played = []
+
+    def play_audio(self, audio_data, message_id=None):
+        played.append(audio_data.decode("utf-8"))
+
+    with patch.object(TTSAgent, "play_audio", play_audio):
+        yield played
+
+
+@pytest.fixture
+def agent(audio_cache, played):
+    agent = TTSAgent()
+    agent.fake_audio_cache_settings = lambda chunk: {"model": "fake-1"}
+    return agent
+
+
+def make_chunk(provider: FakeProvider, texts: list[str], api: str = "fake") -> Chunk:
+    return Chunk(
+        text=texts,
+        type="exposition",
+        api=api,
+        voice=Voice(label="Test", provider=api, provider_id="test-voice"),
+        generate_fn=provider.generate,
+        message_id=1,
+    )
+
+
+async def run_queue(agent: TTSAgent, *chunks: Chunk):
+    context = GenerationContext(chunks=list(chunks))
+    for chunk in chunks:
+        agent._generation_queue.append((context, chunk))
+    agent._queue_id = "test"
+    await agent._process_queue("test")
+
+
+async def test_chunks_are_synthesized_concurrently_and_played_in_order(agent, played):
+    texts = ["One.", "Two.", "Three.", "Four.", "Five."]
+    # the first chunk takes the longest
+    provider = FakeProvider({"One.": 0.05})
+    agent.fake_max_concurrent = 3
+
+    await run_queue(
+        agent, make_chunk(provider, texts[:2]), make_chunk(provider, texts[2:])
+    )
+
+    assert played == texts
+    assert 1 < provider.max_in_flight <= 3
+
+
+async def test_apis_without_concurrency_generate_one_at_a_time(agent, played):
+    texts = ["One.", "Two.", "Three."]
+    provider = FakeProvider({"One.": 0.03})
+    prepared = []
+
+    async def prepare(chunk):
+        # the next chunk is not prepared ahead of the running generation
+        assert provider.in_flight == 0
+        prepared.append(chunk.cleaned_text)
+
+    chunk = make_chunk(provider, texts)
+    chunk.prepare_fn = prepare
+    await run_queue(agent, chunk)
+
+    assert played == texts
+    assert prepared == texts
+    assert provider.max_in_flight == 1
+
+
+async def test_unchanged_text_is_served_from_cache(agent, played, audio_cache):
+    provider = FakeProvider()
+    agent.fake_max_concurrent = 3
+
+    await run_queue(agent, make_chunk(provider, ["One.", "Two."]))
+    # drop the in-memory entries, the audio is read from disk
+    audio_cache.entries.clear()
+    await run_queue(agent, make_chunk(provider, ["One.", "Two.", "Three."]))
+
+    assert provider.calls == ["One.", "Two.", "Three."]
+    assert played == ["One.", "Two.", "One.", "Two.", "Three."]
+    assert audio_cache.disk_hits == 2
+
+
+async def test_cache_key_includes_voice_parameters(agent, played):
+    provider = FakeProvider()
+
+    chunk = make_chunk(provider, ["One."])
+    await run_queue(agent, chunk)
+    chunk = make_chunk(provider, ["One."])
+    chunk.voice.parameters["speed"] = 1.5
+    await run_queue(agent, chunk)
+
+    assert provider.calls == ["One.", "One."]
+
+
+async def test_cache_key_includes_api_settings(agent, played):
+    provider = FakeProvider()
+
+    await run_queue(agent, make_chunk(provider, ["One."]))
+    agent.fake_audio_cache_settings = lambda chunk: {"model": "fake-2"}
+    await run_queue(agent, make_chunk(provider, ["One."]))
+
+    assert provider.calls == ["One.", "One."]
+
+
+def test_f5tts_cache_key_includes_model_and_quality(agent):
+    chunk = Chunk(
+        text=["One."],
+        type="exposition",
+        api="f5tts",
+        voice=Voice(label="Test", provider="f5tts", provider_id="voice.wav"),
+    )
+    key = agent._audio_cache_key(chunk)
+
+    agent.actions["f5tts"].config["nfe_step"].value += 8
+    assert agent._audio_cache_key(chunk) != key
+
+    assert agent.f5tts_audio_cache_settings(chunk)["model"] == agent.f5tts_model_name
+
+
+async def test_apis_without_cache_settings_are_not_cached(agent, played):
+    provider = FakeProvider()
+
+    await run_queue(agent, make_chunk(provider, ["One."], api="uncached"))
+    await run_queue(agent, make_chunk(provider, ["One."], api="uncached"))
+
+    assert provider.calls == ["One.", "One."]
+
+
+async def test_audio_cache_can_be_disabled(agent, played):
+    provider = FakeProvider()
+    agent.actions["_config"].config["audio_cache"].value = False
+
+    await run_queue(agent, make_chunk(provider, ["One."]))
+    await run_queue(agent, make_chunk(provider, ["One."]))
+
+    assert provider.calls == ["One.", "One."]
+
+
+async def test_stop_cancels_in_flight_synthesis(agent, played):
+    provider = FakeProvider()
+    provider.release = asyncio.Event()
+    agent.fake_max_concurrent = 3
+
+    context = GenerationContext()
+    agent._generation_queue.append(
+        (context, make_chunk(provider, ["One.", "Two.", "Three."]))
+    )
+    agent._queue_id = "test"
+    agent._queue_task = asyncio.create_task(agent._process_queue("test"))
+
+    async def all_in_flight():
+        while provider.in_flight < 3:
+            await asyncio.sleep(0.001)
+
+    await asyncio.wait_for(all_in_flight(), timeout=1)
+
+    await agent.stop_and_clear_queue()
+    await asyncio.sleep(0.01)
+
+    assert provider.in_flight == 0
+    assert played == []
+    assert not agent._generation_queue
+    assert agent.current_queue_id() is None
+
+
+def test_audio_cache_prunes_oldest(tmp_path):
+    cache = AudioCache(path=tmp_path, max_disk_bytes=10)
+    for n, key in enumerate(["aa1", "aa2", "aa3"]):
+        cache.put(key, b"12345")
+        os.utime(cache._file(key), (1000 + n, 1000 + n))
+    cache.prune()
+
+    assert sorted(file.stem for file in cache.disk_files()) == ["aa2", "aa3"]
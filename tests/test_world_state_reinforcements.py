@@ -5,7 +5,10 @@ Tests for world state reinforcement bugs:
 2. Removing a world-level reinforcement doesn't clean up its manual_context entry
 """
 
+import asyncio
+
 import pytest
+from unittest.mock import patch
 
 from conftest import MockScene, bootstrap_scene
 from talemate.world_state import ManualContext, Reinforcement
@@ -180,3 +183,96 @@ class TestReinforcementRemovalCleanup:
         # The other manual_context entry should still exist
         assert "What is the current weather?" in world_state.manual_context
         assert "What is the current time of day?" not in world_state.manual_context
+
+
+# ---------------------------------------------------------------------------
+# Concurrent reinforcement updates
+# ---------------------------------------------------------------------------
+
+
+class TestConcurrentReinforcementUpdates:
+    """
+    Due reinforcements are queried concurrently (when the client supports
+    it) and applied in the order of the reinforcements.
+    """
+
+    @pytest.fixture
+    def world_state_agent(self, scene):
+        agent = scene.world_state.agent
+        character = Character(name="Alice")
+        scene.actors.append(Actor(character=character, agent=None))
+
+        in_flight = 0
+        agent._test_max_in_flight = 0
+
+        async def query_reinforcement(reinforcement, reset=False):
+            nonlocal in_flight
+            in_flight += 1
+            agent._test_max_in_flight = max(agent._test_max_in_flight, in_flight)
+            # later questions answer first
+            await asyncio.sleep(0.05 - 0.01 * int(reinforcement.question[-1]))
+            in_flight -= 1
+            return f"answer to {reinforcement.question}"
+
+        agent._query_reinforcement = query_reinforcement
+        return agent
+
+    async def add_reinforcements(self, scene, count: int):
+        for i in range(count):
+            await scene.world_state.add_reinforcement(
+                question=f"Question {i}",
+                character="Alice",
+                interval=3,
+                insert="sequential",
+                require_active=False,
+            )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_updates_apply_in_order(self, scene, world_state_agent):
+        await self.add_reinforcements(scene, 4)
+
+        with (
+            patch.object(type(world_state_agent), "reinforcements_max_concurrent", 4),
+            patch("talemate.tale_mate.emit"),
+        ):
+            await world_state_agent.update_reinforcements(force=True)
+
+        assert world_state_agent._test_max_in_flight > 1
+
+        messages = [message.message for message in scene.history]
+        assert messages == [f"answer to Question {i}" for i in range(4)]
+
+        character = scene.get_character("Alice")
+        for i, reinforcement in enumerate(scene.world_state.reinforce):
+            assert reinforcement.answer == f"answer to Question {i}"
+            assert reinforcement.due == reinforcement.interval
+            assert character.get_detail(f"Question {i}") == f"answer to Question {i}"
+
+    @pytest.mark.asyncio
+    async def test_sequential_without_concurrent_inference(
+        self, scene, world_state_agent
+    ):
+        await self.add_reinforcements(scene, 3)
+        assert world_state_agent.reinforcements_max_concurrent == 1
+
+        with patch("talemate.tale_mate.emit"):
+            await world_state_agent.update_reinforcements(force=True)
+
+        assert world_state_agent._test_max_in_flight == 1
+        messages = [message.message for message in scene.history]
+        assert messages == [f"answer to Question {i}" for i in range(3)]
+
+    @pytest.mark.asyncio
+    async def test_only_due_reinforcements_are_queried(self, scene, world_state_agent):
+        await self.add_reinforcements(scene, 3)
+        scene.world_state.reinforce[1].due = 2
+
+        with (
+            patch.object(type(world_state_agent), "reinforcements_max_concurrent", 4),
+            patch("talemate.tale_mate.emit"),
+        ):
+            await world_state_agent.update_reinforcements()
+
+        messages = [message.message for message in scene.history]
+        assert messages == ["answer to Question 0", "answer to Question 2"]
+        assert scene.world_state.reinforce[1].due == 1